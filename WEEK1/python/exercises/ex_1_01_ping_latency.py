@@ -9,6 +9,7 @@ Obiective:
 - Înțelegerea conceptului de Round-Trip Time (RTT)
 - Utilizarea subprocess pentru executarea comenzilor sistem
 - Parsarea și analiza output-ului ping
+- Măsurarea concurentă a RTT către multe destinații (asyncio)
 
 Nivel: Începător
 Timp estimat: 15 minute
@@ -17,10 +18,15 @@ Timp estimat: 15 minute
 # =============================================================================
 # SETUP_ENVIRONMENT
 # =============================================================================
+import asyncio
+import math
+import socket
+import struct
 import subprocess
 import re
 import statistics
 import sys
+import time
 from typing import NamedTuple
 
 
@@ -37,6 +43,74 @@ class PingResult(NamedTuple):
     rtt_avg_ms: float
     rtt_max_ms: float
     rtt_mdev_ms: float
+    rtt_jitter_ms: float = 0.0      # media |RTT(i) - RTT(i-1)| între răspunsuri consecutive
+    method: str = "ping"            # "ping", "icmp" sau "tcp"
+
+
+class RttStats:
+    """
+    Statistici RTT calculate în flux (streaming), fără a păstra eșantioanele.
+
+    min/max/medie direct, mdev prin algoritmul lui Welford (deviația
+    standard a populației, ca în ping), jitter ca medie a diferențelor
+    absolute între RTT-uri consecutive. Pierderile sunt sondele fără răspuns.
+    """
+    __slots__ = ("sent", "received", "min", "max", "mean", "_m2", "_last", "_jitter_sum")
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.min = math.inf
+        self.max = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._last = None
+        self._jitter_sum = 0.0
+
+    def add(self, rtt_ms: float) -> None:
+        """Înregistrează o sondă cu răspuns."""
+        self.sent += 1
+        self.received += 1
+        self.min = min(self.min, rtt_ms)
+        self.max = max(self.max, rtt_ms)
+        delta = rtt_ms - self.mean
+        self.mean += delta / self.received
+        self._m2 += delta * (rtt_ms - self.mean)
+        if self._last is not None:
+            self._jitter_sum += abs(rtt_ms - self._last)
+        self._last = rtt_ms
+
+    def lost(self) -> None:
+        """Înregistrează o sondă fără răspuns (timeout)."""
+        self.sent += 1
+
+    @property
+    def mdev(self) -> float:
+        return math.sqrt(self._m2 / self.received) if self.received else 0.0
+
+    @property
+    def jitter(self) -> float:
+        return self._jitter_sum / (self.received - 1) if self.received > 1 else 0.0
+
+    @property
+    def loss_percent(self) -> float:
+        return 100.0 * (self.sent - self.received) / self.sent if self.sent else 0.0
+
+    def to_result(self, host: str, method: str) -> PingResult:
+        """Rezultatul final, în același format ca ping_host."""
+        received = self.received > 0
+        return PingResult(
+            host=host,
+            packets_sent=self.sent,
+            packets_received=self.received,
+            packet_loss_percent=self.loss_percent,
+            rtt_min_ms=self.min if received else 0.0,
+            rtt_avg_ms=self.mean,
+            rtt_max_ms=self.max,
+            rtt_mdev_ms=self.mdev,
+            rtt_jitter_ms=self.jitter,
+            method=method
+        )
 
 
 # =============================================================================
@@ -103,6 +177,11 @@ def ping_host(host: str, count: int = 4, timeout: int = 5) -> PingResult | None:
             # Dacă nu primim răspuns, setăm RTT la 0
             rtt_min = rtt_avg = rtt_max = rtt_mdev = 0.0
         
+        # Jitter din RTT-urile individuale ("... time=0.031 ms")
+        replies = RttStats()
+        for rtt in re.findall(r"time=([\d.]+) ms", output):
+            replies.add(float(rtt))
+        
         # ---------------------------------------------------------------------
         # BUILD_RESULT
         # ---------------------------------------------------------------------
@@ -114,7 +193,8 @@ def ping_host(host: str, count: int = 4, timeout: int = 5) -> PingResult | None:
             rtt_min_ms=rtt_min,
             rtt_avg_ms=rtt_avg,
             rtt_max_ms=rtt_max,
-            rtt_mdev_ms=rtt_mdev
+            rtt_mdev_ms=rtt_mdev,
+            rtt_jitter_ms=replies.jitter
         )
     
     # -------------------------------------------------------------------------
@@ -128,13 +208,213 @@ def ping_host(host: str, count: int = 4, timeout: int = 5) -> PingResult | None:
         return None
 
 
-def compare_latencies(hosts: list[str], count: int = 10) -> None:
+# =============================================================================
+# CONCURRENT_PROBER
+# =============================================================================
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+_ICMP_HEADER = struct.Struct("!BBHHH")
+
+
+def _icmp_checksum(data: bytes) -> int:
+    """Suma de control Internet (RFC 1071)."""
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _icmp_echo_request(seq: int, payload: bytes = b"NETro-probe") -> bytes:
+    """Pachet ICMP Echo Request (identificatorul îl pune kernel-ul)."""
+    header = _ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, 0, seq)
+    checksum = _icmp_checksum(header + payload)
+    return _ICMP_HEADER.pack(ICMP_ECHO_REQUEST, 0, checksum, 0, seq) + payload
+
+
+def icmp_datagram_available() -> bool:
+    """
+    Verifică dacă putem deschide socket-uri ICMP fără root.
+
+    Pe Linux, SOCK_DGRAM + IPPROTO_ICMP este permis grupurilor din
+    /proc/sys/net/ipv4/ping_group_range (kernel-ul completează
+    identificatorul și livrează fiecărui socket doar răspunsurile sale).
+    """
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP).close()
+        return True
+    except OSError:
+        return False
+
+
+class LatencyProber:
+    """
+    Măsoară RTT către multe destinații simultan, într-o singură buclă asyncio.
+
+    Metode:
+        - "icmp": un singur socket ICMP datagram (neprivilegiat) pentru toate
+          destinațiile; răspunsurile sunt distribuite după (adresă, seq)
+        - "tcp": durata unui TCP connect() către tcp_port (un RST înseamnă
+          tot un răspuns - host-ul e accesibil, portul doar e închis)
+        - "auto": ICMP dacă sistemul îl permite, altfel TCP
+
+    Fiecare destinație trimite `count` sonde la `interval` secunde; toate
+    destinațiile rulează în paralel, deci durata totală este aproximativ
+    count × interval + timeout, indiferent de numărul de destinații.
+    """
+
+    def __init__(self, count: int = 4, interval: float = 0.2, timeout: float = 1.0,
+                 method: str = "auto", tcp_port: int = 80, max_concurrency: int = 512):
+        if method not in ("auto", "icmp", "tcp"):
+            raise ValueError(f"Metodă necunoscută: {method}")
+        self.count = count
+        self.interval = interval
+        self.timeout = timeout
+        self.method = method
+        self.tcp_port = tcp_port
+        self.max_concurrency = max_concurrency
+        self._sock = None
+        self._waiters: dict[tuple[str, int], asyncio.Future] = {}
+        self._seq = 0
+
+    # -------------------------------------------------------------------------
+    # ICMP_SOCKET
+    # -------------------------------------------------------------------------
+    def _open_icmp(self, loop) -> None:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        self._sock.setblocking(False)
+        loop.add_reader(self._sock.fileno(), self._on_icmp_readable)
+
+    def _close_icmp(self, loop) -> None:
+        if self._sock is not None:
+            loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+
+    def _on_icmp_readable(self) -> None:
+        """Citește toate răspunsurile disponibile și trezește sondele în așteptare."""
+        now = time.perf_counter()
+        while True:
+            try:
+                data, (address, _port) = self._sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            if len(data) < _ICMP_HEADER.size:
+                continue
+            icmp_type, _code, _checksum, _ident, seq = _ICMP_HEADER.unpack_from(data)
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            waiter = self._waiters.pop((address, seq), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(now)
+
+    async def _icmp_once(self, address: str) -> float | None:
+        loop = asyncio.get_running_loop()
+        self._seq = (self._seq + 1) & 0xFFFF
+        key = (address, self._seq)
+        waiter = loop.create_future()
+        self._waiters[key] = waiter
+        start = time.perf_counter()
+        try:
+            self._sock.sendto(_icmp_echo_request(self._seq), (address, 0))
+            received = await asyncio.wait_for(waiter, self.timeout)
+            return (received - start) * 1000
+        except (asyncio.TimeoutError, OSError):
+            return None
+        finally:
+            self._waiters.pop(key, None)
+
+    # -------------------------------------------------------------------------
+    # TCP_FALLBACK
+    # -------------------------------------------------------------------------
+    async def _tcp_once(self, address: str) -> float | None:
+        start = time.perf_counter()
+        try:
+            _reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(address, self.tcp_port), self.timeout)
+        except ConnectionRefusedError:
+            return (time.perf_counter() - start) * 1000   # RST = host accesibil
+        except (asyncio.TimeoutError, OSError):
+            return None
+        rtt = (time.perf_counter() - start) * 1000
+        writer.close()
+        return rtt
+
+    # -------------------------------------------------------------------------
+    # PROBE_LOOP
+    # -------------------------------------------------------------------------
+    async def _probe_host(self, host: str, method: str, limit) -> PingResult | None:
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET if method == "icmp" else socket.AF_UNSPEC
+        try:
+            infos = await loop.getaddrinfo(host, None, family=family, type=socket.SOCK_STREAM)
+            address = infos[0][4][0]
+        except (socket.gaierror, IndexError):
+            return None
+        
+        probe = self._icmp_once if method == "icmp" else self._tcp_once
+        stats = RttStats()
+        for i in range(self.count):
+            if i:
+                await asyncio.sleep(self.interval)
+            async with limit:
+                rtt = await probe(address)
+            if rtt is None:
+                stats.lost()
+            else:
+                stats.add(rtt)
+        return stats.to_result(host, method)
+
+    async def probe_many(self, hosts: list[str]) -> dict[str, PingResult | None]:
+        """Sondează toate destinațiile concurent; None pentru host-uri nerezolvabile."""
+        loop = asyncio.get_running_loop()
+        method = self.method
+        if method == "auto":
+            method = "icmp" if icmp_datagram_available() else "tcp"
+        if method == "icmp":
+            self._open_icmp(loop)
+        limit = asyncio.Semaphore(self.max_concurrency)
+        try:
+            results = await asyncio.gather(
+                *(self._probe_host(host, method, limit) for host in hosts))
+        finally:
+            self._close_icmp(loop)
+        return dict(zip(hosts, results))
+
+    def run(self, hosts: list[str]) -> dict[str, PingResult | None]:
+        """Variantă sincronă a probe_many."""
+        return asyncio.run(self.probe_many(hosts))
+
+
+def probe_hosts(hosts: list[str], count: int = 4, interval: float = 0.2,
+                timeout: float = 1.0, method: str = "auto",
+                tcp_port: int = 80) -> dict[str, PingResult | None]:
+    """
+    Măsoară RTT către toate host-urile simultan (vezi LatencyProber).
+    
+    Exemplu:
+        >>> results = probe_hosts(["127.0.0.1", "8.8.8.8"], count=3)
+        >>> results["127.0.0.1"].rtt_jitter_ms
+    """
+    prober = LatencyProber(count=count, interval=interval, timeout=timeout,
+                           method=method, tcp_port=tcp_port)
+    return prober.run(hosts)
+
+
+def compare_latencies(hosts: list[str], count: int = 10, method: str = "auto") -> None:
     """
     Compară latența către mai multe host-uri.
     
+    Toate host-urile sunt sondate simultan (probe_hosts), deci comparația
+    durează cât un singur ping, indiferent de numărul de host-uri.
+    
     Args:
         hosts: Lista de host-uri de testat
         count: Numărul de pachete per host
+        method: "auto", "icmp" sau "tcp" (vezi LatencyProber)
     """
     # -------------------------------------------------------------------------
     # DISPLAY_HEADER
@@ -148,9 +428,12 @@ def compare_latencies(hosts: list[str], count: int = 10) -> None:
     # -------------------------------------------------------------------------
     results = []
     
+    print(f"[INFO] Se testează {len(hosts)} host-uri în paralel...", flush=True)
+    probed = probe_hosts(hosts, count=count, method=method)
+    
     for host in hosts:
-        print(f"[INFO] Se testează {host}...", end=" ", flush=True)
-        result = ping_host(host, count=count)
+        print(f"[INFO] {host}...", end=" ")
+        result = probed[host]
         
         if result and result.packets_received > 0:
             print(f"✓ RTT={result.rtt_avg_ms:.2f}ms")
@@ -170,7 +453,7 @@ def compare_latencies(hosts: list[str], count: int = 10) -> None:
     print(f"{'-'*60}")
     
     for r in sorted(results, key=lambda x: x.rtt_avg_ms):
-        jitter = r.rtt_mdev_ms
+        jitter = r.rtt_jitter_ms
         loss_str = f"{r.packet_loss_percent:.1f}%"
         print(f"{r.host:<25} {r.rtt_avg_ms:>8.2f} ms  {loss_str:<10} {jitter:>8.3f} ms")
     
@@ -293,7 +576,7 @@ def run_self_test() -> bool:
     print("="*60 + "\n")
     
     tests_passed = 0
-    tests_total = 3
+    tests_total = 5
     
     # -------------------------------------------------------------------------
     # TEST_LOOPBACK
@@ -327,6 +610,40 @@ def run_self_test() -> bool:
     else:
         print("✗ FAIL")
     
+    # -------------------------------------------------------------------------
+    # TEST_STREAMING_STATS
+    # -------------------------------------------------------------------------
+    print("[TEST 4] Statistici RTT în flux...", end=" ")
+    samples = [1.0, 3.0, 2.0, 6.0]
+    stats = RttStats()
+    for rtt in samples:
+        stats.add(rtt)
+    stats.lost()
+    if (abs(stats.mean - statistics.mean(samples)) < 1e-9 and
+            abs(stats.mdev - statistics.pstdev(samples)) < 1e-9 and
+            abs(stats.jitter - 7.0 / 3) < 1e-9 and stats.loss_percent == 20.0):
+        print("✓ PASS")
+        tests_passed += 1
+    else:
+        print("✗ FAIL")
+    
+    # -------------------------------------------------------------------------
+    # TEST_CONCURRENT_PROBER
+    # -------------------------------------------------------------------------
+    print("[TEST 5] Sondare concurentă (50 destinații)...", end=" ")
+    targets = ["127.0.0.1"] + [f"127.0.0.{i}" for i in range(2, 50)] + ["10.255.255.1"]
+    start = time.perf_counter()
+    probed = probe_hosts(targets, count=3, interval=0.1, timeout=0.5)
+    elapsed = time.perf_counter() - start
+    # Secvențial, 50 × 3 sonde (cu timeout-uri) ar dura zeci de secunde;
+    # concurent, durata este ~ 2 × 0.1 s + 3 × 0.5 s (host-ul inaccesibil)
+    replied = [r for r in probed.values() if r and r.packets_received == 3]
+    if len(replied) >= 49 and elapsed < 3.0:
+        print(f"✓ PASS ({replied[0].method}, {elapsed:.2f} s)")
+        tests_passed += 1
+    else:
+        print(f"✗ FAIL ({elapsed:.2f} s)")
+    
     # -------------------------------------------------------------------------
     # DISPLAY_SUMMARY
     # -------------------------------------------------------------------------
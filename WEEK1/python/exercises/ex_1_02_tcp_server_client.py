@@ -9,6 +9,7 @@ Obiective:
 - Înțelegerea modelului client-server
 - Utilizarea socket-urilor TCP în Python
 - Observarea comportamentului de conectare/deconectare
+- (Avansat) Mai multe procese pe același port cu SO_REUSEPORT
 
 Nivel: Începător-Mediu
 Timp estimat: 25 minute
@@ -22,18 +23,30 @@ Timp estimat: 25 minute
 # =============================================================================
 # SETUP_ENVIRONMENT
 # =============================================================================
+import os
+import signal
 import socket
+import subprocess
 import threading
 import time
 import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+from prefork import SharedCounters, run_prefork
+
 
 # =============================================================================
 # SERVER TCP SIMPLU
 # =============================================================================
 
-def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
+def create_tcp_server(
+    host: str = "127.0.0.1",
+    port: int = 9999,
+    processes: int = 1,
+    reuse_port: bool = False,
+    counters: SharedCounters | None = None
+) -> None:
     """
     Creează un server TCP simplu care primește și afișează mesaje.
     
@@ -46,9 +59,17 @@ def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
     Args:
         host: Adresa IP pe care ascultă serverul
         port: Portul pe care ascultă
+        processes: >1 pornește un supervisor cu atâtea procese worker
+        reuse_port: SO_REUSEPORT (folosit de workeri, setat automat)
+        counters: Contoarele în care scrie acest proces
     
     🎯 PREDICȚIE: Ce va afișa `ss -tlnp | grep {port}` după ce pornește serverul?
     """
+    if processes > 1:
+        run_tcp_supervisor(host, port, processes)
+        return
+    counters = counters or SharedCounters(COUNTER_NAMES)
+    
     # -------------------------------------------------------------------------
     # CREATE_SOCKET
     # -------------------------------------------------------------------------
@@ -62,12 +83,18 @@ def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
     # Fără această opțiune, portul rămâne în TIME_WAIT ~2 minute
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     
+    # SO_REUSEPORT permite mai multor socket-uri (din procese diferite) să
+    # asculte pe același port; kernel-ul distribuie conexiunile între ele
+    if reuse_port:
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    
     try:
         # ---------------------------------------------------------------------
         # BIND_SOCKET
         # ---------------------------------------------------------------------
         server_socket.bind((host, port))
-        print(f"[SERVER] Socket legat la {host}:{port}")
+        print(f"[SERVER] Socket legat la {host}:{port}"
+              + (f" (worker pid {os.getpid()})" if reuse_port else ""))
         
         # ---------------------------------------------------------------------
         # START_LISTENING
@@ -83,6 +110,7 @@ def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
         while True:
             # accept() blochează până vine un client
             client_socket, client_address = server_socket.accept()
+            counters.add(CONNECTIONS)
             timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
             print(f"[{timestamp}] Conexiune nouă de la {client_address}")
             
@@ -99,6 +127,8 @@ def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
                         print(f"[{timestamp}] Client {client_address} deconectat")
                         break
                     
+                    counters.add(MESSAGES)
+                    counters.add(BYTES_IN, len(data))
                     message = data.decode('utf-8').strip()
                     print(f"[{timestamp}] Primit de la {client_address}: {message}")
                     
@@ -126,6 +156,43 @@ def create_tcp_server(host: str = "127.0.0.1", port: int = 9999) -> None:
         print("[SERVER] Socket închis.")
 
 
+# =============================================================================
+# SERVER MULTI-PROCES (SO_REUSEPORT)
+# =============================================================================
+
+COUNTER_NAMES = ("connections", "messages", "bytes_in")
+CONNECTIONS, MESSAGES, BYTES_IN = range(len(COUNTER_NAMES))
+
+
+def run_tcp_supervisor(
+    host: str,
+    port: int,
+    processes: int,
+    stats_interval: float = 5.0
+) -> None:
+    """
+    Pornește `processes` copii ai serverului, toți pe același port.
+    
+    Un proces Python execută bytecode pe un singur nucleu (GIL); cu N
+    procese, fiecare cu socket-ul lui SO_REUSEPORT, kernel-ul împarte
+    conexiunile noi între ele și serverul folosește N nuclee.
+    
+    Supervisorul (utils/prefork.py, copiat și în S2 și S3):
+    - repornește orice worker care moare (kill -9, excepție etc.)
+    - afișează periodic contoarele adunate de la toți workerii
+    - la Ctrl+C / SIGTERM oprește workerii și afișează totalul
+    
+    🎯 PREDICȚIE: Câte linii LISTEN va afișa `ss -tlnp | grep {port}` cu 4 procese?
+    """
+    # Contoarele stau în memorie partajată (mmap), creată înainte de fork()
+    counters = SharedCounters(COUNTER_NAMES, processes)
+    run_prefork(
+        host, port, processes,
+        lambda: create_tcp_server(host, port, reuse_port=True, counters=counters),
+        counters, stats_interval=stats_interval
+    )
+
+
 # =============================================================================
 # CLIENT TCP SIMPLU
 # =============================================================================
@@ -403,7 +470,7 @@ def run_self_test() -> bool:
     print("="*60 + "\n")
     
     tests_passed = 0
-    tests_total = 3
+    tests_total = 4
     
     # -------------------------------------------------------------------------
     # TEST_TCP_SOCKET_CREATION
@@ -458,6 +525,67 @@ def run_self_test() -> bool:
     except Exception as e:
         print(f"✗ FAIL ({e})")
     
+    # -------------------------------------------------------------------------
+    # TEST_REUSEPORT_SUPERVISOR
+    # -------------------------------------------------------------------------
+    print("[TEST 4] Supervisor SO_REUSEPORT (2 procese, repornire)...", end=" ", flush=True)
+    if not hasattr(socket, "SO_REUSEPORT") or not hasattr(os, "fork"):
+        print("✓ SKIP (platformă fără SO_REUSEPORT)")
+        tests_passed += 1
+    else:
+        supervisor = None
+        try:
+            probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+            probe.close()
+            
+            supervisor = subprocess.Popen(
+                [sys.executable, __file__, "server", str(port), "--processes", "2"],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            )
+            
+            def echo_once(text: str) -> str:
+                for _ in range(50):  # workerii pot încă porni
+                    try:
+                        with socket.create_connection(("127.0.0.1", port), timeout=2) as c:
+                            c.sendall((text + "\n").encode())
+                            return c.recv(1024).decode().strip()
+                    except ConnectionRefusedError:
+                        time.sleep(0.1)
+                return ""
+            
+            replies = [echo_once(f"msg{i}") for i in range(6)]
+            
+            # Omorâm un worker; supervisorul trebuie să-l repornească
+            with open(f"/proc/{supervisor.pid}/task/{supervisor.pid}/children") as f:
+                children = [int(pid) for pid in f.read().split()]
+            os.kill(children[0], signal.SIGKILL)
+            restarted = False
+            for _ in range(30):  # repornirea poate aștepta 1 s (protecție anti-buclă)
+                time.sleep(0.1)
+                with open(f"/proc/{supervisor.pid}/task/{supervisor.pid}/children") as f:
+                    current = [int(pid) for pid in f.read().split()]
+                if len(current) == 2 and children[0] not in current:
+                    restarted = True
+                    break
+            replies.append(echo_once("after-restart"))
+            
+            supervisor.terminate()
+            output = supervisor.communicate(timeout=5)[0]
+            
+            if (all(r.startswith("Server a primit: ") for r in replies) and restarted
+                    and "'connections': 7" in output.splitlines()[-1]):
+                print("✓ PASS")
+                tests_passed += 1
+            else:
+                print(f"✗ FAIL (repornit={restarted}, {output.splitlines()[-1:]})")
+        except Exception as e:
+            print(f"✗ FAIL ({e})")
+        finally:
+            if supervisor and supervisor.poll() is None:
+                supervisor.kill()
+    
     # -------------------------------------------------------------------------
     # DISPLAY_SUMMARY
     # -------------------------------------------------------------------------
@@ -472,7 +600,7 @@ def run_self_test() -> bool:
 def print_usage():
     print("""
 Utilizare:
-    python ex_1_02_tcp_server_client.py server [port]
+    python ex_1_02_tcp_server_client.py server [port] [--processes N]
     python ex_1_02_tcp_server_client.py client [host] [port]
     python ex_1_02_tcp_server_client.py udp-server [port]
     python ex_1_02_tcp_server_client.py udp-client [host] [port] [message]
@@ -482,6 +610,7 @@ Utilizare:
 Exemple:
     Terminal 1: python ex_1_02_tcp_server_client.py server 9999
     Terminal 2: python ex_1_02_tcp_server_client.py client localhost 9999
+    Multi-proces: python ex_1_02_tcp_server_client.py server 9999 --processes 4
     
 👥 PAIR PROGRAMMING TIP: Rulați serverul pe calculatorul Driver-ului,
    clientul pe calculatorul Navigator-ului (dacă sunteți în aceeași rețea).
@@ -500,8 +629,14 @@ if __name__ == "__main__":
         sys.exit(0 if success else 1)
     
     elif command == "server":
-        port = int(sys.argv[2]) if len(sys.argv) > 2 else 9999
-        create_tcp_server(port=port)
+        args = sys.argv[2:]
+        processes = 1
+        if "--processes" in args:
+            i = args.index("--processes")
+            processes = int(args[i + 1])
+            del args[i:i + 2]
+        port = int(args[0]) if args else 9999
+        create_tcp_server(port=port, processes=processes)
     
     elif command == "client":
         host = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
@@ -16,11 +16,16 @@ Concepte acoperite:
     - Detectarea anomaliilor în trafic (burst-uri, retransmisii)
 
 Dependențe:
+    Niciuna obligatorie - backend-ul nativ (mmap + struct) citește
+    direct formatele pcap și pcapng.
+
+    Opțional, pentru comparație și generare de capturi:
     pip install scapy --break-system-packages
-    
-    Alternativ (fără scapy, doar dpkt):
     pip install dpkt --break-system-packages
 
+    Opțional, pentru modul columnar (--columnar, --cache):
+    pip install numpy --break-system-packages
+
 Autor: Revolvix&Hypotheticalandrei
 Curs: Rețele de calculatoare, ASE București
 """
@@ -29,15 +34,29 @@ from __future__ import annotations
 
 import sys
 import argparse
+import abc
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import socket
 import statistics
+import time
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Generator, Optional, Any
-from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
 from datetime import datetime
+from array import array
 import struct
 
-# Încercăm import scapy, apoi dpkt ca fallback
+# Backend-ul nativ nu are dependențe; scapy și dpkt sunt opționale
+# (le încercăm pe amândouă pentru a le putea compara la --benchmark)
 SCAPY_AVAILABLE = False
 DPKT_AVAILABLE = False
 
@@ -49,12 +68,20 @@ try:
 except ImportError:
     pass
 
-if not SCAPY_AVAILABLE:
-    try:
-        import dpkt
-        DPKT_AVAILABLE = True
-    except ImportError:
-        pass
+try:
+    import dpkt
+    DPKT_AVAILABLE = True
+except ImportError:
+    pass
+
+# NumPy este necesar doar pentru reprezentarea columnară
+NUMPY_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass
 
 
 # =============================================================================
@@ -76,6 +103,9 @@ class PacketSummary:
     tcp_flags: Optional[str]   # Flag-uri TCP (SYN, ACK, FIN, etc.)
     payload_size: int          # Dimensiune payload (fără headere)
     ttl: Optional[int]         # Time To Live
+    tcp_seq: Optional[int] = None   # Număr de secvență TCP
+    tcp_ack: Optional[int] = None   # Număr de acknowledgment TCP
+    tcp_window: Optional[int] = None  # Fereastra anunțată (fără scalare)
     
     @property
     def is_tcp(self) -> bool:
@@ -91,6 +121,152 @@ class PacketSummary:
         return (self.ip_src, self.ip_dst, self.src_port, self.dst_port, self.protocol)
 
 
+class QuantileSketch:
+    """
+    Schiță de cuantile în memorie constantă (stil DDSketch).
+
+    Valorile pozitive se numără în găleți logaritmice: găleata i acoperă
+    intervalul (γ^(i-1), γ^i], cu γ = (1 + α) / (1 - α). Orice cuantilă
+    estimată are eroare relativă de cel mult α față de valoarea exactă,
+    indiferent de numărul de observații. Două schițe cu același α se
+    combină adunând găleată cu găleată, deci rezultatele parțiale ale
+    proceselor paralele (sau ale unor ferestre de timp) se pot uni exact.
+
+    Memoria depinde doar de plaja valorilor: pentru dimensiuni de pachet
+    (1..65535 octeți) și α = 1% sunt cel mult ~560 de găleți. Peste
+    `max_buckets`, gălețile cele mai mici se comasează (percentilele mari,
+    cele interesante pentru latență și dimensiune, rămân exacte în α).
+    """
+
+    __slots__ = ('relative_accuracy', 'max_buckets', '_gamma', '_log_gamma',
+                 'buckets', 'zero_count', 'count', 'sum', 'sum_sq', 'min', 'max')
+
+    # Valorile sub acest prag (inclusiv 0) se numără separat
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy trebuie să fie în (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, value: float) -> None:
+        """Adaugă o observație (valorile negative se tratează ca 0)."""
+        self.count += 1
+        self.sum += value
+        self.sum_sq += value * value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    # Interfață compatibilă cu list, folosită de StatisticsAnalyzer
+    append = add
+
+    def extend(self, values) -> QuantileSketch:
+        """Adaugă mai multe observații (listă sau numpy.ndarray)."""
+        if NUMPY_AVAILABLE and isinstance(values, np.ndarray):
+            if len(values) == 0:
+                return self
+            values = values.astype(np.float64, copy=False)
+            self.count += len(values)
+            self.sum += float(values.sum())
+            self.sum_sq += float(np.dot(values, values))
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            positive = values[values > self.MIN_VALUE]
+            self.zero_count += len(values) - len(positive)
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma),
+                                     return_counts=True)
+            buckets = self.buckets
+            for key, n in zip(keys.astype(np.int64).tolist(), counts.tolist()):
+                buckets[key] = buckets.get(key, 0) + n
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+            return self
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Adaugă observațiile altei schițe cu aceeași precizie."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Schițele au precizii diferite și nu pot fi combinate")
+        buckets = self.buckets
+        for key, n in other.buckets.items():
+            buckets[key] = buckets.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def _collapse(self) -> None:
+        """Comasează gălețile cele mai mici până la max_buckets."""
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets]
+        folded = sum(self.buckets.pop(key) for key in excess)
+        target = keys[len(excess)]
+        self.buckets[target] += folded
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Deviația standard de eșantion (din sumă și suma pătratelor)."""
+        if self.count < 2:
+            return 0.0
+        var = (self.sum_sq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimează cuantila q (0 ≤ q ≤ 1), cu eroare relativă ≤ α.
+
+        Rangul folosit este q·(n-1), ca la interpolarea liniară din
+        describe_values, iar rezultatul se limitează la [min, max].
+        """
+        if self.count == 0:
+            raise ValueError("Schiță goală")
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Mijlocul (în sens relativ) al intervalului (γ^(k-1), γ^k]
+                value = 2 * self._gamma ** key / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
 @dataclass
 class CaptureStatistics:
     """Statistici agregate pentru o captură completă."""
@@ -109,19 +285,20 @@ class CaptureStatistics:
     dst_ports: Counter = field(default_factory=Counter)
     tcp_flags: Counter = field(default_factory=Counter)
     
-    # Dimensiuni pachete
+    # Dimensiuni pachete (listă, numpy.ndarray în modul columnar
+    # sau QuantileSketch în modul --sketch și în analiza paralelă)
     packet_sizes: list = field(default_factory=list)
     
-    # Statistici per flux
-    flows: dict = field(default_factory=dict)
+    # Statistici per flux (None când fluxurile sunt urmărite de FlowAnalyzer)
+    flows: Optional[dict] = field(default_factory=dict)
     
-    # Timings
+    # Timings (același tip ca packet_sizes)
     inter_arrival_times: list = field(default_factory=list)
     
     @property
     def avg_packet_size(self) -> float:
         """Dimensiune medie a pachetelor."""
-        return statistics.mean(self.packet_sizes) if self.packet_sizes else 0.0
+        return self.total_bytes / self.total_packets if self.total_packets else 0.0
     
     @property
     def throughput_bps(self) -> float:
@@ -141,6 +318,84 @@ class CaptureStatistics:
         if self.capture_duration > 0:
             return self.total_packets / self.capture_duration
         return 0.0
+    
+    def merge(self, other: CaptureStatistics) -> CaptureStatistics:
+        """
+        Adaugă statisticile unui segment care urmează în aceeași captură.
+
+        Folosit de analiza paralelă: fiecare proces analizează un interval
+        de octeți, iar rezultatele parțiale se combină în ordinea din
+        fișier. Contoarele se adună, fluxurile se combină per cheie, iar
+        intervalul dintre ultimul pachet al acestui segment și primul
+        pachet al celuilalt devine un inter-arrival time în plus.
+        """
+        if other.total_packets == 0:
+            return self
+        
+        if self.total_packets == 0:
+            self.first_timestamp = other.first_timestamp
+        else:
+            gap = other.first_timestamp - self.last_timestamp
+            if gap >= 0:
+                self.inter_arrival_times = _concat_values(self.inter_arrival_times, [gap])
+        self.last_timestamp = other.last_timestamp
+        self.capture_duration = self.last_timestamp - self.first_timestamp
+        
+        self.total_packets += other.total_packets
+        self.total_bytes += other.total_bytes
+        self.packet_sizes = _concat_values(self.packet_sizes, other.packet_sizes)
+        self.inter_arrival_times = _concat_values(self.inter_arrival_times,
+                                                  other.inter_arrival_times)
+        
+        for name in ('protocols', 'src_ips', 'dst_ips', 'src_ports', 'dst_ports', 'tcp_flags'):
+            getattr(self, name).update(getattr(other, name))
+        
+        if self.flows is None or other.flows is None:
+            self.flows = None
+            return self
+        if not isinstance(self.flows, dict):  # FlowColumns din modul columnar
+            self.flows = dict(self.flows)
+        for flow_key, flow in other.flows.items():
+            mine = self.flows.get(flow_key)
+            if mine is None:
+                self.flows[flow_key] = dict(flow)
+            else:
+                mine['packets'] += flow['packets']
+                mine['bytes'] += flow['bytes']
+                mine['start_time'] = min(mine['start_time'], flow['start_time'])
+                mine['end_time'] = max(mine['end_time'], flow['end_time'])
+        return self
+
+
+def _concat_values(first, second):
+    """Concatenează două distribuții (liste, numpy.ndarray sau schițe)."""
+    if isinstance(second, QuantileSketch):
+        if not isinstance(first, QuantileSketch):
+            first = QuantileSketch(second.relative_accuracy).extend(first)
+        return first.merge(second)
+    if isinstance(first, QuantileSketch):
+        return first.extend(second)
+    if isinstance(first, list) and isinstance(second, list):
+        first.extend(second)
+        return first
+    return np.concatenate((np.asarray(first), np.asarray(second)))
+
+
+@dataclass
+class CaptureChunk:
+    """
+    Interval de octeți [start, stop) dintr-o captură, aliniat la începutul
+    unei înregistrări. Pentru pcapng include și starea secțiunii (ordinea
+    octeților și interfețele), necesară pentru a decoda blocurile din mijloc.
+    """
+    start: int
+    stop: int
+    endian: str = '<'
+    interfaces: list = field(default_factory=list)
+
+
+class ChunkBoundaryError(ValueError):
+    """Limita unui interval nu cade la începutul unei înregistrări."""
 
 
 # =============================================================================
@@ -201,13 +456,21 @@ def parse_pcap_scapy(filepath: str) -> Generator[PacketSummary, None, None]:
         # Layer 4 - TCP/UDP
         src_port = dst_port = None
         tcp_flags = None
+        tcp_seq = tcp_ack = tcp_window = None
         payload_size = 0
         
         if TCP in pkt:
             src_port = pkt[TCP].sport
             dst_port = pkt[TCP].dport
             tcp_flags = str(pkt[TCP].flags)
-            if Raw in pkt:
+            tcp_seq = pkt[TCP].seq
+            tcp_ack = pkt[TCP].ack
+            tcp_window = pkt[TCP].window
+            if IP in pkt:
+                # Din lungimea IP: scapy poate muta payload-ul în alte straturi
+                # (ex. HTTP), caz în care Raw lipsește
+                payload_size = max(0, pkt[IP].len - pkt[IP].ihl * 4 - pkt[TCP].dataofs * 4)
+            elif Raw in pkt:
                 payload_size = len(pkt[Raw].load)
         elif UDP in pkt:
             src_port = pkt[UDP].sport
@@ -227,7 +490,10 @@ def parse_pcap_scapy(filepath: str) -> Generator[PacketSummary, None, None]:
             dst_port=dst_port,
             tcp_flags=tcp_flags,
             payload_size=payload_size,
-            ttl=ttl
+            ttl=ttl,
+            tcp_seq=tcp_seq,
+            tcp_ack=tcp_ack,
+            tcp_window=tcp_window
         )
 
 
@@ -267,6 +533,7 @@ def parse_pcap_dpkt(filepath: str) -> Generator[PacketSummary, None, None]:
             ip_src = ip_dst = None
             src_port = dst_port = None
             tcp_flags = None
+            tcp_seq = tcp_ack = tcp_window = None
             payload_size = 0
             ttl = None
             protocol = "UNKNOWN"
@@ -290,6 +557,9 @@ def parse_pcap_dpkt(filepath: str) -> Generator[PacketSummary, None, None]:
                         protocol = "TCP"
                         src_port = tcp.sport
                         dst_port = tcp.dport
+                        tcp_seq = tcp.seq
+                        tcp_ack = tcp.ack
+                        tcp_window = tcp.win
                         
                         # Decodare flags TCP
                         flags = []
@@ -332,51 +602,613 @@ def parse_pcap_dpkt(filepath: str) -> Generator[PacketSummary, None, None]:
                 dst_port=dst_port,
                 tcp_flags=tcp_flags,
                 payload_size=payload_size,
-                ttl=ttl
+                ttl=ttl,
+                tcp_seq=tcp_seq,
+                tcp_ack=tcp_ack,
+                tcp_window=tcp_window
             )
 
 
-def parse_pcap(filepath: str) -> Generator[PacketSummary, None, None]:
+# =============================================================================
+# PARSARE PCAP NATIVĂ (mmap + struct, fără dependențe)
+# =============================================================================
+
+# Magic numbers pentru formatele de fișier suportate
+PCAP_MAGIC_US = 0xA1B2C3D4          # pcap clasic, timestamp în microsecunde
+PCAP_MAGIC_NS = 0xA1B23C4D          # pcap clasic, timestamp în nanosecunde
+PCAPNG_SHB_TYPE = 0x0A0D0D0A        # Section Header Block (pcapng)
+PCAPNG_BYTE_ORDER_MAGIC = 0x1A2B3C4D
+
+# Tipuri de blocuri pcapng relevante pentru statistici
+PCAPNG_IDB_TYPE = 0x00000001        # Interface Description Block
+PCAPNG_PB_TYPE = 0x00000002         # Packet Block (învechit)
+PCAPNG_SPB_TYPE = 0x00000003        # Simple Packet Block
+PCAPNG_EPB_TYPE = 0x00000006        # Enhanced Packet Block
+
+# Tipuri de legătură (LINKTYPE_*) cunoscute de decodorul nativ
+LINKTYPE_NULL = 0                   # BSD loopback
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW_ALIASES = (12, 14, 101)  # IP brut (valori diferite pe platforme)
+LINKTYPE_LINUX_SLL = 113            # tshark -i any (Linux cooked v1)
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+LINKTYPE_LINUX_SLL2 = 276           # tshark -i any (Linux cooked v2)
+
+# EtherType-uri
+ETH_TYPE_IPV4 = 0x0800
+ETH_TYPE_ARP = 0x0806
+ETH_TYPE_VLAN = (0x8100, 0x88A8, 0x9100)
+ETH_TYPE_IPV6 = 0x86DD
+
+# Structuri precompilate pentru header-ele de rețea (network byte order)
+_ETH_TYPE = struct.Struct('!H')
+_IPV4_HDR = struct.Struct('!BxHxxHBB')      # ver/ihl, total_len, frag, ttl, proto
+_IPV6_HDR = struct.Struct('!4xHBB')         # payload_len, next_header, hop_limit
+_PORTS = struct.Struct('!HH')
+_TCP_HDR = struct.Struct('!HHIIBBH')        # porturi, seq, ack, data offset, flags, fereastră
+_NULL_FAMILY_LE = struct.Struct('<I')
+_NULL_FAMILY_BE = struct.Struct('>I')
+
+# Numele protocoalelor de nivel 4 (identice cu backend-ul scapy)
+_L4_NAMES = {6: "TCP", 17: "UDP", 1: "ICMP", 58: "ICMPv6"}
+
+# Header-e de extensie IPv6 peste care sărim pentru a găsi TCP/UDP
+_IPV6_EXT_HEADERS = frozenset((0, 43, 60))
+_IPV6_FRAGMENT = 44
+
+# Flag-urile TCP în ordinea folosită de scapy (bitul 0 = FIN)
+_TCP_FLAG_LETTERS = "FSRPAUEC"
+_TCP_FLAG_STR = tuple(
+    ''.join(letter for bit, letter in enumerate(_TCP_FLAG_LETTERS) if value & (1 << bit))
+    for value in range(256)
+)
+
+
+def _detect_capture_format(filepath: str) -> Optional[str]:
+    """
+    Identifică formatul fișierului după primii 4 octeți.
+
+    Returns:
+        'pcap', 'pcapng' sau None dacă formatul nu este recunoscut
+    """
+    with open(filepath, 'rb') as f:
+        head = f.read(4)
+    if len(head) < 4:
+        return None
+    for endian in '<>':
+        magic = struct.unpack(endian + 'I', head)[0]
+        if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            return 'pcap'
+        if magic == PCAPNG_SHB_TYPE:
+            return 'pcapng'
+    return None
+
+
+def _pcap_file_header(mm) -> tuple[str, float, int, int]:
+    """
+    Citește header-ul global pcap (24 octeți): magic, versiune, thiszone,
+    sigfigs, snaplen, linktype.
+
+    Returns:
+        (endian, ts_scale, snaplen, linktype)
+    """
+    magic_le = struct.unpack_from('<I', mm, 0)[0]
+    endian = '<' if magic_le in (PCAP_MAGIC_US, PCAP_MAGIC_NS) else '>'
+    magic = struct.unpack_from(endian + 'I', mm, 0)[0]
+    ts_scale = 1e-9 if magic == PCAP_MAGIC_NS else 1e-6
+    snaplen, linktype = struct.unpack_from(endian + 'II', mm, 16)
+    return endian, ts_scale, snaplen, linktype & 0xFFFF
+
+
+def _iter_pcap_records(mm, start: int = 24,
+                       stop: Optional[int] = None) -> Generator[tuple[float, int, int, int], None, None]:
+    """
+    Iterează înregistrările unui fișier pcap clasic.
+
+    Fiecare înregistrare are un header de 16 octeți: ts_sec, ts_frac,
+    incl_len, orig_len, urmat de incl_len octeți de date.
+
+    Args:
+        mm: Captura mapată în memorie
+        start: Offset-ul primei înregistrări (24 = imediat după header)
+        stop: Se opresc înregistrările care încep la sau după acest offset
+
+    Yields:
+        (timestamp, linktype, offset_date, lungime_capturată)
+    """
+    endian, ts_scale, _snaplen, linktype = _pcap_file_header(mm)
+    record_hdr = struct.Struct(endian + 'IIII')
+    unpack_record = record_hdr.unpack_from
+    hdr_size = record_hdr.size
+
+    offset = start
+    end = len(mm)
+    stop = end if stop is None else min(stop, end)
+    while offset < stop and offset + hdr_size <= end:
+        ts_sec, ts_frac, incl_len, _orig_len = unpack_record(mm, offset)
+        offset += hdr_size
+        if offset + incl_len > end:
+            break  # Înregistrare trunchiată la finalul fișierului
+        yield ts_sec + ts_frac * ts_scale, linktype, offset, incl_len
+        offset += incl_len
+    if offset > stop:
+        # Ultima înregistrare depășește limita: `stop` nu era începutul unei
+        # înregistrări, deci și intervalul următor pornește greșit
+        raise ChunkBoundaryError(f"Limita {stop} nu este începutul unei înregistrări pcap")
+
+
+def _parse_idb_tsresol(mm, start: int, end: int, endian: str) -> float:
+    """Extrage rezoluția timestamp-ului (opțiunea if_tsresol) dintr-un IDB."""
+    option_hdr = struct.Struct(endian + 'HH')
+    offset = start
+    while offset + 4 <= end:
+        code, length = option_hdr.unpack_from(mm, offset)
+        offset += 4
+        if code == 0:  # opt_endofopt
+            break
+        if code == 9 and length >= 1:  # if_tsresol
+            value = mm[offset]
+            if value & 0x80:
+                return 2.0 ** -(value & 0x7F)
+            return 10.0 ** -value
+        offset += (length + 3) & ~3
+    return 1e-6
+
+
+def _iter_pcapng_records(mm, start: int = 0, stop: Optional[int] = None,
+                         endian: str = '<', interfaces: Optional[list] = None
+                         ) -> Generator[tuple[float, int, int, int], None, None]:
+    """
+    Iterează pachetele unui fișier pcapng.
+
+    Fișierul este o succesiune de blocuri (tip, lungime, corp, lungime).
+    Fiecare secțiune (SHB) își declară ordinea octeților și își resetează
+    lista de interfețe; fiecare interfață (IDB) are propriul linktype și
+    propria rezoluție de timestamp.
+
+    Args:
+        mm: Captura mapată în memorie
+        start: Offset-ul primului bloc de citit
+        stop: Se opresc blocurile care încep la sau după acest offset
+        endian, interfaces: Starea secțiunii la `start` (când nu e 0)
+
+    Yields:
+        (timestamp, linktype, offset_date, lungime_capturată)
+    """
+    end = len(mm)
+    stop = end if stop is None else min(stop, end)
+    offset = start
+    block_hdr = struct.Struct(endian + 'II')
+    epb_hdr = struct.Struct(endian + 'IIIII')
+    interfaces = list(interfaces or [])  # (linktype, ts_scale)
+
+    while offset < stop and offset + 12 <= end:
+        block_type = struct.unpack_from('<I', mm, offset)[0]
+
+        if block_type == PCAPNG_SHB_TYPE:
+            bom = struct.unpack_from('<I', mm, offset + 8)[0]
+            endian = '<' if bom == PCAPNG_BYTE_ORDER_MAGIC else '>'
+            block_hdr = struct.Struct(endian + 'II')
+            epb_hdr = struct.Struct(endian + 'IIIII')
+            interfaces = []
+
+        block_type, block_len = block_hdr.unpack_from(mm, offset)
+        if block_len < 12 or offset + block_len > end:
+            break  # Bloc corupt sau trunchiat
+
+        body = offset + 8
+        if block_type == PCAPNG_EPB_TYPE or block_type == PCAPNG_PB_TYPE:
+            if_id, ts_high, ts_low, cap_len, _orig_len = epb_hdr.unpack_from(mm, body)
+            if block_type == PCAPNG_PB_TYPE:
+                # interface_id (16 biți) urmat de drops_count (16 biți)
+                if_id = struct.unpack_from(endian + 'H', mm, body)[0]
+            if if_id < len(interfaces):
+                linktype, ts_scale = interfaces[if_id]
+                yield ((ts_high << 32) | ts_low) * ts_scale, linktype, body + 20, cap_len
+
+        elif block_type == PCAPNG_SPB_TYPE:
+            # SPB nu are timestamp și se referă mereu la interfața 0
+            if interfaces:
+                orig_len = struct.unpack_from(endian + 'I', mm, body)[0]
+                cap_len = min(orig_len, block_len - 16)
+                yield 0.0, interfaces[0][0], body + 4, cap_len
+
+        elif block_type == PCAPNG_IDB_TYPE:
+            linktype = struct.unpack_from(endian + 'H', mm, body)[0]
+            ts_scale = _parse_idb_tsresol(mm, body + 8, offset + block_len - 4, endian)
+            interfaces.append((linktype, ts_scale))
+
+        offset += block_len
+    if offset > stop:
+        raise ChunkBoundaryError(f"Limita {stop} nu este începutul unui bloc pcapng")
+
+
+def _decode_frame_raw(buf, offset: int, caplen: int, linktype: int) -> tuple:
+    """
+    Decodează câmpurile brute ale unui cadru, fără a crea obiecte per strat.
+
+    Citește direct din buffer cu struct.Struct.unpack_from la offset-uri
+    calculate. Buffer-ul poate fi întreaga captură mapată, deci fiecare
+    header este verificat față de `end` (altfel am citi din înregistrarea
+    următoare); un pachet trunchiat păstrează câmpurile decodate până acolo.
+
+    Rezultatul este folosit atât pentru PacketSummary (șiruri de caractere),
+    cât și pentru reprezentarea columnară (numere întregi).
+
+    Returns:
+        (protocol, ip_version, ip_src_bytes, ip_dst_bytes, src_port,
+         dst_port, tcp_flags_int, payload_size, ttl, tcp_seq, tcp_ack, tcp_window)
+    """
+    end = offset + caplen
+    ip_version = 0
+    ip_src = ip_dst = None
+    src_port = dst_port = None
+    flags = None
+    tcp_seq = tcp_ack = tcp_window = None
+    payload_size = 0
+    ttl = None
+    protocol = "UNKNOWN"
+
+    try:
+        # Layer 2 - determinăm EtherType-ul și începutul pachetului IP
+        if caplen < 4:
+            raise IndexError("cadru prea scurt")
+        if linktype == LINKTYPE_ETHERNET:
+            ether_type = _ETH_TYPE.unpack_from(buf, offset + 12)[0]
+            pos = offset + 14
+            while ether_type in ETH_TYPE_VLAN:  # 802.1Q / 802.1ad
+                ether_type = _ETH_TYPE.unpack_from(buf, pos + 2)[0]
+                pos += 4
+        elif linktype == LINKTYPE_LINUX_SLL:
+            ether_type = _ETH_TYPE.unpack_from(buf, offset + 14)[0]
+            pos = offset + 16
+        elif linktype == LINKTYPE_LINUX_SLL2:
+            ether_type = _ETH_TYPE.unpack_from(buf, offset)[0]
+            pos = offset + 20
+        elif linktype == LINKTYPE_NULL:
+            family = _NULL_FAMILY_LE.unpack_from(buf, offset)[0]
+            if family > 0xFFFF:
+                family = _NULL_FAMILY_BE.unpack_from(buf, offset)[0]
+            ether_type = ETH_TYPE_IPV4 if family == 2 else ETH_TYPE_IPV6
+            pos = offset + 4
+        elif linktype in LINKTYPE_RAW_ALIASES or linktype in (LINKTYPE_IPV4, LINKTYPE_IPV6):
+            pos = offset
+            ether_type = ETH_TYPE_IPV6 if buf[pos] >> 4 == 6 else ETH_TYPE_IPV4
+        else:
+            ether_type = None
+            pos = offset
+
+        # Layer 3 - IPv4 / IPv6
+        l4_proto = None
+        l4_end = end
+        if ether_type == ETH_TYPE_IPV4:
+            if pos + 20 > end:
+                raise IndexError("header IPv4 trunchiat")
+            ver_ihl, total_len, frag, ttl, l4_proto = _IPV4_HDR.unpack_from(buf, pos)
+            ip_src = buf[pos + 12:pos + 16]
+            ip_dst = buf[pos + 16:pos + 20]
+            ip_version = 4
+            l4_end = min(end, pos + total_len) if total_len else end
+            pos += (ver_ihl & 0x0F) * 4
+            if frag & 0x1FFF:
+                # Fragment ne-inițial: nu conține header-ul de nivel 4
+                protocol = f"IP-{l4_proto}"
+                l4_proto = None
+        elif ether_type == ETH_TYPE_IPV6:
+            if pos + 40 > end:
+                raise IndexError("header IPv6 trunchiat")
+            payload_len, l4_proto, ttl = _IPV6_HDR.unpack_from(buf, pos)
+            ip_src = buf[pos + 8:pos + 24]
+            ip_dst = buf[pos + 24:pos + 40]
+            ip_version = 6
+            pos += 40
+            l4_end = min(end, pos + payload_len) if payload_len else end
+            while l4_proto in _IPV6_EXT_HEADERS:
+                next_header = buf[pos]
+                pos += (buf[pos + 1] + 1) * 8
+                l4_proto = next_header
+            if l4_proto == _IPV6_FRAGMENT:
+                l4_proto = None
+                protocol = "IP-44"
+        elif ether_type == ETH_TYPE_ARP:
+            protocol = "ARP"
+
+        # Layer 4 - TCP / UDP
+        if l4_proto is not None:
+            protocol = _L4_NAMES.get(l4_proto, f"IP-{l4_proto}")
+            if pos + (16 if l4_proto == 6 else 4) > end:
+                raise IndexError("header L4 trunchiat")
+            if l4_proto == 6:
+                (src_port, dst_port, tcp_seq, tcp_ack, data_off, flags,
+                 tcp_window) = _TCP_HDR.unpack_from(buf, pos)
+                payload_size = max(0, l4_end - pos - (data_off >> 4) * 4)
+            elif l4_proto == 17:
+                src_port, dst_port = _PORTS.unpack_from(buf, pos)
+                payload_size = max(0, l4_end - pos - 8)
+    except (struct.error, IndexError, ValueError):
+        # Pachet trunchiat (snaplen mic) sau malformat
+        pass
+
+    return (protocol, ip_version, ip_src, ip_dst, src_port, dst_port,
+            flags, payload_size, ttl, tcp_seq, tcp_ack, tcp_window)
+
+
+def _decode_frame(buf, offset: int, caplen: int, linktype: int,
+                  timestamp: float) -> PacketSummary:
+    """Construiește PacketSummary din câmpurile brute ale unui cadru."""
+    (protocol, ip_version, ip_src, ip_dst, src_port, dst_port,
+     flags, payload_size, ttl, tcp_seq, tcp_ack, tcp_window) = _decode_frame_raw(buf, offset, caplen, linktype)
+
+    eth_src = eth_dst = None
+    if linktype == LINKTYPE_ETHERNET and caplen >= 12:
+        eth_dst = buf[offset:offset + 6].hex(':')
+        eth_src = buf[offset + 6:offset + 12].hex(':')
+
+    if ip_version == 4:
+        ip_src = socket.inet_ntoa(ip_src)
+        ip_dst = socket.inet_ntoa(ip_dst)
+    elif ip_version == 6:
+        ip_src = socket.inet_ntop(socket.AF_INET6, ip_src)
+        ip_dst = socket.inet_ntop(socket.AF_INET6, ip_dst)
+
+    return PacketSummary(
+        timestamp=timestamp,
+        length=caplen,
+        eth_src=eth_src,
+        eth_dst=eth_dst,
+        ip_src=ip_src,
+        ip_dst=ip_dst,
+        protocol=protocol,
+        src_port=src_port,
+        dst_port=dst_port,
+        tcp_flags=_TCP_FLAG_STR[flags] if flags is not None else None,
+        payload_size=payload_size,
+        ttl=ttl,
+        tcp_seq=tcp_seq,
+        tcp_ack=tcp_ack,
+        tcp_window=tcp_window
+    )
+
+
+@contextmanager
+def _mapped_capture(filepath: str, chunk: Optional[CaptureChunk] = None):
+    """
+    Mapează captura în memorie și oferă iteratorul de înregistrări potrivit.
+
+    Args:
+        filepath: Calea către fișierul PCAP sau PCAPNG
+        chunk: Limitează iterarea la un interval de octeți (vezi plan_chunks)
+
+    Yields:
+        (mm, records) - zona mapată și iteratorul de
+        (timestamp, linktype, offset_date, lungime_capturată)
+
+    Raises:
+        ValueError: Dacă fișierul nu este pcap sau pcapng
+    """
+    capture_format = _detect_capture_format(filepath)
+    if capture_format is None:
+        raise ValueError(f"Format de captură necunoscut: {filepath}")
+
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if chunk is None:
+                records = (_iter_pcapng_records(mm) if capture_format == 'pcapng'
+                           else _iter_pcap_records(mm))
+            elif capture_format == 'pcapng':
+                records = _iter_pcapng_records(mm, chunk.start, chunk.stop,
+                                               chunk.endian, chunk.interfaces)
+            else:
+                records = _iter_pcap_records(mm, chunk.start, chunk.stop)
+            yield mm, records
+
+
+def parse_pcap_native(filepath: str,
+                      chunk: Optional[CaptureChunk] = None) -> Generator[PacketSummary, None, None]:
+    """
+    Parsează un fișier pcap/pcapng fără biblioteci externe.
+
+    Fișierul este mapat în memorie (mmap), deci nu este citit integral
+    în RAM; header-ele sunt decodate cu structuri struct precompilate,
+    direct din zona mapată. Sunt decodate doar câmpurile Ethernet /
+    IPv4 / IPv6 / TCP / UDP de care are nevoie PacketSummary.
+
+    Args:
+        filepath: Calea către fișierul PCAP sau PCAPNG
+        chunk: Doar pachetele dintr-un interval de octeți (opțional)
+
+    Yields:
+        PacketSummary pentru fiecare pachet din captură
+
+    Raises:
+        ValueError: Dacă fișierul nu este pcap sau pcapng
+    """
+    with _mapped_capture(filepath, chunk) as (mm, records):
+        for timestamp, linktype, offset, caplen in records:
+            yield _decode_frame(mm, offset, caplen, linktype, timestamp)
+
+
+# Backend-urile disponibile, în ordinea preferinței
+PCAP_BACKENDS = {
+    'native': parse_pcap_native,
+    'scapy': parse_pcap_scapy,
+    'dpkt': parse_pcap_dpkt,
+}
+
+
+def available_backends() -> list[str]:
+    """Returnează backend-urile utilizabile în mediul curent."""
+    backends = ['native']
+    if SCAPY_AVAILABLE:
+        backends.append('scapy')
+    if DPKT_AVAILABLE:
+        backends.append('dpkt')
+    return backends
+
+
+def parse_pcap(filepath: str, backend: Optional[str] = None) -> Generator[PacketSummary, None, None]:
     """
     Parsează un fișier PCAP folosind biblioteca disponibilă.
     
-    Încearcă Scapy mai întâi (mai complet), apoi dpkt ca fallback.
+    Implicit folosește backend-ul nativ (cel mai rapid, fără dependențe).
+    Dacă formatul nu este recunoscut de acesta, încearcă Scapy și apoi
+    dpkt ca fallback.
+
+    Args:
+        filepath: Calea către fișierul PCAP
+        backend: 'native', 'scapy', 'dpkt' sau None (alegere automată)
     """
-    if SCAPY_AVAILABLE:
+    if backend is not None:
+        if backend not in PCAP_BACKENDS:
+            raise ValueError(f"Backend necunoscut: {backend}")
+        yield from PCAP_BACKENDS[backend](filepath)
+    elif _detect_capture_format(filepath) is not None:
+        yield from parse_pcap_native(filepath)
+    elif SCAPY_AVAILABLE:
         yield from parse_pcap_scapy(filepath)
     elif DPKT_AVAILABLE:
         yield from parse_pcap_dpkt(filepath)
     else:
         raise ImportError(
-            "Nu este disponibilă nicio bibliotecă pentru parsare PCAP.\n"
-            "Instalați una dintre:\n"
+            "Formatul fișierului nu este recunoscut de parserul nativ.\n"
+            "Instalați una dintre bibliotecile:\n"
             "  pip install scapy --break-system-packages\n"
             "  pip install dpkt --break-system-packages"
         )
 
 
+def benchmark_backends(filepath: str, repeat: int = 3) -> dict[str, dict]:
+    """
+    Compară viteza de parsare a backend-urilor disponibile.
+
+    Fiecare backend parcurge captura complet de `repeat` ori; se
+    păstrează cel mai bun timp (cel mai puțin afectat de cache/zgomot).
+
+    Returns:
+        {backend: {'packets': n, 'seconds': t, 'pps': pachete/secundă}}
+    """
+    results = {}
+    for name in available_backends():
+        best = float('inf')
+        count = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = sum(1 for _ in PCAP_BACKENDS[name](filepath))
+            best = min(best, time.perf_counter() - start)
+        results[name] = {
+            'packets': count,
+            'seconds': best,
+            'pps': count / best if best > 0 else 0.0,
+        }
+    return results
+
+
+def print_benchmark_report(filepath: str, results: dict[str, dict]):
+    """Afișează rezultatele benchmark-ului, relativ la backend-ul nativ."""
+    print("=" * 70)
+    print(f"BENCHMARK BACKEND-URI PCAP: {Path(filepath).name}")
+    print("=" * 70)
+    print(f"  {'Backend':10} {'Pachete':>10} {'Timp (s)':>10} {'Pachete/s':>14} {'Relativ':>9}")
+    native_time = results.get('native', {}).get('seconds', 0.0)
+    for name, res in results.items():
+        relative = res['seconds'] / native_time if native_time > 0 else 0.0
+        print(f"  {name:10} {res['packets']:>10,} {res['seconds']:>10.4f} "
+              f"{res['pps']:>14,.0f} {relative:>8.1f}x")
+    if len(results) == 1:
+        print("\n  (scapy/dpkt nu sunt instalate - doar backend-ul nativ a fost măsurat)")
+    print("=" * 70)
+
+
 # =============================================================================
 # ANALIZĂ STATISTICĂ
 # =============================================================================
+#
+# Fiecare analiză este un "analizor" care primește pachetele unul câte unul
+# (consume) și își produce rezultatul la final (result). Astfel, un raport
+# complet (statistici + handshake-uri + retransmisii) decodează captura
+# o singură dată: run_analyzers() distribuie fiecare PacketSummary tuturor
+# analizoarelor înregistrate.
 
-def analyze_capture(filepath: str) -> CaptureStatistics:
+class PacketAnalyzer(abc.ABC):
     """
-    Analizează complet o captură PCAP și calculează statistici.
-    
-    Parcurge pachetele o singură dată (streaming) pentru eficiență
-    și acumulează statistici în timp real.
-    
+    Bază pentru analizoarele care consumă fluxul de PacketSummary.
+
+    Subclasele implementează consume() (apelat o dată per pachet, în
+    ordinea din captură) și result() (apelat o singură dată, la final).
+    Un analizor căruia îi lipsește una dintre ele este respins deja la
+    register_analyzer(), nu la prima rulare.
+    """
+    name = "base"
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+
+    @abc.abstractmethod
+    def consume(self, pkt: PacketSummary) -> None:
+        ...
+
+    @abc.abstractmethod
+    def result(self) -> Any:
+        ...
+
+
+# Registrul analizoarelor: nume → clasă
+ANALYZERS: dict[str, type[PacketAnalyzer]] = {}
+
+
+def register_analyzer(cls: type[PacketAnalyzer]) -> type[PacketAnalyzer]:
+    """Decorator care adaugă un analizor în registru, după atributul `name`."""
+    if cls.__abstractmethods__:
+        missing = ", ".join(sorted(cls.__abstractmethods__))
+        raise TypeError(f"Analizorul {cls.__name__} nu implementează: {missing}")
+    ANALYZERS[cls.name] = cls
+    return cls
+
+
+def run_analyzers(filepath: str, analyzers: list[PacketAnalyzer],
+                  backend: Optional[str] = None) -> dict[str, Any]:
+    """
+    Rulează mai multe analizoare într-o singură trecere prin captură.
+
     Args:
         filepath: Calea către fișierul PCAP
-        
+        analyzers: Instanțe PacketAnalyzer care primesc fiecare pachet
+        backend: Backend de parsare (None = alegere automată)
+
     Returns:
-        CaptureStatistics cu toate metricile calculate
+        {nume_analizor: rezultat}
     """
-    stats = CaptureStatistics(file_path=filepath)
-    
-    prev_timestamp = None
-    
-    for pkt in parse_pcap(filepath):
+    consumers = [a.consume for a in analyzers]
+    for pkt in parse_pcap(filepath, backend):
+        for consume in consumers:
+            consume(pkt)
+    return {a.name: a.result() for a in analyzers}
+
+
+@register_analyzer
+class StatisticsAnalyzer(PacketAnalyzer):
+    """
+    Statistici generale: volume, distribuții, timing, fluxuri.
+
+    Cu sketch=True, dimensiunile și inter-arrival times se acumulează în
+    QuantileSketch (memorie constantă) în loc de liste cu o valoare per pachet.
+    Cu track_flows=False, stats.flows rămâne None (fluxurile sunt lăsate
+    în seama FlowAnalyzer, care le expiră și le exportă).
+    """
+    name = "stats"
+
+    def __init__(self, filepath: str, sketch: bool = False, track_flows: bool = True):
+        super().__init__(filepath)
+        self.stats = CaptureStatistics(file_path=filepath)
+        if not track_flows:
+            self.stats.flows = None
+        if sketch:
+            self.stats.packet_sizes = QuantileSketch()
+            self.stats.inter_arrival_times = QuantileSketch()
+        self._prev_timestamp = None
+
+    def consume(self, pkt: PacketSummary) -> None:
+        stats = self.stats
         stats.total_packets += 1
         stats.total_bytes += pkt.length
         stats.packet_sizes.append(pkt.length)
@@ -387,11 +1219,11 @@ def analyze_capture(filepath: str) -> CaptureStatistics:
         stats.last_timestamp = pkt.timestamp
         
         # Inter-arrival time
-        if prev_timestamp is not None:
-            iat = pkt.timestamp - prev_timestamp
+        if self._prev_timestamp is not None:
+            iat = pkt.timestamp - self._prev_timestamp
             if iat >= 0:  # Evită anomalii de timestamp
                 stats.inter_arrival_times.append(iat)
-        prev_timestamp = pkt.timestamp
+        self._prev_timestamp = pkt.timestamp
         
         # Contoare protocol
         stats.protocols[pkt.protocol] += 1
@@ -413,7 +1245,7 @@ def analyze_capture(filepath: str) -> CaptureStatistics:
             stats.tcp_flags[pkt.tcp_flags] += 1
         
         # Tracking fluxuri
-        if pkt.ip_src and pkt.ip_dst:
+        if pkt.ip_src and pkt.ip_dst and stats.flows is not None:
             flow_key = pkt.flow_tuple
             if flow_key not in stats.flows:
                 stats.flows[flow_key] = {
@@ -425,14 +1257,15 @@ def analyze_capture(filepath: str) -> CaptureStatistics:
             stats.flows[flow_key]['packets'] += 1
             stats.flows[flow_key]['bytes'] += pkt.length
             stats.flows[flow_key]['end_time'] = pkt.timestamp
-    
-    # Calcul durată captură
-    stats.capture_duration = stats.last_timestamp - stats.first_timestamp
-    
-    return stats
 
+    def result(self) -> CaptureStatistics:
+        # Calcul durată captură
+        self.stats.capture_duration = self.stats.last_timestamp - self.stats.first_timestamp
+        return self.stats
 
-def detect_tcp_handshakes(filepath: str) -> list[dict]:
+
+@register_analyzer
+class HandshakeAnalyzer(PacketAnalyzer):
     """
     Detectează handshake-uri TCP complete (SYN → SYN-ACK → ACK).
     
@@ -440,17 +1273,18 @@ def detect_tcp_handshakes(filepath: str) -> list[dict]:
     1. Client → Server: SYN (număr de secvență inițial client)
     2. Server → Client: SYN-ACK (confirmare + nr. secvență server)
     3. Client → Server: ACK (confirmare finală)
-    
-    Returns:
-        Lista de handshake-uri detectate cu timing
     """
-    handshakes = []
-    pending_syns = {}  # (src_ip, src_port, dst_ip, dst_port) → timestamp
-    pending_synacks = {}  # (dst_ip, dst_port, src_ip, src_port) → timestamp
-    
-    for pkt in parse_pcap(filepath):
+    name = "handshakes"
+
+    def __init__(self, filepath: str):
+        super().__init__(filepath)
+        self.handshakes = []
+        self.pending_syns = {}  # (src_ip, src_port, dst_ip, dst_port) → timestamp
+        self.pending_synacks = {}  # (dst_ip, dst_port, src_ip, src_port) → timestamp
+
+    def consume(self, pkt: PacketSummary) -> None:
         if not pkt.is_tcp or not pkt.tcp_flags:
-            continue
+            return
         
         flags = pkt.tcp_flags.upper()
         key_forward = (pkt.ip_src, pkt.src_port, pkt.ip_dst, pkt.dst_port)
@@ -458,21 +1292,21 @@ def detect_tcp_handshakes(filepath: str) -> list[dict]:
         
         # Pas 1: SYN (fără ACK)
         if 'S' in flags and 'A' not in flags:
-            pending_syns[key_forward] = pkt.timestamp
+            self.pending_syns[key_forward] = pkt.timestamp
         
         # Pas 2: SYN-ACK
         elif 'S' in flags and 'A' in flags:
-            if key_reverse in pending_syns:
-                pending_synacks[key_forward] = {
-                    'syn_time': pending_syns[key_reverse],
+            if key_reverse in self.pending_syns:
+                self.pending_synacks[key_forward] = {
+                    'syn_time': self.pending_syns[key_reverse],
                     'synack_time': pkt.timestamp
                 }
         
         # Pas 3: ACK final
         elif 'A' in flags and 'S' not in flags and 'F' not in flags:
-            if key_reverse in pending_synacks:
-                hs_info = pending_synacks.pop(key_reverse)
-                handshakes.append({
+            if key_reverse in self.pending_synacks:
+                hs_info = self.pending_synacks.pop(key_reverse)
+                self.handshakes.append({
                     'client_ip': pkt.ip_src,
                     'client_port': pkt.src_port,
                     'server_ip': pkt.ip_dst,
@@ -482,85 +1316,1282 @@ def detect_tcp_handshakes(filepath: str) -> list[dict]:
                     'ack_time': pkt.timestamp,
                     'handshake_duration': pkt.timestamp - hs_info['syn_time']
                 })
-    
-    return handshakes
+
+    def result(self) -> list[dict]:
+        return self.handshakes
+
+
+# Aritmetica numerelor de secvență TCP este modulo 2^32 (RFC 793/1323)
+_SEQ_MOD = 1 << 32
+_SEQ_HALF = 1 << 31
+
+# Flag-urile TCP (octetul de flag-uri, bitul 0 = FIN)
+TCP_FIN, TCP_SYN, TCP_RST, TCP_ACK = 0x01, 0x02, 0x04, 0x10
+_TCP_FLAG_BITS = {letter: 1 << bit for bit, letter in enumerate(_TCP_FLAG_LETTERS)}
+
+
+def _seq_diff(a: int, b: int) -> int:
+    """Diferența a - b între numere de secvență, cu semn, ținând cont de wrap-around."""
+    diff = (a - b) % _SEQ_MOD
+    return diff - _SEQ_MOD if diff >= _SEQ_HALF else diff
 
 
-def detect_retransmissions(filepath: str) -> list[dict]:
+def _tcp_flag_bits(flags: str) -> int:
+    """Convertește șirul de flag-uri ('SA', 'AP'...) înapoi în octetul de flag-uri."""
+    bits = 0
+    for letter in flags.upper():
+        bits |= _TCP_FLAG_BITS.get(letter, 0)
+    return bits
+
+
+class TcpDirectionState:
     """
-    Detectează potențiale retransmisii TCP.
-    
-    Retransmisiile apar când:
-    - Același pachet (src, dst, seq) apare de mai multe ori
-    - ACK duplicat (același nr. de acknowledgment repetat)
-    
-    Returns:
-        Lista de pachete suspectate ca retransmisii
+    Starea unei direcții a unei conexiuni TCP (src → dst).
+
+    Folosește __slots__: pentru milioane de fluxuri, un obiect fără
+    __dict__ ocupă de câteva ori mai puțină memorie.
     """
-    seen_packets = defaultdict(list)  # (flow, seq_estimate) → [timestamps]
-    retransmissions = []
-    
-    for pkt in parse_pcap(filepath):
-        if not pkt.is_tcp:
-            continue
-        
-        # Cheie simplificată (fără număr de secvență real - ar necesita acces la header TCP raw)
-        # Folosim dimensiunea pachetului ca proxy
-        key = (pkt.ip_src, pkt.src_port, pkt.ip_dst, pkt.dst_port, pkt.length)
-        
-        timestamps = seen_packets[key]
-        
-        for prev_ts in timestamps:
-            # Dacă un pachet identic apare în mai puțin de 3 secunde
-            if 0 < (pkt.timestamp - prev_ts) < 3.0:
-                retransmissions.append({
-                    'src': f"{pkt.ip_src}:{pkt.src_port}",
-                    'dst': f"{pkt.ip_dst}:{pkt.dst_port}",
-                    'original_time': prev_ts,
-                    'retrans_time': pkt.timestamp,
-                    'delta': pkt.timestamp - prev_ts,
-                    'size': pkt.length
-                })
-                break
-        
-        timestamps.append(pkt.timestamp)
-    
-    return retransmissions
+    __slots__ = ('next_seq', 'last_ack', 'last_window', 'last_ack_time', 'dup_acks',
+                 'last_seen', 'segments')
 
+    def __init__(self, max_segments: int):
+        self.next_seq = None        # Cel mai mare seq + len văzut (SND.NXT observat)
+        self.last_ack = None        # Ultimul număr de ACK trimis în această direcție
+        self.last_window = None     # Fereastra anunțată odată cu el
+        self.last_ack_time = 0.0
+        self.dup_acks = 0           # ACK-uri duplicate consecutive
+        self.last_seen = 0.0
+        # Segmentele recente (seq, seq_final, timestamp), cel mult max_segments
+        self.segments = deque(maxlen=max_segments)
 
-# =============================================================================
-# RAPORTARE
-# =============================================================================
 
-def print_statistics_report(stats: CaptureStatistics):
+@register_analyzer
+class RetransmissionAnalyzer(PacketAnalyzer):
     """
-    Afișează un raport formatat cu statisticile capturii.
+    Detectează retransmisii, ACK-uri duplicate și segmente out-of-order.
+
+    Pentru fiecare direcție a fiecărei conexiuni se urmărește numărul de
+    secvență următor așteptat (next_seq), ultimul ACK și segmentele din
+    ultima fereastră de timp. Un segment cu date (sau SYN/FIN) care:
+    - începe la sau după next_seq → date noi (cazul obișnuit, O(1));
+    - începe înainte de next_seq și acoperă un segment deja văzut în
+      fereastră → retransmisie;
+    - începe înainte de next_seq dar nu a fost văzut → out-of-order
+      (umple un gol, de ex. după o pierdere înainte de punctul de captură).
+    Un ACK pur (fără date, SYN, FIN, RST) cu același număr și aceeași
+    fereastră ca precedentul este un ACK duplicat (RFC 5681); cu altă
+    fereastră este doar o actualizare de fereastră.
+
+    Memoria este limitată de conexiunile active: fiecare direcție păstrează
+    cel mult `max_segments` segmente din ultimele `window` secunde, iar
+    direcțiile inactive mai mult de `idle_timeout` secunde sunt eliminate.
+    Evenimentele sunt numărate exact, dar doar primele `max_events` sunt
+    păstrate cu detalii (o captură cu pierderi mari nu umple memoria).
+
+    Limitare: o retransmisie a unui segment ieșit deja din fereastră (mai
+    vechi de `window` secunde sau împins afară de alte `max_segments`
+    segmente, de ex. după un RTO lung sau pe o conexiune rapidă) nu mai are
+    original și este clasificată drept out_of_order. Pentru astfel de
+    capturi măriți window/max_segments.
     """
-    print("=" * 70)
-    print(f"RAPORT STATISTICI PCAP: {Path(stats.file_path).name}")
-    print("=" * 70)
-    
-    # Informații generale
-    print(f"\n{'─' * 40}")
-    print("SUMAR GENERAL")
-    print(f"{'─' * 40}")
-    print(f"  Total pachete:        {stats.total_packets:,}")
-    print(f"  Total octeți:         {stats.total_bytes:,} ({stats.total_bytes / 1024:.2f} KB)")
+    name = "retrans"
+
+    def __init__(self, filepath: str, window: float = 3.0, idle_timeout: float = 120.0,
+                 max_segments: int = 64, max_events: int = 1000):
+        super().__init__(filepath)
+        self.window = window
+        self.idle_timeout = idle_timeout
+        self.max_segments = max_segments
+        self.max_events = max_events
+        self.flows: dict[tuple, TcpDirectionState] = {}  # (src, sport, dst, dport) → stare
+        self.events = []                                 # primele max_events evenimente
+        self.counts = Counter()
+        self._last_sweep = None
+
+    def _event(self, kind: str, pkt: PacketSummary, original_time: float) -> None:
+        self.counts[kind] += 1
+        if len(self.events) >= self.max_events:
+            return
+        self.events.append({
+            'type': kind,
+            'src': f"{pkt.ip_src}:{pkt.src_port}",
+            'dst': f"{pkt.ip_dst}:{pkt.dst_port}",
+            'seq': pkt.tcp_seq,
+            'original_time': original_time,
+            'retrans_time': pkt.timestamp,
+            'delta': pkt.timestamp - original_time,
+            'size': pkt.length
+        })
+
+    def _evict_idle(self, now: float) -> None:
+        """Elimină direcțiile fără trafic în ultimele idle_timeout secunde."""
+        cutoff = now - self.idle_timeout
+        idle = [key for key, state in self.flows.items() if state.last_seen < cutoff]
+        for key in idle:
+            del self.flows[key]
+        self._last_sweep = now
+
+    def consume(self, pkt: PacketSummary) -> None:
+        if not pkt.is_tcp or pkt.tcp_seq is None:
+            return
+
+        now = pkt.timestamp
+        if self._last_sweep is None:
+            self._last_sweep = now
+        elif now - self._last_sweep > self.idle_timeout / 2:
+            self._evict_idle(now)
+
+        key = (pkt.ip_src, pkt.src_port, pkt.ip_dst, pkt.dst_port)
+        state = self.flows.get(key)
+        if state is None:
+            state = self.flows[key] = TcpDirectionState(self.max_segments)
+        state.last_seen = now
+
+        flags = _tcp_flag_bits(pkt.tcp_flags or '')
+        seq = pkt.tcp_seq
+        # SYN și FIN consumă câte un număr de secvență
+        seg_len = pkt.payload_size + (1 if flags & TCP_SYN else 0) + (1 if flags & TCP_FIN else 0)
+
+        if seg_len > 0 and not flags & TCP_RST:
+            self._track_segment(state, pkt, seq, seg_len, flags)
+        elif flags & TCP_ACK and not flags & (TCP_SYN | TCP_FIN | TCP_RST):
+            self._track_ack(state, pkt)
+            return
+
+        if flags & TCP_ACK:
+            # ACK-ul purtat de un segment cu date nu este duplicat, dar avansează
+            if state.last_ack is None or _seq_diff(pkt.tcp_ack, state.last_ack) > 0:
+                state.last_ack = pkt.tcp_ack
+                state.last_ack_time = now
+                state.dup_acks = 0
+            state.last_window = pkt.tcp_window
+
+    def _track_segment(self, state: TcpDirectionState, pkt: PacketSummary,
+                       seq: int, seg_len: int, flags: int) -> None:
+        now = pkt.timestamp
+        seq_end = (seq + seg_len) % _SEQ_MOD
+        segments = state.segments
+
+        # Eliminăm segmentele ieșite din fereastra de timp
+        while segments and now - segments[0][2] > self.window:
+            segments.popleft()
+
+        if state.next_seq is None or _seq_diff(seq, state.next_seq) >= 0:
+            # Date noi (eventual după un gol)
+            state.next_seq = seq_end
+        elif (seg_len == 1 and not flags & (TCP_SYN | TCP_FIN)
+              and _seq_diff(state.next_seq, seq_end) == 0):
+            return  # Keep-alive: un octet deja confirmat, nu e retransmisie
+        else:
+            # Segmentul începe înainte de next_seq: retransmisie sau out-of-order
+            original = None
+            for seg_start, seg_stop, seg_time in reversed(segments):
+                if _seq_diff(seq, seg_stop) < 0 and _seq_diff(seq_end, seg_start) > 0:
+                    original = seg_time
+                    break
+            if original is not None:
+                self._event('retransmission', pkt, original)
+            else:
+                last_time = segments[-1][2] if segments else now
+                self._event('out_of_order', pkt, last_time)
+            if _seq_diff(seq_end, state.next_seq) > 0:
+                state.next_seq = seq_end
+
+        segments.append((seq, seq_end, now))
+
+    def _track_ack(self, state: TcpDirectionState, pkt: PacketSummary) -> None:
+        ack = pkt.tcp_ack
+        if state.last_ack is not None and ack == state.last_ack:
+            if pkt.tcp_window == state.last_window:
+                state.dup_acks += 1
+                self._event('dup_ack', pkt, state.last_ack_time)
+        elif state.last_ack is None or _seq_diff(ack, state.last_ack) > 0:
+            state.last_ack = ack
+            state.last_ack_time = pkt.timestamp
+            state.dup_acks = 0
+        state.last_window = pkt.tcp_window
+
+    def result(self) -> dict:
+        return {'counts': dict(self.counts), 'events': self.events}
+
+
+def analyze_capture(filepath: str, backend: Optional[str] = None,
+                    columnar: bool = False, sketch: bool = False,
+                    cache: bool = False, cache_dir: Optional[str] = None) -> CaptureStatistics:
+    """
+    Analizează complet o captură PCAP și calculează statistici.
+    
+    Parcurge pachetele o singură dată (streaming) pentru eficiență
+    și acumulează statistici în timp real.
+    
+    Args:
+        filepath: Calea către fișierul PCAP
+        backend: Backend de parsare (None = alegere automată)
+        columnar: Decodare în coloane NumPy și statistici vectorizate
+        sketch: Distribuții în QuantileSketch (percentile aproximative,
+            memorie constantă) în loc de valorile brute
+        cache: Refolosește rezultatul columnar salvat pe disc (implică columnar)
+        cache_dir: Directorul cache-ului (implicit default_cache_dir())
+        
+    Returns:
+        CaptureStatistics cu toate metricile calculate
+    """
+    if cache:
+        stats = analyze_capture_cached(filepath, cache_dir)
+        if sketch:
+            stats.packet_sizes = QuantileSketch().extend(stats.packet_sizes)
+            stats.inter_arrival_times = QuantileSketch().extend(stats.inter_arrival_times)
+        return stats
+    if columnar:
+        return analyze_columnar(load_columnar(filepath), sketch=sketch)
+    return run_analyzers(filepath, [StatisticsAnalyzer(filepath, sketch=sketch)],
+                         backend)['stats']
+
+
+def detect_tcp_handshakes(filepath: str, backend: Optional[str] = None) -> list[dict]:
+    """
+    Detectează handshake-uri TCP complete (vezi HandshakeAnalyzer).
+    
+    Returns:
+        Lista de handshake-uri detectate cu timing
+    """
+    return run_analyzers(filepath, [HandshakeAnalyzer(filepath)], backend)['handshakes']
+
+
+def detect_retransmissions(filepath: str, backend: Optional[str] = None,
+                           max_events: int = 1000) -> list[dict]:
+    """
+    Detectează retransmisii TCP, ACK-uri duplicate și segmente out-of-order
+    (vezi RetransmissionAnalyzer).
+    
+    Returns:
+        Lista evenimentelor (primele max_events), în ordinea din captură;
+        pe lângă src, dst, original_time, retrans_time, delta și size,
+        fiecare are 'type' ('retransmission', 'dup_ack' sau 'out_of_order')
+        și 'seq'. Numărul exact per tip: retransmission_summary().
+    """
+    return retransmission_summary(filepath, backend, max_events)['events']
+
+
+def retransmission_summary(filepath: str, backend: Optional[str] = None,
+                           max_events: int = 1000) -> dict:
+    """
+    Ca detect_retransmissions, plus numărul exact de evenimente per tip
+    (inclusiv cele peste max_events, care nu sunt păstrate în listă).
+    
+    Returns:
+        {'counts': {tip: număr}, 'events': primele max_events evenimente}
+    """
+    analyzer = RetransmissionAnalyzer(filepath, max_events=max_events)
+    return run_analyzers(filepath, [analyzer], backend)['retrans']
+
+
+# =============================================================================
+# TABELĂ DE FLUXURI (expirare în stil NetFlow/IPFIX)
+# =============================================================================
+
+# Câmpurile unei înregistrări de flux, în ordinea din CSV / JSON Lines
+FLOW_FIELDS = ('src_ip', 'dst_ip', 'src_port', 'dst_port', 'protocol', 'packets',
+               'bytes', 'start_time', 'end_time', 'tcp_flags', 'end_reason')
+
+
+class FlowRecord:
+    """
+    Un flux unidirecțional (5-tuple) activ sau exportat.
+
+    __slots__ în loc de dict per flux: pe capturi cu sute de mii de fluxuri
+    simultane, diferența de memorie este de câteva ori.
+    """
+    __slots__ = ('key', 'src_ip', 'dst_ip', 'src_port', 'dst_port', 'protocol',
+                 'packets', 'bytes', 'start_time', 'end_time', 'tcp_flags', 'end_reason')
+
+    def __init__(self, key: int, pkt: PacketSummary):
+        self.key = key
+        self.src_ip = pkt.ip_src
+        self.dst_ip = pkt.ip_dst
+        self.src_port = pkt.src_port
+        self.dst_port = pkt.dst_port
+        self.protocol = pkt.protocol
+        self.packets = 0
+        self.bytes = 0
+        self.start_time = pkt.timestamp
+        self.end_time = pkt.timestamp
+        self.tcp_flags = 0          # SAU logic între flag-urile tuturor segmentelor
+        self.end_reason = None      # 'idle', 'active' sau 'end'
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+    def as_dict(self) -> dict:
+        """Înregistrarea ca dict (flag-urile TCP în notația scapy, ex. 'FSPA')."""
+        row = {name: getattr(self, name) for name in FLOW_FIELDS}
+        row['tcp_flags'] = _TCP_FLAG_STR[self.tcp_flags]
+        return row
+
+
+@lru_cache(maxsize=65536)
+def _address_int(address: str) -> int:
+    """Adresa IPv4/IPv6 ca întreg (IPv4 în ::ffff:0:0/96, ca în modul columnar)."""
+    if ':' in address:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET6, address), 'big')
+    return 0xFFFF_0000_0000 | int.from_bytes(socket.inet_aton(address), 'big')
+
+
+class FlowTable:
+    """
+    Tabelă de fluxuri cu expirare, ca într-un exportator NetFlow/IPFIX.
+
+    Cheia este 5-tuple-ul împachetat într-un singur întreg
+    (src 128b | dst 128b | sport 16b | dport 16b | protocol 8b), deci
+    dicționarul nu mai păstrează câte un tuplu de 5 obiecte per flux.
+
+    Un flux expiră și este trimis către `on_expire`:
+    - idle: nu a mai primit pachete de `idle_timeout` secunde;
+    - active: durează de peste `active_timeout` secunde (fluxurile lungi
+      sunt raportate periodic; pachetele următoare deschid o înregistrare nouă);
+    - end: a rămas activ la flush(), la sfârșitul capturii.
+
+    Fluxurile sunt ținute într-un OrderedDict în ordinea ultimei activități,
+    deci cele inactive sunt mereu la început și expirarea costă O(1) per
+    flux expirat. Memoria depinde de fluxurile simultan active, nu de
+    lungimea capturii. Timpul este cel din captură, nu ceasul sistemului.
+    """
+
+    def __init__(self, idle_timeout: float = 15.0, active_timeout: float = 1800.0,
+                 on_expire=None):
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.on_expire = on_expire
+        self.flows: OrderedDict[int, FlowRecord] = OrderedDict()
+        self.exported = 0
+        self.peak_active = 0
+        self._protocol_ids: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.flows)
+
+    def flow_key(self, pkt: PacketSummary) -> int:
+        """5-tuple-ul pachetului împachetat într-un întreg."""
+        proto_id = self._protocol_ids.setdefault(pkt.protocol, len(self._protocol_ids))
+        return ((((_address_int(pkt.ip_src) << 128 | _address_int(pkt.ip_dst)) << 16
+                  | (pkt.src_port or 0)) << 16 | (pkt.dst_port or 0)) << 8 | proto_id)
+
+    def update(self, pkt: PacketSummary) -> None:
+        """Contabilizează un pachet (pachetele fără IP sunt ignorate)."""
+        if not (pkt.ip_src and pkt.ip_dst):
+            return
+        now = pkt.timestamp
+        self.expire(now)
+
+        key = self.flow_key(pkt)
+        flows = self.flows
+        record = flows.get(key)
+        if record is not None and now - record.start_time >= self.active_timeout:
+            del flows[key]
+            self._export(record, 'active')
+            record = None
+        if record is None:
+            record = flows[key] = FlowRecord(key, pkt)
+            if len(flows) > self.peak_active:
+                self.peak_active = len(flows)
+        else:
+            flows.move_to_end(key)
+        record.packets += 1
+        record.bytes += pkt.length
+        record.end_time = now
+        if pkt.tcp_flags:
+            record.tcp_flags |= _tcp_flag_bits(pkt.tcp_flags)
+
+    def expire(self, now: float) -> None:
+        """Exportă fluxurile inactive de cel puțin idle_timeout secunde."""
+        flows = self.flows
+        deadline = now - self.idle_timeout
+        while flows:
+            record = next(iter(flows.values()))
+            if record.end_time > deadline:
+                break
+            flows.popitem(last=False)
+            self._export(record, 'idle')
+
+    def flush(self) -> None:
+        """Exportă toate fluxurile rămase active (sfârșitul capturii)."""
+        while self.flows:
+            self._export(self.flows.popitem(last=False)[1], 'end')
+
+    def _export(self, record: FlowRecord, reason: str) -> None:
+        record.end_reason = reason
+        self.exported += 1
+        if self.on_expire is not None:
+            self.on_expire(record)
+
+
+class FlowRecordWriter:
+    """
+    Scrie înregistrările de flux pe măsură ce expiră: JSON Lines pentru
+    fișierele .jsonl/.json, altfel CSV cu antet. Se folosește ca
+    on_expire pentru FlowTable.
+    """
+
+    def __init__(self, output_path: str):
+        import csv
+
+        self.output_path = output_path
+        self._file = open(output_path, 'w', newline='', encoding='utf-8')
+        self.jsonl = Path(output_path).suffix.lower() in ('.jsonl', '.json')
+        if not self.jsonl:
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(FLOW_FIELDS)
+
+    def __call__(self, record: FlowRecord) -> None:
+        row = record.as_dict()
+        if self.jsonl:
+            self._file.write(json.dumps(row) + '\n')
+        else:
+            self._csv.writerow(row[name] for name in FLOW_FIELDS)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+@register_analyzer
+class FlowAnalyzer(PacketAnalyzer):
+    """
+    Fluxuri cu expirare idle/active, exportate pe măsură ce se închid.
+
+    Păstrează doar fluxurile active și primele `top` înregistrări după
+    octeți, deci memoria rămâne constantă pe capturi lungi.
+    """
+    name = "flows"
+
+    def __init__(self, filepath: str, output: Optional[str] = None,
+                 idle_timeout: float = 15.0, active_timeout: float = 1800.0, top: int = 5):
+        super().__init__(filepath)
+        self.writer = FlowRecordWriter(output) if output else None
+        self.top = top
+        self._top: list[tuple] = []     # min-heap (bytes, ordine, înregistrare)
+        self.table = FlowTable(idle_timeout, active_timeout, on_expire=self._on_expire)
+
+    def _on_expire(self, record: FlowRecord) -> None:
+        if self.writer is not None:
+            self.writer(record)
+        entry = (record.bytes, -self.table.exported, record)
+        if len(self._top) < self.top:
+            heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+
+    def consume(self, pkt: PacketSummary) -> None:
+        self.table.update(pkt)
+
+    def result(self) -> dict:
+        self.table.flush()
+        if self.writer is not None:
+            self.writer.close()
+        return {
+            'records': self.table.exported,
+            'peak_active': self.table.peak_active,
+            'top': [entry[2] for entry in sorted(self._top, reverse=True)],
+            'output': self.writer.output_path if self.writer else None,
+        }
+
+
+# =============================================================================
+# REPREZENTARE COLUMNARĂ (NumPy)
+# =============================================================================
+#
+# Pentru capturi cu zeci de milioane de pachete, un obiect per pachet și
+# actualizarea a zeci de Counter-e per pachet costă prea multă memorie și
+# timp. În modul columnar, captura este decodată direct în coloane
+# contigue (câte un element per pachet), iar statisticile se calculează
+# vectorizat: np.unique pentru distribuții, group-by pe cheia 5-tuple
+# pentru fluxuri.
+#
+# Adresele IP sunt valori pe 128 de biți (IPv6), stocate ca două coloane
+# uint64 (hi, lo); adresele IPv4 apar în forma IPv4-mapped (::ffff:a.b.c.d),
+# deci IPv4 și IPv6 pot fi grupate împreună.
+
+_IPV4_MAPPED_PREFIX = 0xFFFF << 32
+_UINT64_MASK = (1 << 64) - 1
+
+# Numele și tipurile coloanelor (typecode comun array.array / NumPy)
+COLUMNS = {
+    'timestamps': 'd',      # float64 - secunde Unix
+    'lengths': 'I',         # uint32 - lungime capturată
+    'ip_version': 'B',      # uint8 - 0 (fără IP), 4 sau 6
+    'src_hi': 'Q',          # uint64 - primii 64 de biți ai adresei sursă
+    'src_lo': 'Q',          # uint64 - ultimii 64 de biți ai adresei sursă
+    'dst_hi': 'Q',
+    'dst_lo': 'Q',
+    'src_ports': 'H',       # uint16 - 0 dacă lipsește
+    'dst_ports': 'H',
+    'proto': 'H',           # uint16 - index în protocol_names
+    'tcp_flags': 'h',       # int16 - octetul de flag-uri TCP, -1 pentru non-TCP
+}
+
+
+@dataclass
+class ColumnarCapture:
+    """Captură decodată în coloane NumPy contigue (un element per pachet)."""
+    file_path: str
+    protocol_names: list       # codurile din coloana `proto` → nume protocol
+    timestamps: Any            # float64
+    lengths: Any               # uint32
+    ip_version: Any            # uint8
+    src_hi: Any                # uint64 (adresa sursă, biții 127..64)
+    src_lo: Any                # uint64 (adresa sursă, biții 63..0)
+    dst_hi: Any                # uint64
+    dst_lo: Any                # uint64
+    src_ports: Any             # uint16
+    dst_ports: Any             # uint16
+    proto: Any                 # uint16
+    tcp_flags: Any             # int16
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def _split_address(raw: bytes, ip_version: int) -> tuple[int, int]:
+    """Împarte o adresă IPv4/IPv6 (octeți) în (hi, lo) pe 64 de biți."""
+    value = int.from_bytes(raw, 'big')
+    if ip_version == 4:
+        return 0, _IPV4_MAPPED_PREFIX | value
+    return value >> 64, value & _UINT64_MASK
+
+
+def _join_address(hi: int, lo: int) -> str:
+    """Operația inversă lui _split_address: (hi, lo) → șir de caractere."""
+    if hi == 0 and lo >> 32 == 0xFFFF:
+        return socket.inet_ntoa((lo & 0xFFFFFFFF).to_bytes(4, 'big'))
+    return socket.inet_ntop(socket.AF_INET6, ((hi << 64) | lo).to_bytes(16, 'big'))
+
+
+def load_columnar(filepath: str, chunk: Optional[CaptureChunk] = None) -> ColumnarCapture:
+    """
+    Decodează o captură direct în coloane, fără obiecte per pachet.
+
+    Valorile sunt acumulate în array.array (compacte, tipizate) și apoi
+    expuse ca numpy.ndarray fără copiere (np.frombuffer).
+
+    Args:
+        filepath: Calea către fișierul PCAP sau PCAPNG
+        chunk: Doar pachetele dintr-un interval de octeți (opțional)
+
+    Returns:
+        ColumnarCapture cu coloanele descrise în COLUMNS
+    """
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy nu este instalat. Rulați: pip install numpy")
+
+    buffers = {name: array(code) for name, code in COLUMNS.items()}
+    add_ts = buffers['timestamps'].append
+    add_len = buffers['lengths'].append
+    add_ver = buffers['ip_version'].append
+    add_src_hi, add_src_lo = buffers['src_hi'].append, buffers['src_lo'].append
+    add_dst_hi, add_dst_lo = buffers['dst_hi'].append, buffers['dst_lo'].append
+    add_sport, add_dport = buffers['src_ports'].append, buffers['dst_ports'].append
+    add_proto = buffers['proto'].append
+    add_flags = buffers['tcp_flags'].append
+
+    protocol_codes: dict[str, int] = {}
+
+    with _mapped_capture(filepath, chunk) as (mm, records):
+        for timestamp, linktype, offset, caplen in records:
+            (protocol, ip_version, ip_src, ip_dst, src_port, dst_port,
+             flags, _payload, _ttl, _seq, _ack, _win) = _decode_frame_raw(mm, offset, caplen, linktype)
+
+            add_ts(timestamp)
+            add_len(caplen)
+            add_ver(ip_version)
+            if ip_version:
+                src_hi, src_lo = _split_address(ip_src, ip_version)
+                dst_hi, dst_lo = _split_address(ip_dst, ip_version)
+            else:
+                src_hi = src_lo = dst_hi = dst_lo = 0
+            add_src_hi(src_hi)
+            add_src_lo(src_lo)
+            add_dst_hi(dst_hi)
+            add_dst_lo(dst_lo)
+            add_sport(src_port or 0)
+            add_dport(dst_port or 0)
+            code = protocol_codes.get(protocol)
+            if code is None:
+                code = protocol_codes[protocol] = len(protocol_codes)
+            add_proto(code)
+            add_flags(-1 if flags is None else flags)
+
+    columns = {name: np.frombuffer(buf, dtype=buf.typecode) if len(buf)
+               else np.empty(0, dtype=buf.typecode)
+               for name, buf in buffers.items()}
+    return ColumnarCapture(file_path=filepath, protocol_names=list(protocol_codes),
+                           **columns)
+
+
+def _factorize_addresses(hi, lo) -> tuple[Any, list]:
+    """
+    Înlocuiește fiecare adresă de 128 de biți cu un identificator întreg.
+
+    Când toate adresele sunt IPv4 (hi == 0), sortarea se face pe o singură
+    coloană uint64, mult mai rapid decât np.unique(axis=0) pe perechi.
+
+    Returns:
+        (ids, adrese) - ids[i] este indexul adresei i în lista `adrese`
+    """
+    if len(hi) == 0:
+        return np.empty(0, dtype=np.intp), []
+    if not hi.any():
+        uniq_lo, ids = np.unique(lo, return_inverse=True)
+        table = [_join_address(0, l) for l in uniq_lo.tolist()]
+    else:
+        pairs, ids = np.unique(np.column_stack((hi, lo)), axis=0, return_inverse=True)
+        table = [_join_address(h, l) for h, l in pairs.tolist()]
+    return ids.reshape(-1), table
+
+
+def _count_ids(ids, names=None) -> Counter:
+    """
+    Numără aparițiile fiecărui identificator, în ordinea primei apariții.
+
+    Ordinea contează la egalitate în Counter.most_common(), care păstrează
+    ordinea inserării - astfel raportul columnar este identic cu cel clasic.
+
+    Args:
+        ids: Coloană de valori întregi
+        names: Secvență opțională id → cheie afișată (adresă, protocol...)
+    """
+    if len(ids) == 0:
+        return Counter()
+    uniq, first, counts = np.unique(ids, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    keys = uniq[order].tolist()
+    if names is not None:
+        keys = [names[k] for k in keys]
+    return Counter(dict(zip(keys, counts[order].tolist())))
+
+
+class FlowColumns(Mapping):
+    """
+    Fluxurile agregate de aggregate_flows_columnar, ținute în coloane.
+
+    Se comportă ca dicționarul CaptureStatistics.flows ({5-tuple: {...}}),
+    dar dicționarul Python (un tuplu și un dict per flux, partea cea mai
+    lentă a modului columnar) este construit doar la prima accesare a
+    unei chei. len() și top() lucrează direct pe coloane, deci raportul
+    nu are nevoie de el.
+    """
+
+    def __init__(self, addresses: list, protocol_names: list, columns: dict):
+        self.addresses = addresses             # id → adresă (șir)
+        self.protocol_names = protocol_names   # cod → nume protocol
+        self.columns = columns                 # FLOW_COLUMNS → numpy.ndarray, ordinea primei apariții
+        self._flows = None
+
+    def __len__(self) -> int:
+        return len(self.columns['packets'])
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __getitem__(self, flow_key):
+        return self._materialize()[flow_key]
+
+    def _materialize(self) -> dict:
+        if self._flows is None:
+            self._flows = dict(self._items(range(len(self))))
+        return self._flows
+
+    def _items(self, indices):
+        columns, addresses, names = self.columns, self.addresses, self.protocol_names
+        for i in indices:
+            protocol = names[columns['proto'][i]]
+            has_ports = protocol in ("TCP", "UDP")
+            flow_key = (
+                addresses[columns['src_ids'][i]], addresses[columns['dst_ids'][i]],
+                int(columns['src_ports'][i]) if has_ports else None,
+                int(columns['dst_ports'][i]) if has_ports else None,
+                protocol,
+            )
+            yield flow_key, {
+                'packets': int(columns['packets'][i]),
+                'bytes': int(columns['bytes'][i]),
+                'start_time': float(columns['start_time'][i]),
+                'end_time': float(columns['end_time'][i]),
+            }
+
+    def top(self, n: int) -> list[tuple]:
+        """Primele n fluxuri după octeți (la egalitate, în ordinea apariției)."""
+        order = np.argsort(-self.columns['bytes'].astype(np.int64), kind='stable')[:n]
+        return list(self._items(order.tolist()))
+
+
+# Coloanele per flux din FlowColumns
+FLOW_COLUMNS = ('src_ids', 'dst_ids', 'src_ports', 'dst_ports', 'proto',
+                'packets', 'bytes', 'start_time', 'end_time')
+
+
+def aggregate_flows_columnar(cap: ColumnarCapture, mask=None) -> dict:
+    """
+    Agregă fluxurile 5-tuple printr-un group-by vectorizat.
+
+    Adresele sunt întâi înlocuite cu identificatori, apoi cheia 5-tuple
+    este împachetată în două numere uint64: (id_src, id_dst) și
+    (sport, dport, proto). Un np.lexsort stabil pe aceste chei grupează
+    pachetele fiecărui flux; add/minimum/maximum.reduceat pe segmentele
+    sortate dau pachetele, octeții, începutul și sfârșitul fluxului.
+
+    Returns:
+        FlowColumns (mapping în același format ca CaptureStatistics.flows)
+    """
+    if mask is None:
+        mask = cap.ip_version > 0
+    count = int(mask.sum())
+    if count == 0:
+        return {}
+
+    # Un singur spațiu de identificatori pentru sursă și destinație
+    ids, addresses = _factorize_addresses(
+        np.concatenate((cap.src_hi[mask], cap.dst_hi[mask])),
+        np.concatenate((cap.src_lo[mask], cap.dst_lo[mask])),
+    )
+    src_ids = ids[:count].astype(np.uint64)
+    dst_ids = ids[count:].astype(np.uint64)
+
+    key_hosts = (src_ids << np.uint64(32)) | dst_ids
+    key_service = ((cap.src_ports[mask].astype(np.uint64) << np.uint64(32)) |
+                   (cap.dst_ports[mask].astype(np.uint64) << np.uint64(16)) |
+                   cap.proto[mask].astype(np.uint64))
+
+    order = np.lexsort((key_service, key_hosts))  # stabil: primul index = prima apariție
+    sorted_hosts = key_hosts[order]
+    sorted_service = key_service[order]
+    boundary = np.empty(count, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (sorted_hosts[1:] != sorted_hosts[:-1]) | (sorted_service[1:] != sorted_service[:-1])
+    starts = np.flatnonzero(boundary)
+
+    timestamps = cap.timestamps[mask][order]
+    packets = np.diff(np.append(starts, count))
+    flow_bytes = np.add.reduceat(cap.lengths[mask][order].astype(np.uint64), starts)
+    start_times = np.minimum.reduceat(timestamps, starts)
+    end_times = np.maximum.reduceat(timestamps, starts)
+
+    # Fluxurile în ordinea primei apariții (ca în modul clasic)
+    flow_order = np.argsort(order[starts], kind='stable')
+    first = starts[flow_order]
+    hosts = sorted_hosts[first]
+    services = sorted_service[first]
+    return FlowColumns(addresses, list(cap.protocol_names), {
+        'src_ids': (hosts >> np.uint64(32)).astype(np.uint32),
+        'dst_ids': (hosts & np.uint64(0xFFFFFFFF)).astype(np.uint32),
+        'src_ports': (services >> np.uint64(32)).astype(np.uint16),
+        'dst_ports': ((services >> np.uint64(16)) & np.uint64(0xFFFF)).astype(np.uint16),
+        'proto': (services & np.uint64(0xFFFF)).astype(np.uint16),
+        'packets': packets[flow_order].astype(np.uint64),
+        'bytes': flow_bytes[flow_order],
+        'start_time': start_times[flow_order],
+        'end_time': end_times[flow_order],
+    })
+
+
+def analyze_columnar(cap: ColumnarCapture, sketch: bool = False) -> CaptureStatistics:
+    """
+    Calculează CaptureStatistics vectorizat, dintr-o captură columnară.
+
+    Rezultatul este compatibil cu print_statistics_report/export_to_csv;
+    packet_sizes și inter_arrival_times rămân numpy.ndarray (4, respectiv
+    8 octeți per pachet, în loc de obiecte Python în liste) sau, cu
+    sketch=True, se rezumă în QuantileSketch.
+    """
+    stats = CaptureStatistics(file_path=cap.file_path)
+    stats.total_packets = len(cap)
+    if stats.total_packets == 0:
+        return stats
+
+    timestamps = cap.timestamps
+    stats.total_bytes = int(cap.lengths.sum(dtype=np.uint64))
+    stats.first_timestamp = float(timestamps[0])
+    stats.last_timestamp = float(timestamps[-1])
+    stats.capture_duration = stats.last_timestamp - stats.first_timestamp
+
+    stats.packet_sizes = cap.lengths
+    iat = np.diff(timestamps)
+    stats.inter_arrival_times = iat[iat >= 0]  # Evită anomalii de timestamp
+    if sketch:
+        stats.packet_sizes = QuantileSketch().extend(stats.packet_sizes)
+        stats.inter_arrival_times = QuantileSketch().extend(stats.inter_arrival_times)
+
+    stats.protocols = _count_ids(cap.proto, cap.protocol_names)
+
+    has_ip = cap.ip_version > 0
+    src_ids, src_table = _factorize_addresses(cap.src_hi[has_ip], cap.src_lo[has_ip])
+    dst_ids, dst_table = _factorize_addresses(cap.dst_hi[has_ip], cap.dst_lo[has_ip])
+    stats.src_ips = _count_ids(src_ids, src_table)
+    stats.dst_ips = _count_ids(dst_ids, dst_table)
+
+    stats.src_ports = _count_ids(cap.src_ports[cap.src_ports > 0])
+    stats.dst_ports = _count_ids(cap.dst_ports[cap.dst_ports > 0])
+
+    stats.tcp_flags = _count_ids(cap.tcp_flags[cap.tcp_flags > 0], _TCP_FLAG_STR)
+
+    stats.flows = aggregate_flows_columnar(cap, has_ip)
+    return stats
+
+
+# =============================================================================
+# CACHE PE DISC (rezumatul columnar al capturii)
+# =============================================================================
+#
+# Rezultatul analyze_columnar se salvează într-un fișier .npz necomprimat:
+# coloanele (dimensiuni, inter-arrival times, fluxuri) ca numpy.ndarray,
+# iar contoarele și metadatele ca JSON. O rulare ulterioară pe aceeași
+# captură (cu alte opțiuni de raport sau export) citește doar acest fișier.
+#
+# Cheia cache-ului este amprenta fișierului: calea absolută, dimensiunea,
+# mtime și un hash al primilor octeți (header-ul și primele pachete).
+# Dacă oricare se schimbă, intrarea veche este ignorată și suprascrisă.
+
+CACHE_VERSION = 1
+_CACHE_HASH_BYTES = 64 * 1024
+_COUNTER_FIELDS = ('protocols', 'src_ips', 'dst_ips', 'src_ports', 'dst_ports', 'tcp_flags')
+
+
+def default_cache_dir() -> Path:
+    """Directorul implicit: $XDG_CACHE_HOME (sau ~/.cache)/ex_1_04_pcap_stats."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'ex_1_04_pcap_stats'
+
+
+def capture_fingerprint(filepath: str) -> dict:
+    """Amprenta unei capturi: cale, dimensiune, mtime și hash-ul începutului."""
+    path = Path(filepath).resolve()
+    info = path.stat()
+    with open(path, 'rb') as f:
+        head = f.read(_CACHE_HASH_BYTES)
+    return {
+        'version': CACHE_VERSION,
+        'path': str(path),
+        'size': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'header_sha256': hashlib.sha256(head).hexdigest(),
+    }
+
+
+def _cache_file(fingerprint: dict, cache_dir: Optional[str]) -> Path:
+    directory = Path(cache_dir) if cache_dir else default_cache_dir()
+    name = hashlib.sha256(fingerprint['path'].encode()).hexdigest()[:32]
+    return directory / f'{name}.npz'
+
+
+def save_stats_cache(stats: CaptureStatistics, fingerprint: dict,
+                     cache_dir: Optional[str] = None) -> Optional[Path]:
+    """
+    Salvează statisticile columnare (packet_sizes/inter_arrival_times ca
+    numpy.ndarray, flows ca FlowColumns) pentru captura cu amprenta dată.
+    Scrierea este atomică: un fișier temporar redenumit la final.
+
+    Cache-ul e doar o optimizare: dacă scrierea eșuează (disc plin,
+    director read-only) se afișează un avertisment și se întoarce None,
+    fără fișierul temporar rămas pe disc.
+    """
+    flows = stats.flows if isinstance(stats.flows, FlowColumns) else None
+    meta = {
+        'fingerprint': fingerprint,
+        'file_path': stats.file_path,
+        'total_packets': stats.total_packets,
+        'total_bytes': stats.total_bytes,
+        'first_timestamp': stats.first_timestamp,
+        'last_timestamp': stats.last_timestamp,
+        'counters': {name: list(getattr(stats, name).items()) for name in _COUNTER_FIELDS},
+        'addresses': flows.addresses if flows else [],
+        'protocol_names': flows.protocol_names if flows else [],
+    }
+    arrays = {
+        'packet_sizes': np.asarray(stats.packet_sizes, dtype=np.uint32),
+        'inter_arrival_times': np.asarray(stats.inter_arrival_times, dtype=np.float64),
+    }
+    if flows:
+        arrays.update({f'flow_{name}': flows.columns[name] for name in FLOW_COLUMNS})
+
+    path = _cache_file(fingerprint, cache_dir)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[!] Nu pot salva cache-ul în {path.parent}: {e}", file=sys.stderr)
+        return None
+    finally:
+        try:
+            tmp.unlink()            # există doar dacă os.replace nu a ajuns să ruleze
+        except OSError:
+            pass
+    return path
+
+
+def load_stats_cache(filepath: str, cache_dir: Optional[str] = None,
+                     fingerprint: Optional[dict] = None) -> Optional[CaptureStatistics]:
+    """
+    Încarcă statisticile din cache, dacă amprenta capturii nu s-a schimbat.
+
+    Returns:
+        CaptureStatistics sau None (cache absent, vechi sau corupt)
+    """
+    fingerprint = fingerprint or capture_fingerprint(filepath)
+    path = _cache_file(fingerprint, cache_dir)
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta['fingerprint'] != fingerprint:
+                return None
+            arrays = {name: data[name] for name in data.files if name != 'meta'}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    stats = CaptureStatistics(file_path=filepath)
+    stats.total_packets = meta['total_packets']
+    stats.total_bytes = meta['total_bytes']
+    stats.first_timestamp = meta['first_timestamp']
+    stats.last_timestamp = meta['last_timestamp']
+    stats.capture_duration = stats.last_timestamp - stats.first_timestamp
+    for name, items in meta['counters'].items():
+        setattr(stats, name, Counter(dict(items)))
+    stats.packet_sizes = arrays['packet_sizes']
+    stats.inter_arrival_times = arrays['inter_arrival_times']
+    if 'flow_packets' in arrays:
+        stats.flows = FlowColumns(meta['addresses'], meta['protocol_names'],
+                                  {name: arrays[f'flow_{name}'] for name in FLOW_COLUMNS})
+    return stats
+
+
+def analyze_capture_cached(filepath: str, cache_dir: Optional[str] = None) -> CaptureStatistics:
+    """
+    Ca analyze_capture(columnar=True), dar refolosește rezultatul salvat
+    pe disc la o rulare anterioară, cât timp captura nu s-a modificat.
+    """
+    fingerprint = capture_fingerprint(filepath)
+    stats = load_stats_cache(filepath, cache_dir, fingerprint)
+    if stats is None:
+        stats = analyze_columnar(load_columnar(filepath))
+        save_stats_cache(stats, fingerprint, cache_dir)
+    return stats
+
+
+# =============================================================================
+# ANALIZĂ PARALELĂ (procese multiple)
+# =============================================================================
+#
+# Captura este împărțită în intervale de octeți aproximativ egale. Un
+# interval nu poate începe oriunde: limita se mută înainte până la
+# începutul unei înregistrări, recunoscut după un lanț de header-e
+# plauzibile (pcap) sau după lungimea repetată la finalul blocului
+# (pcapng), confirmat apoi pe un lanț mai lung. Fiecare interval este
+# analizat de un proces separat, iar rezultatele parțiale se combină cu
+# CaptureStatistics.merge().
+#
+# Euristica poate, teoretic, accepta o limită falsă. Verificarea exactă
+# vine gratuit: procesul care analizează intervalul anterior parcurge
+# lanțul real de înregistrări, iar ultima trebuie să se termine exact la
+# limită (altfel iteratorul ridică ChunkBoundaryError și analiza se reia
+# secvențial).
+
+# Cât de departe căutăm o limită de înregistrare după offset-ul țintă
+_RESYNC_WINDOW = 4 * 1024 * 1024
+# Câte înregistrări consecutive trebuie să fie plauzibile: un lanț scurt
+# pentru căutare, unul lung pentru confirmarea candidatului găsit
+_RESYNC_CHAIN = 4
+_RESYNC_CONFIRM = 64
+# Lungimea maximă plauzibilă a unei înregistrări (snaplen-ul implicit tcpdump)
+_MAX_RECORD_LEN = 262144
+
+
+def _pcap_record_chain_ok(mm, pos: int, record_hdr: struct.Struct, max_len: int,
+                          frac_limit: int, ts_min: int, ts_max: int,
+                          chain: int = _RESYNC_CHAIN) -> bool:
+    """Verifică dacă la `pos` încep `chain` înregistrări pcap plauzibile."""
+    end = len(mm)
+    for _ in range(chain):
+        if pos == end:
+            return True
+        if pos + 16 > end:
+            return False
+        ts_sec, ts_frac, incl_len, orig_len = record_hdr.unpack_from(mm, pos)
+        if (ts_frac >= frac_limit or incl_len > orig_len or incl_len > max_len
+                or not ts_min <= ts_sec <= ts_max):
+            return False
+        pos += 16 + incl_len
+        if pos > end:
+            return False
+    return True
+
+
+def _resync_pcap(mm, target: int) -> Optional[int]:
+    """Primul offset >= target la care începe o înregistrare pcap."""
+    endian, ts_scale, snaplen, _linktype = _pcap_file_header(mm)
+    record_hdr = struct.Struct(endian + 'IIII')
+    max_len = max(snaplen, _MAX_RECORD_LEN)
+    frac_limit = 1_000_000_000 if ts_scale < 1e-6 else 1_000_000
+    # Timestamp-urile din captură sunt apropiate de cel al primului pachet
+    first_ts = record_hdr.unpack_from(mm, 24)[0] if len(mm) >= 40 else 0
+    ts_min, ts_max = first_ts - 86400, first_ts + 366 * 86400
+
+    for pos in range(target, min(len(mm), target + _RESYNC_WINDOW)):
+        if (_pcap_record_chain_ok(mm, pos, record_hdr, max_len, frac_limit, ts_min, ts_max)
+                and _pcap_record_chain_ok(mm, pos, record_hdr, max_len, frac_limit,
+                                          ts_min, ts_max, _RESYNC_CONFIRM)):
+            return pos
+    return None
+
+
+def _pcapng_block_chain_ok(mm, pos: int, block_len_at, chain: int) -> bool:
+    """Verifică dacă la `pos` încep `chain` blocuri pcapng bine formate."""
+    end = len(mm)
+    for _ in range(chain):
+        if pos == end:
+            return True
+        if pos + 12 > end:
+            return False
+        block_len = block_len_at(mm, pos + 4)[0]
+        if (block_len < 12 or block_len % 4 or pos + block_len > end
+                or block_len_at(mm, pos + block_len - 4)[0] != block_len):
+            return False
+        pos += block_len
+    return True
+
+
+def _resync_pcapng(mm, target: int, endian: str) -> Optional[int]:
+    """Primul offset >= target (aliniat la 4) la care începe un bloc pcapng."""
+    block_len_at = struct.Struct(endian + 'I').unpack_from
+    start = target + (-target % 4)  # blocurile pcapng sunt aliniate la 32 de biți
+    for pos in range(start, min(len(mm), target + _RESYNC_WINDOW), 4):
+        if (_pcapng_block_chain_ok(mm, pos, block_len_at, _RESYNC_CHAIN)
+                and _pcapng_block_chain_ok(mm, pos, block_len_at, _RESYNC_CONFIRM)):
+            return pos
+    return None
+
+
+def _pcapng_prologue(mm) -> tuple[int, str, list]:
+    """
+    Parcurge blocurile SHB/IDB de la începutul unui fișier pcapng.
+
+    Returns:
+        (offset_primul_bloc_de_date, endian, interfețe)
+    """
+    offset = 0
+    endian = '<'
+    interfaces = []
+    end = len(mm)
+    while offset + 12 <= end:
+        block_type = struct.unpack_from('<I', mm, offset)[0]
+        if block_type == PCAPNG_SHB_TYPE:
+            bom = struct.unpack_from('<I', mm, offset + 8)[0]
+            endian = '<' if bom == PCAPNG_BYTE_ORDER_MAGIC else '>'
+            interfaces = []
+        block_type, block_len = struct.unpack_from(endian + 'II', mm, offset)
+        if block_type == PCAPNG_IDB_TYPE:
+            linktype = struct.unpack_from(endian + 'H', mm, offset + 8)[0]
+            interfaces.append((linktype, _parse_idb_tsresol(
+                mm, offset + 16, offset + block_len - 4, endian)))
+        elif block_type != PCAPNG_SHB_TYPE:
+            break
+        if block_len < 12:
+            break
+        offset += block_len
+    return offset, endian, interfaces
+
+
+def plan_chunks(filepath: str, parts: int) -> list[CaptureChunk]:
+    """
+    Împarte o captură în cel mult `parts` intervale aliniate la înregistrări.
+
+    Nu parcurge tot fișierul: pentru fiecare limită citește doar câteva
+    header-e în jurul offset-ului țintă. Dacă o limită nu poate fi găsită,
+    intervalul vecin o preia (în cel mai rău caz rămâne un singur interval).
+
+    Limitare pcapng: se presupune că toate interfețele (IDB) sunt declarate
+    la începutul fișierului, cum scriu dumpcap/tshark.
+    """
+    capture_format = _detect_capture_format(filepath)
+    if capture_format is None:
+        raise ValueError(f"Format de captură necunoscut: {filepath}")
+
+    with open(filepath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            if capture_format == 'pcapng':
+                first, endian, interfaces = _pcapng_prologue(mm)
+                resync = lambda target: _resync_pcapng(mm, target, endian)
+            else:
+                first, endian, interfaces = 24, '<', []
+                resync = lambda target: _resync_pcap(mm, target)
+
+            bounds = [first]
+            for i in range(1, max(1, parts)):
+                target = first + (size - first) * i // parts
+                if target <= bounds[-1]:
+                    continue
+                boundary = resync(target)
+                if boundary is not None and bounds[-1] < boundary < size:
+                    bounds.append(boundary)
+            bounds.append(size)
+
+    return [CaptureChunk(start, stop, endian, interfaces)
+            for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _analyze_chunk(filepath: str, chunk: CaptureChunk, columnar: bool,
+                   sketch: bool = False) -> CaptureStatistics:
+    """Analizează un singur interval (rulează într-un proces separat)."""
+    if columnar:
+        return analyze_columnar(load_columnar(filepath, chunk), sketch=sketch)
+    analyzer = StatisticsAnalyzer(filepath, sketch=sketch)
+    for pkt in parse_pcap_native(filepath, chunk):
+        analyzer.consume(pkt)
+    return analyzer.result()
+
+
+def analyze_capture_parallel(filepath: str, workers: int, columnar: bool = False,
+                             exact: bool = False) -> CaptureStatistics:
+    """
+    Analizează o captură folosind `workers` procese.
+
+    Fiecare proces mapează singur fișierul și analizează un interval de
+    octeți; procesul principal doar împarte fișierul și combină
+    rezultatele, deci timpul scade aproximativ proporțional cu numărul
+    de nuclee.
+
+    Rezultatele parțiale au dimensiune fixă: dimensiunile pachetelor și
+    inter-arrival times vin ca QuantileSketch (câțiva KB), nu ca liste cu
+    o valoare per pachet, deci memoria și transferul între procese nu cresc
+    cu captura. Contoarele și fluxurile sunt identice cu analiza
+    secvențială; percentilele au eroare relativă ≤ 1%.
+
+    Args:
+        filepath: Calea către fișierul PCAP sau PCAPNG (backend nativ)
+        workers: Numărul de procese
+        columnar: Fiecare proces folosește modul columnar (NumPy)
+        exact: Procesele întorc toate valorile (percentile exacte, dar
+            memorie și transfer proporționale cu numărul de pachete)
+
+    Returns:
+        CaptureStatistics; dacă un proces găsește o limită de interval
+        falsă (ChunkBoundaryError), rezultatul analizei secvențiale
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    sketch = not exact
+    chunks = plan_chunks(filepath, workers)
+    if workers <= 1 or len(chunks) <= 1:
+        return analyze_capture(filepath, columnar=columnar, sketch=sketch)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = pool.map(_analyze_chunk, [filepath] * len(chunks), chunks,
+                                [columnar] * len(chunks), [sketch] * len(chunks))
+            stats = CaptureStatistics(file_path=filepath)
+            for partial in partials:  # în ordinea din fișier
+                stats.merge(partial)
+    except ChunkBoundaryError as e:
+        print(f"[!] {e}; reiau analiza secvențial", file=sys.stderr)
+        return analyze_capture(filepath, columnar=columnar, sketch=sketch)
+    return stats
+
+
+# =============================================================================
+# RAPORTARE
+# =============================================================================
+
+def describe_values(values) -> dict:
+    """
+    Statistici descriptive pentru o listă, un numpy.ndarray sau un
+    QuantileSketch (pentru schiță, percentilele sunt aproximative).
+
+    Returns:
+        {'count', 'min', 'max', 'mean', 'median', 'stdev', 'p90', 'p99', 'p999'}
+        sau {} pentru o colecție goală
+    """
+    count = len(values)
+    if count == 0:
+        return {}
+
+    if isinstance(values, QuantileSketch):
+        return {
+            'count': count,
+            'min': values.min,
+            'max': values.max,
+            'mean': values.mean,
+            'median': values.quantile(0.5),
+            'stdev': values.stdev,
+            'p90': values.quantile(0.9),
+            'p99': values.quantile(0.99),
+            'p999': values.quantile(0.999),
+        }
+
+    if NUMPY_AVAILABLE and isinstance(values, np.ndarray):
+        p50, p90, p99, p999 = np.percentile(values, [50, 90, 99, 99.9])
+        return {
+            'count': count,
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'mean': float(values.mean()),
+            'median': float(p50),
+            'stdev': float(values.std(ddof=1)) if count > 1 else 0.0,
+            'p90': float(p90),
+            'p99': float(p99),
+            'p999': float(p999),
+        }
+
+    if count > 1:
+        # 'inclusive' = interpolare liniară, la fel ca np.percentile
+        cuts = statistics.quantiles(values, n=1000, method='inclusive')
+    else:
+        cuts = [values[0]] * 999
+    return {
+        'count': count,
+        'min': min(values),
+        'max': max(values),
+        'mean': statistics.mean(values),
+        'median': statistics.median(values),
+        'stdev': statistics.stdev(values) if count > 1 else 0.0,
+        'p90': cuts[899],
+        'p99': cuts[989],
+        'p999': cuts[998],
+    }
+
+
+def print_statistics_report(stats: CaptureStatistics):
+    """
+    Afișează un raport formatat cu statisticile capturii.
+    """
+    print("=" * 70)
+    print(f"RAPORT STATISTICI PCAP: {Path(stats.file_path).name}")
+    print("=" * 70)
+    
+    # Informații generale
+    print(f"\n{'─' * 40}")
+    print("SUMAR GENERAL")
+    print(f"{'─' * 40}")
+    print(f"  Total pachete:        {stats.total_packets:,}")
+    print(f"  Total octeți:         {stats.total_bytes:,} ({stats.total_bytes / 1024:.2f} KB)")
     print(f"  Durată captură:       {stats.capture_duration:.3f} secunde")
     print(f"  Throughput:           {stats.throughput_mbps:.3f} Mbps")
     print(f"  Pachete/secundă:      {stats.packets_per_second:.2f}")
     
     # Statistici dimensiune pachete
-    if stats.packet_sizes:
+    sizes = describe_values(stats.packet_sizes)
+    if sizes:
         print(f"\n{'─' * 40}")
         print("DIMENSIUNE PACHETE (octeți)")
         print(f"{'─' * 40}")
-        print(f"  Minim:     {min(stats.packet_sizes):,}")
-        print(f"  Maxim:     {max(stats.packet_sizes):,}")
+        print(f"  Minim:     {sizes['min']:,.0f}")
+        print(f"  Maxim:     {sizes['max']:,.0f}")
         print(f"  Medie:     {stats.avg_packet_size:.2f}")
-        print(f"  Mediană:   {statistics.median(stats.packet_sizes):.2f}")
-        if len(stats.packet_sizes) > 1:
-            print(f"  Std Dev:   {statistics.stdev(stats.packet_sizes):.2f}")
+        print(f"  Mediană:   {sizes['median']:.2f}")
+        print(f"  P90 / P99 / P99.9: {sizes['p90']:.2f} / {sizes['p99']:.2f} / "
+              f"{sizes['p999']:.2f}")
+        if sizes['count'] > 1:
+            print(f"  Std Dev:   {sizes['stdev']:.2f}")
     
     # Distribuție protocoale
     print(f"\n{'─' * 40}")
@@ -605,29 +2636,35 @@ def print_statistics_report(stats: CaptureStatistics):
             print(f"  {flags:10} {count:>8,}")
     
     # Statistici timing
-    if stats.inter_arrival_times:
+    iat = describe_values(stats.inter_arrival_times)
+    if iat:
         print(f"\n{'─' * 40}")
         print("INTER-ARRIVAL TIME (milisecunde)")
         print(f"{'─' * 40}")
-        iat_ms = [t * 1000 for t in stats.inter_arrival_times]
-        print(f"  Minim:     {min(iat_ms):.3f}")
-        print(f"  Maxim:     {max(iat_ms):.3f}")
-        print(f"  Medie:     {statistics.mean(iat_ms):.3f}")
-        print(f"  Mediană:   {statistics.median(iat_ms):.3f}")
+        print(f"  Minim:     {iat['min'] * 1000:.3f}")
+        print(f"  Maxim:     {iat['max'] * 1000:.3f}")
+        print(f"  Medie:     {iat['mean'] * 1000:.3f}")
+        print(f"  Mediană:   {iat['median'] * 1000:.3f}")
+        print(f"  P90 / P99 / P99.9: {iat['p90'] * 1000:.3f} / {iat['p99'] * 1000:.3f} / "
+              f"{iat['p999'] * 1000:.3f}")
     
     # Sumar fluxuri
-    print(f"\n{'─' * 40}")
-    print("SUMAR FLUXURI (5-TUPLE)")
-    print(f"{'─' * 40}")
-    print(f"  Total fluxuri unice: {len(stats.flows)}")
+    if stats.flows is not None:
+        print(f"\n{'─' * 40}")
+        print("SUMAR FLUXURI (5-TUPLE)")
+        print(f"{'─' * 40}")
+        print(f"  Total fluxuri unice: {len(stats.flows)}")
     
     if stats.flows:
         # Top 5 fluxuri după bytes
-        sorted_flows = sorted(
-            stats.flows.items(),
-            key=lambda x: x[1]['bytes'],
-            reverse=True
-        )[:5]
+        if isinstance(stats.flows, FlowColumns):
+            sorted_flows = stats.flows.top(5)
+        else:
+            sorted_flows = sorted(
+                stats.flows.items(),
+                key=lambda x: x[1]['bytes'],
+                reverse=True
+            )[:5]
         
         print(f"\n  Top 5 fluxuri (după octeți):")
         for flow_key, flow_data in sorted_flows:
@@ -697,7 +2734,98 @@ def export_to_csv(stats: CaptureStatistics, output_path: str):
 # GENERARE PCAP DE TEST
 # =============================================================================
 
-def generate_sample_pcap(output_path: str):
+def _ipv4_checksum(header: bytes) -> int:
+    """Suma de control Internet (RFC 1071) pentru header-ul IPv4."""
+    total = sum(struct.unpack(f'!{len(header) // 2}H', header))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def _build_ipv4_frame(src_ip: str, dst_ip: str, proto: int, l4: bytes) -> bytes:
+    """Construiește un cadru Ethernet + IPv4 în jurul unui segment L4."""
+    eth = bytes.fromhex('020000000001') + bytes.fromhex('020000000002') + _ETH_TYPE.pack(ETH_TYPE_IPV4)
+    ip_hdr = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(l4), 1, 0, 64, proto, 0,
+                         socket.inet_aton(src_ip), socket.inet_aton(dst_ip))
+    ip_hdr = ip_hdr[:10] + struct.pack('!H', _ipv4_checksum(ip_hdr)) + ip_hdr[12:]
+    return eth + ip_hdr + l4
+
+
+def _build_tcp_frame(src_ip: str, dst_ip: str, sport: int, dport: int, flags: int,
+                     seq: int, ack: int = 0, payload: bytes = b'',
+                     window: int = 65535) -> bytes:
+    """Construiește un cadru Ethernet/IPv4/TCP (fără opțiuni TCP)."""
+    tcp = struct.pack('!HHIIBBHHH', sport, dport, seq, ack, 5 << 4, flags, window, 0, 0)
+    return _build_ipv4_frame(src_ip, dst_ip, 6, tcp + payload)
+
+
+def _build_udp_frame(src_ip: str, dst_ip: str, sport: int, dport: int,
+                     payload: bytes = b'') -> bytes:
+    """Construiește un cadru Ethernet/IPv4/UDP."""
+    udp = struct.pack('!HHHH', sport, dport, 8 + len(payload), 0)
+    return _build_ipv4_frame(src_ip, dst_ip, 17, udp + payload)
+
+
+def write_capture_native(output_path: str, frames: list[tuple[float, bytes]],
+                         pcapng: bool = False):
+    """
+    Scrie cadre Ethernet într-un fișier pcap (sau pcapng) fără scapy.
+
+    Args:
+        output_path: Fișierul de ieșire
+        frames: Listă de (timestamp, octeți_cadru)
+        pcapng: True pentru format pcapng (SHB + IDB + EPB)
+    """
+    with open(output_path, 'wb') as f:
+        if not pcapng:
+            f.write(struct.pack('<IHHiIII', PCAP_MAGIC_US, 2, 4, 0, 0, 65535, LINKTYPE_ETHERNET))
+            for ts, frame in frames:
+                ts_us = round(ts * 1_000_000)
+                f.write(struct.pack('<IIII', ts_us // 1_000_000, ts_us % 1_000_000,
+                                    len(frame), len(frame)))
+                f.write(frame)
+            return
+
+        # Section Header Block: versiune 1.0, lungime secțiune nespecificată (-1)
+        f.write(struct.pack('<IIIHHqI', PCAPNG_SHB_TYPE, 28, PCAPNG_BYTE_ORDER_MAGIC,
+                            1, 0, -1, 28))
+        # Interface Description Block: Ethernet, rezoluție implicită (µs)
+        f.write(struct.pack('<IIHHII', PCAPNG_IDB_TYPE, 20, LINKTYPE_ETHERNET, 0, 65535, 20))
+        for ts, frame in frames:
+            ts_us = round(ts * 1_000_000)
+            padded = frame + b'\x00' * (-len(frame) % 4)
+            block_len = 32 + len(padded)
+            f.write(struct.pack('<IIIIIII', PCAPNG_EPB_TYPE, block_len, 0,
+                                ts_us >> 32, ts_us & 0xFFFFFFFF, len(frame), len(frame)))
+            f.write(padded)
+            f.write(struct.pack('<I', block_len))
+
+
+def _sample_frames() -> list[tuple[float, bytes]]:
+    """Aceeași conversație ca generate_sample_pcap, construită cu struct."""
+    base_time = 1704067200.0  # 2024-01-01 00:00:00 UTC
+    client_ip, server_ip = "192.168.1.100", "192.168.1.1"
+    client_port, server_port = 54321, 80
+    http_req = b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n"
+    http_resp = b"HTTP/1.1 200 OK\r\nContent-Length: 13\r\n\r\nHello, World!"
+
+    return [
+        (base_time, _build_tcp_frame(client_ip, server_ip, client_port, server_port, 0x02, 1000)),
+        (base_time + 0.001, _build_tcp_frame(server_ip, client_ip, server_port, client_port,
+                                             0x12, 2000, 1001)),
+        (base_time + 0.002, _build_tcp_frame(client_ip, server_ip, client_port, server_port,
+                                             0x10, 1001, 2001)),
+        (base_time + 0.010, _build_tcp_frame(client_ip, server_ip, client_port, server_port,
+                                             0x18, 1001, 2001, http_req)),
+        (base_time + 0.015, _build_tcp_frame(server_ip, client_ip, server_port, client_port,
+                                             0x18, 2001, 1001 + len(http_req), http_resp)),
+        (base_time + 0.020, _build_tcp_frame(server_ip, client_ip, server_port, client_port,
+                                             0x11, 2001 + len(http_resp), 1001 + len(http_req))),
+        (base_time + 0.025, _build_udp_frame(client_ip, "8.8.8.8", 12345, 53, b"\x00\x01\x00\x00")),
+    ]
+
+
+def generate_sample_pcap(output_path: str, pcapng: bool = False):
     """
     Generează un fișier PCAP minim pentru testare.
     
@@ -705,11 +2833,16 @@ def generate_sample_pcap(output_path: str):
     - TCP handshake (SYN, SYN-ACK, ACK)
     - Transfer date (PSH-ACK)
     - Închidere conexiune (FIN)
+
+    Folosește Scapy dacă este instalat; altfel (sau pentru pcapng)
+    construiește cadrele direct cu struct.
     """
-    if not SCAPY_AVAILABLE:
-        print("⚠ Scapy nu este disponibil. Nu se poate genera PCAP de test.")
-        print("  Folosiți un PCAP existent sau instalați Scapy.")
-        return False
+    if pcapng or not SCAPY_AVAILABLE:
+        frames = _sample_frames()
+        write_capture_native(output_path, frames, pcapng=pcapng)
+        print(f"✓ {'PCAPNG' if pcapng else 'PCAP'} de test generat: {output_path}")
+        print(f"  {len(frames)} pachete (TCP handshake + HTTP + UDP)")
+        return True
     
     from scapy.all import wrpcap
     
@@ -797,6 +2930,8 @@ def run_tests() -> bool:
     Returns:
         True dacă toate testele trec, False altfel
     """
+    import contextlib
+    import io
     import tempfile
     import os
     
@@ -807,97 +2942,342 @@ def run_tests() -> bool:
     tests_passed = 0
     tests_total = 0
     
-    # Test 1: Verificare bibliotecă disponibilă
+    # Test 1: Verificare backend-uri disponibile
     tests_total += 1
-    print(f"\n[Test {tests_total}] Verificare bibliotecă PCAP...")
-    if SCAPY_AVAILABLE:
-        print("  ✓ Scapy disponibil")
-        tests_passed += 1
-    elif DPKT_AVAILABLE:
-        print("  ✓ dpkt disponibil (fallback)")
-        tests_passed += 1
-    else:
-        print("  ✗ Nicio bibliotecă PCAP disponibilă!")
-        print("    Instalați: pip install scapy --break-system-packages")
-        return False
+    print(f"\n[Test {tests_total}] Verificare backend-uri PCAP...")
+    print(f"  ✓ Disponibile: {', '.join(available_backends())}")
+    tests_passed += 1
     
     # Test 2: Generare PCAP de test
     tests_total += 1
     print(f"\n[Test {tests_total}] Generare PCAP de test...")
     
-    if SCAPY_AVAILABLE:
-        with tempfile.NamedTemporaryFile(suffix='.pcap', delete=False) as f:
-            test_pcap = f.name
-        
-        try:
-            if generate_sample_pcap(test_pcap):
-                print("  ✓ PCAP generat cu succes")
-                tests_passed += 1
-            else:
-                print("  ✗ Eroare la generare PCAP")
-        except Exception as e:
-            print(f"  ✗ Excepție: {e}")
-    else:
-        print("  ⊘ Skip (necesită Scapy pentru generare)")
-        tests_passed += 1  # Nu penalizăm
+    with tempfile.NamedTemporaryFile(suffix='.pcap', delete=False) as f:
+        test_pcap = f.name
+    
+    try:
+        if generate_sample_pcap(test_pcap):
+            print("  ✓ PCAP generat cu succes")
+            tests_passed += 1
+        else:
+            print("  ✗ Eroare la generare PCAP")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
     
     # Test 3: Parsare PCAP
     tests_total += 1
     print(f"\n[Test {tests_total}] Parsare PCAP...")
     
-    if SCAPY_AVAILABLE and os.path.exists(test_pcap):
-        try:
-            packets = list(parse_pcap(test_pcap))
-            if len(packets) > 0:
-                print(f"  ✓ Parsate {len(packets)} pachete")
-                tests_passed += 1
-            else:
-                print("  ✗ Niciun pachet parsat")
-        except Exception as e:
-            print(f"  ✗ Excepție: {e}")
-    else:
-        print("  ⊘ Skip (fără PCAP de test)")
-        tests_passed += 1
+    try:
+        packets = list(parse_pcap(test_pcap))
+        if len(packets) > 0:
+            print(f"  ✓ Parsate {len(packets)} pachete")
+            tests_passed += 1
+        else:
+            print("  ✗ Niciun pachet parsat")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
     
-    # Test 4: Analiză statistici
+    # Test 4: Backend nativ - pcap și pcapng dau același rezultat
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Backend nativ (pcap vs pcapng)...")
+    
+    with tempfile.NamedTemporaryFile(suffix='.pcapng', delete=False) as f:
+        test_pcapng = f.name
+    
+    try:
+        write_capture_native(test_pcapng, _sample_frames(), pcapng=True)
+        from_pcap = list(parse_pcap_native(test_pcap))
+        from_pcapng = list(parse_pcap_native(test_pcapng))
+        flags = [p.tcp_flags for p in from_pcapng if p.is_tcp]
+        if (len(from_pcapng) == 7 and
+                [(p.ip_src, p.src_port, p.payload_size) for p in from_pcap] ==
+                [(p.ip_src, p.src_port, p.payload_size) for p in from_pcapng] and
+                flags[:3] == ['S', 'SA', 'A']):
+            print(f"  ✓ {len(from_pcapng)} pachete identice, flag-uri {flags[:3]}")
+            tests_passed += 1
+        else:
+            print("  ✗ Rezultate diferite între pcap și pcapng")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    finally:
+        os.unlink(test_pcapng)
+    
+    # Test 5: Analiză statistici
     tests_total += 1
     print(f"\n[Test {tests_total}] Analiză statistici...")
     
-    if SCAPY_AVAILABLE and os.path.exists(test_pcap):
+    try:
+        stats = analyze_capture(test_pcap)
+        if stats.total_packets > 0 and stats.total_bytes > 0:
+            print(f"  ✓ Statistici calculate: {stats.total_packets} pkt, {stats.total_bytes} bytes")
+            tests_passed += 1
+        else:
+            print("  ✗ Statistici invalide")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    
+    # Test 6: Detectare handshake
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Detectare TCP handshake...")
+    
+    try:
+        handshakes = detect_tcp_handshakes(test_pcap)
+        if len(handshakes) >= 1:
+            print(f"  ✓ Detectate {len(handshakes)} handshake(uri)")
+            tests_passed += 1
+        else:
+            print("  ⚠ Niciun handshake detectat (poate fi OK)")
+            tests_passed += 1  # Nu penalizăm
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    
+    # Test 7: Toate analizoarele într-o singură trecere
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Analizoare într-o singură trecere...")
+    
+    try:
+        results = run_analyzers(test_pcap, [cls(test_pcap) for cls in ANALYZERS.values()])
+        separate = analyze_capture(test_pcap)
+        registered = set(ANALYZERS)
+        try:
+            @register_analyzer
+            class _Incomplete(PacketAnalyzer):
+                name = "incomplete"
+
+                def consume(self, pkt: PacketSummary) -> None:
+                    pass
+            rejected = False
+        except TypeError:
+            rejected = True
+        if (rejected and set(ANALYZERS) == registered and
+                set(results) == set(ANALYZERS) and
+                results['stats'].total_bytes == separate.total_bytes and
+                len(results['handshakes']) == len(detect_tcp_handshakes(test_pcap))):
+            print(f"  ✓ {len(results)} analizoare, rezultate identice cu rularea separată")
+            tests_passed += 1
+        else:
+            print("  ✗ Rezultate diferite față de rularea separată")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    
+    # Test 8: Mod columnar (NumPy) - aceleași statistici ca modul clasic
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Statistici columnare vectorizate...")
+    
+    if NUMPY_AVAILABLE:
         try:
-            stats = analyze_capture(test_pcap)
-            if stats.total_packets > 0 and stats.total_bytes > 0:
-                print(f"  ✓ Statistici calculate: {stats.total_packets} pkt, {stats.total_bytes} bytes")
+            classic = analyze_capture(test_pcap)
+            vectorized = analyze_capture(test_pcap, columnar=True)
+            if (vectorized.total_bytes == classic.total_bytes and
+                    vectorized.src_ips == classic.src_ips and
+                    vectorized.protocols == classic.protocols and
+                    vectorized.tcp_flags == classic.tcp_flags and
+                    vectorized.flows == classic.flows and
+                    describe_values(vectorized.packet_sizes)['p90'] ==
+                    describe_values(classic.packet_sizes)['p90']):
+                print(f"  ✓ {len(vectorized.flows)} fluxuri, rezultate identice")
                 tests_passed += 1
             else:
-                print("  ✗ Statistici invalide")
+                print("  ✗ Rezultate diferite față de modul clasic")
         except Exception as e:
             print(f"  ✗ Excepție: {e}")
     else:
-        print("  ⊘ Skip")
+        print("  ⊘ Skip (necesită NumPy)")
         tests_passed += 1
     
-    # Test 5: Detectare handshake
+    # Test 9: Analiză paralelă pe intervale = analiză secvențială
     tests_total += 1
-    print(f"\n[Test {tests_total}] Detectare TCP handshake...")
+    print(f"\n[Test {tests_total}] Analiză paralelă pe intervale...")
+    
+    with tempfile.NamedTemporaryFile(suffix='.pcapng', delete=False) as f:
+        multi_pcapng = f.name
+    
+    try:
+        frames = [(ts + 0.1 * rep, frame) for rep in range(50)
+                  for ts, frame in _sample_frames()]
+        merged_ok = True
+        for path, pcapng in ((test_pcap, False), (multi_pcapng, True)):
+            write_capture_native(path, frames, pcapng=pcapng)
+            chunks = plan_chunks(path, 4)
+            sequential = analyze_capture(path, backend='native')
+            merged = CaptureStatistics(file_path=path)
+            for chunk in chunks:
+                merged.merge(_analyze_chunk(path, chunk, columnar=False))
+            merged_ok &= (len(chunks) == 4 and
+                          merged.total_packets == sequential.total_packets and
+                          merged.flows == sequential.flows and
+                          merged.inter_arrival_times == sequential.inter_arrival_times)
+
+            # Procese reale, rezultate parțiale ca schițe: contoarele identice
+            parallel = analyze_capture_parallel(path, 4)
+            merged_ok &= (isinstance(parallel.packet_sizes, QuantileSketch) and
+                          len(parallel.packet_sizes) == len(sequential.packet_sizes) and
+                          len(parallel.inter_arrival_times) == len(sequential.inter_arrival_times) and
+                          all(getattr(parallel, name) == getattr(sequential, name)
+                              for name in ('total_packets', 'total_bytes', 'first_timestamp',
+                                           'last_timestamp', 'protocols', 'src_ips', 'dst_ips',
+                                           'src_ports', 'dst_ports', 'tcp_flags', 'flows')))
+            exact = analyze_capture_parallel(path, 4, exact=True)
+            merged_ok &= exact.packet_sizes == sequential.packet_sizes
+
+            # O limită falsă (în mijlocul unei înregistrări) nu trece neobservată
+            bad = CaptureChunk(chunks[0].start, chunks[1].start - 4,
+                               chunks[0].endian, chunks[0].interfaces)
+            try:
+                _analyze_chunk(path, bad, columnar=False)
+                merged_ok = False
+            except ChunkBoundaryError:
+                pass
+        if merged_ok:
+            print("  ✓ 4 intervale (pcap și pcapng), rezultat identic cu analiza secvențială")
+            tests_passed += 1
+        else:
+            print("  ✗ Rezultatul combinat diferă de analiza secvențială")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    finally:
+        os.unlink(multi_pcapng)
+    
+    # Test 10: Retransmisii pe baza numerelor de secvență
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Retransmisii / dup-ACK / out-of-order...")
     
-    if SCAPY_AVAILABLE and os.path.exists(test_pcap):
+    try:
+        c, srv = "10.0.0.1", "10.0.0.2"
+        t0 = 1704067200.0
+        frames = [
+            (t0, _build_tcp_frame(c, srv, 40000, 80, 0x02, 100)),                      # SYN
+            (t0 + 0.01, _build_tcp_frame(srv, c, 80, 40000, 0x12, 500, 101)),         # SYN-ACK
+            (t0 + 0.02, _build_tcp_frame(c, srv, 40000, 80, 0x10, 101, 501)),         # ACK
+            (t0 + 0.03, _build_tcp_frame(c, srv, 40000, 80, 0x18, 101, 501, b'a' * 100)),
+            (t0 + 0.04, _build_tcp_frame(c, srv, 40000, 80, 0x18, 301, 501, b'c' * 100)),  # gol 201-301
+            (t0 + 0.05, _build_tcp_frame(srv, c, 80, 40000, 0x10, 501, 201)),
+            (t0 + 0.06, _build_tcp_frame(srv, c, 80, 40000, 0x10, 501, 201)),         # dup ACK
+            (t0 + 0.065, _build_tcp_frame(srv, c, 80, 40000, 0x10, 501, 201,
+                                          window=32768)),                              # actualizare fereastră
+            (t0 + 0.07, _build_tcp_frame(c, srv, 40000, 80, 0x18, 201, 501, b'b' * 100)),  # out-of-order
+            (t0 + 0.30, _build_tcp_frame(c, srv, 40000, 80, 0x18, 101, 501, b'a' * 100)),  # retransmisie
+            (t0 + 0.31, _build_tcp_frame(c, srv, 40000, 80, 0x18, 401, 501, b'd' * 50)),
+        ]
+        write_capture_native(test_pcap, frames)
+        counts = retransmission_summary(test_pcap)['counts']
+        events = detect_retransmissions(test_pcap)
+        expected = {'retransmission': 1, 'dup_ack': 1, 'out_of_order': 1}
+        if counts == expected and [e['type'] for e in events] == [
+                'dup_ack', 'out_of_order', 'retransmission']:
+            print(f"  ✓ {dict(counts)}")
+            tests_passed += 1
+        else:
+            print(f"  ✗ Așteptat {expected}, obținut {dict(counts)}")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    
+    # Test 11: Schițe de cuantile - eroare relativă ≤ α, combinare exactă
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Schițe de cuantile (memorie constantă)...")
+    
+    try:
+        import random
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 2) for _ in range(20000)]
+        whole = QuantileSketch().extend(values)
+        halves = QuantileSketch().extend(values[:7000])
+        halves.merge(QuantileSketch().extend(values[7000:]))
+        exact = describe_values(values)
+        approx = describe_values(whole)
+        worst = max(abs(approx[k] - exact[k]) / exact[k]
+                    for k in ('median', 'p90', 'p99', 'p999'))
+        if (halves.buckets == whole.buckets and halves.count == whole.count and
+                len(whole.buckets) < 2048 and worst <= 0.02):
+            print(f"  ✓ {len(whole.buckets)} găleți pentru {whole.count} valori, "
+                  f"eroare maximă {worst:.2%}")
+            tests_passed += 1
+        else:
+            print(f"  ✗ Eroare relativă {worst:.2%} sau combinare inexactă")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    
+    # Test 12: Tabelă de fluxuri cu expirare și export pe parcurs
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Tabelă de fluxuri (expirare idle/active)...")
+    
+    with tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False) as f:
+        flows_out = f.name
+    
+    try:
+        t0 = 1704067200.0
+        frames = []
+        for i in range(200):  # 200 conexiuni scurte, una pe secundă
+            client = f"10.0.{i // 250}.{i % 250 + 1}"
+            for j in range(3):
+                frames.append((t0 + i + j * 0.01,
+                               _build_udp_frame(client, "10.0.9.9", 5000, 53, b'q' * 20)))
+        for k in range(40):  # un flux lung, câte un pachet la 5 s
+            frames.append((t0 + k * 5, _build_udp_frame("10.0.8.8", "10.0.9.9", 6000, 514, b'x')))
+        frames.sort(key=lambda item: item[0])
+        write_capture_native(test_pcap, frames)
+        
+        analyzer = FlowAnalyzer(test_pcap, output=flows_out, idle_timeout=10.0,
+                                active_timeout=60.0)
+        summary = run_analyzers(test_pcap, [analyzer])['flows']
+        with open(flows_out, encoding='utf-8') as fh:
+            rows = [json.loads(line) for line in fh]
+        reasons = Counter(row['end_reason'] for row in rows)
+        long_flow = [row for row in rows if row['dst_port'] == 514]
+        if (summary['records'] == len(rows) == 200 + len(long_flow) and
+                sum(row['packets'] for row in rows) == len(frames) and
+                summary['peak_active'] <= 12 and
+                len(long_flow) == 4 and reasons['active'] == 3):
+            print(f"  ✓ {len(rows)} înregistrări {dict(reasons)}, "
+                  f"maxim {summary['peak_active']} fluxuri active")
+            tests_passed += 1
+        else:
+            print(f"  ✗ {summary['records']} înregistrări {dict(reasons)}, "
+                  f"maxim {summary['peak_active']} active")
+    except Exception as e:
+        print(f"  ✗ Excepție: {e}")
+    finally:
+        os.unlink(flows_out)
+    
+    # Test 13: Cache pe disc - refolosire și invalidare la modificarea capturii
+    tests_total += 1
+    print(f"\n[Test {tests_total}] Cache pe disc pentru rezumatul columnar...")
+    
+    if NUMPY_AVAILABLE:
         try:
-            handshakes = detect_tcp_handshakes(test_pcap)
-            if len(handshakes) >= 1:
-                print(f"  ✓ Detectate {len(handshakes)} handshake(uri)")
+            with tempfile.TemporaryDirectory() as cache_dir:
+                write_capture_native(test_pcap, _sample_frames())
+                first = analyze_capture(test_pcap, cache=True, cache_dir=cache_dir)
+                cached = load_stats_cache(test_pcap, cache_dir)
+                write_capture_native(test_pcap, _sample_frames()[:4])
+                stale = load_stats_cache(test_pcap, cache_dir)
+                fresh = analyze_capture(test_pcap, cache=True, cache_dir=cache_dir)
+                # Director de cache imposibil (sub un fișier): doar avertisment
+                blocker = os.path.join(cache_dir, 'not-a-dir')
+                open(blocker, 'w').close()
+                with contextlib.redirect_stderr(io.StringIO()):
+                    unsaved = analyze_capture(test_pcap, cache=True,
+                                              cache_dir=os.path.join(blocker, 'cache'))
+            classic = analyze_capture(test_pcap)
+            if (cached is not None and cached.flows == first.flows and
+                    unsaved.total_packets == 4 and
+                    cached.src_ips == first.src_ips and
+                    list(cached.packet_sizes) == list(first.packet_sizes) and
+                    stale is None and fresh.total_packets == classic.total_packets == 4 and
+                    fresh.flows == classic.flows):
+                print("  ✓ Rezultat refolosit, invalidat după modificarea fișierului")
                 tests_passed += 1
             else:
-                print("  ⚠ Niciun handshake detectat (poate fi OK)")
-                tests_passed += 1  # Nu penalizăm
+                print("  ✗ Cache-ul nu a fost refolosit sau invalidat corect")
         except Exception as e:
             print(f"  ✗ Excepție: {e}")
     else:
-        print("  ⊘ Skip")
+        print("  ⊘ Skip (necesită NumPy)")
         tests_passed += 1
     
     # Cleanup
-    if SCAPY_AVAILABLE and os.path.exists(test_pcap):
+    if os.path.exists(test_pcap):
         os.unlink(test_pcap)
     
     # Sumar
@@ -921,8 +3301,16 @@ def main():
 Exemple de utilizare:
   %(prog)s capture.pcap                    # Analiză standard
   %(prog)s capture.pcap --handshakes       # Detectare TCP handshakes
-  %(prog)s capture.pcap --retrans          # Detectare retransmisii
+  %(prog)s capture.pcap --retrans          # Retransmisii, dup-ACK, out-of-order
   %(prog)s capture.pcap --export stats.csv # Export CSV
+  %(prog)s capture.pcap --backend scapy   # Forțare backend de parsare
+  %(prog)s capture.pcap --benchmark        # Comparare viteză backend-uri
+  %(prog)s capture.pcap --columnar         # Mod columnar NumPy (capturi mari)
+  %(prog)s capture.pcap --workers 8        # Analiză paralelă pe 8 procese
+  %(prog)s capture.pcap --workers 8 --exact  # ... cu percentile exacte
+  %(prog)s capture.pcap --sketch           # Percentile în memorie constantă
+  %(prog)s capture.pcap --flows-out f.jsonl # Export fluxuri expirate (CSV/JSONL)
+  %(prog)s capture.pcap --cache            # Refolosește analiza salvată pe disc
   %(prog)s --generate test.pcap            # Generare PCAP de test
   %(prog)s --test                          # Rulare auto-teste
         """
@@ -934,14 +3322,44 @@ Exemple de utilizare:
     parser.add_argument('--handshakes', action='store_true',
                         help='Detectează TCP handshakes')
     parser.add_argument('--retrans', action='store_true',
-                        help='Detectează potențiale retransmisii')
+                        help='Detectează retransmisii, ACK-uri duplicate și out-of-order')
     parser.add_argument('--export', metavar='CSV',
                         help='Exportă statistici în CSV')
+    parser.add_argument('--backend', choices=sorted(PCAP_BACKENDS),
+                        help='Backend de parsare (implicit: native)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Compară viteza backend-urilor disponibile')
+    parser.add_argument('--columnar', action='store_true',
+                        help='Statistici vectorizate pe coloane NumPy (capturi mari)')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Analizează statisticile în N procese paralele')
+    parser.add_argument('--sketch', action='store_true',
+                        help='Percentile aproximative (±1%%) în memorie constantă')
+    parser.add_argument('--exact', action='store_true',
+                        help='Cu --workers: procesele întorc toate valorile (percentile '
+                             'exacte, memorie proporțională cu numărul de pachete)')
+    parser.add_argument('--flows-out', metavar='FILE',
+                        help='Exportă fluxurile pe măsură ce expiră (.jsonl sau CSV)')
+    parser.add_argument('--idle-timeout', type=float, default=15.0, metavar='SEC',
+                        help='Expirare flux inactiv (implicit: 15 s)')
+    parser.add_argument('--active-timeout', type=float, default=1800.0, metavar='SEC',
+                        help='Raportare periodică a fluxurilor lungi (implicit: 1800 s)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Salvează/refolosește rezumatul columnar pe disc (implică --columnar)')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help=f'Directorul cache-ului (implicit: {default_cache_dir()})')
     parser.add_argument('--test', action='store_true',
                         help='Rulează auto-teste')
     
     args = parser.parse_args()
     
+    # Modurile columnar/paralel/cache decodează mereu cu parserul nativ
+    if args.backend not in (None, 'native') and (args.columnar or args.workers > 1 or args.cache):
+        parser.error('--backend nu se poate combina cu --columnar, --workers sau --cache '
+                     '(aceste moduri folosesc doar backend-ul nativ)')
+    if args.exact and (args.workers <= 1 or args.sketch):
+        parser.error('--exact are sens doar cu --workers > 1 și fără --sketch')
+    
     # Auto-test
     if args.test:
         success = run_tests()
@@ -962,17 +3380,69 @@ Exemple de utilizare:
         print(f"EROARE: Fișierul nu există: {pcap_path}")
         sys.exit(1)
     
-    # Statistici principale
+    # Benchmark backend-uri
+    if args.benchmark:
+        print_benchmark_report(pcap_path, benchmark_backends(pcap_path))
+        sys.exit(0)
+    
+    # O singură trecere prin captură pentru toate analizele cerute
+    # (în modul columnar/paralel/cache, statisticile nu vin din analizor)
+    separate_stats = args.columnar or args.workers > 1 or args.cache
+    analyzer_names = [] if separate_stats else ['stats']
+    if args.handshakes:
+        analyzer_names.append('handshakes')
+    if args.retrans:
+        analyzer_names.append('retrans')
+    if args.flows_out:
+        analyzer_names.append('flows')
+    
     print(f"\nAnalizez: {pcap_path}...")
-    stats = analyze_capture(pcap_path)
+    if args.cache:
+        stats = analyze_capture(pcap_path, sketch=args.sketch, cache=True,
+                                cache_dir=args.cache_dir)
+    elif args.workers > 1:
+        stats = analyze_capture_parallel(pcap_path, args.workers, columnar=args.columnar,
+                                         exact=args.exact)
+    elif args.columnar:
+        stats = analyze_capture(pcap_path, columnar=True, sketch=args.sketch)
+    options = {
+        'stats': {'sketch': args.sketch, 'track_flows': not args.flows_out},
+        'flows': {'output': args.flows_out, 'idle_timeout': args.idle_timeout,
+                  'active_timeout': args.active_timeout},
+    }
+    results = {}
+    if analyzer_names:
+        results = run_analyzers(
+            pcap_path,
+            [ANALYZERS[name](pcap_path, **options.get(name, {})) for name in analyzer_names],
+            backend=args.backend
+        )
+    if not separate_stats:
+        stats = results['stats']
     print_statistics_report(stats)
     
+    # Fluxuri expirate și exportate în timpul analizei
+    if args.flows_out:
+        flows = results['flows']
+        print(f"\n{'=' * 70}")
+        print("FLUXURI EXPORTATE (expirare idle/active)")
+        print("=" * 70)
+        print(f"\n  Înregistrări:          {flows['records']:,} → {flows['output']}")
+        print(f"  Maxim fluxuri active:  {flows['peak_active']:,}")
+        if flows['top']:
+            print(f"\n  Top {len(flows['top'])} înregistrări (după octeți):")
+            for rec in flows['top']:
+                print(f"    {rec.src_ip}:{rec.src_port} → {rec.dst_ip}:{rec.dst_port} "
+                      f"({rec.protocol}, {rec.end_reason})")
+                print(f"      {rec.packets} pachete, {rec.bytes:,} octeți, "
+                      f"{rec.duration:.3f} s")
+    
     # Detectare handshakes
     if args.handshakes:
         print(f"\n{'=' * 70}")
         print("DETECTARE TCP HANDSHAKES")
         print("=" * 70)
-        handshakes = detect_tcp_handshakes(pcap_path)
+        handshakes = results['handshakes']
         if handshakes:
             for i, hs in enumerate(handshakes, 1):
                 print(f"\n  Handshake #{i}:")
@@ -985,17 +3455,21 @@ Exemple de utilizare:
     # Detectare retransmisii
     if args.retrans:
         print(f"\n{'=' * 70}")
-        print("DETECTARE POTENȚIALE RETRANSMISII")
+        print("DETECTARE RETRANSMISII / ACK DUPLICAT / OUT-OF-ORDER")
         print("=" * 70)
-        retrans = detect_retransmissions(pcap_path)
-        if retrans:
-            for rt in retrans[:20]:  # Limitare la primele 20
-                print(f"\n  {rt['src']} → {rt['dst']}")
+        counts = Counter(results['retrans']['counts'])
+        total = sum(counts.values())
+        if total:
+            print(f"\n  Retransmisii:   {counts['retransmission']:>8,}")
+            print(f"  ACK duplicate:  {counts['dup_ack']:>8,}")
+            print(f"  Out-of-order:   {counts['out_of_order']:>8,}")
+            for rt in results['retrans']['events'][:20]:  # Limitare la primele 20
+                print(f"\n  [{rt['type']}] {rt['src']} → {rt['dst']} (seq {rt['seq']})")
                 print(f"    Delta: {rt['delta']*1000:.3f} ms, Size: {rt['size']} bytes")
-            if len(retrans) > 20:
-                print(f"\n  ... și încă {len(retrans) - 20} altele")
+            if total > 20:
+                print(f"\n  ... și încă {total - 20} altele")
         else:
-            print("\n  Nicio retransmisie potențială detectată.")
+            print("\n  Nicio retransmisie detectată.")
     
     # Export CSV
     if args.export:
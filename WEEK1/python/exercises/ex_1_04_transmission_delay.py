@@ -17,11 +17,24 @@ Formule fundamentale:
 - Delay transmisie = Dimensiune_pachet / Bandwidth
 - Delay propagare = Distanță / Viteză_propagare
 - Delay total ≈ D_transmisie + D_propagare + D_procesare + D_coadă
+
+Dependențe opționale (pentru baleierea vectorizată, --sweep):
+    pip install numpy --break-system-packages
 """
 
 from dataclasses import dataclass
 from enum import Enum
 import sys
+import time
+
+# NumPy este necesar doar pentru variantele vectorizate (sweep)
+NUMPY_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass
 
 
 class MediaType(Enum):
@@ -341,6 +354,247 @@ Este crucial pentru dimensionarea buffer-elor TCP (window size).
     print("  • Satelitul GEO are probleme serioase cu TCP standard")
 
 
+# =============================================================================
+# CALCUL VECTORIZAT (baleiere pe grile de parametri)
+# =============================================================================
+
+def _require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy nu este instalat. Rulați: pip install numpy")
+
+
+def _propagation_speeds(media) -> "np.ndarray":
+    """MediaType, viteză în m/s sau o secvență de acestea → array de viteze."""
+    if isinstance(media, (MediaType, int, float)):
+        media = [media]
+    return np.array([m.value if isinstance(m, MediaType) else m for m in media],
+                    dtype=np.float64)
+
+
+def calculate_transmission_delay_array(packet_sizes_bytes, link_speeds_bps) -> "np.ndarray":
+    """
+    Varianta vectorizată a calculate_transmission_delay.
+
+    Argumentele sunt scalari sau array-uri compatibile prin broadcasting
+    (ex. coloană × linie pentru un tabel).
+
+    Returns:
+        Delay de transmisie în milisecunde, ca numpy.ndarray
+    """
+    _require_numpy()
+    sizes = np.asarray(packet_sizes_bytes, dtype=np.float64)
+    speeds = np.asarray(link_speeds_bps, dtype=np.float64)
+    return sizes * 8 / speeds * 1000
+
+
+def calculate_propagation_delay_array(distances_km, media=MediaType.FIBER) -> "np.ndarray":
+    """
+    Varianta vectorizată a calculate_propagation_delay.
+
+    Args:
+        distances_km: Distanțe (scalar sau array)
+        media: Un mediu (MediaType sau m/s) pentru toate distanțele, sau un
+            array de viteze în m/s compatibil prin broadcasting
+
+    Returns:
+        Delay de propagare în milisecunde, ca numpy.ndarray
+    """
+    _require_numpy()
+    if isinstance(media, MediaType):
+        media = media.value
+    distances = np.asarray(distances_km, dtype=np.float64)
+    return distances * 1000 / np.asarray(media, dtype=np.float64) * 1000
+
+
+def calculate_file_transfer_time_array(
+    file_sizes_mb,
+    link_speeds_bps,
+    distances_km=0,
+    overhead_percent=5.0
+) -> dict:
+    """
+    Varianta vectorizată a calculate_file_transfer_time.
+
+    Spre deosebire de varianta scalară, viteza se dă în biți/secundă
+    (nu ca LinkSpeed), ca să poată fi orice valoare de pe grilă.
+
+    Returns:
+        Dict cu array-uri: transfer_time_seconds, effective_throughput_mbps
+    """
+    _require_numpy()
+    file_bits = np.asarray(file_sizes_mb, dtype=np.float64) * 1024 * 1024 * 8
+    effective_speed = np.asarray(link_speeds_bps, dtype=np.float64) * (
+        1 - np.asarray(overhead_percent, dtype=np.float64) / 100)
+    prop_delay_sec = np.asarray(distances_km, dtype=np.float64) * 1000 / MediaType.FIBER.value
+    total_time = file_bits / effective_speed + prop_delay_sec
+    return {
+        "transfer_time_seconds": total_time,
+        "effective_throughput_mbps": file_bits / total_time / 1e6,
+    }
+
+
+@dataclass
+class SweepResult:
+    """
+    Rezultatul unei baleieri: toate combinațiile de parametri.
+
+    Axele array-urilor 4D sunt (pachet, viteză, distanță, mediu), în
+    ordinea din packet_sizes_bytes, link_speeds_bps, distances_km, media.
+    Mărimile care nu depind de dimensiunea pachetului (RTT, BDP) sunt 3D:
+    (viteză, distanță, mediu); componentele de delay păstrează axele de
+    lungime 1 pe care nu variază (se combină prin broadcasting).
+    """
+    packet_sizes_bytes: "np.ndarray"
+    link_speeds_bps: "np.ndarray"
+    distances_km: "np.ndarray"
+    media_speeds_mps: "np.ndarray"
+    window_bytes: float
+
+    transmission_delay_ms: "np.ndarray"    # (pachet, viteză, 1, 1) - nu depinde de distanță
+    propagation_delay_ms: "np.ndarray"     # (1, distanță, mediu) - nu depinde de viteză
+    total_delay_ms: "np.ndarray"           # 4D
+    rtt_ms: "np.ndarray"                   # 3D - 2 × propagare
+    bdp_bytes: "np.ndarray"                # 3D - viteză × RTT
+    throughput_mbps: "np.ndarray"          # 4D - min(viteză, fereastră / (RTT + transmisie))
+
+    @property
+    def combinations(self) -> int:
+        return self.total_delay_ms.size
+
+
+def sweep_link_budget(
+    packet_sizes_bytes,
+    link_speeds_bps,
+    distances_km,
+    media=(MediaType.FIBER,),
+    window_bytes: float = 65535
+) -> SweepResult:
+    """
+    Calculează delay-urile, BDP și throughput-ul pentru toate combinațiile
+    de parametri, într-un singur apel vectorizat.
+
+    Fiecare listă de parametri devine o axă; array-urile sunt remodelate
+    astfel încât broadcasting-ul NumPy să producă grila completă fără
+    bucle Python (câteva milioane de combinații în câteva zeci de ms).
+
+    Throughput-ul este cel al unui transfer limitat de fereastră (TCP fără
+    pierderi): într-un RTT se pot trimite cel mult window_bytes, deci
+    throughput = min(R, W / (RTT + L/R)).
+
+    Args:
+        packet_sizes_bytes: Dimensiuni de pachet (bytes)
+        link_speeds_bps: Viteze de legătură (biți/secundă sau LinkSpeed)
+        distances_km: Distanțe (km)
+        media: Medii (MediaType sau viteze de propagare în m/s)
+        window_bytes: Fereastra de transmisie (implicit 64 KB, fără window scaling)
+
+    Returns:
+        SweepResult cu array-uri de forma (pachet, viteză, distanță, mediu)
+    """
+    _require_numpy()
+    if isinstance(link_speeds_bps, (LinkSpeed, int, float)):
+        link_speeds_bps = [link_speeds_bps]
+    sizes = np.atleast_1d(np.asarray(packet_sizes_bytes, dtype=np.float64))
+    speeds = np.array([v.value if isinstance(v, LinkSpeed) else v for v in link_speeds_bps],
+                      dtype=np.float64)
+    distances = np.atleast_1d(np.asarray(distances_km, dtype=np.float64))
+    media_speeds = _propagation_speeds(media)
+
+    # Axe: pachet (P,1,1,1), viteză (1,S,1,1), distanță (1,1,D,1), mediu (1,1,1,M)
+    size_axis = sizes[:, None, None, None]
+    speed_axis = speeds[None, :, None, None]
+    trans_ms = calculate_transmission_delay_array(size_axis, speed_axis)
+    prop_ms = calculate_propagation_delay_array(distances[None, :, None],
+                                                media_speeds[None, None, :])
+    rtt_ms = 2 * prop_ms
+    speeds_3d = speeds[:, None, None]
+    bdp_bytes = speeds_3d * rtt_ms / 1000 / 8
+
+    cycle_sec = (rtt_ms[None] + trans_ms) / 1000
+    throughput_bps = np.minimum(speed_axis, window_bytes * 8 / cycle_sec)
+
+    return SweepResult(
+        packet_sizes_bytes=sizes,
+        link_speeds_bps=speeds,
+        distances_km=distances,
+        media_speeds_mps=media_speeds,
+        window_bytes=window_bytes,
+        transmission_delay_ms=trans_ms,
+        propagation_delay_ms=prop_ms,
+        total_delay_ms=trans_ms + prop_ms[None],
+        rtt_ms=np.broadcast_to(rtt_ms, (len(speeds),) + rtt_ms.shape[1:]),
+        bdp_bytes=bdp_bytes,
+        throughput_mbps=throughput_bps / 1e6,
+    )
+
+
+def format_bytes(value: float) -> str:
+    """Formatează o dimensiune în bytes / KB / MB."""
+    if value < 1024:
+        return f"{value:.0f} B"
+    elif value < 1024 * 1024:
+        return f"{value / 1024:.1f} KB"
+    return f"{value / (1024 * 1024):.2f} MB"
+
+
+def print_sweep_tables(result: SweepResult, packet_index: int = -1, media_index: int = 0):
+    """
+    Afișează tabelele viteză × distanță pentru BDP și throughput, pentru
+    o dimensiune de pachet și un mediu din grilă.
+    """
+    packet = result.packet_sizes_bytes[packet_index]
+    header = f"{'Viteză':>12} |" + "".join(f"{d:>11g} km" for d in result.distances_km)
+
+    print(f"\nBDP (viteză × RTT), mediu {result.media_speeds_mps[media_index]:.0e} m/s")
+    print(header)
+    print("-" * len(header))
+    for i, speed in enumerate(result.link_speeds_bps):
+        row = result.bdp_bytes[i, :, media_index]
+        print(f"{speed / 1e6:>7g} Mbps |" + "".join(f"{format_bytes(v):>14}" for v in row))
+
+    print(f"\nThroughput (Mbps) cu fereastră {format_bytes(result.window_bytes)}, "
+          f"pachet {packet:.0f} B")
+    print(header)
+    print("-" * len(header))
+    for i, speed in enumerate(result.link_speeds_bps):
+        row = result.throughput_mbps[packet_index, i, :, media_index]
+        print(f"{speed / 1e6:>7g} Mbps |" + "".join(f"{v:>14.2f}" for v in row))
+
+
+def demo_sweep():
+    """Demonstrație: baleiere what-if pe o grilă mare de parametri."""
+
+    print("\n" + "="*70)
+    print(" DEMONSTRAȚIE: Baleiere vectorizată (capacity planning) ".center(70))
+    print("="*70)
+
+    if not NUMPY_AVAILABLE:
+        print("\n[INFO] Necesită NumPy: pip install numpy --break-system-packages")
+        return
+
+    # Grilă mare: cât durează calculul complet?
+    start = time.perf_counter()
+    big = sweep_link_budget(
+        np.linspace(64, 9000, 200),
+        np.geomspace(1e6, 100e9, 100),
+        np.geomspace(0.01, 20000, 100),
+        media=list(MediaType),
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\n{big.combinations:,} combinații calculate în {elapsed * 1000:.1f} ms")
+
+    # Tabel lizibil pe o grilă mică
+    table = sweep_link_budget(
+        [1500],
+        [LinkSpeed.FAST_ETHERNET, LinkSpeed.GIGABIT, LinkSpeed.TEN_GIGABIT],
+        [1, 100, 1000, 8000],
+    )
+    print_sweep_tables(table)
+    print("\nObservații:")
+    print("  • Cu fereastră fixă de 64 KB, throughput-ul scade cu distanța")
+    print("  • Când BDP > fereastră, viteza legăturii nu mai contează")
+
+
 # =============================================================================
 # INTERFAȚĂ INTERACTIVĂ
 # =============================================================================
@@ -394,7 +648,7 @@ def run_self_test() -> bool:
     print("="*60 + "\n")
     
     tests_passed = 0
-    tests_total = 4
+    tests_total = 5
     
     # Test 1: Delay transmisie
     print("[TEST 1] Delay transmisie (1500B, 1Gbps)...", end=" ")
@@ -437,6 +691,27 @@ def run_self_test() -> bool:
     else:
         print("✗ FAIL")
     
+    # Test 5: Baleiere vectorizată = calcul scalar, punct cu punct
+    print("[TEST 5] Baleiere vectorizată...", end=" ")
+    if NUMPY_AVAILABLE:
+        sweep = sweep_link_budget([64, 1500], [LinkSpeed.GIGABIT, 10e6], [0.1, 1000],
+                                  media=[MediaType.FIBER, MediaType.WIRELESS])
+        point = calculate_total_transmission(1500, 10e6, 1000, MediaType.WIRELESS)
+        transfer = calculate_file_transfer_time_array([100], LinkSpeed.GIGABIT.value, 0, 0)
+        if (sweep.total_delay_ms.shape == (2, 2, 2, 2) and
+                abs(sweep.total_delay_ms[1, 1, 1, 1] - point.total_delay_ms) < 1e-9 and
+                abs(sweep.bdp_bytes[0, 1, 0] - 1e9 * 0.010 / 8) < 1e-6 and
+                abs(transfer["transfer_time_seconds"][0] -
+                    calculate_file_transfer_time(100, LinkSpeed.GIGABIT,
+                                                 overhead_percent=0)["transfer_time_seconds"]) < 1e-9):
+            print("✓ PASS")
+            tests_passed += 1
+        else:
+            print("✗ FAIL")
+    else:
+        print("⊘ SKIP (necesită NumPy)")
+        tests_passed += 1
+    
     print(f"\nRezultat: {tests_passed}/{tests_total} teste trecute")
     return tests_passed == tests_total
 
@@ -456,6 +731,8 @@ if __name__ == "__main__":
             demo_transmission_delays()
             demo_file_transfers()
             demo_bandwidth_delay_product()
+        elif sys.argv[1] == "--sweep":
+            demo_sweep()
         else:
             print(f"Opțiune necunoscută: {sys.argv[1]}")
     else:
@@ -466,12 +743,15 @@ Exercițiul 1.04: Calculator Delay Transmisie
 Utilizare:
     python ex_1_04_transmission_delay.py --demo         # Demonstrații
     python ex_1_04_transmission_delay.py --interactive  # Calculator interactiv
+    python ex_1_04_transmission_delay.py --sweep        # Baleiere vectorizată (NumPy)
     python ex_1_04_transmission_delay.py --test         # Auto-teste
 
 Exemple programatice:
     >>> from ex_1_04_transmission_delay import *
     >>> result = calculate_total_transmission(1500, 1e9, 100)
     >>> print(result)
+    >>> grid = sweep_link_budget([64, 1500], [1e8, 1e9], [1, 100, 1000])
+    >>> grid.bdp_bytes.shape
 """)
         # Rulăm demo implicit
         demo_transmission_delays()
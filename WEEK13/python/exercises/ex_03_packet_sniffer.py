@@ -34,6 +34,7 @@ import json
 import sys
 import signal
 import os
+import math
 from datetime import datetime
 from collections import defaultdict
 from typing import Optional, Dict, List, Any, Callable
@@ -102,6 +103,81 @@ class Culori:
 if not sys.stdout.isatty():
     Culori.disable()
 
+# ============================================================================
+# PERCENTILE ÎN TIMP REAL
+# ============================================================================
+
+class SchitaCuantile:
+    """
+    Schiță de cuantile în memorie constantă (stil DDSketch).
+
+    Fiecare valoare pozitivă incrementează găleata ceil(log_γ(x)), cu
+    γ = (1 + α) / (1 - α); percentilele estimate au eroare relativă ≤ α.
+    Numărul de găleți depinde doar de plaja valorilor, nu de câte pachete
+    trec prin sniffer, iar două schițe se combină adunând gălețile.
+    """
+
+    def __init__(self, precizie: float = 0.01):
+        self.precizie = precizie
+        self._gamma = (1 + precizie) / (1 - precizie)
+        self._log_gamma = math.log(self._gamma)
+        self.galeti: Dict[int, int] = defaultdict(int)
+        self.zero = 0
+        self.count = 0
+        self.suma = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def adauga(self, valoare: float):
+        self.count += 1
+        self.suma += valoare
+        self.min = min(self.min, valoare)
+        self.max = max(self.max, valoare)
+        if valoare <= 1e-9:
+            self.zero += 1
+        else:
+            self.galeti[math.ceil(math.log(valoare) / self._log_gamma)] += 1
+
+    def combina(self, alta: "SchitaCuantile"):
+        for cheie, n in alta.galeti.items():
+            self.galeti[cheie] += n
+        self.zero += alta.zero
+        self.count += alta.count
+        self.suma += alta.suma
+        self.min = min(self.min, alta.min)
+        self.max = max(self.max, alta.max)
+
+    def cuantila(self, q: float) -> float:
+        """Valoarea aproximativă sub care se află fracțiunea q din observații."""
+        if self.count == 0:
+            return 0.0
+        rang = q * (self.count - 1)
+        vazute = self.zero
+        if rang < vazute:
+            return max(self.min, 0.0)
+        for cheie in sorted(self.galeti):
+            vazute += self.galeti[cheie]
+            if rang < vazute:
+                valoare = 2 * self._gamma ** cheie / (self._gamma + 1)
+                return min(max(valoare, self.min), self.max)
+        return self.max
+
+    def rezumat(self) -> Dict[str, float]:
+        """Numărul de observații, media și p50/p90/p99/p999."""
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "medie": self.suma / self.count,
+            "p50": self.cuantila(0.5),
+            "p90": self.cuantila(0.9),
+            "p99": self.cuantila(0.99),
+            "p999": self.cuantila(0.999),
+        }
+
+
 # ============================================================================
 # CLASA PRINCIPALĂ - PACKET SNIFFER
 # ============================================================================
@@ -163,7 +239,11 @@ class PacketSniffer:
             "mqtt_mesaje": [],
             "alerte_securitate": [],
             "conexiuni": defaultdict(lambda: {"pachete": 0, "bytes": 0}),
+            # Distribuții în memorie constantă (percentile actualizate live)
+            "dimensiuni": SchitaCuantile(),
+            "inter_arrival": SchitaCuantile(),
         }
+        self._ultimul_timestamp: Optional[float] = None
         
         # Flag pentru oprire gracioasă
         self._running = False
@@ -584,6 +664,13 @@ class PacketSniffer:
         self.statistici["total_pachete"] += 1
         self.statistici["total_bytes"] += info["lungime"]
         self.statistici["protocoale"][info["protocol"]] += 1
+        self.statistici["dimensiuni"].adauga(info["lungime"])
+        
+        # Inter-arrival time din timestamp-ul de captură al pachetului
+        ts = float(getattr(pachet, "time", 0.0))
+        if self._ultimul_timestamp is not None and ts >= self._ultimul_timestamp:
+            self.statistici["inter_arrival"].adauga(ts - self._ultimul_timestamp)
+        self._ultimul_timestamp = ts
         
         if "ip" in info["sursa"]:
             self.statistici["ip_sursa"][info["sursa"]["ip"]] += 1
@@ -746,6 +833,19 @@ class PacketSniffer:
         print(f"  Total bytes:    {stats['total_bytes']:,}")
         print(f"  Durată:         {stats['start_time']} - {stats['end_time']}")
         
+        # Percentile (aproximative, ±1%)
+        dim = stats["dimensiuni"].rezumat()
+        if dim["count"]:
+            print(f"\n{Culori.BOLD}Dimensiune pachete (octeți):{Culori.RESET}")
+            print(f"  p50 / p90 / p99 / p99.9:  {dim['p50']:.0f} / {dim['p90']:.0f} / "
+                  f"{dim['p99']:.0f} / {dim['p999']:.0f}")
+        iat = stats["inter_arrival"].rezumat()
+        if iat["count"]:
+            print(f"\n{Culori.BOLD}Inter-arrival time (ms):{Culori.RESET}")
+            print(f"  p50 / p90 / p99 / p99.9:  {iat['p50'] * 1000:.3f} / "
+                  f"{iat['p90'] * 1000:.3f} / {iat['p99'] * 1000:.3f} / "
+                  f"{iat['p999'] * 1000:.3f}")
+        
         # Protocoale
         if stats["protocoale"]:
             print(f"\n{Culori.BOLD}Protocoale:{Culori.RESET}")
@@ -799,6 +899,8 @@ class PacketSniffer:
                     "total_packets": self.statistici["total_pachete"],
                     "total_bytes": self.statistici["total_bytes"],
                 },
+                "packet_size": self.statistici["dimensiuni"].rezumat(),
+                "inter_arrival_s": self.statistici["inter_arrival"].rezumat(),
                 "protocols": dict(self.statistici["protocoale"]),
                 "top_src_ips": dict(sorted(
                     self.statistici["ip_sursa"].items(),
@@ -10,29 +10,60 @@
  2. Diferența: server iterativ vs. server concurent (threading)
  3. Corelarea handshake TCP (SYN-SYN/ACK-ACK) cu codul
  4. Observarea încapsulării: date → segment TCP → pachet IP
+ 5. Server event-loop (selectors/epoll, asyncio): mii de conexiuni
+    într-un singur thread, fără thread per socket
+ 6. Scalare pe mai multe nuclee: N procese pe același port (SO_REUSEPORT)
 
  PROTOCOL APLICAȚIE:
  ──────────────────
  Request:  <mesaj text> (bytes)
  Response: b"OK: " + upper(mesaj)
+ Implicit o cerere per conexiune: serverul răspunde și închide.
+ Cu --keepalive conexiunea e persistentă: clientul poate trimite mai
+ multe cereri pe același socket, iar serverul închide la EOF (FIN).
+ Testele loadgen (conexiuni persistente) cer un server cu --keepalive.
 
  UTILIZARE:
    Server:  python3 ex_2_01_tcp.py server --port 9999
+            python3 ex_2_01_tcp.py server --port 9999 --keepalive --quiet
+            python3 ex_2_01_tcp.py server --port 9999 --mode selectors --quiet
+            python3 ex_2_01_tcp.py server --port 9999 --mode selectors --processes 4
    Client:  python3 ex_2_01_tcp.py client --host 127.0.0.1 --port 9999 -m "test"
    Load:    python3 ex_2_01_tcp.py load --host 127.0.0.1 --port 9999 --clients 10
+            python3 ex_2_01_tcp.py load --host 127.0.0.1 --port 9999 \
+                --clients 2000 --idle 10000 --stagger-ms 0
+   Bench:   python3 ex_2_01_tcp.py bench --clients 2000 --idle 10000
+   Open-loop: python3 ex_2_01_tcp.py loadgen --host 127.0.0.1 --port 9999 \
+                --rate 5000 --duration 10 --connections 32 --json tcp.json
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
 from __future__ import annotations
 import argparse
+import asyncio
+import os
+import selectors
 import socket
+import statistics
+import subprocess
 import sys
 import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Optional, List
 
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+# Adăugăm directorul utils la path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+from loadgen import LoadReport, TcpTarget, run_open_loop
+from prefork import SharedCounters, run_prefork
+
 # =============================================================================
 # CONSTANTE
 # =============================================================================
@@ -41,6 +72,7 @@ DEFAULT_BIND = "0.0.0.0"
 DEFAULT_BACKLOG = 32
 DEFAULT_RECV_BUF = 1024
 DEFAULT_TIMEOUT = 5.0
+SERVER_MODES = ("threaded", "iterative", "selectors", "asyncio")
 
 
 def timestamp() -> str:
@@ -51,6 +83,22 @@ def log(tag: str, msg: str) -> None:
     print(f"[{timestamp()}][{tag}] {msg}", flush=True)
 
 
+def raise_nofile_limit() -> int:
+    """
+    Ridică limita de descriptori deschiși (ulimit -n) până la maximul permis.
+    
+    10k conexiuni înseamnă 10k file descriptori, iar limita implicită
+    (de obicei 1024) ar opri accept()/connect() cu EMFILE.
+    """
+    if not RESOURCE_AVAILABLE:
+        return 0
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    return soft
+
+
 @dataclass
 class ServerConfig:
     bind: str = DEFAULT_BIND
@@ -58,34 +106,64 @@ class ServerConfig:
     backlog: int = DEFAULT_BACKLOG
     recv_buf: int = DEFAULT_RECV_BUF
     mode: str = "threaded"
+    quiet: bool = False             # fără log per conexiune (teste de încărcare)
+    processes: int = 1              # >1: supervisor + N workeri pe același port
+    reuse_port: bool = False        # SO_REUSEPORT (setat automat pentru workeri)
+    stats_interval: float = 5.0     # secunde între rapoartele supervisorului
+    keepalive: bool = False         # mai multe cereri per conexiune, până la EOF
+
+
+# =============================================================================
+# CONTOARE (partajate între procese, vezi utils/prefork.py)
+# =============================================================================
+COUNTER_FIELDS = ("connections", "requests", "bytes_in")
+CONNECTIONS, REQUESTS, BYTES_IN = range(len(COUNTER_FIELDS))
 
 
 # =============================================================================
 # HANDLER CLIENT
 # =============================================================================
-def handle_client(conn: socket.socket, addr: tuple[str, int], recv_buf: int) -> None:
+def process_request(data: bytes) -> bytes:
+    """Protocolul aplicației, comun tuturor modurilor de server."""
+    # Strip \r\n pentru că netcat și alți clienți le adaugă
+    return b"OK: " + data.rstrip(b"\r\n").upper()
+
+
+def handle_client(conn: socket.socket, addr: tuple[str, int], recv_buf: int,
+                  quiet: bool = False, counters: Optional[SharedCounters] = None,
+                  keepalive: bool = False) -> None:
     """
     Procesează conexiunea TCP de la client.
     
     Notă: recv_buf de 1024 e suficient pentru demo, dar în producție
     ai vrea să gestionezi mesaje mai mari cu un loop. Pentru curs, keep it simple.
+    Cu keepalive, cererile se servesc pe aceeași conexiune până când
+    clientul o închide; altfel conexiunea se închide după primul răspuns.
     """
     client_ip, client_port = addr
     thread_name = threading.current_thread().name
     
     try:
-        data = conn.recv(recv_buf)
-        if not data:
-            log(thread_name, f"{client_ip}:{client_port} deconectat")
-            return
-        
-        # Strip \r\n pentru că netcat și alți clienți le adaugă
-        data_clean = data.rstrip(b"\r\n")
-        response = b"OK: " + data_clean.upper()
-        
-        log(thread_name, f"RX {len(data):4d}B de la {client_ip}:{client_port}: {data_clean!r}")
-        conn.sendall(response)
-        log(thread_name, f"TX {len(response):4d}B către {client_ip}:{client_port}: {response!r}")
+        while True:
+            data = conn.recv(recv_buf)
+            if not data:
+                if not quiet:
+                    log(thread_name, f"{client_ip}:{client_port} deconectat")
+                return
+            
+            data_clean = data.rstrip(b"\r\n")
+            response = process_request(data)
+            if counters:
+                counters.add(REQUESTS)
+                counters.add(BYTES_IN, len(data))
+            
+            if not quiet:
+                log(thread_name, f"RX {len(data):4d}B de la {client_ip}:{client_port}: {data_clean!r}")
+            conn.sendall(response)
+            if not quiet:
+                log(thread_name, f"TX {len(response):4d}B către {client_ip}:{client_port}: {response!r}")
+            if not keepalive:
+                return
         
     except Exception as exc:
         log(thread_name, f"EROARE {client_ip}:{client_port}: {exc}")
@@ -101,45 +179,230 @@ def handle_client(conn: socket.socket, addr: tuple[str, int], recv_buf: int) ->
 # =============================================================================
 # SERVER
 # =============================================================================
-def run_server(cfg: ServerConfig) -> None:
-    """Pornește serverul TCP."""
+def run_server(cfg: ServerConfig, counters: Optional[SharedCounters] = None) -> None:
+    """Pornește serverul TCP (sau supervisorul, dacă processes > 1)."""
+    if cfg.processes > 1:
+        run_supervisor(cfg)
+        return
+    counters = counters or SharedCounters(COUNTER_FIELDS)
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     
     # HACK: SO_REUSEADDR pentru că altfel "Address already in use" 
     # ne face viața grea la demo-uri repetate. În producție, gândește-te
     # de două ori înainte să-l folosești.
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if cfg.reuse_port:
+        # Fiecare worker are propriul socket de ascultare pe același port;
+        # kernel-ul împarte conexiunile noi între ele
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     
     sock.bind((cfg.bind, cfg.port))
     sock.listen(cfg.backlog)
+    raise_nofile_limit()
     
     log("SERVER", f"TCP pe {cfg.bind}:{cfg.port} | mod={cfg.mode}")
     log("SERVER", "Așteptare conexiuni... (Ctrl+C oprire)")
     
     try:
-        while True:
-            conn, addr = sock.accept()
-            log("MAIN", f"Conexiune nouă: {addr[0]}:{addr[1]}")
+        if cfg.mode == "selectors":
+            serve_selectors(sock, cfg, counters)
+        elif cfg.mode == "asyncio":
+            asyncio.run(serve_asyncio(sock, cfg, counters))
+        else:
+            while True:
+                conn, addr = sock.accept()
+                counters.add(CONNECTIONS)
+                if not cfg.quiet:
+                    log("MAIN", f"Conexiune nouă: {addr[0]}:{addr[1]}")
             
-            if cfg.mode == "iterative":
-                # Un client la un moment dat - simplu dar nu scalează
-                handle_client(conn, addr, cfg.recv_buf)
-            else:
-                # Thread per conexiune - ok pentru demo, în producție
-                # ai folosi thread pool sau asyncio
-                t = threading.Thread(
-                    target=handle_client,
-                    args=(conn, addr, cfg.recv_buf),
-                    daemon=True,
-                    name=f"Worker-{addr[1]}"
-                )
-                t.start()
+                if cfg.mode == "iterative":
+                    # Un client la un moment dat - simplu dar nu scalează
+                    handle_client(conn, addr, cfg.recv_buf, cfg.quiet, counters, cfg.keepalive)
+                else:
+                    # Thread per conexiune - ok pentru demo, în producție
+                    # ai folosi thread pool sau asyncio
+                    t = threading.Thread(
+                        target=handle_client,
+                        args=(conn, addr, cfg.recv_buf, cfg.quiet, counters, cfg.keepalive),
+                        daemon=True,
+                        name=f"Worker-{addr[1]}"
+                    )
+                    t.start()
     except KeyboardInterrupt:
         log("SERVER", "Oprire (Ctrl+C)")
     finally:
         sock.close()
 
 
+# =============================================================================
+# SERVER EVENT-LOOP (un singur thread, fără thread per conexiune)
+# =============================================================================
+class _Connection:
+    """Starea unei conexiuni în serverul selectors: ce mai e de trimis."""
+    __slots__ = ("sock", "addr", "pending", "writing")
+
+    def __init__(self, sock: socket.socket, addr: tuple[str, int]):
+        self.sock = sock
+        self.addr = addr
+        self.pending = b""
+        self.writing = False        # înregistrat pe EVENT_WRITE în loc de EVENT_READ
+
+
+def _close_connection(sel: selectors.BaseSelector, conn: _Connection) -> None:
+    sel.unregister(conn.sock)
+    try:
+        conn.sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.sock.close()
+
+
+def serve_selectors(sock: socket.socket, cfg: ServerConfig,
+                    counters: Optional[SharedCounters] = None) -> None:
+    """
+    Server event-loop cu modulul selectors (epoll pe Linux, kqueue pe BSD/macOS).
+    
+    Un singur thread urmărește toate socket-urile: cel de ascultare și
+    fiecare conexiune. O conexiune inactivă costă doar o intrare în
+    epoll și un obiect _Connection - nu un thread cu stivă proprie.
+    """
+    counters = counters or SharedCounters(COUNTER_FIELDS)
+    sel = selectors.DefaultSelector()
+    sock.setblocking(False)
+    sel.register(sock, selectors.EVENT_READ, None)
+    log("LOOP", f"selectors: {type(sel).__name__}")
+    
+    def accept_ready() -> None:
+        # Golim coada de accept - la un val de conexiuni, un singur
+        # eveniment poate acoperi sute de clienți
+        while True:
+            try:
+                client, addr = sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:      # ex. EMFILE - încercăm la următorul eveniment
+                log("LOOP", f"accept: {exc}")
+                return
+            client.setblocking(False)
+            sel.register(client, selectors.EVENT_READ, _Connection(client, addr))
+            counters.add(CONNECTIONS)
+            if not cfg.quiet:
+                log("LOOP", f"Conexiune nouă: {addr[0]}:{addr[1]}")
+    
+    def read_ready(conn: _Connection) -> None:
+        try:
+            data = conn.sock.recv(cfg.recv_buf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            _close_connection(sel, conn)
+            return
+        conn.pending = process_request(data)
+        counters.add(REQUESTS)
+        counters.add(BYTES_IN, len(data))
+        if not cfg.quiet:
+            data_clean = data.rstrip(b"\r\n")
+            log("LOOP", f"RX {len(data):4d}B de la {conn.addr[0]}:{conn.addr[1]}: {data_clean!r}")
+        write_ready(conn)
+    
+    def write_ready(conn: _Connection) -> None:
+        try:
+            sent = conn.sock.send(conn.pending)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            _close_connection(sel, conn)
+            return
+        conn.pending = conn.pending[sent:]
+        if conn.pending and not conn.writing:
+            # Buffer-ul de trimitere e plin - așteptăm EVENT_WRITE
+            sel.modify(conn.sock, selectors.EVENT_WRITE, conn)
+            conn.writing = True
+        elif not conn.pending and not cfg.keepalive:
+            # Răspuns trimis complet - o cerere per conexiune
+            _close_connection(sel, conn)
+        elif not conn.pending and conn.writing:
+            # Totul trimis - conexiunea așteaptă următoarea cerere
+            sel.modify(conn.sock, selectors.EVENT_READ, conn)
+            conn.writing = False
+    
+    try:
+        while True:
+            for key, events in sel.select():
+                if key.data is None:
+                    accept_ready()
+                elif events & selectors.EVENT_WRITE:
+                    write_ready(key.data)
+                else:
+                    read_ready(key.data)
+    finally:
+        sel.close()
+
+
+async def serve_asyncio(sock: socket.socket, cfg: ServerConfig,
+                        counters: Optional[SharedCounters] = None) -> None:
+    """
+    Server asyncio: o corutină per conexiune, toate în același thread.
+    
+    Varianta de nivel înalt a lui serve_selectors - bucla de evenimente
+    asyncio folosește tot selectors/epoll dedesubt.
+    """
+    counters = counters or SharedCounters(COUNTER_FIELDS)
+    
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info("peername")
+        counters.add(CONNECTIONS)
+        try:
+            while data := await reader.read(cfg.recv_buf):
+                response = process_request(data)
+                counters.add(REQUESTS)
+                counters.add(BYTES_IN, len(data))
+                if not cfg.quiet:
+                    data_clean = data.rstrip(b"\r\n")
+                    log("ASYNC", f"RX {len(data):4d}B de la {addr[0]}:{addr[1]}: {data_clean!r}")
+                writer.write(response)
+                await writer.drain()
+                if not cfg.keepalive:
+                    break
+        except OSError as exc:
+            if not cfg.quiet:
+                log("ASYNC", f"EROARE {addr}: {exc}")
+        finally:
+            writer.close()
+    
+    server = await asyncio.start_server(handle, sock=sock, backlog=cfg.backlog)
+    async with server:
+        await server.serve_forever()
+
+
+# =============================================================================
+# MULTI-PROCES (supervisor + workeri SO_REUSEPORT)
+# =============================================================================
+def _format_counters(values: dict[str, int]) -> str:
+    return (f"conn={values['connections']} req={values['requests']} "
+            f"in={values['bytes_in']}B")
+
+
+def run_supervisor(cfg: ServerConfig) -> None:
+    """
+    Pornește cfg.processes workeri (fork), fiecare cu propriul socket
+    SO_REUSEPORT și propriul GIL, în modul cfg.mode.
+    
+    Supervisorul (utils/prefork.py, la fel ca în S1/S3) nu
+    servește clienți: repornește workerii care mor și afișează periodic
+    contoarele agregate. Ctrl+C sau SIGTERM oprește tot.
+    """
+    counters = SharedCounters(COUNTER_FIELDS, cfg.processes)
+    worker_cfg = replace(cfg, processes=1, reuse_port=True)
+    log("SUPERVISOR", f"mod={cfg.mode}")
+    run_prefork(cfg.bind, cfg.port, cfg.processes,
+                lambda: run_server(worker_cfg, counters), counters,
+                log=lambda msg: log("SUPERVISOR", msg), describe=_format_counters,
+                stats_interval=cfg.stats_interval, rate_field="requests")
+
+
 # =============================================================================
 # CLIENT
 # =============================================================================
@@ -170,37 +433,228 @@ def tcp_client(host: str, port: int, message: bytes, timeout: float) -> Optional
     return None
 
 
+@dataclass
+class LoadResult:
+    """Rezultatul unui test de încărcare."""
+    clients: int
+    ok: int
+    idle: int
+    duration_s: float
+    latencies_ms: List[float]
+    server_threads: Optional[int] = None
+    server_rss_kb: Optional[int] = None
+
+    @property
+    def conn_per_s(self) -> float:
+        return self.ok / self.duration_s if self.duration_s > 0 else 0.0
+
+    def percentile(self, p: int) -> float:
+        """Percentila p (1..99) a latenței conexiune→răspuns, în ms."""
+        if len(self.latencies_ms) < 2:
+            return self.latencies_ms[0] if self.latencies_ms else 0.0
+        return statistics.quantiles(self.latencies_ms, n=100)[p - 1]
+
+
+def _process_status(pid: int) -> tuple[Optional[int], Optional[int]]:
+    """(thread-uri, RSS în KiB) pentru un proces, din /proc (doar Linux)."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields[key] = value.split()
+    except OSError:
+        return None, None
+    threads = int(fields["Threads"][0]) if "Threads" in fields else None
+    rss = int(fields["VmRSS"][0]) if "VmRSS" in fields else None
+    return threads, rss
+
+
+async def _timed_request(host: str, port: int, message: bytes,
+                         timeout: float) -> Optional[float]:
+    """O cerere completă (connect, send, recv); latența în ms sau None."""
+    writer = None
+    try:
+        t0 = time.perf_counter()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(message)
+        response = await asyncio.wait_for(reader.read(4096), timeout)
+        rtt = (time.perf_counter() - t0) * 1000
+        return rtt if response else None
+    except (asyncio.TimeoutError, OSError):
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _open_idle(host: str, port: int, count: int, timeout: float,
+                     concurrency: int) -> List[asyncio.StreamWriter]:
+    """Deschide `count` conexiuni care nu trimit nimic (clienți inactivi)."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one() -> Optional[asyncio.StreamWriter]:
+        async with limit:
+            try:
+                _reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), timeout)
+                return writer
+            except (asyncio.TimeoutError, OSError):
+                return None
+
+    writers = await asyncio.gather(*(one() for _ in range(count)))
+    return [w for w in writers if w is not None]
+
+
+async def _load(host: str, port: int, num_clients: int, message: bytes, timeout: float,
+                stagger_ms: int, idle: int, concurrency: int,
+                server_pid: Optional[int]) -> LoadResult:
+    idle_writers = await _open_idle(host, port, idle, timeout, concurrency) if idle else []
+    if idle:
+        log("LOAD", f"{len(idle_writers)}/{idle} conexiuni inactive deschise")
+    
+    limit = asyncio.Semaphore(concurrency)
+
+    async def client() -> Optional[float]:
+        async with limit:
+            return await _timed_request(host, port, message, timeout)
+
+    tasks = []
+    t0 = time.perf_counter()
+    for _ in range(num_clients):
+        tasks.append(asyncio.create_task(client()))
+        if stagger_ms > 0:
+            await asyncio.sleep(stagger_ms / 1000)
+    latencies = await asyncio.gather(*tasks)
+    duration = time.perf_counter() - t0
+    
+    # Măsurăm serverul cât timp conexiunile inactive sunt încă deschise
+    threads, rss = _process_status(server_pid) if server_pid else (None, None)
+    for w in idle_writers:
+        w.close()
+    
+    ok = [rtt for rtt in latencies if rtt is not None]
+    return LoadResult(clients=num_clients, ok=len(ok), idle=len(idle_writers),
+                      duration_s=duration, latencies_ms=ok,
+                      server_threads=threads, server_rss_kb=rss)
+
+
 def run_load_test(host: str, port: int, num_clients: int, message: bytes,
-                  timeout: float, stagger_ms: int) -> None:
+                  timeout: float, stagger_ms: int, idle: int = 0,
+                  concurrency: int = 256, server_pid: Optional[int] = None) -> LoadResult:
     """
     Test de încărcare cu N clienți concurenți.
     
     stagger_ms pune o pauză între pornirea clienților ca să nu
     lovim serverul cu toți deodată (deși uneori exact asta vrei să testezi).
-    """
-    log("LOAD", f"Start: {num_clients} clienți → {host}:{port}")
     
-    results: List[Optional[bytes]] = [None] * num_clients
+    Clienții rulează ca corutine într-o singură buclă asyncio (cel mult
+    `concurrency` cereri în zbor), iar `idle` conexiuni inactive sunt ținute
+    deschise pe toată durata testului - exact situația în care un server
+    cu thread per conexiune rămâne fără resurse.
+    
+    Returns:
+        LoadResult cu conexiuni/s și latențe (p50/p99)
+    """
+    log("LOAD", f"Start: {num_clients} clienți → {host}:{port}"
+                + (f" (+{idle} inactivi)" if idle else ""))
+    raise_nofile_limit()
     
-    def worker(i: int) -> None:
-        results[i] = tcp_client(host, port, message, timeout)
+    result = asyncio.run(_load(host, port, num_clients, message, timeout,
+                               stagger_ms, idle, concurrency, server_pid))
     
-    threads = []
-    t0 = time.perf_counter()
+    log("LOAD", f"Rezultat: {result.ok}/{num_clients} în {result.duration_s * 1000:.0f}ms | "
+                f"{result.conn_per_s:.0f} conn/s | p50={result.percentile(50):.2f}ms "
+                f"p99={result.percentile(99):.2f}ms")
+    return result
+
+
+def run_open_loop_test(host: str, port: int, rate: float, duration: float,
+                       connections: int, message: bytes, timeout: float,
+                       json_path: Optional[str] = None) -> LoadReport:
+    """
+    Încărcare open-loop: `rate` cereri/s constant, pe conexiuni persistente.
     
-    for i in range(num_clients):
-        t = threading.Thread(target=worker, args=(i,))
-        t.start()
-        threads.append(t)
-        if stagger_ms > 0:
-            time.sleep(stagger_ms / 1000)
+    Spre deosebire de run_load_test, rata nu scade când serverul încetinește,
+    iar latența include așteptarea în coadă (vezi utils/loadgen.py).
+    Serverul trebuie pornit cu --keepalive.
+    """
+    response_len = len(process_request(message))
+    log("LOADGEN", f"TCP {host}:{port} | {rate:.0f} cereri/s × {duration:.0f}s | "
+                   f"{connections} conexiuni")
+    report = run_open_loop(
+        lambda: TcpTarget(host, port, message, response_len, timeout),
+        "tcp", f"{host}:{port}", rate, duration, connections)
+    for line in report.summary_lines():
+        log("LOADGEN", line)
+    if json_path:
+        report.write_json(json_path)
+        log("LOADGEN", f"JSON: {json_path}")
+    return report
+
+
+# =============================================================================
+# BENCHMARK MODURI SERVER
+# =============================================================================
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_server(port: int, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def run_benchmark(modes: List[str], num_clients: int, idle: int, concurrency: int,
+                  message: bytes, timeout: float, backlog: int,
+                  processes: int = 1) -> List[tuple[str, LoadResult]]:
+    """
+    Pornește serverul în fiecare mod (proces separat) și rulează același
+    test de încărcare, pentru comparație directă.
     
-    for t in threads:
-        t.join()
+    Cu processes > 1, thread-urile/RSS nu se mai raportează (ar fi doar
+    ale supervisorului, nu ale workerilor).
+    """
+    results = []
+    for mode in modes:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, __file__, "server", "--bind", "127.0.0.1",
+             "--port", str(port), "--mode", mode, "--backlog", str(backlog), "--quiet",
+             "--processes", str(processes)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            if not _wait_for_server(port):
+                log("BENCH", f"Serverul {mode} nu a pornit")
+                continue
+            log("BENCH", f"Mod {mode} (pid {server.pid}, port {port})")
+            results.append((mode, run_load_test(
+                "127.0.0.1", port, num_clients, message, timeout, 0,
+                idle=idle, concurrency=concurrency,
+                server_pid=server.pid if processes == 1 else None)))
+        finally:
+            server.terminate()
+            server.wait()
     
-    duration = (time.perf_counter() - t0) * 1000
-    ok = sum(1 for r in results if r)
-    log("LOAD", f"Rezultat: {ok}/{num_clients} în {duration:.0f}ms")
+    print()
+    print(f"{'Mod':<10} {'OK':>11} {'conn/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'threads':>8} {'RSS MiB':>8}")
+    print("-" * 68)
+    for mode, r in results:
+        threads = r.server_threads if r.server_threads is not None else "-"
+        rss = f"{r.server_rss_kb / 1024:.1f}" if r.server_rss_kb is not None else "-"
+        print(f"{mode:<10} {f'{r.ok}/{r.clients}':>11} {r.conn_per_s:>9.0f} "
+              f"{r.percentile(50):>8.2f} {r.percentile(99):>8.2f} {threads:>8} {rss:>8}")
+    return results
 
 
 # =============================================================================
@@ -216,7 +670,15 @@ def parse_args() -> argparse.Namespace:
     ps.add_argument("--port", type=int, default=DEFAULT_PORT)
     ps.add_argument("--backlog", type=int, default=DEFAULT_BACKLOG)
     ps.add_argument("--recv-buf", type=int, default=DEFAULT_RECV_BUF)
-    ps.add_argument("--mode", choices=["threaded", "iterative"], default="threaded")
+    ps.add_argument("--mode", choices=SERVER_MODES, default="threaded")
+    ps.add_argument("--quiet", "-q", action="store_true",
+                    help="Fără log per conexiune (pentru teste de încărcare)")
+    ps.add_argument("--processes", "-P", type=int, default=1,
+                    help="Workeri (procese) care împart portul prin SO_REUSEPORT")
+    ps.add_argument("--stats-interval", type=float, default=5.0,
+                    help="Secunde între rapoartele supervisorului")
+    ps.add_argument("--keepalive", action="store_true",
+                    help="Conexiuni persistente: mai multe cereri până la EOF (necesar pentru loadgen)")
     
     # Client
     pc = sub.add_parser("client")
@@ -233,6 +695,33 @@ def parse_args() -> argparse.Namespace:
     pl.add_argument("--message", "-m", default="ping")
     pl.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
     pl.add_argument("--stagger-ms", type=int, default=50)
+    pl.add_argument("--idle", type=int, default=0,
+                    help="Conexiuni inactive ținute deschise pe durata testului")
+    pl.add_argument("--concurrency", type=int, default=256,
+                    help="Cereri simultane maxime")
+    
+    # Loadgen - rată constantă (open-loop), histograme de latență
+    pg = sub.add_parser("loadgen")
+    pg.add_argument("--host", required=True)
+    pg.add_argument("--port", type=int, required=True)
+    pg.add_argument("--rate", type=float, required=True, help="Cereri pe secundă")
+    pg.add_argument("--duration", type=float, default=10.0, help="Secunde")
+    pg.add_argument("--connections", "-c", type=int, default=16)
+    pg.add_argument("--message", "-m", default="ping")
+    pg.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    pg.add_argument("--json", metavar="PATH", help="Export rezultate JSON")
+    
+    # Bench - compară modurile de server pe același test
+    pb = sub.add_parser("bench")
+    pb.add_argument("--modes", nargs="+", choices=SERVER_MODES,
+                    default=["threaded", "selectors", "asyncio"])
+    pb.add_argument("--clients", "-n", type=int, default=2000)
+    pb.add_argument("--idle", type=int, default=1000)
+    pb.add_argument("--concurrency", type=int, default=256)
+    pb.add_argument("--backlog", type=int, default=4096)
+    pb.add_argument("--processes", "-P", type=int, default=1)
+    pb.add_argument("--message", "-m", default="ping")
+    pb.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
     
     return p.parse_args()
 
@@ -243,14 +732,26 @@ def main() -> int:
     if args.cmd == "server":
         run_server(ServerConfig(
             bind=args.bind, port=args.port, backlog=args.backlog,
-            recv_buf=args.recv_buf, mode=args.mode
+            recv_buf=args.recv_buf, mode=args.mode, quiet=args.quiet,
+            processes=args.processes, stats_interval=args.stats_interval,
+            keepalive=args.keepalive
         ))
     elif args.cmd == "client":
         r = tcp_client(args.host, args.port, args.message.encode(), args.timeout)
         return 0 if r else 1
     elif args.cmd == "load":
-        run_load_test(args.host, args.port, args.clients,
-                      args.message.encode(), args.timeout, args.stagger_ms)
+        r = run_load_test(args.host, args.port, args.clients, args.message.encode(),
+                          args.timeout, args.stagger_ms, idle=args.idle,
+                          concurrency=args.concurrency)
+        return 0 if r.ok == r.clients else 1
+    elif args.cmd == "loadgen":
+        r = run_open_loop_test(args.host, args.port, args.rate, args.duration,
+                               args.connections, args.message.encode(), args.timeout,
+                               args.json)
+        return 0 if r.completed else 1
+    elif args.cmd == "bench":
+        run_benchmark(args.modes, args.clients, args.idle, args.concurrency,
+                      args.message.encode(), args.timeout, args.backlog, args.processes)
     return 0
 
 
@@ -19,23 +19,38 @@
 
  UTILIZARE:
    Server:    python3 ex_2_02_udp.py server --port 9998
+   High-rate:  python3 ex_2_02_udp.py server --port 9998 --batch 64 --quiet
+   Bench:      python3 ex_2_02_udp.py bench --clients 16 --duration 5
    Interactiv: python3 ex_2_02_udp.py client --host 127.0.0.1 --port 9998 -i
    O comandă:  python3 ex_2_02_udp.py client --host 127.0.0.1 --port 9998 -o "ping"
+   Open-loop:  python3 ex_2_02_udp.py loadgen --host 127.0.0.1 --port 9998 \
+                   --rate 5000 --duration 10 --connections 32 --json udp.json
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
 from __future__ import annotations
 import argparse
+import ctypes
+import errno
+import os
 import socket
+import subprocess
 import sys
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+# Adăugăm directorul utils la path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+from loadgen import LoadReport, UdpTarget, run_open_loop
+from mmsg import (IoVec, MMsgHdr, MMSG_AVAILABLE, MSG_WAITFORONE, SOCKADDR_STORAGE_SIZE,
+                  recvmmsg, sendmmsg)
 
 DEFAULT_PORT = 9998
 DEFAULT_BIND = "0.0.0.0"
 DEFAULT_TIMEOUT = 2.0
+DEFAULT_BATCH = 64
 
 HELP_TEXT = """Comenzi: ping, upper:<text>, lower:<text>, reverse:<text>, time, help, exit"""
 
@@ -53,15 +68,24 @@ class ServerConfig:
     bind: str = DEFAULT_BIND
     port: int = DEFAULT_PORT
     recv_buf: int = 1024
+    quiet: bool = False             # fără log per datagramă (teste de încărcare)
+    batch: int = 0                  # >0: mod high-rate, până la `batch` datagrame per apel
+    batch_io: str = "auto"          # "mmsg", "recvmsg" sau "auto"
 
 
 # =============================================================================
 # PROTOCOL
 # =============================================================================
-def process_command(data: bytes) -> bytes:
-    """Procesează comanda conform protocolului."""
+def process_command(data: bytes | memoryview) -> bytes:
+    """
+    Procesează comanda conform protocolului.
+    
+    Acceptă și un memoryview peste buffer-ul de recepție (modul --batch):
+    str(view, "utf-8") decodează direct din buffer, fără o copie bytes
+    intermediară a datagramei.
+    """
     try:
-        cmd = data.decode("utf-8").strip()
+        cmd = str(data, "utf-8").strip()
         cmd_lower = cmd.lower()
         
         if cmd_lower == "ping":
@@ -84,6 +108,199 @@ def process_command(data: bytes) -> bytes:
         return f"ERROR: {e}".encode()
 
 
+# =============================================================================
+# I/O ÎN LOTURI (recvmmsg/sendmmsg)
+# =============================================================================
+# Modulul socket nu expune recvmmsg/sendmmsg, așa că pe Linux le apelăm
+# direct din libc prin ctypes (utils/mmsg.py): un singur apel sistem primește
+# (sau trimite) până la `batch` datagrame, în buffere alocate o singură dată.
+RECVMSG_AVAILABLE = hasattr(socket.socket, "recvmsg_into") and hasattr(socket, "MSG_DONTWAIT")
+
+
+class MmsgBatchIO:
+    """
+    Lot de datagrame prin recvmmsg/sendmmsg (Linux).
+    
+    recv() întoarce memoryview-uri peste buffer-ul de recepție (valabile
+    până la următorul recv()); send() trimite răspunsurile către adresele
+    sursă ale lotului curent, tot într-un singur apel sistem. Un răspuns
+    mai mare decât slotul (bufsize) pleacă întreg, dintr-o copie separată.
+    """
+
+    def __init__(self, sock: socket.socket, batch: int, bufsize: int):
+        self.sock = sock
+        self.batch = batch
+        self.bufsize = bufsize
+        self._rx = ctypes.create_string_buffer(batch * bufsize)
+        self._tx = ctypes.create_string_buffer(batch * bufsize)
+        self._rx_view = memoryview(self._rx).cast("B")
+        self._tx_view = memoryview(self._tx).cast("B")
+        self._names = ctypes.create_string_buffer(batch * SOCKADDR_STORAGE_SIZE)
+        self._rx_iov = (IoVec * batch)()
+        self._tx_iov = (IoVec * batch)()
+        self._rx_hdrs = (MMsgHdr * batch)()
+        self._tx_hdrs = (MMsgHdr * batch)()
+        
+        rx_base = ctypes.addressof(self._rx)
+        tx_base = self._tx_base = ctypes.addressof(self._tx)
+        names = ctypes.addressof(self._names)
+        # Adresele destinație sunt exact cele sursă din lotul primit (același
+        # buffer msg_name); lungimea depinde doar de familia socket-ului
+        tx_namelen = 16 if sock.family == socket.AF_INET else 28
+        for i in range(batch):
+            self._rx_iov[i].iov_base = rx_base + i * bufsize
+            self._rx_iov[i].iov_len = bufsize
+            self._tx_iov[i].iov_base = tx_base + i * bufsize
+            for hdrs, iov in ((self._rx_hdrs, self._rx_iov), (self._tx_hdrs, self._tx_iov)):
+                hdr = hdrs[i].msg_hdr
+                hdr.msg_name = names + i * SOCKADDR_STORAGE_SIZE
+                hdr.msg_namelen = SOCKADDR_STORAGE_SIZE
+                hdr.msg_iov = ctypes.pointer(iov[i])
+                hdr.msg_iovlen = 1
+            self._tx_hdrs[i].msg_hdr.msg_namelen = tx_namelen
+        # Kernel-ul suprascrie msg_namelen la fiecare recvmmsg - îl refacem
+        # dintr-o copie, cu o singură copiere de memorie
+        self._rx_template = bytes(self._rx_hdrs)
+        # Câmpurile citite/scrise per datagramă (msg_len, iov_len) le accesăm
+        # prin memoryview-uri cu pas, nu prin atribute ctypes (mult mai lente)
+        hdr_words = ctypes.sizeof(MMsgHdr) // 4
+        len_word = MMsgHdr.msg_len.offset // 4
+        self._rx_lens = memoryview(self._rx_hdrs).cast("B").cast("I")[len_word::hdr_words]
+        iov_words = ctypes.sizeof(IoVec) // ctypes.sizeof(ctypes.c_size_t)
+        self._tx_lens = memoryview(self._tx_iov).cast("B").cast(
+            "Q" if ctypes.sizeof(ctypes.c_size_t) == 8 else "I")[1::iov_words]
+        self._offsets = range(0, batch * bufsize, bufsize)
+
+    def recv(self) -> List[memoryview]:
+        ctypes.memmove(self._rx_hdrs, self._rx_template, len(self._rx_template))
+        n = recvmmsg(self.sock.fileno(), self._rx_hdrs, self.batch, MSG_WAITFORONE, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EINTR, errno.EAGAIN):
+                return []
+            raise OSError(err, os.strerror(err))
+        view = self._rx_view
+        return [view[off:off + length] for off, length in zip(self._offsets, self._rx_lens[:n])]
+
+    def send(self, replies: List[bytes]) -> None:
+        size, view, lens = self.bufsize, self._tx_view, self._tx_lens
+        oversize = []                   # (index, buffer) - păstrate în viață până la sendmmsg
+        for i, (off, reply) in enumerate(zip(self._offsets, replies)):
+            length = len(reply)
+            if length > size:
+                # Rar: răspuns mai mare decât slotul - iovec-ul indică o copie
+                # de lungimea lui, nu slotul (care l-ar trunchia)
+                buf = ctypes.create_string_buffer(reply, length)
+                self._tx_iov[i].iov_base = ctypes.addressof(buf)
+                oversize.append((i, buf))
+            else:
+                view[off:off + length] = reply
+            lens[i] = length
+        sent, total = 0, len(replies)
+        try:
+            while sent < total:
+                n = sendmmsg(self.sock.fileno(),
+                              ctypes.byref(self._tx_hdrs, sent * ctypes.sizeof(MMsgHdr)),
+                              total - sent, 0)
+                if n < 0:
+                    if ctypes.get_errno() != errno.EINTR:
+                        sent += 1       # EMSGSIZE, ENOBUFS etc. - UDP, doar acest răspuns se pierde
+                    continue
+                sent += n
+        finally:
+            for i, _buf in oversize:
+                self._tx_iov[i].iov_base = self._tx_base + i * size
+
+
+class RecvmsgBatchIO:
+    """
+    Varianta portabilă: recvmsg_into în buffere prealocate.
+    
+    Prima datagramă se așteaptă blocant, restul lotului se golește cu
+    MSG_DONTWAIT; trimiterea rămâne câte un sendto per răspuns.
+    """
+
+    def __init__(self, sock: socket.socket, batch: int, bufsize: int):
+        self.sock = sock
+        self.batch = batch
+        self._buffers = [memoryview(bytearray(bufsize)) for _ in range(batch)]
+        self._addrs: List[tuple] = []
+
+    def recv(self) -> List[memoryview]:
+        recv_into = self.sock.recvmsg_into
+        views, addrs = [], []
+        flags = 0
+        for buf in self._buffers:
+            try:
+                nbytes, _anc, _flags, addr = recv_into([buf], 0, flags)
+            except (BlockingIOError, InterruptedError):
+                break
+            views.append(buf[:nbytes])
+            addrs.append(addr)
+            flags = socket.MSG_DONTWAIT
+        self._addrs = addrs
+        return views
+
+    def send(self, replies: List[bytes]) -> None:
+        sendto = self.sock.sendto
+        for reply, addr in zip(replies, self._addrs):
+            try:
+                sendto(reply, addr)
+            except OSError:
+                pass
+
+
+def make_batch_io(sock: socket.socket, batch: int, bufsize: int, kind: str = "auto"):
+    """Alege implementarea: recvmmsg/sendmmsg dacă există, altfel recvmsg_into."""
+    if kind in ("auto", "mmsg") and MMSG_AVAILABLE:
+        return MmsgBatchIO(sock, batch, bufsize)
+    if kind == "mmsg":
+        log("SERVER", "recvmmsg indisponibil - folosim recvmsg_into")
+    if RECVMSG_AVAILABLE:
+        return RecvmsgBatchIO(sock, batch, bufsize)
+    return None
+
+
+def serve_batched(sock: socket.socket, cfg: ServerConfig) -> int:
+    """
+    Bucla high-rate: lot primit → procesat pe memoryview-uri → lot trimis.
+    
+    Câștigul este mic în CPython pe loopback. Măsurat cu `bench` pe o VM cu
+    un vCPU: golirea unui socket plin costă ~4-5 µs/datagramă cu mmsg față
+    de ~5-7 µs în bucla clasică cu --quiet (~1.3x, variabil între rulări),
+    iar varianta recvmsg_into nu câștigă nimic (un apel sistem per
+    datagramă, ca bucla clasică). Cap la cap, sub flood, modurile ies la
+    fel: clientul și costul per pachet din kernel domină. Câștigul mare față
+    de serverul inițial vine din --quiet (fără print per datagramă), nu din lot.
+    """
+    io = make_batch_io(sock, cfg.batch, cfg.recv_buf, cfg.batch_io)
+    if io is None:
+        raise OSError("Modul --batch necesită recvmsg_into (Unix)")
+    log("SERVER", f"Mod batch: {type(io).__name__}, până la {cfg.batch} datagrame/apel")
+    
+    count = 0
+    window_start, window_count, window_batches = time.monotonic(), 0, 0
+    try:
+        while True:
+            datagrams = io.recv()
+            if not datagrams:
+                continue
+            io.send([process_command(d) for d in datagrams])
+            count += len(datagrams)
+            if not cfg.quiet:
+                # Log per secundă, nu per datagramă - altfel print() domină
+                window_count += len(datagrams)
+                window_batches += 1
+                now = time.monotonic()
+                if now - window_start >= 1.0:
+                    log("SERVER", f"{window_count / (now - window_start):.0f} răspunsuri/s | "
+                                  f"lot mediu {window_count / window_batches:.1f}")
+                    window_start, window_count, window_batches = now, 0, 0
+    except KeyboardInterrupt:
+        pass
+    return count
+
+
 # =============================================================================
 # SERVER
 # =============================================================================
@@ -97,13 +314,19 @@ def run_server(cfg: ServerConfig) -> None:
     
     count = 0
     try:
+        if cfg.batch > 0:
+            count = serve_batched(sock, cfg)    # revine doar la Ctrl+C
+            log("SERVER", f"Oprire | Total: {count}")
+            return
         while True:
             data, addr = sock.recvfrom(cfg.recv_buf)
             count += 1
             response = process_command(data)
-            log("SERVER", f"#{count} RX {len(data)}B {addr[0]}:{addr[1]}: {data!r}")
+            if not cfg.quiet:
+                log("SERVER", f"#{count} RX {len(data)}B {addr[0]}:{addr[1]}: {data!r}")
             sock.sendto(response, addr)
-            log("SERVER", f"#{count} TX {len(response)}B: {response!r}")
+            if not cfg.quiet:
+                log("SERVER", f"#{count} TX {len(response)}B: {response!r}")
     except KeyboardInterrupt:
         log("SERVER", f"Oprire | Total: {count}")
     finally:
@@ -193,6 +416,199 @@ def run_once(host: str, port: int, cmd: str, timeout: float) -> int:
         sock.close()
 
 
+def run_open_loop_test(host: str, port: int, rate: float, duration: float,
+                       connections: int, timeout: float, command: Optional[str] = None,
+                       json_path: Optional[str] = None) -> LoadReport:
+    """
+    Încărcare open-loop: `rate` datagrame/s constant, de pe `connections` socket-uri.
+    
+    Implicit se trimite "echo:<seq>", ca un răspuns întârziat (după timeout)
+    să nu fie confundat cu răspunsul cererii următoare.
+    """
+    if command:
+        payload = lambda seq: command.encode()
+        expect = None
+    else:
+        payload = lambda seq: f"echo:{seq}".encode()
+        expect = lambda seq: str(seq).encode()
+    log("LOADGEN", f"UDP {host}:{port} | {rate:.0f} cereri/s × {duration:.0f}s | "
+                   f"{connections} socket-uri")
+    report = run_open_loop(
+        lambda: UdpTarget(host, port, payload, expect, timeout),
+        "udp", f"{host}:{port}", rate, duration, connections)
+    for line in report.summary_lines():
+        log("LOADGEN", line)
+    if json_path:
+        report.write_json(json_path)
+        log("LOADGEN", f"JSON: {json_path}")
+    return report
+
+
+# =============================================================================
+# BENCHMARK (flood)
+# =============================================================================
+def run_flood(host: str, port: int, clients: int, duration: float, command: bytes,
+              window: int = 32) -> Tuple[int, int, float]:
+    """
+    Inundă serverul de pe `clients` socket-uri, fiecare cu cel mult `window`
+    datagrame în zbor. Întoarce (trimise, răspunsuri, durată).
+    """
+    socks = []
+    for _ in range(clients):
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect((host, port))
+        s.setblocking(False)
+        socks.append(s)
+    in_flight = [0] * clients
+    last_reply = [0.0] * clients
+    sent = received = 0
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            for i, s in enumerate(socks):
+                # Datagramele pierdute nu mai vin - după 200 ms fără răspuns
+                # reumplem fereastra, altfel socket-ul ar rămâne blocat
+                if in_flight[i] and now - last_reply[i] > 0.2:
+                    in_flight[i] = 0
+                while in_flight[i] < window:
+                    try:
+                        s.send(command)
+                    except (BlockingIOError, ConnectionRefusedError):
+                        break
+                    in_flight[i] += 1
+                    sent += 1
+                last_reply[i] = last_reply[i] or now
+                while True:
+                    try:
+                        s.recv(2048)
+                    except (BlockingIOError, ConnectionRefusedError):
+                        break
+                    received += 1
+                    in_flight[i] -= 1
+                    last_reply[i] = now
+    finally:
+        for s in socks:
+            s.close()
+    return sent, received, time.perf_counter() - t0
+
+
+def _process_cpu_seconds(pid: int) -> Optional[float]:
+    """utime + stime pentru un proces, din /proc (doar Linux)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def run_benchmark(clients: int, duration: float, command: str, window: int,
+                  batch: int) -> None:
+    """Compară modul clasic cu modurile batch, sub același flood."""
+    modes = [("clasic", [])]
+    if RECVMSG_AVAILABLE:
+        modes.append(("recvmsg", ["--batch", str(batch), "--batch-io", "recvmsg"]))
+    if MMSG_AVAILABLE:
+        modes.append(("mmsg", ["--batch", str(batch), "--batch-io", "mmsg"]))
+    
+    rows = []
+    for label, extra in modes:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = subprocess.Popen(
+            [sys.executable, __file__, "server", "--bind", "127.0.0.1",
+             "--port", str(port), "--quiet", *extra],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+                for _ in range(50):
+                    if send_recv(probe, b"ping", ("127.0.0.1", port), 0.1)[0]:
+                        break
+            cpu_start = _process_cpu_seconds(server.pid)
+            log("BENCH", f"Mod {label}: {clients} clienți × {duration:.0f}s")
+            sent, received, elapsed = run_flood("127.0.0.1", port, clients, duration,
+                                                command.encode(), window)
+            cpu_end = _process_cpu_seconds(server.pid)
+            cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+            rows.append((label, sent, received, received / elapsed, cpu))
+        finally:
+            server.terminate()
+            server.wait()
+    
+    # Pe o mașină cu un singur nucleu clientul și serverul împart CPU-ul;
+    # răspunsuri per secundă de CPU server arată capacitatea serverului
+    print()
+    print(f"{'Mod':<10} {'Trimise':>10} {'Răspunsuri':>11} {'resp/s':>9} "
+          f"{'CPU srv s':>10} {'resp/s CPU':>11}")
+    print("-" * 66)
+    for label, sent, received, rate, cpu in rows:
+        per_cpu = f"{received / cpu:.0f}" if cpu else "-"
+        cpu_txt = f"{cpu:.2f}" if cpu is not None else "-"
+        print(f"{label:<10} {sent:>10} {received:>11} {rate:>9.0f} {cpu_txt:>10} {per_cpu:>11}")
+    
+    run_drain_benchmark(command.encode(), batch)
+
+
+def run_drain_benchmark(command: bytes, batch: int, datagrams: int = 20000,
+                        repeat: int = 5) -> None:
+    """
+    Costul serverului per datagramă, fără client concurent: socket-ul este
+    umplut dinainte (ce nu încape în buffer-ul de recepție se pierde), apoi
+    golit (primire + procesare + răspuns) de fiecare mod.
+    
+    Flood-ul de mai sus măsoară tot sistemul; pe un singur nucleu clientul
+    Python e gâtuirea, iar modurile ies la fel. Aici se vede doar bucla serverului.
+    """
+    kinds = ["clasic"]
+    if RECVMSG_AVAILABLE:
+        kinds.append("recvmsg")
+    if MMSG_AVAILABLE:
+        kinds.append("mmsg")
+    
+    print()
+    print(f"{'Mod':<10} {'Datagrame':>10} {'µs/datagramă':>13} {'vs clasic':>10}")
+    print("-" * 46)
+    base = None
+    for kind in kinds:
+        best, drained = float("inf"), 0
+        for _ in range(repeat):
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as srv, \
+                 socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as cli:
+                srv.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 25)  # limitat de rmem_max
+                srv.bind(("127.0.0.1", 0))
+                cli.connect(srv.getsockname())
+                for _ in range(datagrams):
+                    cli.send(command)
+                srv.setblocking(False)
+                count = 0
+                start = time.perf_counter()
+                if kind == "clasic":
+                    try:
+                        while True:
+                            data, addr = srv.recvfrom(2048)
+                            srv.sendto(process_command(data), addr)
+                            count += 1
+                    except BlockingIOError:
+                        pass
+                else:
+                    io = make_batch_io(srv, batch, 2048, kind)
+                    while received := io.recv():
+                        io.send([process_command(d) for d in received])
+                        count += len(received)
+                elapsed = time.perf_counter() - start
+            if count:
+                best = min(best, elapsed / count * 1e6)
+                drained = count
+        base = base or best
+        print(f"{kind:<10} {drained:>10} {best:>13.2f} {base / best:>9.2f}x")
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -204,6 +620,12 @@ def parse_args() -> argparse.Namespace:
     ps.add_argument("--bind", default=DEFAULT_BIND)
     ps.add_argument("--port", type=int, default=DEFAULT_PORT)
     ps.add_argument("--recv-buf", type=int, default=1024)
+    ps.add_argument("--quiet", "-q", action="store_true",
+                    help="Fără log per datagramă (pentru teste de încărcare)")
+    ps.add_argument("--batch", type=int, nargs="?", const=DEFAULT_BATCH, default=0,
+                    metavar="N", help=f"Mod high-rate: loturi de N datagrame "
+                                      f"(implicit {DEFAULT_BATCH})")
+    ps.add_argument("--batch-io", choices=["auto", "mmsg", "recvmsg"], default="auto")
     
     pc = sub.add_parser("client")
     pc.add_argument("--host", required=True)
@@ -213,6 +635,23 @@ def parse_args() -> argparse.Namespace:
     mode.add_argument("--interactive", "-i", action="store_true")
     mode.add_argument("--once", "-o", metavar="CMD")
     
+    pb = sub.add_parser("bench")
+    pb.add_argument("--clients", type=int, default=16)
+    pb.add_argument("--duration", type=float, default=5.0)
+    pb.add_argument("--command", default="ping")
+    pb.add_argument("--window", type=int, default=32, help="Datagrame în zbor per client")
+    pb.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    
+    pg = sub.add_parser("loadgen")
+    pg.add_argument("--host", required=True)
+    pg.add_argument("--port", type=int, required=True)
+    pg.add_argument("--rate", type=float, required=True, help="Cereri pe secundă")
+    pg.add_argument("--duration", type=float, default=10.0, help="Secunde")
+    pg.add_argument("--connections", "-c", type=int, default=16)
+    pg.add_argument("--command", metavar="CMD", help="Comandă fixă (implicit echo:<seq>)")
+    pg.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    pg.add_argument("--json", metavar="PATH", help="Export rezultate JSON")
+    
     return p.parse_args()
 
 
@@ -220,12 +659,19 @@ def main() -> int:
     args = parse_args()
     
     if args.cmd == "server":
-        run_server(ServerConfig(bind=args.bind, port=args.port, recv_buf=args.recv_buf))
+        run_server(ServerConfig(bind=args.bind, port=args.port, recv_buf=args.recv_buf,
+                                quiet=args.quiet, batch=args.batch, batch_io=args.batch_io))
     elif args.cmd == "client":
         if args.interactive:
             run_interactive(args.host, args.port, args.timeout)
         else:
             return run_once(args.host, args.port, args.once, args.timeout)
+    elif args.cmd == "bench":
+        run_benchmark(args.clients, args.duration, args.command, args.window, args.batch)
+    elif args.cmd == "loadgen":
+        r = run_open_loop_test(args.host, args.port, args.rate, args.duration,
+                               args.connections, args.timeout, args.command, args.json)
+        return 0 if r.completed else 1
     return 0
 
 
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Generator de încărcare open-loop pentru aplicațiile TCP/UDP din S2.
+
+Un test "closed-loop" (fiecare client trimite următoarea cerere doar după
+ce a primit răspunsul) încetinește odată cu serverul: când serverul se
+blochează 1 s, clientul pur și simplu nu mai trimite nimic în acea secundă,
+iar latențele mari dispar din statistici (coordinated omission).
+
+Aici cererile sunt programate la rată constantă: cererea i are momentul
+planificat t0 + i/rată, indiferent de cât de repede răspunde serverul.
+Latența se măsoară de la momentul *planificat*, deci timpul petrecut
+în coadă (când toate conexiunile sunt ocupate) intră în rezultat - ca la
+wrk2. Separat se păstrează și timpul de servire (de la trimiterea efectivă).
+
+Histograma corectată conține *toate* cererile programate: o cerere eșuată
+(timeout, conexiune căzută) intră cu latența până la momentul eșecului, iar
+una netrimisă sau încă în zbor la final, cu latența până la sfârșitul
+testului (o limită inferioară). Altfel un server supraîncărcat care
+pierde cereri ar arăta percentile mai bune decât unul care le servește lent.
+Histograma timpului de servire conține doar cererile reușite.
+
+Latențele se înregistrează în histograme log-lineare în stilul HdrHistogram:
+precizie relativă fixă (~1%) pe tot intervalul 1 µs .. ore, memorie constantă,
+histograme combinabile.
+
+Modulul evită dependenţe externe pentru a rula pe VM minimală.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Protocol
+
+
+# =============================================================================
+# HISTOGRAMĂ LATENȚĂ (stil HdrHistogram)
+# =============================================================================
+class LatencyHistogram:
+    """
+    Histogramă log-lineară a latențelor, în microsecunde întregi.
+
+    Valorile sub 2^sub_bits se păstrează exact; peste, fiecare putere a lui 2
+    e împărțită în 2^(sub_bits-1) găleți egale, deci eroarea relativă e cel
+    mult 1/2^(sub_bits-1). Cu significant_digits=2 → 256 găleți pe prima
+    octavă, eroare < 1%.
+    """
+
+    PERCENTILES = (50.0, 90.0, 99.0, 99.9, 99.99)
+
+    def __init__(self, significant_digits: int = 2, highest_us: int = 3_600_000_000):
+        self.significant_digits = significant_digits
+        self.sub_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_count = 1 << self.sub_bits
+        self.half = self.sub_count >> 1
+        self.highest_us = highest_us
+        self.counts = [0] * (self._index(highest_us) + 1)
+        self.total = 0
+        self.min_us = 0
+        self.max_us = 0
+        self._sum_us = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + (value >> shift) - self.half
+
+    def _value_at(self, index: int) -> int:
+        """Valoarea reprezentativă (mijlocul) a găleții `index`."""
+        if index < self.sub_count:
+            return index
+        shift, offset = divmod(index - self.sub_count, self.half)
+        shift += 1
+        low = (offset + self.half) << shift
+        return low + (1 << (shift - 1))
+
+    def record(self, value_us: int, count: int = 1) -> None:
+        value_us = min(max(int(value_us), 0), self.highest_us)
+        self.counts[self._index(value_us)] += count
+        if not self.total or value_us < self.min_us:
+            self.min_us = value_us
+        self.max_us = max(self.max_us, value_us)
+        self.total += count
+        self._sum_us += value_us * count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adună altă histogramă cu aceeași configurație (ex. de la alt worker)."""
+        if (other.sub_bits, other.highest_us) != (self.sub_bits, self.highest_us):
+            raise ValueError("Histograme cu configurații diferite")
+        if not other.total:
+            return
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.min_us = min(self.min_us, other.min_us) if self.total else other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+        self.total += other.total
+        self._sum_us += other._sum_us
+
+    @property
+    def mean_us(self) -> float:
+        return self._sum_us / self.total if self.total else 0.0
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """Cea mai mică valoare sub care se află `percentile`% din înregistrări."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(percentile / 100 * self.total))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self._value_at(i), self.max_us)
+        return self.max_us
+
+    def to_dict(self) -> dict:
+        """Rezumat + găleți nenule (valoare, număr), pentru export JSON."""
+        return {
+            "count": self.total,
+            "min_us": self.min_us,
+            "mean_us": round(self.mean_us, 1),
+            "max_us": self.max_us,
+            "percentiles_us": {f"p{p:g}": self.value_at_percentile(p) for p in self.PERCENTILES},
+            "significant_digits": self.significant_digits,
+            "buckets": [[self._value_at(i), c] for i, c in enumerate(self.counts) if c],
+        }
+
+
+# =============================================================================
+# ȚINTE (un obiect = o conexiune persistentă)
+# =============================================================================
+class Target(Protocol):
+    async def connect(self) -> None: ...
+    async def request(self, seq: int) -> bool: ...
+    def close(self) -> None: ...
+
+
+class TcpTarget:
+    """
+    Conexiune TCP persistentă: o cerere în zbor la un moment dat.
+
+    Dacă response_len e cunoscut, se citesc exact atâția bytes (TCP e un
+    stream, un recv() poate întoarce și jumătate de răspuns).
+    """
+
+    def __init__(self, host: str, port: int, payload: bytes,
+                 response_len: Optional[int] = None, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.payload = payload
+        self.response_len = response_len
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+
+    async def request(self, seq: int) -> bool:
+        try:
+            if self._writer is None:
+                await self.connect()
+            self._writer.write(self.payload)
+            if self.response_len:
+                await asyncio.wait_for(self._reader.readexactly(self.response_len), self.timeout)
+                return True
+            return bool(await asyncio.wait_for(self._reader.read(65536), self.timeout))
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError):
+            # Un răspuns întârziat ar fi atribuit cererii următoare - reconectăm
+            self.close()
+            return False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+class _DatagramWaiter(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.queue.put_nowait(data)
+
+
+class UdpTarget:
+    """
+    Socket UDP "conectat" (propriul port sursă), o cerere în zbor.
+
+    payload(seq) construiește cererea, expect(seq) răspunsul așteptat;
+    răspunsurile vechi (sosite după timeout) sunt ignorate.
+    """
+
+    def __init__(self, host: str, port: int, payload: Callable[[int], bytes],
+                 expect: Optional[Callable[[int], bytes]] = None, timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.payload = payload
+        self.expect = expect
+        self.timeout = timeout
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._protocol: Optional[_DatagramWaiter] = None
+
+    async def connect(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_datagram_endpoint(
+            _DatagramWaiter, remote_addr=(self.host, self.port))
+
+    async def request(self, seq: int) -> bool:
+        if self._transport is None:
+            await self.connect()
+        self._transport.sendto(self.payload(seq))
+        wanted = self.expect(seq) if self.expect else None
+        deadline = time.perf_counter() + self.timeout
+        try:
+            while True:
+                data = await asyncio.wait_for(self._protocol.queue.get(),
+                                              deadline - time.perf_counter())
+                if wanted is None or data == wanted:
+                    return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+        self._transport = self._protocol = None
+
+
+# =============================================================================
+# PROGRAMARE OPEN-LOOP
+# =============================================================================
+@dataclass
+class LoadReport:
+    """Rezultatul unui test open-loop."""
+    protocol: str
+    target: str
+    rate: float
+    duration_s: float
+    connections: int
+    sent: int = 0
+    completed: int = 0
+    errors: int = 0                 # trimise, fără răspuns (timeout, conexiune căzută)
+    dropped: int = 0                # programate, dar netrimise până la final
+    elapsed_s: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)   # toate cererile programate
+    service: LatencyHistogram = field(default_factory=LatencyHistogram)   # doar cererile reușite
+
+    @property
+    def achieved_rate(self) -> float:
+        return self.completed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "protocol": self.protocol,
+            "target": self.target,
+            "requested_rate": self.rate,
+            "achieved_rate": round(self.achieved_rate, 1),
+            "duration_s": self.duration_s,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "connections": self.connections,
+            "sent": self.sent,
+            "completed": self.completed,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "latency": self.latency.to_dict(),      # de la momentul planificat (corectat CO, cu eșecuri)
+            "service_time": self.service.to_dict(), # de la trimiterea efectivă
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary_lines(self) -> List[str]:
+        def ms(us: int) -> str:
+            return f"{us / 1000:8.2f}"
+        lines = [
+            f"{self.protocol.upper()} → {self.target} | rată cerută {self.rate:.0f}/s, "
+            f"obținută {self.achieved_rate:.0f}/s | {self.connections} conexiuni",
+            f"Trimise: {self.sent} | Completate: {self.completed} | "
+            f"Erori/timeout: {self.errors} | Netrimise: {self.dropped}",
+            f"Latența include erorile și cererile netrimise "
+            f"({self.errors + self.dropped} din {self.latency.total}); servirea, doar reușitele",
+            f"{'':<10} {'latență ms':>10} {'servire ms':>10}",
+        ]
+        for p in LatencyHistogram.PERCENTILES:
+            lines.append(f"{f'p{p:g}':<10} {ms(self.latency.value_at_percentile(p)):>10} "
+                         f"{ms(self.service.value_at_percentile(p)):>10}")
+        lines.append(f"{'max':<10} {ms(self.latency.max_us):>10} {ms(self.service.max_us):>10}")
+        return lines
+
+
+async def _run_open_loop(make_target: Callable[[], Target], report: LoadReport,
+                         drain_timeout: float) -> LoadReport:
+    targets = [make_target() for _ in range(report.connections)]
+    await asyncio.gather(*(t.connect() for t in targets))
+
+    # Coada conține momentele planificate; o conexiune liberă ia următoarea cerere
+    queue: asyncio.Queue[Optional[float]] = asyncio.Queue()
+    inflight = {}       # worker → momentul planificat al cererii în zbor
+
+    async def worker(wid: int, target: Target) -> None:
+        while True:
+            intended = await queue.get()
+            if intended is None:
+                return
+            seq = report.sent
+            report.sent += 1
+            inflight[wid] = intended
+            start = time.perf_counter()
+            ok = await target.request(seq)
+            end = time.perf_counter()
+            del inflight[wid]
+            # Și eșecurile intră în histograma corectată (vezi docstring-ul modulului)
+            report.latency.record((end - intended) * 1e6)
+            if ok:
+                report.completed += 1
+                report.service.record((end - start) * 1e6)
+
+    workers = [asyncio.create_task(worker(i, t)) for i, t in enumerate(targets)]
+    total = int(report.rate * report.duration_s)
+    interval = 1.0 / report.rate
+    t0 = time.perf_counter()
+    scheduled = 0
+    while scheduled < total:
+        # Punem în coadă toate cererile scadente; la rate mari, sleep()
+        # are granularitate prea mare pentru a programa câte una
+        now = time.perf_counter()
+        due = min(total, int((now - t0) / interval) + 1)
+        for i in range(scheduled, due):
+            queue.put_nowait(t0 + i * interval)
+        scheduled = due
+        await asyncio.sleep(max(0.0, t0 + scheduled * interval - time.perf_counter()))
+
+    for _ in workers:
+        queue.put_nowait(None)
+    _done, pending = await asyncio.wait(workers, timeout=report.duration_s + drain_timeout)
+    for task in pending:
+        task.cancel()
+    # Cererile rămase fără răspuns: latența până acum este o limită inferioară
+    end = time.perf_counter()
+    for intended in inflight.values():
+        report.latency.record((end - intended) * 1e6)
+    while not queue.empty():
+        intended = queue.get_nowait()
+        if intended is not None:
+            report.latency.record((end - intended) * 1e6)
+    report.dropped = total - report.sent
+    report.errors = report.sent - report.completed
+    report.elapsed_s = time.perf_counter() - t0
+    for t in targets:
+        t.close()
+    return report
+
+
+def run_open_loop(make_target: Callable[[], Target], protocol: str, target: str,
+                  rate: float, duration_s: float, connections: int,
+                  drain_timeout: float = 5.0) -> LoadReport:
+    """
+    Rulează `rate` cereri/s timp de `duration_s` secunde pe `connections`
+    conexiuni persistente create cu make_target().
+    """
+    if rate <= 0 or duration_s <= 0 or connections <= 0:
+        raise ValueError("rate, duration și connections trebuie să fie pozitive")
+    report = LoadReport(protocol=protocol, target=target, rate=rate,
+                        duration_s=duration_s, connections=connections)
+    return asyncio.run(_run_open_loop(make_target, report, drain_timeout))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Apelurile recvmmsg/sendmmsg din libc, prin ctypes (Linux).
+
+Modulul socket nu le expune, deși un singur apel sistem poate primi (sau
+trimite) zeci de datagrame. Aici sunt doar structurile C și funcțiile din
+libc; bucla care le folosește în S2 este în ex_2_02_udp.py (receptorul
+multicast din S3 are propria copie, în WEEK3/python/utils).
+
+Pe alte platforme (sau fără libc) MMSG_AVAILABLE este False, iar
+recvmmsg/sendmmsg sunt None - apelantul alege altă cale (recvmsg_into).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import sys
+
+
+class IoVec(ctypes.Structure):
+    """struct iovec"""
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class MsgHdr(ctypes.Structure):
+    """struct msghdr"""
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(IoVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class MMsgHdr(ctypes.Structure):
+    """struct mmsghdr: un msghdr plus numărul de bytes primiți/trimiși"""
+    _fields_ = [("msg_hdr", MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+MSG_WAITFORONE = 0x10000            # recvmmsg: blochează doar pentru prima datagramă
+SOCKADDR_STORAGE_SIZE = 128         # sizeof(struct sockaddr_storage)
+SOCKADDR_IN_SIZE = 16               # sizeof(struct sockaddr_in)
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    recvmmsg = _libc.recvmmsg
+    sendmmsg = _libc.sendmmsg
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(MMsgHdr), ctypes.c_uint,
+                         ctypes.c_int, ctypes.c_void_p]
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    MMSG_AVAILABLE = sys.platform.startswith("linux")
+except (OSError, AttributeError, TypeError):
+    recvmmsg = sendmmsg = None
+    MMSG_AVAILABLE = False
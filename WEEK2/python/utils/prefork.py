@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Supervisor pre-fork: N procese worker pe același port TCP (SO_REUSEPORT).
+
+Un proces Python execută bytecode pe un singur nucleu (GIL). Cu N procese,
+fiecare cu socket-ul lui de ascultare SO_REUSEPORT pe același port, kernel-ul
+împarte conexiunile noi între ele și serverul folosește N nuclee.
+
+Folosit de ex_2_01; fiecare server își păstrează bucla de servire și îi dă
+supervisorului doar funcția worker. Copie identică a WEEK1/python/utils/
+prefork.py (fiecare săptămână rulează singură); o modificare se face în
+toate copiile.
+
+UTILIZARE:
+    counters = SharedCounters(("connections", "bytes_in"), workers=4)
+    run_prefork("0.0.0.0", 9999, 4, lambda: serve(reuse_port=True), counters)
+    # în worker: counters.add(0) / counters.add(1, len(data))
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+
+# =============================================================================
+# CONTOARE PARTAJATE ÎNTRE PROCESE
+# =============================================================================
+class SharedCounters:
+    """
+    Contoare per worker, într-un mmap anonim creat înainte de fork().
+
+    Memoria anonimă rămâne comună părintelui și copiilor după fork(), deci
+    supervisorul vede ce scriu workerii fără niciun canal de comunicare.
+    Fiecare worker scrie doar în slotul său (fără lock între procese); un
+    worker repornit scrie în același slot, deci totalurile se păstrează.
+    """
+
+    def __init__(self, fields: Sequence[str], workers: int = 1):
+        self.fields = tuple(fields)
+        self.workers = workers
+        self.slot = 0
+        self._values = memoryview(mmap.mmap(-1, 8 * len(self.fields) * workers)).cast("Q")
+        self._lock = threading.Lock()       # thread-urile unui worker scriu același slot
+
+    def add(self, field: int, n: int = 1) -> None:
+        i = self.slot * len(self.fields) + field
+        with self._lock:
+            self._values[i] += n
+
+    def worker(self, slot: int) -> Dict[str, int]:
+        base = slot * len(self.fields)
+        return dict(zip(self.fields, self._values[base:base + len(self.fields)]))
+
+    def total(self) -> Dict[str, int]:
+        n = len(self.fields)
+        return {name: sum(self._values[f::n]) for f, name in enumerate(self.fields)}
+
+
+# =============================================================================
+# SUPERVISOR
+# =============================================================================
+def _raise_interrupt(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def _print_log(message: str) -> None:
+    print(f"[SUPERVISOR] {message}", flush=True)
+
+
+def run_prefork(host: str, port: int, processes: int,
+                worker: Callable[[], Optional[int]],
+                counters: SharedCounters,
+                log: Callable[[str], None] = _print_log,
+                describe: Callable[[Dict[str, int]], str] = str,
+                stats_interval: float = 5.0,
+                rate_field: Optional[str] = None) -> int:
+    """
+    Pornește `processes` workeri (fork) și îi supraveghează până la Ctrl+C/SIGTERM.
+
+    worker() rulează în copil (după ce counters.slot a fost setat) și trebuie
+    să lege propriul socket cu SO_REUSEPORT; valoarea întoarsă e codul de
+    ieșire. Supervisorul nu servește clienți: repornește workerii care mor
+    (cu 1 s pauză dacă mor imediat), afișează periodic contoarele agregate
+    (și rata câmpului rate_field) și, la oprire, contoarele fiecărui worker.
+
+    Returns:
+        0 după oprire, 1 dacă platforma sau portul nu permit pornirea
+    """
+    if not hasattr(socket, "SO_REUSEPORT") or not hasattr(os, "fork"):
+        log("--processes necesită SO_REUSEPORT și fork() (Linux/BSD)")
+        return 1
+
+    # Verificăm portul o singură dată, altfel fiecare worker ar muri la bind()
+    # și supervisorul i-ar reporni la nesfârșit
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            probe.bind((host, port))
+    except OSError as exc:
+        log(f"Nu pot asculta pe {host}:{port}: {exc}")
+        return 1
+
+    workers: Dict[int, tuple] = {}          # pid → (slot, moment pornire)
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Copil: Ctrl+C din terminal ajunge la tot grupul de procese -
+            # îl ignorăm, supervisorul ne oprește explicit cu SIGTERM
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 1
+            try:
+                counters.slot = slot
+                code = worker() or 0
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)          # fără cleanup-ul părintelui
+        workers[pid] = (slot, time.monotonic())
+        log(f"Worker {slot} pornit (pid {pid})")
+
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    log(f"{processes} workeri pe {host}:{port} (SO_REUSEPORT)")
+    for slot in range(processes):
+        spawn(slot)
+
+    last_report, last_total = time.monotonic(), counters.total()
+    try:
+        while True:
+            time.sleep(0.2)
+            # Reaping: waitpid(-1, WNOHANG) întoarce copiii terminați
+            while workers:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+                slot, started = workers.pop(pid)
+                log(f"Worker {slot} (pid {pid}) terminat "
+                    f"(cod {os.waitstatus_to_exitcode(status)}) - repornire")
+                if time.monotonic() - started < 1.0:
+                    time.sleep(1.0)     # moare imediat la pornire - nu intrăm în buclă de fork
+                spawn(slot)
+
+            now = time.monotonic()
+            if now - last_report >= stats_interval:
+                total = counters.total()
+                if total != last_total:
+                    line = f"Total: {describe(total)}"
+                    if rate_field:
+                        rate = (total[rate_field] - last_total[rate_field]) / (now - last_report)
+                        line += f" | {rate:.0f} {rate_field}/s"
+                    log(line)
+                last_report, last_total = now, total
+    except KeyboardInterrupt:
+        log("Oprire workeri...")
+    finally:
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        for slot in range(processes):
+            log(f"Worker {slot}: {describe(counters.worker(slot))}")
+        log(f"Total: {describe(counters.total())}")
+    return 0
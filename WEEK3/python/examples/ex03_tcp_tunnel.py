@@ -29,6 +29,13 @@ PATTERN FORWARDING:
     
     Ambele thread-uri rulează în paralel pentru comunicare full-duplex.
 
+MODUL RELAY (--mode relay / splice):
+    Un singur thread și un singur selector pentru TOATE tunelurile.
+    - relay:  recv_into într-un buffer refolosit (fără bytes nou per chunk)
+    - splice: os.splice socket → pipe → socket (datele nu trec prin user space,
+              doar Linux)
+    Nu se mai loghează fiecare chunk, doar contoare de bytes per tunel.
+
 UTILIZĂRI PRACTICE:
     1. NAT traversal: expune un serviciu din rețea privată
     2. Load balancing simplu: distribuie conexiuni
@@ -44,15 +51,31 @@ RULARE (în Mininet topologie extinsă):
 
     # Client din a1:
     echo "hello" | nc 10.0.1.254 9090 -w 2
+
+    # Multe tuneluri, throughput mare (un proces, un thread):
+    python3 ex03_tcp_tunnel.py --listen 0.0.0.0:9090 --target 10.0.2.1:8080 --mode splice
 """
 from __future__ import annotations
 
 import argparse
+import errno
+import os
+import selectors
 import socket
 import sys
 import threading
+import time
 from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+    import resource
+    POSIX_AVAILABLE = True
+except ImportError:
+    POSIX_AVAILABLE = False
+
+SPLICE_AVAILABLE = hasattr(os, "splice")
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -63,6 +86,12 @@ BUFFER_SIZE = 4096
 DEFAULT_LISTEN = "0.0.0.0:9090"
 DEFAULT_TARGET = "127.0.0.1:8080"
 
+RELAY_CHUNK = 256 * 1024          # Buffer-ul comun al modului relay / capacitate pipe splice
+STATS_INTERVAL = 10.0             # Secunde între rapoartele agregate
+ACCEPT_BACKOFF = 0.5              # Pauză la accept după EMFILE/ENFILE (secunde)
+ACCEPT_EXHAUSTED = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM)
+MODES = ("thread", "relay", "splice")
+
 
 # ════════════════════════════════════════════════════════════════════════════
 #  FUNCȚII UTILITARE
@@ -73,7 +102,7 @@ def timestamp() -> str:
 
 
 def log(level: str, tunnel_id: str, message: str) -> None:
-    print(f"[{timestamp()}] [{level}] [{tunnel_id}] {message}")
+    print(f"[{timestamp()}] [{level}] [{tunnel_id}] {message}", flush=True)
 
 
 def parse_addr(addr_str: str) -> Tuple[str, int]:
@@ -238,33 +267,380 @@ def handle_client(
         log("INFO", tunnel_id, "Tunnel închis")
 
 
+# ════════════════════════════════════════════════════════════════════════════
+#  RELAY CU SELECTOR (UN THREAD PENTRU TOATE TUNELURILE)
+# ════════════════════════════════════════════════════════════════════════════
+
+class _RelayDirection:
+    """
+    O direcție a unui tunel (src → dst) în modul relay.
+    
+    Datele nu stau în buffere per tunel: recv_into scrie în buffer-ul comun al
+    engine-ului și se trimite imediat. Doar restul netrimis (send parțial)
+    este copiat în `backlog`. Cât timp există backlog, src nu mai este citit
+    (backpressure: kernel-ul îl încetinește pe expeditor prin fereastra TCP).
+    
+    În modul splice, datele trec prin pipe-ul kernel (pipe_r, pipe_w), iar
+    `pending` ține minte câți bytes au rămas în pipe.
+    """
+    __slots__ = ("src", "dst", "backlog", "pipe_r", "pipe_w", "pending", "eof", "done", "bytes")
+    
+    def __init__(self, src: socket.socket, dst: socket.socket, use_splice: bool):
+        self.src = src
+        self.dst = dst
+        self.backlog: Optional[memoryview] = None
+        self.pipe_r = self.pipe_w = -1
+        self.pending = 0
+        self.eof = False
+        self.done = False
+        self.bytes = 0
+        if use_splice:
+            self.pipe_r, self.pipe_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+            try:
+                fcntl.fcntl(self.pipe_w, fcntl.F_SETPIPE_SZ, RELAY_CHUNK)
+            except (AttributeError, OSError):
+                pass    # capacitatea implicită (64 KiB) rămâne
+    
+    @property
+    def has_pending(self) -> bool:
+        return self.pending > 0 or self.backlog is not None
+    
+    def pull(self, scratch: memoryview) -> None:
+        """Citește din src și încearcă să trimită imediat în dst."""
+        if self.pipe_w >= 0:
+            n = os.splice(self.src.fileno(), self.pipe_w, RELAY_CHUNK,
+                          flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+            if n == 0:
+                self.eof = True
+            else:
+                self.pending = n
+                self.push()
+            return
+        
+        n = self.src.recv_into(scratch)
+        if n == 0:
+            self.eof = True
+            return
+        sent = 0
+        try:
+            sent = self.dst.send(scratch[:n])
+        except BlockingIOError:
+            pass
+        self.bytes += sent
+        if sent < n:
+            # Singura copiere: restul netrimis, până devine dst scriibil
+            self.backlog = memoryview(bytes(scratch[sent:n]))
+    
+    def push(self) -> None:
+        """Trimite ce a rămas (backlog sau pipe) în dst."""
+        try:
+            if self.pipe_w >= 0:
+                while self.pending:
+                    n = os.splice(self.pipe_r, self.dst.fileno(), self.pending,
+                                  flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+                    self.pending -= n
+                    self.bytes += n
+            elif self.backlog is not None:
+                n = self.dst.send(self.backlog)
+                self.bytes += n
+                self.backlog = self.backlog[n:] if n < len(self.backlog) else None
+        except BlockingIOError:
+            pass
+    
+    def close(self) -> None:
+        for fd in (self.pipe_r, self.pipe_w):
+            if fd >= 0:
+                os.close(fd)
+        self.pipe_r = self.pipe_w = -1
+
+
+class _Tunnel:
+    """Un tunel client ↔ target: două direcții și starea conectării."""
+    __slots__ = ("tunnel_id", "client", "target", "upstream", "downstream",
+                 "connecting", "masks", "started")
+    
+    def __init__(self, tunnel_id: str, client: socket.socket, target: socket.socket,
+                 use_splice: bool):
+        self.tunnel_id = tunnel_id
+        self.client = client
+        self.target = target
+        self.upstream = _RelayDirection(client, target, use_splice)
+        try:
+            self.downstream = _RelayDirection(target, client, use_splice)
+        except OSError:
+            self.upstream.close()
+            raise
+        self.connecting = True
+        self.masks = {client: 0, target: 0}
+        self.started = time.monotonic()
+    
+    def wanted_events(self, sock: socket.socket) -> int:
+        """Evenimentele de care are nevoie `sock` acum (0 = niciunul)."""
+        if self.connecting:
+            return selectors.EVENT_WRITE if sock is self.target else 0
+        out = self.upstream if sock is self.client else self.downstream
+        inn = self.downstream if sock is self.client else self.upstream
+        events = 0
+        if not out.eof and not out.has_pending:
+            events |= selectors.EVENT_READ
+        if inn.has_pending:
+            events |= selectors.EVENT_WRITE
+        return events
+
+
+class RelayEngine:
+    """
+    Forwarder TCP cu un singur selector pentru accept, connect și toate
+    tunelurile. Nu există thread-uri per tunel și nici logging per chunk.
+    """
+    
+    def __init__(self, target_host: str, target_port: int, use_splice: bool = False):
+        self.target = (target_host, target_port)
+        self.use_splice = use_splice
+        self.sel = selectors.DefaultSelector()
+        self.scratch = memoryview(bytearray(RELAY_CHUNK))
+        self.tunnels: set[_Tunnel] = set()
+        self.opened = 0
+        self.total_bytes = 0
+        self.listener: Optional[socket.socket] = None
+        self.accept_paused_until = 0.0   # != 0: listener scos din selector
+    
+    # ── Selector ─────────────────────────────────────────────────────────────
+    
+    def _update(self, tunnel: _Tunnel, sock: socket.socket) -> None:
+        events = tunnel.wanted_events(sock)
+        old = tunnel.masks[sock]
+        if events == old:
+            return
+        if old == 0:
+            self.sel.register(sock, events, tunnel)
+        elif events == 0:
+            self.sel.unregister(sock)
+        else:
+            self.sel.modify(sock, events, tunnel)
+        tunnel.masks[sock] = events
+    
+    def _pause_accept(self, e: OSError) -> None:
+        """
+        Fără descriptori liberi, conexiunea rămâne în backlog și listener-ul
+        rămâne readable: select() ar întoarce imediat, la nesfârșit (100% CPU).
+        Îl scoatem din selector până expiră pauza sau se închide un tunel.
+        """
+        self.sel.unregister(self.listener)
+        self.accept_paused_until = time.monotonic() + ACCEPT_BACKOFF
+        log("ERROR", "MAIN", f"Eroare accept: {e}; pauză {ACCEPT_BACKOFF}s "
+                             f"({len(self.tunnels)} tuneluri active)")
+    
+    def _resume_accept(self) -> None:
+        if self.accept_paused_until:
+            self.accept_paused_until = 0.0
+            self.sel.register(self.listener, selectors.EVENT_READ, None)
+    
+    # ── Ciclul de viață al tunelului ─────────────────────────────────────────
+    
+    def _accept(self, server_socket: socket.socket) -> None:
+        while True:
+            try:
+                client, client_addr = server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                if e.errno in ACCEPT_EXHAUSTED:
+                    self._pause_accept(e)
+                    return
+                # ECONNABORTED etc.: doar conexiunea respectivă e pierdută
+                log("ERROR", "MAIN", f"Eroare accept: {e}")
+                continue
+            
+            self.opened += 1
+            tunnel_id = f"T{self.opened:04d}"
+            target = None
+            try:
+                client.setblocking(False)
+                target = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                target.setblocking(False)
+                err = target.connect_ex(self.target)
+                if err not in (0, errno.EINPROGRESS):
+                    raise OSError(err, os.strerror(err))
+                tunnel = _Tunnel(tunnel_id, client, target, self.use_splice)
+            except OSError as e:
+                log("ERROR", tunnel_id, f"Nu pot deschide tunelul: {e}")
+                client.close()
+                if target is not None:
+                    target.close()
+                if e.errno in ACCEPT_EXHAUSTED:
+                    self._pause_accept(e)
+                    return
+                continue
+            
+            self.tunnels.add(tunnel)
+            log("INFO", tunnel_id, f"Client conectat de la {client_addr[0]}:{client_addr[1]}")
+            self._update(tunnel, target)
+    
+    def _close(self, tunnel: _Tunnel, reason: str = "") -> None:
+        for sock in (tunnel.client, tunnel.target):
+            if tunnel.masks[sock]:
+                self.sel.unregister(sock)
+                tunnel.masks[sock] = 0
+            sock.close()
+        tunnel.upstream.close()
+        tunnel.downstream.close()
+        self.tunnels.discard(tunnel)
+        self._resume_accept()           # s-au eliberat descriptori
+        
+        up, down = tunnel.upstream.bytes, tunnel.downstream.bytes
+        self.total_bytes += up + down
+        elapsed = time.monotonic() - tunnel.started
+        suffix = f" ({reason})" if reason else ""
+        log("INFO", tunnel.tunnel_id,
+            f"Tunnel închis{suffix}: client→target {up} bytes, "
+            f"target→client {down} bytes, {elapsed:.2f}s")
+    
+    def _finish(self, direction: _RelayDirection) -> None:
+        """După EOF și golirea datelor, propagăm EOF (half-close) către dst."""
+        if direction.eof and not direction.has_pending and not direction.done:
+            direction.done = True
+            try:
+                direction.dst.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+    
+    def _on_event(self, tunnel: _Tunnel, sock: socket.socket, events: int) -> None:
+        if tunnel.connecting:
+            err = tunnel.target.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                self._close(tunnel, f"target {self.target[0]}:{self.target[1]}: "
+                                    f"{os.strerror(err)}")
+                return
+            tunnel.connecting = False
+            self._update(tunnel, tunnel.client)
+            self._update(tunnel, tunnel.target)
+            return
+        
+        out = tunnel.upstream if sock is tunnel.client else tunnel.downstream
+        inn = tunnel.downstream if sock is tunnel.client else tunnel.upstream
+        try:
+            if events & selectors.EVENT_WRITE:
+                inn.push()
+                self._finish(inn)
+            if events & selectors.EVENT_READ:
+                out.pull(self.scratch)
+                self._finish(out)
+        except BlockingIOError:
+            pass
+        except (ConnectionResetError, BrokenPipeError) as e:
+            self._close(tunnel, e.strerror or type(e).__name__)
+            return
+        except OSError as e:
+            self._close(tunnel, str(e))
+            return
+        
+        if tunnel.upstream.done and tunnel.downstream.done:
+            self._close(tunnel)
+            return
+        self._update(tunnel, tunnel.client)
+        self._update(tunnel, tunnel.target)
+    
+    # ── Bucla principală ─────────────────────────────────────────────────────
+    
+    def _report(self, last: tuple[float, int]) -> tuple[float, int]:
+        now = time.monotonic()
+        live = sum(t.upstream.bytes + t.downstream.bytes for t in self.tunnels)
+        total = self.total_bytes + live
+        rate = (total - last[1]) * 8 / max(now - last[0], 1e-9) / 1e6
+        log("STAT", "MAIN", f"{len(self.tunnels)} tuneluri active, {self.opened} deschise, "
+                            f"{total} bytes, {rate:.1f} Mbit/s")
+        return now, total
+    
+    def serve(self, server_socket: socket.socket, stats_interval: float = STATS_INTERVAL) -> None:
+        server_socket.setblocking(False)
+        self.listener = server_socket
+        self.sel.register(server_socket, selectors.EVENT_READ, None)
+        last = (time.monotonic(), 0)
+        try:
+            while True:
+                timeout = 1.0
+                if self.accept_paused_until:
+                    timeout = max(0.0, min(timeout, self.accept_paused_until - time.monotonic()))
+                for key, events in self.sel.select(timeout=timeout):
+                    if key.data is None:
+                        self._accept(server_socket)
+                    else:
+                        self._on_event(key.data, key.fileobj, events)
+                if self.accept_paused_until and time.monotonic() >= self.accept_paused_until:
+                    self._resume_accept()
+                if stats_interval and time.monotonic() - last[0] >= stats_interval:
+                    last = self._report(last)
+        finally:
+            for tunnel in list(self.tunnels):
+                self._close(tunnel, "oprire server")
+            self.sel.close()
+
+
+def raise_nofile_limit() -> int:
+    """Ridică limita de descriptori (RLIMIT_NOFILE) la maxim. Returnează limita nouă."""
+    if not POSIX_AVAILABLE:
+        return -1
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            soft = hard
+        except (ValueError, OSError):
+            pass
+    return soft
+
+
 # ════════════════════════════════════════════════════════════════════════════
 #  SERVER PRINCIPAL (ACCEPT LOOP)
 # ════════════════════════════════════════════════════════════════════════════
 
-def run_tunnel(listen_host: str, listen_port: int, target_host: str, target_port: int) -> int:
+def run_tunnel(
+    listen_host: str,
+    listen_port: int,
+    target_host: str,
+    target_port: int,
+    mode: str = "thread"
+) -> int:
     """
     Pornește serverul tunnel care acceptă conexiuni și le redirecționează.
     
-    Pentru fiecare client:
+    Pentru fiecare client (mode="thread"):
     1. Accept conexiune
     2. Pornește thread pentru handle_client
     3. Continuă să accepte alte conexiuni
+    
+    Cu mode="relay" sau "splice", toate tunelurile sunt servite de RelayEngine.
     """
+    if mode == "splice" and not SPLICE_AVAILABLE:
+        print(f"[{timestamp()}] [ERROR] os.splice indisponibil (necesită Linux, Python 3.10+)")
+        return 1
+    
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     
     try:
         server_socket.bind((listen_host, listen_port))
-        server_socket.listen(10)  # Backlog de 10 conexiuni în așteptare
+        if mode == "thread":
+            server_socket.listen(10)  # Backlog de 10 conexiuni în așteptare
+        else:
+            server_socket.listen(socket.SOMAXCONN)
         
         print(f"╔══════════════════════════════════════════════════════════════╗")
         print(f"║  TCP Tunnel activ                                            ║")
         print(f"║  Listen: {listen_host}:{listen_port:<44}║")
         print(f"║  Target: {target_host}:{target_port:<44}║")
+        print(f"║  Mod:    {mode:<52}║")
         print(f"╚══════════════════════════════════════════════════════════════╝")
         print(f"[{timestamp()}] [INFO] Aștept conexiuni... (Ctrl+C pentru oprire)")
         
+        if mode != "thread":
+            nofile = raise_nofile_limit()
+            if nofile > 0:
+                log("INFO", "MAIN", f"Limită descriptori: {nofile}")
+            RelayEngine(target_host, target_port, use_splice=(mode == "splice")).serve(server_socket)
+            return 0
+        
         tunnel_counter = 0
         
         while True:
@@ -327,6 +703,11 @@ Topologie tipică Mininet:
         "--target", default=DEFAULT_TARGET,
         help=f"Adresa serverului țintă (host:port), default: {DEFAULT_TARGET}"
     )
+    parser.add_argument(
+        "--mode", choices=MODES, default="thread",
+        help="thread = 2 thread-uri per tunel (didactic); relay = un selector, "
+             "recv_into; splice = un selector, os.splice (Linux). Default: thread"
+    )
     
     args = parser.parse_args(argv)
     
@@ -337,7 +718,7 @@ Topologie tipică Mininet:
         print(f"Eroare: {e}")
         return 1
     
-    return run_tunnel(listen_host, listen_port, target_host, target_port)
+    return run_tunnel(listen_host, listen_port, target_host, target_port, args.mode)
 
 
 if __name__ == "__main__":
@@ -18,6 +18,9 @@ UTILIZARE:
 RULARE:
     python3 ex04_echo_server.py --listen 0.0.0.0:8080
 
+    # Mai multe procese pe același port (SO_REUSEPORT), câte unul per nucleu:
+    python3 ex04_echo_server.py --listen 0.0.0.0:8080 --processes 4
+
     # Test cu netcat:
     echo "hello" | nc localhost 8080
     # Output: HELLO
@@ -25,13 +28,19 @@ RULARE:
 from __future__ import annotations
 
 import argparse
+import os
 import socket
 import sys
 import threading
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.prefork import SharedCounters, run_prefork
+
 
 BUFFER_SIZE = 4096
+STATS_INTERVAL = 5.0
 
 
 def timestamp() -> str:
@@ -39,13 +48,21 @@ def timestamp() -> str:
 
 
 def log(level: str, message: str) -> None:
-    print(f"[{timestamp()}] [{level}] {message}")
+    print(f"[{timestamp()}] [{level}] {message}", flush=True)
+
+
+# Contoare per proces worker, în memorie partajată (mmap) creată de
+# supervisor înainte de fork() - vezi utils/prefork.py
+COUNTER_FIELDS = ("clients", "bytes")
+CLIENTS, BYTES = range(len(COUNTER_FIELDS))
+COUNTERS = SharedCounters(COUNTER_FIELDS)
 
 
 def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) -> None:
     """Gestionează un client: primește date, răspunde cu uppercase."""
     ip, port = client_addr
     log("CONN", f"Client conectat: {ip}:{port}")
+    COUNTERS.add(CLIENTS)
     
     with client_socket:
         total_bytes = 0
@@ -55,6 +72,7 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
                 break
             
             total_bytes += len(data)
+            COUNTERS.add(BYTES, len(data))
             
             # Transformare uppercase pentru vizibilitate
             response = data.upper()
@@ -72,36 +90,26 @@ def parse_addr(addr_str: str) -> tuple[str, int]:
     return host, int(port)
 
 
-def main(argv: list[str] | None = None) -> int:
-    parser = argparse.ArgumentParser(
-        prog="ex04_echo_server.py",
-        description="Server TCP echo simplu (returnează uppercase)."
-    )
-    parser.add_argument(
-        "--listen", default="0.0.0.0:8080",
-        help="Adresa de ascultare (host:port sau doar port)"
-    )
-    parser.add_argument(
-        "--single", action="store_true",
-        help="Mod single-client (fără threading)"
-    )
-    args = parser.parse_args(argv)
-    
-    host, port = parse_addr(args.listen)
-    
+def serve(host: str, port: int, single: bool, reuse_port: bool = False) -> int:
+    """Bucla accept → handle_client (un proces)."""
     server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        # Toți workerii ascultă pe același port; kernel-ul alege workerul
+        # pentru fiecare conexiune nouă (hash pe adresa/portul clientului)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     
     try:
         server.bind((host, port))
         server.listen(5)
-        log("INFO", f"Echo server pornit pe {host}:{port}")
+        log("INFO", f"Echo server pornit pe {host}:{port}"
+                    + (f" (worker pid {os.getpid()})" if reuse_port else ""))
         log("INFO", "Aștept conexiuni... (Ctrl+C pentru oprire)")
         
         while True:
             client_socket, client_addr = server.accept()
             
-            if args.single:
+            if single:
                 # Mod blocking (un client la un moment dat)
                 handle_client(client_socket, client_addr)
             else:
@@ -125,5 +133,50 @@ def main(argv: list[str] | None = None) -> int:
     return 0
 
 
+def _describe(values: dict[str, int]) -> str:
+    return f"{values['clients']} clienți, {values['bytes']} bytes"
+
+
+def supervise(host: str, port: int, single: bool, processes: int) -> int:
+    """
+    Supervisor: pornește `processes` workeri (fork) pe același port.
+    
+    Fiecare worker e un proces separat, cu propriul GIL, deci ecoul
+    scalează pe mai multe nuclee. Workerii morți sunt reporniți, iar
+    contoarele tuturor sunt afișate periodic și la oprire.
+    """
+    global COUNTERS
+    COUNTERS = SharedCounters(COUNTER_FIELDS, processes)
+    return run_prefork(host, port, processes,
+                       lambda: serve(host, port, single, reuse_port=True), COUNTERS,
+                       log=lambda msg: log("SUPV", msg), describe=_describe,
+                       stats_interval=STATS_INTERVAL)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="ex04_echo_server.py",
+        description="Server TCP echo simplu (returnează uppercase)."
+    )
+    parser.add_argument(
+        "--listen", default="0.0.0.0:8080",
+        help="Adresa de ascultare (host:port sau doar port)"
+    )
+    parser.add_argument(
+        "--single", action="store_true",
+        help="Mod single-client (fără threading)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Număr de procese worker pe același port (SO_REUSEPORT)"
+    )
+    args = parser.parse_args(argv)
+    
+    host, port = parse_addr(args.listen)
+    if args.processes > 1:
+        return supervise(host, port, args.single, args.processes)
+    return serve(host, port, args.single)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -31,6 +31,15 @@ RULARE:
     nc 127.0.0.1 3333
     # Scrieți text, primiți răspuns uppercase
 
+    # Chat: mesajele sunt trimise și celorlalți clienți (broadcast)
+    python3 ex05_tcp_multiclient.py --broadcast --policy coalesce
+
+BROADCAST:
+    Scrierile către clienți trec prin BroadcastEngine (utils/broadcast_engine.py):
+    cozi mărginite per client + scrieri non-blocante. Un client care nu
+    citește nu mai blochează mesajele celorlalți; politica --policy decide
+    ce se întâmplă când coada lui se umple.
+
 OBSERVAȚII WIRESHARK:
     - Fiecare client are propriul TCP stream
     - Mesajele sunt independente pe fiecare stream
@@ -39,11 +48,16 @@ OBSERVAȚII WIRESHARK:
 from __future__ import annotations
 
 import argparse
+import os
 import socket
 import sys
 import threading
 from datetime import datetime
-from typing import Set
+from typing import Optional, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.broadcast_engine import BroadcastEngine, DEFAULT_MAX_QUEUE, POLICIES
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -75,22 +89,30 @@ class ClientManager:
     """
     Gestionează lista de clienți conectați.
     Thread-safe prin utilizarea unui Lock.
+    
+    Toate scrierile către clienți trec prin BroadcastEngine, în ordine.
+    Politica pentru clienți lenți se aplică doar broadcast-ului; răspunsul
+    direct (ecoul) nu se pierde niciodată - dacă un client nu citește,
+    doar thread-ul lui așteaptă.
     """
     
-    def __init__(self):
+    def __init__(self, engine: Optional[BroadcastEngine] = None):
         self.clients: Set[socket.socket] = set()
         self.lock = threading.Lock()
         self.client_counter = 0
+        self.engine = engine or BroadcastEngine()
     
     def add(self, client: socket.socket) -> int:
         """Adaugă un client și returnează ID-ul său."""
+        self.engine.add(client)
         with self.lock:
             self.client_counter += 1
             self.clients.add(client)
             return self.client_counter
     
     def remove(self, client: socket.socket) -> None:
-        """Elimină un client din listă."""
+        """Elimină un client din listă (înainte de close())."""
+        self.engine.remove(client)
         with self.lock:
             self.clients.discard(client)
     
@@ -99,26 +121,29 @@ class ClientManager:
         with self.lock:
             return len(self.clients)
     
+    def send(self, client: socket.socket, message: bytes) -> None:
+        """Trimite mesaj unui singur client (prin coada lui, fără pierderi)."""
+        self.engine.send(client, message, droppable=False)
+    
     def broadcast(self, message: bytes, exclude: socket.socket = None) -> None:
         """Trimite mesaj către toți clienții (pentru exercițiul chat)."""
-        with self.lock:
-            for client in self.clients:
-                if client != exclude:
-                    try:
-                        client.sendall(message)
-                    except OSError:
-                        pass
+        self.engine.broadcast(message, exclude=exclude)
 
 
-# Instanță globală pentru managementul clienților
-manager = ClientManager()
+# Instanță globală pentru managementul clienților; creată în run_server()/main(),
+# nu la import (engine-ul deschide un socketpair și un selector)
+manager: Optional[ClientManager] = None
 
 
 # ════════════════════════════════════════════════════════════════════════════
 #  HANDLER CLIENT
 # ════════════════════════════════════════════════════════════════════════════
 
-def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) -> None:
+def handle_client(
+    client_socket: socket.socket,
+    client_addr: tuple[str, int],
+    chat: bool = False
+) -> None:
     """
     Handler pentru un client individual.
     Rulează în thread separat.
@@ -126,6 +151,7 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
     Comportament:
     - Primește mesaje de la client
     - Răspunde cu mesajul în uppercase
+    - Cu chat=True, trimite mesajul și celorlalți clienți
     - Se oprește când clientul închide conexiunea
     """
     ip, port = client_addr
@@ -138,7 +164,7 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
     try:
         # Mesaj de bun venit
         welcome = f"Bine ai venit! Ești clientul #{client_id}. Scrie ceva:\n"
-        client_socket.sendall(welcome.encode("utf-8"))
+        manager.send(client_socket, welcome.encode("utf-8"))
         
         while True:
             # ─────────────────────────────────────────────────────────────────
@@ -157,9 +183,12 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
             
             # Răspuns: uppercase
             response = data.upper()
-            client_socket.sendall(response)
+            manager.send(client_socket, response)
             log("SEND", thread_id, f"→ {response.decode('utf-8', errors='replace').strip()!r}")
             
+            if chat:
+                manager.broadcast(f"[{thread_id}] ".encode("utf-8") + data, exclude=client_socket)
+            
     except ConnectionResetError:
         log("WARN", thread_id, f"Conexiune resetată de {ip}:{port}")
     except BrokenPipeError:
@@ -180,7 +209,7 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
 #  SERVER PRINCIPAL
 # ════════════════════════════════════════════════════════════════════════════
 
-def run_server(host: str, port: int) -> int:
+def run_server(host: str, port: int, chat: bool = False) -> int:
     """
     Pornește serverul TCP multiclient.
     
@@ -189,6 +218,9 @@ def run_server(host: str, port: int) -> int:
     2. Pornește thread pentru handle_client
     3. Revine la accept()
     """
+    global manager
+    if manager is None:
+        manager = ClientManager()
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     
     try:
@@ -205,7 +237,10 @@ def run_server(host: str, port: int) -> int:
         print("╔══════════════════════════════════════════════════════════════╗")
         print("║  TCP Server Multiclient (Thread per Client)                  ║")
         print(f"║  Ascultă pe: {host}:{port:<43}║")
+        print(f"║  Broadcast: {'da' if chat else 'nu'}, politică clienți lenți: "
+              f"{manager.engine.policy:<19}║")
         print("╚══════════════════════════════════════════════════════════════╝")
+        manager.engine.start()
         log("INFO", "MAIN", f"Server pornit. Aștept conexiuni...")
         log("INFO", "MAIN", "Test: nc {host} {port}".format(host=host, port=port))
         
@@ -219,7 +254,7 @@ def run_server(host: str, port: int) -> int:
             # Pornire thread pentru acest client
             client_thread = threading.Thread(
                 target=handle_client,
-                args=(client_socket, client_addr),
+                args=(client_socket, client_addr, chat),
                 daemon=True  # Thread se oprește când procesul principal se oprește
             )
             client_thread.start()
@@ -232,6 +267,8 @@ def run_server(host: str, port: int) -> int:
         return 1
     finally:
         server_socket.close()
+        manager.engine.stop()
+        log("STAT", "MAIN", manager.engine.summary())
         log("INFO", "MAIN", "Server închis")
     
     return 0
@@ -254,9 +291,23 @@ def main(argv: list[str] | None = None) -> int:
         "--port", type=int, default=DEFAULT_PORT,
         help=f"Portul de ascultare (default: {DEFAULT_PORT})"
     )
+    parser.add_argument(
+        "--broadcast", action="store_true",
+        help="Trimite fiecare mesaj și celorlalți clienți (chat)"
+    )
+    parser.add_argument(
+        "--policy", choices=POLICIES, default="drop",
+        help="Ce se întâmplă când coada unui client lent e plină (default: drop)"
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+        help=f"Mesaje maxime în coada de ieșire a unui client (default: {DEFAULT_MAX_QUEUE})"
+    )
     args = parser.parse_args(argv)
     
-    return run_server(args.host, args.port)
+    global manager
+    manager = ClientManager(BroadcastEngine(max_queue=args.max_queue, policy=args.policy))
+    return run_server(args.host, args.port, args.broadcast)
 
 
 if __name__ == "__main__":
@@ -36,12 +36,21 @@ SOLUȚII DE FRAMING:
        - Pentru protocoale complexe cu multiple tipuri de mesaje
        - Folosit de: ASN.1/BER, protocoale binare custom
 
+RECV EFICIENT (FramedStream):
+    recv(1) + `buffer += chunk` înseamnă un syscall per byte și copieri care
+    cresc cu mărimea mesajului (cost pătratic). FramedStream citește cu
+    recv_into() în același bytearray și extrage TOATE cadrele complete
+    dintr-un singur recv.
+
 RULARE:
     # Terminal 1: Server
     python3 ex06_tcp_framing.py server --port 4444
 
     # Terminal 2: Client
     python3 ex06_tcp_framing.py client --port 4444
+
+    # Benchmark: funcțiile simple vs FramedStream (mesaje/s)
+    python3 ex06_tcp_framing.py bench
 """
 from __future__ import annotations
 
@@ -49,8 +58,10 @@ import argparse
 import socket
 import struct
 import sys
+import threading
 import time
 from datetime import datetime
+from typing import List
 
 
 def timestamp() -> str:
@@ -157,6 +168,187 @@ def send_length_prefixed(sock: socket.socket, message: bytes) -> None:
     sock.sendall(header + message)
 
 
+# ════════════════════════════════════════════════════════════════════════════
+#  SOLUȚIA 3: FRAMEDSTREAM (BUFFER REFOLOSIT + recv_into)
+# ════════════════════════════════════════════════════════════════════════════
+
+LENGTH_HEADER = struct.Struct(">I")
+
+
+class FramedStream:
+    """
+    Cititor de cadre peste un socket TCP, cu buffer intern refolosit.
+    
+    Buffer-ul este un bytearray cu doi indecși: datele necitite sunt în
+    [start:end]. recv_into() scrie direct după `end`; când nu mai e loc,
+    restul necitit se mută la început (compactare), iar buffer-ul crește doar
+    dacă un singur cadru nu încape.
+    
+    Un recv_into() mare poate aduce mai multe cadre; recv_lines() și
+    recv_messages() le returnează pe toate, fără alt syscall. Cadrele
+    length-prefix mai mari de jumătate din buffer sunt citite direct din
+    socket, ocolind buffer-ul (altfel ar fi copiate de două ori); după un
+    astfel de cadru se citește doar header-ul următorului, fără read-ahead.
+    
+    Exemplu:
+        stream = FramedStream(sock)
+        for line in stream.recv_lines():       # toate liniile complete
+            ...
+        msg = stream.recv_message()            # un cadru length-prefix
+    """
+    
+    def __init__(self, sock: socket.socket, bufsize: int = 65536, max_frame: int = 16 * 1024 * 1024):
+        self.sock = sock
+        self.max_frame = max_frame
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._scanned = 0       # până unde am căutat deja delimitatorul
+        self._large = False     # ultimul cadru a fost citit direct (fără read-ahead)
+        self.syscalls = 0
+    
+    @property
+    def buffered(self) -> int:
+        """Bytes primiți dar încă neconsumați."""
+        return self._end - self._start
+    
+    # ── Umplere buffer ───────────────────────────────────────────────────────
+    
+    def _reserve(self, need: int) -> None:
+        """Asigură `need` bytes liberi după `end` (compactare sau creștere)."""
+        if len(self._buf) - self._end >= need:
+            return
+        pending = self._end - self._start
+        if pending + need > len(self._buf):
+            size = len(self._buf)
+            while size < pending + need:
+                size *= 2
+            self._view.release()
+            new = bytearray(size)
+            new[:pending] = self._buf[self._start:self._end]
+            self._buf = new
+            self._view = memoryview(self._buf)
+        elif pending:
+            self._buf[:pending] = self._buf[self._start:self._end]
+        self._scanned -= self._start
+        self._start, self._end = 0, pending
+    
+    def _fill(self, need: int = 1, exact: bool = False) -> int:
+        """Un singur recv_into(); returnează bytes citiți (0 = EOF)."""
+        self._reserve(max(need, 4096))
+        n = self.sock.recv_into(self._view[self._end:self._end + need] if exact
+                                else self._view[self._end:])
+        self.syscalls += 1
+        self._end += n
+        return n
+    
+    def _eof(self) -> None:
+        if self.buffered:
+            raise ConnectionError(f"Conexiune închisă cu {self.buffered} bytes dintr-un cadru incomplet")
+        raise ConnectionError("Conexiune închisă")
+    
+    # ── Extragere din buffer (fără syscall) ──────────────────────────────────
+    
+    def _take(self, n: int) -> bytes:
+        data = bytes(self._view[self._start:self._start + n])
+        self._start += n
+        if self._start == self._end:
+            self._start = self._end = 0
+        self._scanned = self._start
+        return data
+    
+    def _parse_lines(self, delimiter: bytes, limit: int) -> List[bytes]:
+        frames = []
+        buf, dlen = self._buf, len(delimiter)
+        while len(frames) < limit:
+            # Căutăm doar în datele noi (minus dlen-1, delimitatorul poate fi rupt)
+            pos = buf.find(delimiter, max(self._start, self._scanned - dlen + 1), self._end)
+            if pos < 0:
+                self._scanned = self._end
+                if self.buffered > self.max_frame:
+                    raise ValueError(f"Linie mai lungă de {self.max_frame} bytes fără delimitator")
+                break
+            frames.append(bytes(self._view[self._start:pos]))
+            self._start = self._scanned = pos + dlen
+        if self._start == self._end:
+            self._start = self._end = self._scanned = 0
+        return frames
+    
+    def _parse_messages(self, limit: int) -> tuple[List[bytes], int, int]:
+        """
+        Returnează (cadre complete, bytes lipsă pentru următorul cadru,
+        lungimea următorului cadru dacă este incomplet, altfel 0).
+        """
+        frames = []
+        while len(frames) < limit:
+            if self.buffered < LENGTH_HEADER.size:
+                return frames, LENGTH_HEADER.size - self.buffered, 0
+            (length,) = LENGTH_HEADER.unpack_from(self._buf, self._start)
+            if length > self.max_frame:
+                raise ValueError(f"Cadru de {length} bytes depășește limita de {self.max_frame}")
+            total = LENGTH_HEADER.size + length
+            if self.buffered < total:
+                return frames, total - self.buffered, length
+            self._start += LENGTH_HEADER.size
+            frames.append(self._take(length))
+        return frames, 0, 0
+    
+    def _recv_large(self, length: int) -> bytes:
+        """Cadru mare: restul datelor vin direct din recv(), nu prin buffer."""
+        self._start += LENGTH_HEADER.size
+        chunks = [self._take(self.buffered)] if self.buffered else []
+        remaining = length - sum(map(len, chunks))
+        while remaining:
+            chunk = self.sock.recv(remaining)
+            self.syscalls += 1
+            if not chunk:
+                raise ConnectionError(f"Conexiune închisă. Primit {length - remaining}/{length} bytes.")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    
+    # ── API ──────────────────────────────────────────────────────────────────
+    
+    def recv_lines(self, delimiter: bytes = b"\n", limit: int = 1 << 30) -> List[bytes]:
+        """Toate mesajele delimitate deja complete (cel puțin unul). Fără delimitator."""
+        while True:
+            frames = self._parse_lines(delimiter, limit)
+            if frames:
+                return frames
+            if not self._fill():
+                self._eof()
+    
+    def recv_line(self, delimiter: bytes = b"\n") -> bytes:
+        """Un singur mesaj delimitat; restul rămâne în buffer."""
+        return self.recv_lines(delimiter, limit=1)[0]
+    
+    def recv_messages(self, limit: int = 1 << 30) -> List[bytes]:
+        """Toate mesajele length-prefix deja complete (cel puțin unul)."""
+        while True:
+            frames, missing, length = self._parse_messages(limit)
+            if frames:
+                return frames
+            if length > len(self._buf) // 2:
+                self._large = True
+                return [self._recv_large(length)]
+            if length:
+                self._large = False
+            if not self._fill(missing, exact=self._large):
+                self._eof()
+    
+    def recv_message(self) -> bytes:
+        """Un singur mesaj length-prefix (4 bytes big-endian + date)."""
+        return self.recv_messages(limit=1)[0]
+    
+    def recv_exact(self, n: int) -> bytes:
+        """Exact n bytes (folosind întâi ce e deja în buffer)."""
+        while self.buffered < n:
+            if not self._fill(n - self.buffered):
+                self._eof()
+        return self._take(n)
+
+
 # ════════════════════════════════════════════════════════════════════════════
 #  SERVER DEMO
 # ════════════════════════════════════════════════════════════════════════════
@@ -180,13 +372,15 @@ def run_server(port: int) -> int:
         log("CONN", f"Client conectat: {addr}")
         
         with client:
+            stream = FramedStream(client)
+            
             # ─────────────────────────────────────────────────────────────────
             # Demo 1: Primire cu DELIMITATOR
             # ─────────────────────────────────────────────────────────────────
             log("INFO", "══ Demo 1: FRAMING CU DELIMITATOR (newline) ══")
             
             for i in range(3):
-                msg = recv_with_delimiter(client, b"\n")
+                msg = stream.recv_line(b"\n")
                 log("RECV", f"Mesaj #{i+1}: {msg.decode()!r}")
             
             client.sendall(b"ACK:delimiter_ok\n")
@@ -197,10 +391,11 @@ def run_server(port: int) -> int:
             log("INFO", "══ Demo 2: FRAMING CU LENGTH-PREFIX (4 bytes) ══")
             
             for i in range(3):
-                msg = recv_length_prefixed(client)
+                msg = stream.recv_message()
                 log("RECV", f"Mesaj #{i+1}: {msg!r} ({len(msg)} bytes)")
             
             send_length_prefixed(client, b"ACK:length_prefix_ok")
+            log("INFO", f"recv_into() apelat de {stream.syscalls} ori pentru 6 mesaje")
             
         log("INFO", "Demo complet!")
         
@@ -226,6 +421,7 @@ def run_client(host: str, port: int) -> int:
     try:
         sock.connect((host, port))
         log("CONN", f"Conectat la {host}:{port}")
+        stream = FramedStream(sock)
         
         # ─────────────────────────────────────────────────────────────────────
         # Demo 1: Trimitere cu DELIMITATOR
@@ -239,7 +435,7 @@ def run_client(host: str, port: int) -> int:
             time.sleep(0.1)  # Mică pauză pentru demonstrație
         
         # Așteptăm ACK
-        ack = recv_with_delimiter(sock, b"\n")
+        ack = stream.recv_line(b"\n")
         log("RECV", f"Server ACK: {ack.decode()!r}")
         
         # ─────────────────────────────────────────────────────────────────────
@@ -259,7 +455,7 @@ def run_client(host: str, port: int) -> int:
             time.sleep(0.1)
         
         # Așteptăm ACK
-        ack = recv_length_prefixed(sock)
+        ack = stream.recv_message()
         log("RECV", f"Server ACK: {ack!r}")
         
         log("INFO", "Demo complet!")
@@ -276,6 +472,92 @@ def run_client(host: str, port: int) -> int:
     return 0
 
 
+# ════════════════════════════════════════════════════════════════════════════
+#  BENCHMARK: FUNCȚII SIMPLE vs FRAMEDSTREAM
+# ════════════════════════════════════════════════════════════════════════════
+
+def _bench_case(payload: bytes, count: int, framing: str, reader) -> float:
+    """Trimite `count` cadre printr-un socketpair și măsoară cititorul (mesaje/s)."""
+    if framing == "delimiter":
+        frame = payload + b"\n"
+    else:
+        frame = LENGTH_HEADER.pack(len(payload)) + payload
+    blob = frame * count
+    
+    rx, tx = socket.socketpair()
+    writer = threading.Thread(target=tx.sendall, args=(blob,), daemon=True)
+    try:
+        start = time.perf_counter()
+        writer.start()
+        received = reader(rx, count)
+        elapsed = time.perf_counter() - start
+        writer.join()
+    finally:
+        rx.close()
+        tx.close()
+    if received != count:
+        raise AssertionError(f"{received}/{count} cadre primite")
+    return count / elapsed
+
+
+def _read_simple_lines(sock: socket.socket, count: int) -> int:
+    for _ in range(count):
+        recv_with_delimiter(sock, b"\n")
+    return count
+
+
+def _read_simple_prefixed(sock: socket.socket, count: int) -> int:
+    for _ in range(count):
+        recv_length_prefixed(sock)
+    return count
+
+
+def _read_stream_lines(sock: socket.socket, count: int) -> int:
+    stream, got = FramedStream(sock), 0
+    while got < count:
+        got += len(stream.recv_lines())
+    return got
+
+
+def _read_stream_prefixed(sock: socket.socket, count: int) -> int:
+    stream, got = FramedStream(sock), 0
+    while got < count:
+        got += len(stream.recv_messages())
+    return got
+
+
+def run_benchmark(budget: float = 1.0) -> int:
+    """Compară funcțiile simple cu FramedStream pe mesaje mici și mari."""
+    print("╔══════════════════════════════════════════════════════════════╗")
+    print("║  Benchmark framing: funcții simple vs FramedStream           ║")
+    print("╚══════════════════════════════════════════════════════════════╝")
+    print(f"  {'framing':<10} {'mesaj':>8} {'simplu (msg/s)':>16} {'FramedStream':>14} {'speedup':>8}")
+    
+    cases = [("delimiter", 32), ("delimiter", 1024), ("delimiter", 16384),
+             ("prefix", 32), ("prefix", 1024), ("prefix", 65536)]
+    readers = {
+        "delimiter": (_read_simple_lines, _read_stream_lines),
+        "prefix": (_read_simple_prefixed, _read_stream_prefixed),
+    }
+    for framing, size in cases:
+        payload = b"x" * size
+        simple, framed = readers[framing]
+        
+        # Calibrăm numărul de mesaje după funcția simplă, ca să nu dureze minute
+        count = 16
+        while True:
+            rate_simple = _bench_case(payload, count, framing, simple)
+            if count / rate_simple >= budget / 4 or count >= 1 << 20:
+                break
+            count *= 4
+        rate_simple = _bench_case(payload, count, framing, simple)
+        rate_framed = max(_bench_case(payload, count, framing, framed) for _ in range(3))
+        
+        print(f"  {framing:<10} {size:>7}B {rate_simple:>16,.0f} {rate_framed:>14,.0f} "
+              f"{rate_framed / rate_simple:>7.1f}x")
+    return 0
+
+
 # ════════════════════════════════════════════════════════════════════════════
 #  MAIN
 # ════════════════════════════════════════════════════════════════════════════
@@ -297,10 +579,17 @@ def main(argv: list[str] | None = None) -> int:
     pc.add_argument("--host", default="127.0.0.1")
     pc.add_argument("--port", type=int, default=4444)
     
+    # Benchmark
+    pb = subparsers.add_parser("bench", help="Funcții simple vs FramedStream (mesaje/s)")
+    pb.add_argument("--budget", type=float, default=1.0,
+                    help="Durata aproximativă per caz, în secunde (default: 1.0)")
+    
     args = parser.parse_args(argv)
     
     if args.mode == "server":
         return run_server(args.port)
+    elif args.mode == "bench":
+        return run_benchmark(args.budget)
     else:
         return run_client(args.host, args.port)
 
@@ -28,27 +28,72 @@ PROTOCOL DEMONSTRAT:
     BYE:abc123 ─────────────►
                         ◄────── BYE_ACK:abc123
 
+MOD FEREASTRĂ GLISANTĂ (transfer bulk):
+    Stop-and-wait trimite un mesaj per RTT. Cu o fereastră de W mesaje în
+    zbor, throughput-ul crește de ~W ori (până la capacitatea link-ului).
+
+    DATA:abc123:1:<bytes> ──►
+    DATA:abc123:2:<bytes> ──►     (pierdut)
+    DATA:abc123:3:<bytes> ──►
+                        ◄────── SACK:abc123:1:1:      (cumulativ 1, declanșat de 1)
+                        ◄────── SACK:abc123:1:3:3-3   (selectiv: am și 3)
+    DATA:abc123:2:<bytes> ──►     (retransmis după 3 SACK-uri peste gaura 2
+                                   sau la expirarea RTO)
+                        ◄────── SACK:abc123:3:2:
+
+    SACK:token:<cumulativ>:<seq care l-a declanșat>:<blocuri a-b,c-d>
+    BYE:abc123 ─────────────►
+                        ◄────── BYE_ACK:abc123:<bytes>:<sha256>
+
+    - Serverul păstrează per sesiune un buffer de reordonare (seq → date)
+      și livrează în ordine
+    - Clientul estimează RTT (SRTT, RTTVAR) și calculează RTO adaptiv
+      (RFC 6298, algoritmul lui Karn, backoff exponențial)
+
 RULARE:
     # Server:
     python3 ex07_udp_session_ack.py server --port 5555
 
     # Client:
     python3 ex07_udp_session_ack.py client --port 5555 --messages 5
+
+    # Transfer bulk de 5 MB cu fereastră de 64 (în Mininet: link cu netem loss)
+    python3 ex07_udp_session_ack.py client --port 5555 --bulk 5000000 --window 64
+
+    # Fără Mininet: pierderi simulate în client (5% în ambele direcții)
+    python3 ex07_udp_session_ack.py client --port 5555 --bulk 5000000 --window 64 --loss 0.05
+
+    # Self-test (reordonare, SACK), fără rețea
+    python3 ex07_udp_session_ack.py selftest
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import os
 import random
+import select
 import socket
 import string
 import sys
 import time
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 BUFFER_SIZE = 65535
 
+# Mod fereastră glisantă
+DEFAULT_CHUNK = 1200          # Bytes de date per datagramă (sub MTU-ul Ethernet)
+DEFAULT_WINDOW = 64           # Datagrame în zbor
+MAX_SACK_BLOCKS = 16          # Blocuri selective raportate per SACK
+REORDER_LIMIT = 8192          # Cât de departe de `expected` acceptă serverul
+DUP_THRESH = 3                # SACK-uri peste o gaură înainte de retransmisie rapidă
+RTO_INITIAL = 1.0             # Secunde, înainte de primul eșantion RTT (RFC 6298)
+RTO_MIN = 0.02                # RFC 6298 cere 1s; pentru LAN/Mininet e prea mult
+RTO_MAX = 4.0
+CLOSED_SESSIONS_KEPT = 1024   # Răspunsuri BYE_ACK păstrate pentru BYE retransmis
+
 
 def timestamp() -> str:
     return datetime.now().strftime("%H:%M:%S.%f")[:-3]
@@ -75,6 +120,51 @@ class Session:
         self.addr = addr
         self.message_count = 0
         self.created_at = time.time()
+        
+        # Mod fereastră: livrare în ordine + buffer de reordonare
+        self.expected = 1                       # următorul seq așteptat
+        self.reorder: Dict[int, bytes] = {}     # seq > expected, primite deja
+        self.bytes_received = 0
+        self.duplicates = 0
+        self.digest = hashlib.sha256()
+    
+    def accept_data(self, seq: int, payload: bytes) -> None:
+        """Primește un DATA: livrează în ordine sau îl pune în buffer-ul de reordonare."""
+        if seq < self.expected or seq in self.reorder:
+            self.duplicates += 1
+            return
+        if seq >= self.expected + REORDER_LIMIT:
+            return      # prea departe în viitor; clientul îl va retransmite
+        if seq != self.expected:
+            self.reorder[seq] = payload
+            return
+        self._deliver(payload)
+        while self.expected in self.reorder:
+            self._deliver(self.reorder.pop(self.expected))
+    
+    def _deliver(self, payload: bytes) -> None:
+        self.digest.update(payload)
+        self.bytes_received += len(payload)
+        self.expected += 1
+    
+    def sack(self, seq: int) -> str:
+        """SACK:token:cumulativ:seq:a-b,c-d (blocuri primite peste gaură)."""
+        blocks: List[str] = []
+        start = prev = None
+        for s in sorted(self.reorder):
+            if start is None:
+                start = prev = s
+            elif s == prev + 1:
+                prev = s
+            else:
+                blocks.append(f"{start}-{prev}")
+                if len(blocks) == MAX_SACK_BLOCKS:
+                    start = None
+                    break
+                start = prev = s
+        if start is not None:
+            blocks.append(f"{start}-{prev}")
+        return f"SACK:{self.token}:{self.expected - 1}:{seq}:{','.join(blocks)}"
     
     def __repr__(self):
         return f"Session({self.token}, {self.addr}, msgs={self.message_count})"
@@ -87,13 +177,20 @@ def run_server(port: int) -> int:
     Protocolul:
     - HELLO → generează token și îl trimite
     - MSG:token:data → procesează, trimite ACK
+    - DATA:token:seq:bytes → reordonează, trimite SACK (fără log per datagramă)
     - BYE:token → închide sesiunea
     """
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    except OSError:
+        pass
     
     # Dicționar: token → Session
     sessions: Dict[str, Session] = {}
+    # token → BYE_ACK trimis (dacă BYE_ACK se pierde, clientul repetă BYE)
+    closed: Dict[str, bytes] = {}
     
     try:
         sock.bind(("0.0.0.0", port))
@@ -106,6 +203,24 @@ def run_server(port: int) -> int:
         
         while True:
             data, addr = sock.recvfrom(BUFFER_SIZE)
+            
+            if data.startswith(b"DATA:"):
+                # Format: DATA:token:seq:payload (payload binar, nu se decodează)
+                parts = data.split(b":", 3)
+                session = sessions.get(parts[1].decode("ascii", errors="replace")) \
+                    if len(parts) == 4 else None
+                if session is None:
+                    sock.sendto(b"ERROR:token_invalid", addr)
+                    continue
+                try:
+                    seq = int(parts[2])
+                except ValueError:
+                    sock.sendto(b"ERROR:format_invalid", addr)
+                    continue
+                session.accept_data(seq, parts[3])
+                sock.sendto(session.sack(seq).encode(), addr)
+                continue
+            
             text = data.decode("utf-8", errors="replace").strip()
             
             log("RECV", f"De la {addr[0]}:{addr[1]} → {text!r}")
@@ -155,9 +270,18 @@ def run_server(port: int) -> int:
                 if token in sessions:
                     session = sessions.pop(token)
                     response = f"BYE_ACK:{token}"
+                    if session.bytes_received:
+                        response += f":{session.bytes_received}:{session.digest.hexdigest()[:16]}"
+                        log("INFO", f"[{token}] Transfer: {session.bytes_received} bytes în "
+                                    f"{session.expected - 1} datagrame, {session.duplicates} duplicate")
                     sock.sendto(response.encode(), addr)
                     log("SEND", f"→ {response}")
                     log("INFO", f"Sesiune închisă: {token} (total mesaje: {session.message_count})")
+                    closed[token] = response.encode()
+                    if len(closed) > CLOSED_SESSIONS_KEPT:
+                        closed.pop(next(iter(closed)))
+                elif token in closed:
+                    sock.sendto(closed[token], addr)
                 else:
                     sock.sendto(b"ERROR:token_invalid", addr)
                     
@@ -277,6 +401,244 @@ def run_client(host: str, port: int, num_messages: int, timeout: float) -> int:
     return 0
 
 
+# ════════════════════════════════════════════════════════════════════════════
+#  CLIENT: Transfer bulk cu fereastră glisantă și SACK
+# ════════════════════════════════════════════════════════════════════════════
+
+class RttEstimator:
+    """
+    Estimare RTT și RTO adaptiv (RFC 6298).
+    
+        SRTT   ← 7/8·SRTT + 1/8·R
+        RTTVAR ← 3/4·RTTVAR + 1/4·|SRTT − R|
+        RTO    = SRTT + 4·RTTVAR   (între RTO_MIN și RTO_MAX)
+    
+    Algoritmul lui Karn: eșantioanele de la segmente retransmise sunt
+    ignorate (nu știm cărui transmisii îi aparține ACK-ul).
+    """
+    
+    def __init__(self):
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.rto = RTO_INITIAL
+        self.samples = 0
+    
+    def sample(self, rtt: float) -> None:
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(RTO_MAX, max(RTO_MIN, self.srtt + 4 * self.rttvar))
+        self.samples += 1
+    
+    def backoff(self) -> None:
+        self.rto = min(RTO_MAX, self.rto * 2)
+
+
+def _request(sock: socket.socket, addr: Tuple[str, int], request: bytes,
+             expect: str, timeout: float, retries: int, loss: float) -> Optional[str]:
+    """Trimite o cerere de control și așteaptă răspunsul, cu retransmisie."""
+    for _ in range(retries):
+        if random.random() >= loss:
+            sock.sendto(request, addr)
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not select.select([sock], [], [], remaining)[0]:
+                break
+            data, _ = sock.recvfrom(BUFFER_SIZE)
+            if random.random() < loss:
+                continue
+            text = data.decode("utf-8", errors="replace").strip()
+            if text.startswith(expect):
+                return text
+    return None
+
+
+def run_window_client(
+    host: str,
+    port: int,
+    total_bytes: int,
+    chunk: int = DEFAULT_CHUNK,
+    window: int = DEFAULT_WINDOW,
+    timeout: float = 2.0,
+    loss: float = 0.0
+) -> int:
+    """
+    Transfer bulk de `total_bytes` cu fereastră glisantă.
+    
+    - Până la `window` datagrame DATA neconfirmate în zbor
+    - SACK: cumulativ + blocuri selective → se retransmit doar gaurile
+    - Retransmisie rapidă: gaură cu ≥ DUP_THRESH segmente confirmate peste ea
+    - RTO (un timer pentru cel mai vechi segment neconfirmat): se retransmit
+      toate segmentele neconfirmate din fereastră, RTO se dublează
+    - `loss` > 0 aruncă aleator datagrame trimise/primite (test fără netem)
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server_addr = (host, port)
+    payload = os.urandom(total_bytes)
+    chunks = [payload[i:i + chunk] for i in range(0, total_bytes, chunk)]
+    n = len(chunks)
+    
+    print("╔══════════════════════════════════════════════════════════════╗")
+    print("║  UDP Session Client — fereastră glisantă + SACK              ║")
+    print(f"║  Server: {host}:{port:<44}║")
+    transfer = f"Transfer: {total_bytes} bytes, {n} datagrame, fereastră {window}"
+    print(f"║  {transfer:<60}║")
+    print("╚══════════════════════════════════════════════════════════════╝")
+    
+    try:
+        response = _request(sock, server_addr, b"HELLO", "TOKEN:", timeout, 5, loss)
+        if response is None:
+            log("ERROR", "Timeout la HELLO")
+            return 1
+        token = response.split(":", 1)[1]
+        log("INFO", f"Sesiune inițiată. Token: {token}")
+        
+        prefix = f"DATA:{token}:".encode()
+        acked = bytearray(n + 2)            # 1 = confirmat (cumulativ sau selectiv)
+        sent_at = [0.0] * (n + 2)
+        retransmitted = bytearray(n + 2)    # pentru algoritmul lui Karn
+        rtt = RttEstimator()
+        base = 1                            # cel mai vechi seq neconfirmat
+        next_seq = 1                        # următorul seq netrimis niciodată
+        timer = 0.0                         # momentul armării timer-ului RTO
+        sent = retransmits = fast_retransmits = timeouts = 0
+        
+        def transmit(seq: int) -> None:
+            nonlocal sent
+            sent_at[seq] = time.monotonic()
+            sent += 1
+            if random.random() >= loss:
+                sock.sendto(prefix + str(seq).encode() + b":" + chunks[seq - 1], server_addr)
+        
+        def retransmit(seq: int) -> None:
+            nonlocal retransmits
+            retransmitted[seq] = 1
+            retransmits += 1
+            transmit(seq)
+        
+        sock.setblocking(False)
+        started = time.monotonic()
+        
+        while base <= n:
+            # ── Umplem fereastra ─────────────────────────────────────────────
+            while next_seq <= n and next_seq < base + window:
+                if base == next_seq:
+                    timer = time.monotonic()
+                transmit(next_seq)
+                next_seq += 1
+            
+            # ── Așteptăm SACK sau expirarea RTO ──────────────────────────────
+            wait = timer + rtt.rto - time.monotonic()
+            if wait > 0 and select.select([sock], [], [], wait)[0]:
+                highest = 0
+                while True:
+                    try:
+                        data, _ = sock.recvfrom(BUFFER_SIZE)
+                    except BlockingIOError:
+                        break
+                    if random.random() < loss or not data.startswith(b"SACK:"):
+                        continue
+                    _, _, cum, trigger, ranges = data.decode().split(":", 4)
+                    cum, trigger = int(cum), int(trigger)
+                    now = time.monotonic()
+                    # Eșantion RTT doar de la segmentul care a declanșat SACK-ul,
+                    # dacă e prima lui confirmare și nu a fost retransmis (Karn)
+                    if 1 <= trigger <= n and not acked[trigger] and not retransmitted[trigger]:
+                        rtt.sample(now - sent_at[trigger])
+                    if cum >= base:
+                        for seq in range(base, cum + 1):
+                            acked[seq] = 1
+                        base = cum + 1
+                        timer = now
+                    for block in filter(None, ranges.split(",")):
+                        lo, hi = map(int, block.split("-"))
+                        for seq in range(max(lo, base), min(hi, n) + 1):
+                            acked[seq] = 1
+                        highest = max(highest, hi)
+                    while base <= n and acked[base]:
+                        base += 1
+                
+                # Retransmisie rapidă: găuri cu DUP_THRESH segmente confirmate
+                # deasupra; o retransmisie pierdută se repetă după un RTO
+                now = time.monotonic()
+                for seq in range(base, min(highest - DUP_THRESH, next_seq - 1) + 1):
+                    if not acked[seq] and (not retransmitted[seq] or now - sent_at[seq] > rtt.rto):
+                        fast_retransmits += 1
+                        retransmit(seq)
+            elif base <= n and time.monotonic() - timer >= rtt.rto:
+                # ── RTO expirat: retransmitem tot ce nu e confirmat ──────────
+                timeouts += 1
+                rtt.backoff()
+                for seq in range(base, next_seq):
+                    if not acked[seq]:
+                        retransmit(seq)
+                timer = time.monotonic()
+        
+        elapsed = time.monotonic() - started
+        sock.setblocking(True)
+        
+        # ── Închidere și verificare ──────────────────────────────────────────
+        response = _request(sock, server_addr, f"BYE:{token}".encode(), f"BYE_ACK:{token}",
+                            timeout, 5, loss)
+        expected = f"BYE_ACK:{token}:{total_bytes}:{hashlib.sha256(payload).hexdigest()[:16]}"
+        
+        goodput = total_bytes * 8 / elapsed / 1e6
+        srtt = f"{rtt.srtt * 1000:.2f}ms" if rtt.srtt is not None else "n/a"
+        log("STAT", f"{total_bytes} bytes în {elapsed:.2f}s → {goodput:.2f} Mbit/s "
+                    f"({n / elapsed:,.0f} datagrame/s)")
+        log("STAT", f"trimise {sent}, retransmise {retransmits} "
+                    f"(rapid {fast_retransmits}, timeout-uri RTO {timeouts}), "
+                    f"SRTT {srtt}, RTO {rtt.rto * 1000:.1f}ms")
+        if rtt.srtt:
+            log("STAT", f"stop-and-wait la același RTT: ~{chunk * 8 / rtt.srtt / 1e6:.2f} Mbit/s")
+        
+        if response == expected:
+            log("INFO", "✓ Serverul a primit toate datele (lungime și SHA-256 corecte)")
+            return 0
+        log("ERROR", f"Verificare eșuată: {response!r} (așteptat {expected!r})")
+        return 1
+        
+    except OSError as e:
+        log("ERROR", f"Eroare: {e}")
+        return 1
+    finally:
+        sock.close()
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  SELF-TEST
+# ════════════════════════════════════════════════════════════════════════════
+
+def run_self_test() -> bool:
+    """Verifică reordonarea și formatul SACK pe o sesiune, fără rețea."""
+    session = Session("t", ("127.0.0.1", 0))
+    session.accept_data(1, b"a")
+    assert session.sack(1) == "SACK:t:1:1:"
+
+    # Gaură la 2: 4, 5 și 7 stau în buffer; SACK-ul raportează seq-ul care
+    # l-a declanșat (3), nu ultimul seq din buffer
+    for seq in (4, 5, 7, 3):
+        session.accept_data(seq, seq.to_bytes(1, "big"))
+    assert session.sack(3) == "SACK:t:1:3:3-5,7-7", session.sack(3)
+
+    session.accept_data(2, b"b")
+    session.accept_data(4, b"x")            # duplicat
+    assert session.expected == 6 and sorted(session.reorder) == [7]
+    assert session.duplicates == 1 and session.sack(2) == "SACK:t:5:2:7-7"
+
+    # Cel mult MAX_SACK_BLOCKS blocuri, cele mai apropiate de gaură
+    for seq in range(10, 10 + 2 * (MAX_SACK_BLOCKS + 4), 2):
+        session.accept_data(seq, b"z")
+    blocks = session.sack(10).split(":")[4].split(",")
+    assert len(blocks) == MAX_SACK_BLOCKS and blocks[0] == "7-7"
+
+    log("INFO", "Self-test OK")
+    return True
+
+
 # ════════════════════════════════════════════════════════════════════════════
 #  MAIN
 # ════════════════════════════════════════════════════════════════════════════
@@ -299,11 +661,30 @@ def main(argv: list[str] | None = None) -> int:
     pc.add_argument("--port", type=int, default=5555)
     pc.add_argument("--messages", type=int, default=3, help="Număr de mesaje de trimis")
     pc.add_argument("--timeout", type=float, default=2.0, help="Timeout pentru ACK (secunde)")
+    pc.add_argument("--bulk", type=int, default=0, metavar="BYTES",
+                    help="Transfer bulk cu fereastră glisantă în loc de stop-and-wait")
+    pc.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                    help=f"Datagrame în zbor pentru --bulk (default: {DEFAULT_WINDOW})")
+    pc.add_argument("--chunk", type=int, default=DEFAULT_CHUNK,
+                    help=f"Bytes de date per datagramă pentru --bulk (default: {DEFAULT_CHUNK})")
+    pc.add_argument("--loss", type=float, default=0.0,
+                    help="Pierdere simulată în client, ambele direcții (ex: 0.05)")
+    
+    # Self-test
+    subparsers.add_parser("selftest", help="Verificare reordonare și SACK, fără rețea")
     
     args = parser.parse_args(argv)
     
-    if args.mode == "server":
+    if args.mode == "client" and args.window < 1:
+        parser.error("--window trebuie să fie >= 1")
+    
+    if args.mode == "selftest":
+        return 0 if run_self_test() else 1
+    elif args.mode == "server":
         return run_server(args.port)
+    elif args.bulk > 0:
+        return run_window_client(args.host, args.port, args.bulk, args.chunk,
+                                 args.window, args.timeout, args.loss)
     else:
         return run_client(args.host, args.port, args.messages, args.timeout)
 
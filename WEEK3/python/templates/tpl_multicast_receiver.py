@@ -35,6 +35,16 @@ UTILIZARE:
   python3 tpl_multicast_receiver.py --group 239.0.0.1 --port 5001 --prefix ALERT
   python3 tpl_multicast_receiver.py --prefix INFO,DEBUG --stats
 
+MOD HIGH-RATE (--fast, feed-uri de tip market data):
+  Mesajele au forma PREFIX:SECVENTA:CONTINUT, cu secvență crescătoare per
+  (grup, expeditor). Un singur socket face join la mai multe grupuri,
+  datagramele sunt primite în loturi (recvmmsg pe Linux) în buffere
+  prealocate, filtrarea pe prefix se face pe bytes (fără decode), iar
+  pentru fiecare grup și expeditor se numără gap-urile și pierderile.
+
+  python3 tpl_multicast_receiver.py --fast --groups 239.0.0.1,239.0.0.2 --prefix TRADE
+  python3 tpl_multicast_receiver.py --publish --groups 239.0.0.1,239.0.0.2 --count 100000
+
 AUTOR: Starter Kit S3 - Rețele de Calculatoare ASE-CSIE
 ================================================================================
 """
@@ -42,9 +52,15 @@ AUTOR: Starter Kit S3 - Rețele de Calculatoare ASE-CSIE
 import socket
 import struct
 import argparse
+import ctypes
+import errno
+import os
+import random
+import select
 import sys
+import time
 from datetime import datetime
-from typing import Optional, Set, Tuple, Dict
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 # =============================================================================
 # CONSTANTE ȘI CONFIGURARE
@@ -59,6 +75,12 @@ DEFAULT_PREFIX = "ALL"  # "ALL" = acceptă toate mesajele
 # Prefixuri cunoscute (pentru validare și statistici)
 KNOWN_PREFIXES = {"ALERT", "INFO", "DEBUG", "METRIC", "ERROR", "WARN", "STATUS"}
 
+# Mod high-rate
+DEFAULT_BATCH = 64            # Datagrame per apel recvmmsg
+FEED_SLOT_SIZE = 2048         # Bytes per datagramă în buffer-ul prealocat
+MAX_PREFIX_LEN = 16           # Prefix-ul se caută doar în primii bytes
+FEED_PREFIXES = ("TRADE", "QUOTE", "STATUS")
+
 
 # =============================================================================
 # FUNCȚII AUXILIARE
@@ -380,6 +402,383 @@ class MulticastReceiver:
                 pass
 
 
+# =============================================================================
+# MOD HIGH-RATE: FEED-URI MULTICAST (TIP MARKET DATA)
+# =============================================================================
+# Un apel recvfrom() per datagramă, decode și log per mesaj nu țin pasul cu
+# zeci de mii de mesaje pe secundă. Modul high-rate:
+#   - un singur socket, join la toate grupurile; grupul destinație al fiecărei
+#     datagrame vine din IP_PKTINFO (date auxiliare)
+#   - recvmmsg(): până la DEFAULT_BATCH datagrame per apel sistem, direct în
+#     buffere prealocate (fără obiecte bytes noi per datagramă)
+#   - filtrare pe prefix pe bytes bruți; decode doar pentru mesajele acceptate
+#   - statistici de secvență per (grup, expeditor): gap-uri, pierderi, întârziate
+
+IP_PKTINFO = getattr(socket, "IP_PKTINFO", 8)      # 8 pe Linux; lipsește în unele build-uri
+PKTINFO_SPACE = socket.CMSG_SPACE(12) if hasattr(socket, "CMSG_SPACE") else 0  # struct in_pktinfo
+
+# Structurile ctypes și recvmmsg din libc (utils/mmsg.py); fără ele rămâne
+# calea recvmsg_into
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+try:
+    from utils.mmsg import IoVec, MMsgHdr, MMSG_AVAILABLE, SOCKADDR_IN_SIZE, recvmmsg
+except ImportError:
+    MMSG_AVAILABLE = False
+
+# struct cmsghdr = size_t cmsg_len + int level + int type; in_pktinfo.ipi_addr e la +8
+_PKTINFO_ADDR_OFFSET = ctypes.sizeof(ctypes.c_size_t) + 2 * ctypes.sizeof(ctypes.c_int) + 8
+
+RECVMSG_AVAILABLE = hasattr(socket.socket, "recvmsg_into") and PKTINFO_SPACE > 0
+
+
+class _BatchRx:
+    """
+    Primire în lot în buffere prealocate.
+    
+    După recv_batch() -> n, pentru i < n:
+        datagrama i este în self.buffer[i*slot : i*slot + self.lengths[i]]
+        self.groups[i]  = adresa grupului destinație (4 bytes, din IP_PKTINFO)
+        self.senders[i] = port + IP expeditor (6 bytes, din sockaddr_in)
+    """
+    
+    def __init__(self, sock: socket.socket, batch: int = DEFAULT_BATCH,
+                 slot: int = FEED_SLOT_SIZE, use_mmsg: bool = MMSG_AVAILABLE):
+        self.sock = sock
+        self.batch = batch
+        self.slot = slot
+        self.use_mmsg = use_mmsg
+        self.buffer = bytearray(batch * slot)
+        self.lengths: List[int] = [0] * batch
+        self.groups: List[bytes] = [b""] * batch
+        self.senders: List[bytes] = [b""] * batch
+        self.syscalls = 0
+        
+        if use_mmsg:
+            self._data = (ctypes.c_char * len(self.buffer)).from_buffer(self.buffer)
+            self._names = ctypes.create_string_buffer(batch * SOCKADDR_IN_SIZE)
+            self._control = ctypes.create_string_buffer(batch * PKTINFO_SPACE)
+            self._iov = (IoVec * batch)()
+            self._hdrs = (MMsgHdr * batch)()
+            base = ctypes.addressof(self._data)
+            for i in range(batch):
+                self._iov[i].iov_base = base + i * slot
+                self._iov[i].iov_len = slot
+                hdr = self._hdrs[i].msg_hdr
+                hdr.msg_name = ctypes.addressof(self._names) + i * SOCKADDR_IN_SIZE
+                hdr.msg_iov = ctypes.pointer(self._iov[i])
+                hdr.msg_iovlen = 1
+                hdr.msg_control = ctypes.addressof(self._control) + i * PKTINFO_SPACE
+            self._fd = sock.fileno()
+        else:
+            self._view = memoryview(self.buffer)
+    
+    def recv_batch(self) -> int:
+        """Citește toate datagramele disponibile (max batch). 0 = nimic de citit."""
+        if self.use_mmsg:
+            hdrs = self._hdrs
+            for i in range(self.batch):
+                hdrs[i].msg_hdr.msg_namelen = SOCKADDR_IN_SIZE
+                hdrs[i].msg_hdr.msg_controllen = PKTINFO_SPACE
+            n = recvmmsg(self._fd, hdrs, self.batch, socket.MSG_DONTWAIT, None)
+            self.syscalls += 1
+            if n < 0:
+                err = ctypes.get_errno()
+                if err in (errno.EAGAIN, errno.EINTR):
+                    return 0
+                raise OSError(err, "recvmmsg")
+            names, control = self._names.raw, self._control.raw
+            for i in range(n):
+                self.lengths[i] = hdrs[i].msg_len
+                c = i * PKTINFO_SPACE + _PKTINFO_ADDR_OFFSET
+                self.groups[i] = control[c:c + 4]
+                a = i * SOCKADDR_IN_SIZE + 2
+                self.senders[i] = names[a:a + 6]
+            return n
+        
+        n = 0
+        while n < self.batch:
+            try:
+                nbytes, ancdata, _, addr = self.sock.recvmsg_into(
+                    [self._view[n * self.slot:(n + 1) * self.slot]], PKTINFO_SPACE,
+                    socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                break
+            self.syscalls += 1
+            self.lengths[n] = nbytes
+            self.groups[n] = ancdata[0][2][8:12] if ancdata else b""
+            self.senders[n] = struct.pack("!H", addr[1]) + socket.inet_aton(addr[0])
+            n += 1
+        return n
+
+
+class FeedStats:
+    """
+    Statistici de secvență pentru un flux (grup, expeditor).
+    
+    Un salt de secvență (seq > așteptat) este un gap; secvențele sărite sunt
+    numărate ca pierdute. Un mesaj cu seq < așteptat (întârziat sau duplicat)
+    scade numărul de pierderi, dacă există. Aproximare: nu se ține minte ce
+    secvențe lipsesc exact.
+    """
+    __slots__ = ("received", "bytes", "expected", "first_seq", "gaps", "lost", "late", "unsequenced")
+    
+    def __init__(self):
+        self.received = 0
+        self.bytes = 0
+        self.expected = -1
+        self.first_seq = -1
+        self.gaps = 0
+        self.lost = 0
+        self.late = 0
+        self.unsequenced = 0
+    
+    def record(self, seq: int, nbytes: int) -> None:
+        self.received += 1
+        self.bytes += nbytes
+        if seq < 0:
+            self.unsequenced += 1
+        elif self.expected < 0:
+            self.first_seq = seq
+            self.expected = seq + 1
+        elif seq == self.expected:
+            self.expected += 1
+        elif seq > self.expected:
+            self.gaps += 1
+            self.lost += seq - self.expected
+            self.expected = seq + 1
+        else:
+            self.late += 1
+            if self.lost:
+                self.lost -= 1
+    
+    @property
+    def loss_percent(self) -> float:
+        total = self.received - self.unsequenced + self.lost
+        return 100.0 * self.lost / total if total else 0.0
+
+
+class FastMulticastReceiver:
+    """
+    Receptor multicast high-rate: mai multe grupuri, un socket, loturi.
+    
+    Atribute:
+        groups: Adresele grupurilor la care se face join
+        filter_prefixes: Prefixuri acceptate (bytes, uppercase); "ALL" = toate
+        feeds: (grup, expeditor) → FeedStats
+        prefix_counts: prefix → mesaje acceptate
+        on_message: Callback(prefix, seq, content, group, sender) pentru mesajele
+                    acceptate; doar pentru ele se face decode
+    """
+    
+    def __init__(
+        self,
+        groups: List[str],
+        port: int = DEFAULT_PORT,
+        filter_prefixes: Optional[Set[str]] = None,
+        batch: int = DEFAULT_BATCH,
+        use_mmsg: bool = MMSG_AVAILABLE,
+        on_message: Optional[Callable[[str, int, str, str, str], None]] = None
+    ):
+        self.groups = groups
+        self.port = port
+        prefixes = filter_prefixes or {"ALL"}
+        self.accept_all = "ALL" in prefixes
+        self.filter_prefixes = {p.upper().encode() for p in prefixes}
+        self.batch = batch
+        self.use_mmsg = use_mmsg
+        self.on_message = on_message
+        
+        self.socket: Optional[socket.socket] = None
+        self.rx: Optional[_BatchRx] = None
+        self.running = False
+        
+        self.feeds: Dict[Tuple[bytes, bytes], FeedStats] = {}
+        self.prefix_counts: Dict[bytes, int] = {}
+        self.total = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.foreign = 0
+        self.started = 0.0
+    
+    def setup_socket(self) -> bool:
+        """Socket unic: SO_REUSEADDR, bind pe port, join la fiecare grup, IP_PKTINFO."""
+        if not (MMSG_AVAILABLE or RECVMSG_AVAILABLE):
+            log_message("ERROR", "Modul high-rate necesită recvmmsg sau recvmsg_into cu IP_PKTINFO")
+            return False
+        try:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                # Buffer mare: absoarbe rafalele cât timp procesăm lotul anterior
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+            except OSError:
+                pass
+            self.socket.bind(('', self.port))
+            self.socket.setsockopt(socket.IPPROTO_IP, IP_PKTINFO, 1)
+            
+            joined = []
+            for group in self.groups:
+                mreq = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton("0.0.0.0"))
+                try:
+                    self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+                    joined.append(socket.inet_aton(group))
+                except OSError as e:
+                    # Linux limitează join-urile per socket (net.ipv4.igmp_max_memberships, implicit 20)
+                    log_message("ERROR", f"Join eșuat pentru {group}: {e}")
+            if not joined:
+                return False
+            self._joined = set(joined)
+            
+            self.socket.setblocking(False)
+            self.rx = _BatchRx(self.socket, self.batch, use_mmsg=self.use_mmsg)
+            mode = "recvmmsg" if self.rx.use_mmsg else "recvmsg_into"
+            log_message("INFO", f"Join la {len(joined)} grupuri pe portul {self.port} "
+                                f"({mode}, lot {self.batch})")
+            return True
+        except OSError as e:
+            log_message("ERROR", f"Eroare configurare socket: {e}")
+            return False
+    
+    def _process_batch(self, n: int) -> None:
+        rx, buf, slot = self.rx, self.rx.buffer, self.rx.slot
+        feeds, counts = self.feeds, self.prefix_counts
+        for i in range(n):
+            group = rx.groups[i]
+            if group not in self._joined:
+                self.foreign += 1
+                continue
+            start = i * slot
+            end = start + rx.lengths[i]
+            key = (group, rx.senders[i])
+            stats = feeds.get(key)
+            if stats is None:
+                stats = feeds[key] = FeedStats()
+            
+            # PREFIX:SECVENTA:CONTINUT, totul pe bytes bruți
+            colon = buf.find(b":", start, min(end, start + MAX_PREFIX_LEN + 1))
+            seq = -1
+            if colon < 0:
+                prefix = b""
+                body = start
+            else:
+                prefix = bytes(buf[start:colon]).upper()   # filtrele sunt uppercase
+                body = colon + 1
+                colon2 = buf.find(b":", body, min(end, body + 21))
+                if colon2 > body:
+                    try:
+                        seq = int(buf[body:colon2])
+                        body = colon2 + 1
+                    except ValueError:
+                        pass
+            stats.record(seq, end - start)
+            
+            if self.accept_all or prefix in self.filter_prefixes:
+                self.accepted += 1
+                counts[prefix] = counts.get(prefix, 0) + 1
+                if self.on_message is not None:
+                    self.on_message(prefix.decode("ascii", errors="replace"), seq,
+                                    buf[body:end].decode("utf-8", errors="replace"),
+                                    socket.inet_ntoa(group), self._format_sender(rx.senders[i]))
+            else:
+                self.rejected += 1
+        self.total += n
+    
+    @staticmethod
+    def _format_sender(sender: bytes) -> str:
+        return f"{socket.inet_ntoa(sender[2:6])}:{struct.unpack('!H', sender[:2])[0]}"
+    
+    def print_stats(self):
+        """Statistici per (grup, expeditor) și totale."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        log_message("STATS", "=" * 78)
+        log_message("STATS", f"{'grup':<15} {'expeditor':<21} {'primite':>9} {'pierdute':>8} "
+                             f"{'pierd.%':>7} {'gap-uri':>7} {'întârz.':>7}")
+        for (group, sender), st in sorted(self.feeds.items()):
+            log_message("STATS", f"{socket.inet_ntoa(group):<15} {self._format_sender(sender):<21} "
+                                 f"{st.received:>9} {st.lost:>8} {st.loss_percent:>6.2f}% "
+                                 f"{st.gaps:>7} {st.late:>7}")
+        per_prefix = ", ".join(f"{p.decode(errors='replace') or 'RAW'}={c}"
+                               for p, c in sorted(self.prefix_counts.items()))
+        log_message("STATS", f"Total {self.total} ({self.total / elapsed:,.0f} msg/s), "
+                             f"acceptate {self.accepted}, respinse {self.rejected}, "
+                             f"alte grupuri {self.foreign}, apeluri recv {self.rx.syscalls}")
+        if per_prefix:
+            log_message("STATS", f"Per prefix: {per_prefix}")
+        log_message("STATS", "=" * 78)
+    
+    def run(self, duration: float = 0.0, stats_interval: float = 5.0):
+        """Bucla de recepție: select() → loturi până socket-ul e gol."""
+        if not self.setup_socket():
+            log_message("ERROR", "Nu pot porni receptorul high-rate")
+            return
+        
+        self.running = True
+        self.started = time.monotonic()
+        deadline = self.started + duration if duration > 0 else float("inf")
+        next_stats = self.started + stats_interval if stats_interval > 0 else float("inf")
+        log_message("INFO", "Receptor high-rate pornit. (Ctrl+C pentru a opri)")
+        
+        try:
+            while self.running:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if now >= next_stats:
+                    self.print_stats()
+                    next_stats = now + stats_interval
+                if not select.select([self.socket], [], [], min(1.0, deadline - now))[0]:
+                    continue
+                while True:
+                    n = self.rx.recv_batch()
+                    if not n:
+                        break
+                    self._process_batch(n)
+        except KeyboardInterrupt:
+            log_message("INFO", "Oprire solicitată...")
+        finally:
+            self.running = False
+            self.print_stats()
+            if self.socket:
+                self.socket.close()
+
+
+def run_feed_publisher(groups: List[str], port: int, count: int, rate: float = 0.0,
+                       skip: float = 0.0, payload_size: int = 64):
+    """
+    Generator de feed pentru test: PREFIX:SECVENTA:CONTINUT, round-robin pe
+    grupuri, cu secvență separată per grup. `skip` > 0 sare aleator secvențe
+    (pierdere simulată) ca să se vadă statisticile de gap.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    filler = "x" * payload_size
+    seqs = {g: 0 for g in groups}
+    skipped = 0
+    interval = 1.0 / rate if rate > 0 else 0.0
+    started = time.monotonic()
+    try:
+        for i in range(count):
+            group = groups[i % len(groups)]
+            seqs[group] += 1
+            if skip and random.random() < skip:
+                skipped += 1
+                continue
+            prefix = FEED_PREFIXES[i % len(FEED_PREFIXES)]
+            sock.sendto(f"{prefix}:{seqs[group]}:{filler}".encode(), (group, port))
+            if interval:
+                delay = started + (i + 1) * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    elapsed = max(time.monotonic() - started, 1e-9)
+    log_message("INFO", f"Publicate {count - skipped} mesaje ({skipped} secvențe sărite) "
+                        f"în {elapsed:.2f}s → {(count - skipped) / elapsed:,.0f} msg/s")
+
+
 # =============================================================================
 # INTERFAȚĂ LINIE DE COMANDĂ
 # =============================================================================
@@ -450,6 +849,28 @@ PREFIXURI CUNOSCUTE:
         help="Output detaliat (debugging)"
     )
     
+    hr = parser.add_argument_group("mod high-rate")
+    hr.add_argument("--fast", action="store_true",
+                    help="Receptor high-rate: mai multe grupuri, loturi, statistici de secvență")
+    hr.add_argument("--publish", action="store_true",
+                    help="Generator de feed de test (PREFIX:SECVENTA:CONTINUT)")
+    hr.add_argument("--groups", type=str, default="",
+                    help="Grupuri separate prin virgulă (default: --group)")
+    hr.add_argument("--batch", type=int, default=DEFAULT_BATCH,
+                    help=f"Datagrame per apel recvmmsg (default: {DEFAULT_BATCH})")
+    hr.add_argument("--no-mmsg", action="store_true",
+                    help="Folosește recvmsg_into în buclă în loc de recvmmsg")
+    hr.add_argument("--duration", type=float, default=0.0,
+                    help="Oprire după N secunde (0 = până la Ctrl+C)")
+    hr.add_argument("--stats-interval", type=float, default=5.0,
+                    help="Secunde între rapoartele de statistici (default: 5)")
+    hr.add_argument("--count", type=int, default=100000,
+                    help="--publish: număr de mesaje (default: 100000)")
+    hr.add_argument("--rate", type=float, default=0.0,
+                    help="--publish: mesaje/s (0 = cât de repede se poate)")
+    hr.add_argument("--skip", type=float, default=0.0,
+                    help="--publish: probabilitatea de a sări o secvență (pierdere simulată)")
+    
     return parser.parse_args()
 
 
@@ -509,6 +930,25 @@ def main():
     
     # Parsează prefixurile din argument
     filter_prefixes = {p.strip().upper() for p in args.prefix.split(",")}
+    groups = [g.strip() for g in (args.groups or args.group).split(",") if g.strip()]
+    
+    if args.publish:
+        run_feed_publisher(groups, args.port, args.count, args.rate, args.skip)
+        return
+    
+    if args.fast:
+        def show(prefix, seq, content, group, sender):
+            log_message("RECV", f"[{prefix or 'RAW'}#{seq}] {content} ({group} de la {sender})")
+        
+        FastMulticastReceiver(
+            groups,
+            port=args.port,
+            filter_prefixes=filter_prefixes,
+            batch=args.batch,
+            use_mmsg=MMSG_AVAILABLE and not args.no_mmsg,
+            on_message=show if args.verbose else None
+        ).run(args.duration, args.stats_interval)
+        return
     
     print("=" * 70)
     print("MULTICAST RECEIVER CU FILTRARE")
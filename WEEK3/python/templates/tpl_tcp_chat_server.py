@@ -27,16 +27,28 @@ VERIFICARE:
 
     # Terminal 2, 3, 4: Clienți (netcat)
     nc localhost 4000
+
+EXTENSIE (după ce broadcast-ul de bază funcționează):
+    Cu --engine, broadcast-ul trece prin BroadcastEngine (utils/broadcast_engine.py):
+    cozi mărginite per client și scrieri non-blocante, astfel încât un client
+    care nu citește nu îi mai blochează pe ceilalți.
+
+    python3 tpl_tcp_chat_server.py --port 4000 --engine --policy disconnect
 """
 from __future__ import annotations
 
 import argparse
+import os
 import socket
 import sys
 import threading
 from datetime import datetime
 from typing import Dict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.broadcast_engine import BroadcastEngine, DEFAULT_MAX_QUEUE, POLICIES
+
 
 # ════════════════════════════════════════════════════════════════════════════
 #  CONSTANTE
@@ -58,6 +70,9 @@ clients_lock = threading.Lock()
 # Counter pentru generare nume clienți
 client_counter = 0
 
+# Engine-ul de broadcast non-blocant (doar cu --engine)
+engine: BroadcastEngine | None = None
+
 
 def add_client(sock: socket.socket) -> str:
     """
@@ -68,13 +83,17 @@ def add_client(sock: socket.socket) -> str:
         client_counter += 1
         name = f"User{client_counter}"
         clients[sock] = name
-        return name
+    if engine is not None:
+        engine.add(sock)
+    return name
 
 
 def remove_client(sock: socket.socket) -> str | None:
     """
     Elimină un client din listă și returnează numele său.
     """
+    if engine is not None:
+        engine.remove(sock)
     with clients_lock:
         return clients.pop(sock, None)
 
@@ -87,6 +106,11 @@ def broadcast_message(message: str, exclude: socket.socket | None = None) -> Non
         message: Mesajul de trimis
         exclude: Socket-ul clientului care nu primește mesajul (expeditorul)
     """
+    if engine is not None:
+        # Varianta non-blocantă: nu așteaptă după clienții lenți
+        engine.broadcast(message.encode("utf-8"), exclude=exclude)
+        return
+    
     # ═══════════════════════════════════════════════════════════════════════
     # TODO: Implementați broadcast-ul
     # 
@@ -192,6 +216,9 @@ def handle_client(client_socket: socket.socket, client_addr: tuple[str, int]) ->
 
 def run_server(host: str, port: int) -> int:
     """Pornește serverul de chat."""
+    if engine is not None:
+        engine.start()
+
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     
@@ -222,6 +249,9 @@ def run_server(host: str, port: int) -> int:
         return 1
     finally:
         server_socket.close()
+        if engine is not None:
+            engine.stop()
+            print(f"[STAT] {engine.summary()}")
     
     return 0
 
@@ -233,8 +263,18 @@ def main(argv: list[str] | None = None) -> int:
     )
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--engine", action="store_true",
+                        help="Broadcast non-blocant prin BroadcastEngine")
+    parser.add_argument("--policy", choices=POLICIES, default="drop",
+                        help="Politica pentru clienți lenți (cu --engine)")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="Coada maximă de mesaje per client (cu --engine)")
     
     args = parser.parse_args(argv)
+    
+    global engine
+    if args.engine:
+        engine = BroadcastEngine(max_queue=args.max_queue, policy=args.policy)
     return run_server(args.host, args.port)
 
 
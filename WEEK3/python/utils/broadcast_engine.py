@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║  Broadcast Engine — Fan-out TCP fără blocare                                 ║
+║  Săptămâna 3 — Rețele de Calculatoare                                        ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+PROBLEMA:
+    broadcast() clasic face sendall() blocant pe fiecare client, pe rând,
+    ținând lock-ul. Un singur client lent (nu citește, fereastra TCP plină)
+    blochează mesajul pentru TOȚI ceilalți.
+
+SOLUȚIA:
+    - Fiecare client are o coadă de ieșire mărginită (max_queue mesaje)
+    - Scrierile sunt non-blocante (MSG_DONTWAIT): ce nu intră acum în
+      buffer-ul kernel rămâne în coadă
+    - Un thread cu event loop (selectors) golește cozile când socket-urile
+      devin scriibile
+    - Același obiect bytes este pus în toate cozile (fără copii per client)
+
+POLITICI PENTRU CLIENȚI LENȚI (coada plină):
+    drop        - mesajul nou este aruncat pentru acel client
+    disconnect  - clientul este deconectat (shutdown)
+    coalesce    - cel mai vechi mesaj din coadă este aruncat, clientul
+                  primește mereu cele mai recente mesaje
+
+    Politica se aplică doar mesajelor care se pot pierde (broadcast și
+    send(..., droppable=True)). Un răspuns direct cu send(..., droppable=False)
+    nu se pierde niciodată: dacă coada e plină, apelantul (thread-ul acelui
+    client) așteaptă să se elibereze loc - presiune inversă doar pe clientul
+    care nu citește, ca un sendall() blocant, dar păstrând ordinea în flux.
+
+METRICI:
+    Latența fan-out = de la broadcast() până când ultimul destinatar a primit
+    mesajul în buffer-ul kernel (sau a fost eliminat de politică). Mesajele
+    încă în coada unui client lent nu intră în percentile până nu ies din ea.
+
+UTILIZARE:
+    engine = BroadcastEngine(max_queue=256, policy="drop")
+    engine.start()
+    engine.add(sock)                       # după accept()
+    engine.broadcast(b"mesaj\\n", exclude=sock)
+    engine.send(sock, b"raspuns\\n", droppable=False)   # fără pierderi
+    engine.remove(sock)                    # înainte de sock.close()
+    engine.stop()
+
+    Socket-urile pot rămâne blocante pentru recv() în thread-ul clientului;
+    engine-ul trimite doar cu MSG_DONTWAIT (Linux/BSD/macOS).
+"""
+from __future__ import annotations
+
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  CONSTANTE
+# ════════════════════════════════════════════════════════════════════════════
+
+POLICIES = ("drop", "disconnect", "coalesce")
+DEFAULT_MAX_QUEUE = 256
+LATENCY_SAMPLES = 10000          # Ultimele N latențe fan-out păstrate pentru percentile
+
+# Pe platformele fără MSG_DONTWAIT (Windows), send() rămâne blocant
+SEND_FLAGS = getattr(socket, "MSG_DONTWAIT", 0)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  STRUCTURI INTERNE
+# ════════════════════════════════════════════════════════════════════════════
+
+class _Fanout:
+    """Un mesaj broadcast: momentul trimiterii și câți destinatari mai are."""
+    __slots__ = ("started", "remaining")
+
+    def __init__(self, remaining: int):
+        self.started = time.perf_counter()
+        self.remaining = remaining
+
+
+class _Peer:
+    """Starea de ieșire a unui client: coada și offset-ul în primul mesaj."""
+    __slots__ = ("sock", "queue", "offset", "registered", "closed", "dropped")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.queue: Deque[list] = deque()    # [data, fanout | None, droppable]
+        self.offset = 0
+        self.registered = False
+        self.closed = False
+        self.dropped = 0
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  ENGINE
+# ════════════════════════════════════════════════════════════════════════════
+
+class BroadcastEngine:
+    """
+    Fan-out non-blocant către mulți clienți TCP.
+
+    broadcast() și send() nu blochează niciodată pe un client lent: încearcă
+    o scriere directă și, dacă nu încape tot, pun restul în coada clientului.
+    Thread-ul engine-ului golește cozile. Toate operațiile pe cozi și pe
+    selector se fac sub același lock; select() rulează fără lock.
+    """
+
+    def __init__(self, max_queue: int = DEFAULT_MAX_QUEUE, policy: str = "drop"):
+        if policy not in POLICIES:
+            raise ValueError(f"Politică necunoscută: {policy} (alegeți din {POLICIES})")
+        if max_queue < 2:
+            raise ValueError("max_queue trebuie să fie cel puțin 2")
+        self.max_queue = max_queue
+        self.policy = policy
+
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock)   # loc eliberat într-o coadă
+        self._peers: Dict[socket.socket, _Peer] = {}
+        self._sel = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrici
+        self.broadcasts = 0
+        self.deliveries = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.disconnected = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    # ── Ciclul de viață ──────────────────────────────────────────────────────
+
+    def start(self) -> "BroadcastEngine":
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="broadcast-engine", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            self._space.notify_all()
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._sel.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    # ── Clienți ──────────────────────────────────────────────────────────────
+
+    def add(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._peers[sock] = _Peer(sock)
+
+    def remove(self, sock: socket.socket) -> None:
+        """Scoate clientul din engine. Trebuie apelat ÎNAINTE de sock.close()."""
+        with self._lock:
+            peer = self._peers.pop(sock, None)
+            if peer is not None:
+                self._release(peer)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._peers)
+
+    # ── Trimitere ────────────────────────────────────────────────────────────
+
+    def send(self, sock: socket.socket, data: bytes, droppable: bool = True) -> bool:
+        """
+        Trimite către un singur client (prin aceeași coadă ca broadcast).
+
+        Cu droppable=False mesajul nu este supus politicii: dacă coada e
+        plină, apelul blochează până când engine-ul o golește (sau clientul
+        dispare). Returnează False doar dacă clientul nu mai există.
+        """
+        with self._lock:
+            peer = self._peers.get(sock)
+            if peer is None:
+                return False
+            if not droppable:
+                while len(peer.queue) >= self.max_queue and not peer.closed and self._running:
+                    self._space.wait(timeout=1.0)
+            return self._enqueue(peer, data, None, droppable)
+
+    def broadcast(self, data: bytes, exclude: Optional[socket.socket] = None) -> int:
+        """
+        Trimite `data` către toți clienții, exceptând `exclude`.
+        Returnează numărul de destinatari care au primit mesajul în coadă.
+        """
+        with self._lock:
+            targets = [p for s, p in self._peers.items() if s is not exclude]
+            self.broadcasts += 1
+            fanout = _Fanout(len(targets))
+            if not targets:
+                return 0
+            accepted = 0
+            for peer in targets:
+                accepted += self._enqueue(peer, data, fanout)
+            return accepted
+
+    # ── Metrici ──────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        """Contoare și percentile ale latenței fan-out (ms)."""
+        with self._lock:
+            samples = sorted(self.latencies)
+            queued = sum(len(p.queue) for p in self._peers.values())
+            result = {
+                "clients": len(self._peers),
+                "broadcasts": self.broadcasts,
+                "deliveries": self.deliveries,
+                "queued": queued,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "disconnected": self.disconnected,
+            }
+
+        def pct(p: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p / 100.0 * len(samples)))] * 1000.0
+
+        result.update(fanout_p50_ms=pct(50), fanout_p99_ms=pct(99),
+                      fanout_max_ms=samples[-1] * 1000.0 if samples else 0.0)
+        return result
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"{s['clients']} clienți, {s['broadcasts']} broadcast-uri, "
+                f"{s['deliveries']} livrări, {s['queued']} în cozi, "
+                f"drop={s['dropped']} coalesce={s['coalesced']} "
+                f"deconectați={s['disconnected']}, fan-out p50={s['fanout_p50_ms']:.2f}ms "
+                f"p99={s['fanout_p99_ms']:.2f}ms max={s['fanout_max_ms']:.2f}ms")
+
+    # ── Intern (apelat cu lock-ul deținut) ───────────────────────────────────
+
+    def _done(self, fanout: Optional[_Fanout]) -> None:
+        if fanout is None:
+            return
+        fanout.remaining -= 1
+        if fanout.remaining == 0:
+            self.latencies.append(time.perf_counter() - fanout.started)
+
+    def _enqueue(self, peer: _Peer, data: bytes, fanout: Optional[_Fanout],
+                 droppable: bool = True) -> bool:
+        if peer.closed:
+            self._done(fanout)
+            return False
+
+        if not peer.queue:
+            # Cazul obișnuit: buffer-ul kernel are loc, scriem direct
+            try:
+                sent = peer.sock.send(data, SEND_FLAGS)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._kill(peer)
+                self._done(fanout)
+                return False
+            if sent == len(data):
+                self.deliveries += 1
+                self._done(fanout)
+                return True
+            peer.queue.append([data, fanout, droppable])
+            peer.offset = sent
+            self._watch(peer)
+            return True
+
+        if droppable and len(peer.queue) >= self.max_queue:
+            # Client lent: aplicăm politica
+            if self.policy == "disconnect":
+                self._kill(peer)
+                self._done(fanout)
+                return False
+            if self.policy == "drop":
+                self.dropped += 1
+                peer.dropped += 1
+                self._done(fanout)
+                return False
+            # coalesce: primul mesaj poate fi parțial trimis, deci îl păstrăm
+            # și aruncăm cel mai vechi mesaj netrimis care se poate pierde
+            victim = next((i for i in range(1, len(peer.queue)) if peer.queue[i][2]), None)
+            if victim is None:      # coada conține doar răspunsuri directe
+                self.dropped += 1
+                peer.dropped += 1
+                self._done(fanout)
+                return False
+            old_fanout = peer.queue[victim][1]
+            del peer.queue[victim]
+            self.coalesced += 1
+            peer.dropped += 1
+            self._done(old_fanout)
+
+        peer.queue.append([data, fanout, droppable])
+        return True
+
+    def _flush(self, peer: _Peer) -> None:
+        queue = peer.queue
+        full = len(queue) >= self.max_queue
+        while queue:
+            data, fanout, _ = queue[0]
+            try:
+                sent = peer.sock.send(memoryview(data)[peer.offset:], SEND_FLAGS)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                self._kill(peer)
+                return
+            peer.offset += sent
+            if peer.offset < len(data):
+                return
+            queue.popleft()
+            peer.offset = 0
+            self.deliveries += 1
+            self._done(fanout)
+            if full and len(queue) < self.max_queue:
+                self._space.notify_all()    # trezește un send(droppable=False) în așteptare
+                full = False
+        self._unwatch(peer)
+
+    def _watch(self, peer: _Peer) -> None:
+        if not peer.registered:
+            self._sel.register(peer.sock, selectors.EVENT_WRITE, peer)
+            peer.registered = True
+
+    def _unwatch(self, peer: _Peer) -> None:
+        if peer.registered:
+            try:
+                self._sel.unregister(peer.sock)
+            except (KeyError, ValueError):
+                pass
+            peer.registered = False
+
+    def _release(self, peer: _Peer) -> None:
+        """Eliberează coada (fan-out-urile în curs nu mai așteaptă clientul)."""
+        peer.closed = True
+        self._unwatch(peer)
+        for _, fanout, _ in peer.queue:
+            self._done(fanout)
+        peer.queue.clear()
+        self._space.notify_all()
+
+    def _kill(self, peer: _Peer) -> None:
+        """Deconectează clientul: shutdown() trezește recv()-ul din thread-ul lui."""
+        if peer.closed:
+            return
+        self.disconnected += 1
+        self._release(peer)
+        try:
+            peer.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    # ── Event loop ───────────────────────────────────────────────────────────
+
+    def _loop(self) -> None:
+        while self._running:
+            try:
+                events = self._sel.select(timeout=1.0)
+            except (OSError, ValueError):
+                # Un socket a fost închis între timp; următorul select îl ignoră
+                continue
+            with self._lock:
+                for key, _ in events:
+                    peer = key.data
+                    if peer is None:
+                        try:
+                            self._wake_r.recv(4096)
+                        except OSError:
+                            pass
+                    elif not peer.closed:
+                        self._flush(peer)
+
+
+# ════════════════════════════════════════════════════════════════════════════
+#  TEST
+# ════════════════════════════════════════════════════════════════════════════
+
+def _selftest(clients: int = 1000, messages: int = 200) -> bool:
+    """
+    `clients` clienți rapizi + 1 client care nu citește niciodată.
+    Verifică: clienții rapizi primesc tot, clientul lent e tratat de politică,
+    iar broadcast() nu blochează.
+    """
+    ok = True
+    payload = b"x" * 1000 + b"\n"
+    for policy in POLICIES:
+        engine = BroadcastEngine(max_queue=64, policy=policy).start()
+        pairs: List[tuple] = [socket.socketpair() for _ in range(clients + 1)]
+        for server_side, _ in pairs:
+            engine.add(server_side)
+        slow_server, slow_client = pairs[-1]
+
+        received = [0] * clients
+        stop = threading.Event()
+
+        def reader() -> None:
+            sel = selectors.DefaultSelector()
+            for i, (_, client_side) in enumerate(pairs[:-1]):
+                client_side.setblocking(False)
+                sel.register(client_side, selectors.EVENT_READ, i)
+            while not stop.is_set():
+                for key, _ in sel.select(timeout=0.1):
+                    try:
+                        received[key.data] += len(key.fileobj.recv(65536))
+                    except BlockingIOError:
+                        pass
+            sel.close()
+
+        t = threading.Thread(target=reader, daemon=True)
+        t.start()
+        t0 = time.perf_counter()
+        worst_call = 0.0
+        for _ in range(messages):
+            c0 = time.perf_counter()
+            engine.broadcast(payload)
+            worst_call = max(worst_call, time.perf_counter() - c0)
+        call_time = time.perf_counter() - t0
+
+        expected = messages * len(payload)
+        deadline = time.time() + 20
+        while min(received) < expected and time.time() < deadline:
+            time.sleep(0.05)
+        stop.set()
+        t.join()
+
+        s = engine.stats()
+        fast_ok = min(received) == expected
+        slow_ok = {
+            "drop": s["dropped"] > 0,
+            "disconnect": s["disconnected"] == 1,
+            "coalesce": s["coalesced"] > 0,
+        }[policy]
+        print(f"  [{'✓' if fast_ok and slow_ok else '✗'}] {policy:10s} "
+              f"{clients} clienți × {messages} mesaje în {call_time * 1000:.0f}ms "
+              f"(cel mai lent broadcast {worst_call * 1000:.1f}ms)")
+        print(f"      {engine.summary()}")
+        ok = ok and fast_ok and slow_ok
+
+        engine.stop()
+        for a, b in pairs:
+            a.close()
+            b.close()
+    return ok
+
+
+def _selftest_lossless(messages: int = 2000) -> bool:
+    """
+    Un client care citește abia după 0.5 s, cu max_queue=4 și politica drop:
+    răspunsurile directe (droppable=False) ajung toate, în ordine, iar
+    broadcast-urile de pe aceeași conexiune sunt aruncate de politică.
+    """
+    engine = BroadcastEngine(max_queue=4, policy="drop").start()
+    server_side, client_side = socket.socketpair()
+    engine.add(server_side)
+    payload = b"y" * 4000
+
+    def writer() -> None:
+        for i in range(messages):
+            engine.send(server_side, b"%06d" % i + payload, droppable=False)
+            engine.broadcast(b"B" * len(payload))
+
+    t = threading.Thread(target=writer, daemon=True)
+    t.start()
+    time.sleep(0.5)
+    expected = b"".join(b"%06d" % i + payload for i in range(messages))
+    data = bytearray()
+    client_side.settimeout(1.0)
+    while True:                 # până nu mai vine nimic timp de 1 s
+        try:
+            chunk = client_side.recv(1 << 16)
+        except socket.timeout:
+            break
+        if not chunk:
+            break
+        data += chunk
+    t.join(timeout=5.0)
+    replies = bytes(data).replace(b"B" * len(payload), b"")
+    s = engine.stats()
+    ok = replies == expected and s["dropped"] > 0
+    print(f"  [{'✓' if ok else '✗'}] lossless   {messages} răspunsuri directe către un "
+          f"client lent: {'toate, în ordine' if replies == expected else 'PIERDERI'}; "
+          f"broadcast aruncate={s['dropped']}")
+    engine.stop()
+    server_side.close()
+    client_side.close()
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+    print("=== Test broadcast_engine ===")
+    sys.exit(0 if _selftest() and _selftest_lossless() else 1)
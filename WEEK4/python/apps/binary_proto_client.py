@@ -16,12 +16,23 @@ UTILIZARE INTERACTIVĂ:
   < COUNT_RESP: 1
   > keys
   < KEYS_RESP: ['name']
+  > scan na
+  < SCAN_RESP: ['name'] (1 keys, 1 pages)
   > quit
 
 UTILIZARE PROGRAMATICĂ:
 -----------------------
   python3 binary_proto_client.py --host localhost --port 5401 \\
       --command "put name Alice" --command "get name"
+
+PIPELINING:
+-----------
+  Cu pipeline() clientul ține până la `window` request-uri în zbor și
+  corelează răspunsurile după seq; pe o legătură cu RTT mare, N operații
+  mici costă ~N/window RTT-uri în loc de N.
+
+  python3 binary_proto_client.py --bench 10000              # secvențial
+  python3 binary_proto_client.py --bench 10000 --pipeline 128
 """
 from __future__ import annotations
 
@@ -29,22 +40,28 @@ import argparse
 import socket
 import struct
 import sys
+import time
 
 # Adăugăm directorul utils la path
 sys.path.insert(0, str(__file__).rsplit('/', 2)[0] + '/utils')
 from io_utils import recv_exact
 from proto_common import (
     BIN_HEADER_LEN,
-    TYPE_ECHO_REQ, TYPE_ECHO_RESP,
+    TYPE_ECHO_REQ,
     TYPE_PUT_REQ, TYPE_PUT_RESP,
-    TYPE_GET_REQ, TYPE_GET_RESP,
-    TYPE_COUNT_REQ, TYPE_COUNT_RESP,
-    TYPE_KEYS_REQ, TYPE_KEYS_RESP,
+    TYPE_GET_REQ,
+    TYPE_COUNT_REQ,
+    TYPE_KEYS_REQ,
+    TYPE_SCAN_REQ, SCAN_DEFAULT_COUNT,
     TYPE_ERR,
     unpack_bin_header, pack_bin_message, validate_bin_message,
-    encode_kv, encode_key
+    encode_bin_batch, decode_bin_batch,
+    encode_kv, encode_key, encode_scan_req, decode_scan_resp
 )
 
+DEFAULT_PIPELINE_WINDOW = 128
+RECV_CHUNK = 65536
+
 
 class BinaryClient:
     """Client pentru protocolul binar."""
@@ -54,6 +71,7 @@ class BinaryClient:
         self.port = port
         self.conn: socket.socket | None = None
         self.seq = 0
+        self._rbuf = bytearray()     # răspunsuri primite dar încă nedecodate (pipeline)
     
     def connect(self) -> None:
         """Stabilește conexiunea."""
@@ -106,6 +124,98 @@ class BinaryClient:
         
         return header.mtype, resp_payload
     
+    def _recv_frames(self) -> list[tuple[int, int, bytes]]:
+        """
+        Un recv() și decodarea tuturor răspunsurilor complete din buffer.
+        
+        Returns:
+            Listă de (seq, response_type, response_payload); poate fi goală
+        """
+        chunk = self.conn.recv(RECV_CHUNK)
+        if not chunk:
+            raise ConnectionError("peer closed connection")
+        buf = self._rbuf
+        buf += chunk
+        
+        frames, offset = decode_bin_batch(buf)
+        if len(buf) - offset >= BIN_HEADER_LEN and not unpack_bin_header(
+                bytes(buf[offset:offset + BIN_HEADER_LEN])).is_valid_protocol():
+            raise ValueError("Response protocol mismatch")
+        del buf[:offset]
+        
+        result = []
+        for frame in frames:
+            if not frame.crc_ok:
+                raise ValueError("Response CRC mismatch")
+            result.append((frame.seq, frame.mtype, frame.payload))
+        return result
+    
+    def pipeline(
+        self,
+        requests: list[tuple[int, bytes]],
+        window: int = DEFAULT_PIPELINE_WINDOW
+    ) -> list[tuple[int, bytes]]:
+        """
+        Trimite request-urile fără să aștepte fiecare răspuns.
+        
+        Cel mult `window` request-uri sunt în zbor. Când numărul lor scade la
+        jumătate, următorul grup de request-uri pleacă într-un singur sendall().
+        Răspunsurile sunt corelate după seq, deci ordinea lor nu contează.
+        
+        Args:
+            requests: Listă de (mtype, payload)
+            window: Numărul maxim de request-uri fără răspuns
+            
+        Returns:
+            Listă de (response_type, response_payload), în ordinea request-urilor
+        """
+        if not self.conn:
+            raise ConnectionError("Not connected")
+        
+        results: list[tuple[int, bytes] | None] = [None] * len(requests)
+        in_flight: dict[int, int] = {}      # seq → indexul request-ului
+        next_req = 0
+        done = 0
+        
+        while done < len(requests):
+            if next_req < len(requests) and len(in_flight) <= window // 2:
+                out = []
+                while next_req < len(requests) and len(in_flight) < window:
+                    mtype, payload = requests[next_req]
+                    seq = self._next_seq()
+                    in_flight[seq] = next_req
+                    out.append((mtype, payload, seq))
+                    next_req += 1
+                self.conn.sendall(encode_bin_batch(out))
+            
+            for seq, rtype, payload in self._recv_frames():
+                index = in_flight.pop(seq, None)
+                if index is None:
+                    print(f"Warning: unexpected response seq {seq}")
+                    continue
+                results[index] = (rtype, payload)
+                done += 1
+        
+        return results
+    
+    def put_many(self, items: list[tuple[str, str]], window: int = DEFAULT_PIPELINE_WINDOW) -> int:
+        """PUT pipelined. Returnează numărul de chei stocate cu succes."""
+        responses = self.pipeline([(TYPE_PUT_REQ, encode_kv(k, v)) for k, v in items], window)
+        return sum(1 for rtype, _ in responses if rtype == TYPE_PUT_RESP)
+    
+    def get_many(self, keys: list[str], window: int = DEFAULT_PIPELINE_WINDOW) -> list[str | None]:
+        """GET pipelined. None pentru cheile inexistente."""
+        responses = self.pipeline([(TYPE_GET_REQ, encode_key(k)) for k in keys], window)
+        values: list[str | None] = []
+        for rtype, resp in responses:
+            if rtype == TYPE_ERR:
+                if b"not_found" in resp:
+                    values.append(None)
+                    continue
+                raise RuntimeError(f"Server error: {resp.decode()}")
+            values.append(resp.decode("utf-8"))
+        return values
+    
     def echo(self, data: bytes) -> bytes:
         """Trimite ECHO și returnează răspunsul."""
         rtype, payload = self._send_recv(TYPE_ECHO_REQ, data)
@@ -162,11 +272,38 @@ class BinaryClient:
             offset += klen
         
         return keys
+    
+    def scan(
+        self,
+        cursor: str | None = None,
+        count: int = SCAN_DEFAULT_COUNT,
+        prefix: str = ""
+    ) -> tuple[list[str], str | None]:
+        """
+        O pagină de chei. Returnează (chei, cursor); cursor None = ultima pagină.
+        """
+        rtype, resp = self._send_recv(TYPE_SCAN_REQ, encode_scan_req(cursor, count, prefix))
+        if rtype == TYPE_ERR:
+            raise RuntimeError(f"Server error: {resp.decode()}")
+        return decode_scan_resp(resp)
+
+
+def scan_all(client: BinaryClient, prefix: str, count: int = SCAN_DEFAULT_COUNT) -> tuple[list[str], int]:
+    """Toate cheile cu prefix, prin SCAN. Returnează (chei, număr de pagini)."""
+    keys: list[str] = []
+    pages = 0
+    cursor = None
+    while True:
+        page, cursor = client.scan(cursor, count, prefix)
+        keys.extend(page)
+        pages += 1
+        if cursor is None:
+            return keys, pages
 
 
 def interactive_mode(client: BinaryClient) -> None:
     """Mod interactiv."""
-    print("Connected! Commands: echo <data>, put <key> <value>, get <key>, count, keys, quit")
+    print("Connected! Commands: echo <data>, put <key> <value>, get <key>, count, keys, scan [prefix], quit")
     print()
     
     while True:
@@ -219,6 +356,10 @@ def interactive_mode(client: BinaryClient) -> None:
                 ks = client.keys()
                 print(f"< KEYS_RESP: {ks}")
             
+            elif cmd == "scan":
+                ks, pages = scan_all(client, parts[1] if len(parts) > 1 else "")
+                print(f"< SCAN_RESP: {ks} ({len(ks)} keys, {pages} pages)")
+            
             else:
                 print(f"Unknown command: {cmd}")
                 
@@ -268,6 +409,10 @@ def command_mode(client: BinaryClient, commands: list[str], verbose: bool) -> in
             elif cmd == "keys":
                 print(client.keys())
             
+            elif cmd == "scan":
+                ks, pages = scan_all(client, parts[1] if len(parts) > 1 else "")
+                print(f"{ks} ({len(ks)} keys, {pages} pages)" if verbose else ks)
+            
             else:
                 print(f"Unknown: {cmd}")
                 errors += 1
@@ -279,6 +424,31 @@ def command_mode(client: BinaryClient, commands: list[str], verbose: bool) -> in
     return errors
 
 
+def bench_mode(client: BinaryClient, n: int, window: int) -> int:
+    """Măsoară ops/s pentru N PUT + N GET, secvențial (window=1) sau pipelined."""
+    items = [(f"bench:{i}", f"value-{i}") for i in range(n)]
+    
+    start = time.perf_counter()
+    if window <= 1:
+        stored = sum(1 for k, v in items if client.put(k, v))
+    else:
+        stored = client.put_many(items, window)
+    put_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    if window <= 1:
+        values = [client.get(k) for k, _ in items]
+    else:
+        values = client.get_many([k for k, _ in items], window)
+    get_time = time.perf_counter() - start
+    
+    mismatches = sum(1 for (_, v), got in zip(items, values) if got != v)
+    mode = "sequential" if window <= 1 else f"pipeline window={window}"
+    print(f"[{mode}] PUT: {n / put_time:,.0f} ops/s ({stored}/{n} OK), "
+          f"GET: {n / get_time:,.0f} ops/s ({mismatches} mismatches)")
+    return 0 if stored == n and not mismatches else 1
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Client TCP pentru protocolul binar"
@@ -287,6 +457,10 @@ def main() -> int:
     parser.add_argument("--port", type=int, default=5401)
     parser.add_argument("--command", "-c", action="append", dest="commands")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="Benchmark: N PUT + N GET, raportează ops/s")
+    parser.add_argument("--pipeline", type=int, default=1, metavar="W",
+                        help="Request-uri în zbor pentru --bench (default: 1 = secvențial)")
     
     args = parser.parse_args()
     
@@ -295,6 +469,8 @@ def main() -> int:
     try:
         client.connect()
         
+        if args.bench:
+            return bench_mode(client, args.bench, args.pipeline)
         if args.commands:
             return command_mode(client, args.commands, args.verbose)
         else:
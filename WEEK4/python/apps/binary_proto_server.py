@@ -23,6 +23,7 @@ Payload (variabil):
   - Pentru ECHO: orice bytes
   - Pentru COUNT: gol
   - Pentru KEYS: gol
+  - Pentru SCAN: count(2B) + flags(1B) + prefix_len(1B) + prefix + cursor_len(1B) + cursor
 
 TIPURI DE MESAJE:
 -----------------
@@ -30,7 +31,8 @@ TIPURI DE MESAJE:
   PUT_REQ(3)    → PUT_RESP(4): stochează cheie-valoare
   GET_REQ(5)    → GET_RESP(6): returnează valoarea
   COUNT_REQ(9)  → COUNT_RESP(10): numărul de chei
-  KEYS_REQ(7)   → KEYS_RESP(8): lista cheilor
+  KEYS_REQ(7)   → KEYS_RESP(8): lista cheilor (doar dacă încape într-un payload)
+  SCAN_REQ(11)  → SCAN_RESP(12): o pagină de chei sortate + cursorul următor
   ERROR(255)    → eroare
 
 DE CE ACEST DESIGN:
@@ -40,6 +42,13 @@ DE CE ACEST DESIGN:
 - CRC32 detectează erori de transmisie
 - Big-endian (network byte order) pentru interoperabilitate
 
+PIPELINING:
+-----------
+Clientul poate trimite mai multe request-uri fără să aștepte răspunsurile
+(corelate apoi după seq). Serverul decodează toate frame-urile complete
+aflate în buffer după fiecare recv() și trimite răspunsurile lor cu un
+singur sendall(), în ordinea request-urilor.
+
 UTILIZARE:
 ----------
   python3 binary_proto_server.py --port 4444 --verbose
@@ -51,93 +60,64 @@ import socket
 import threading
 import struct
 import sys
-from typing import Dict, Tuple
+from typing import List, Tuple
 
 # Adăugăm directorul utils la path
 sys.path.insert(0, str(__file__).rsplit('/', 2)[0] + '/utils')
-from io_utils import recv_exact
 from proto_common import (
-    BIN_HEADER_LEN, BIN_MAGIC, BIN_VERSION,
+    BIN_HEADER_LEN, TYPE_NAMES,
     TYPE_ECHO_REQ, TYPE_ECHO_RESP,
     TYPE_PUT_REQ, TYPE_PUT_RESP,
     TYPE_GET_REQ, TYPE_GET_RESP,
     TYPE_COUNT_REQ, TYPE_COUNT_RESP,
     TYPE_KEYS_REQ, TYPE_KEYS_RESP,
+    TYPE_SCAN_REQ, TYPE_SCAN_RESP, SCAN_MAX_COUNT,
     TYPE_ERR,
-    unpack_bin_header, pack_bin_message, validate_bin_message,
-    decode_kv, decode_key
+    unpack_bin_header, pack_bin_message, decode_bin_batch,
+    decode_kv, decode_key, decode_scan_req, encode_scan_resp
 )
+from kv_store import ShardedStore, DEFAULT_SHARDS
+from kv_persist import open_store, FSYNC_POLICIES, DEFAULT_FSYNC_MS, DEFAULT_SNAPSHOT_INTERVAL
+
+RECV_CHUNK = 65536
 
 
 def handle_client(
     conn: socket.socket,
     addr: Tuple[str, int],
-    state: Dict[str, str],
-    lock: threading.Lock,
+    state: ShardedStore,
     verbose: bool
 ) -> None:
     """
     Gestionează comunicarea cu un singur client.
     
-    Loop de procesare mesaje:
-    1. Citim header (14 bytes)
-    2. Validăm magic și version
-    3. Citim payload (payload_len bytes)
-    4. Verificăm CRC
-    5. Procesăm comanda
-    6. Trimitem răspuns
+    Loop de procesare:
+    1. recv() într-un buffer (poate conține mai multe frame-uri sau doar o parte)
+    2. Decodăm și procesăm toate frame-urile complete (process_frames)
+    3. Trimitem toate răspunsurile cu un singur sendall()
+    4. Restul incomplet rămâne în buffer pentru următorul recv()
     """
     with conn:
         if verbose:
             print(f"[BIN] + connected {addr[0]}:{addr[1]}")
         
+        buf = bytearray()
         try:
             while True:
-                # 1. Citim header
-                try:
-                    header_bytes = recv_exact(conn, BIN_HEADER_LEN)
-                except ConnectionError:
+                chunk = conn.recv(RECV_CHUNK)
+                if not chunk:
                     break
+                buf += chunk
                 
-                # 2. Parsăm header
-                try:
-                    header = unpack_bin_header(header_bytes)
-                except Exception as e:
-                    if verbose:
-                        print(f"[BIN] ! invalid header from {addr}: {e}")
+                responses, consumed, fatal = process_frames(buf, addr, state, verbose)
+                if consumed:
+                    del buf[:consumed]
+                if responses:
+                    conn.sendall(b"".join(responses))
+                    if verbose and len(responses) > 1:
+                        print(f"[BIN] > {addr[0]}:{addr[1]}: batch of {len(responses)} responses")
+                if fatal:
                     break
-                
-                # 3. Validăm protocol
-                if not header.is_valid_protocol():
-                    if verbose:
-                        print(f"[BIN] ! protocol mismatch from {addr}")
-                    resp = pack_bin_message(TYPE_ERR, b"bad_protocol", header.seq)
-                    conn.sendall(resp)
-                    break
-                
-                # 4. Citim payload
-                payload = recv_exact(conn, header.payload_len)
-                
-                # 5. Verificăm CRC
-                if not validate_bin_message(header, payload):
-                    if verbose:
-                        print(f"[BIN] ! CRC mismatch from {addr}")
-                    resp = pack_bin_message(TYPE_ERR, b"crc_mismatch", header.seq)
-                    conn.sendall(resp)
-                    continue
-                
-                if verbose:
-                    print(f"[BIN] < {addr[0]}:{addr[1]}: type={header.type_name} seq={header.seq} len={header.payload_len}")
-                
-                # 6. Procesăm comanda
-                resp = process_request(header.mtype, header.seq, payload, state, lock)
-                
-                # 7. Trimitem răspuns
-                conn.sendall(resp)
-                
-                if verbose:
-                    resp_header = unpack_bin_header(resp[:BIN_HEADER_LEN])
-                    print(f"[BIN] > {addr[0]}:{addr[1]}: type={resp_header.type_name} seq={resp_header.seq}")
                     
         except Exception as e:
             if verbose:
@@ -147,15 +127,74 @@ def handle_client(
             print(f"[BIN] - disconnected {addr[0]}:{addr[1]}")
 
 
+def process_frames(
+    buf: bytearray,
+    addr: Tuple[str, int],
+    state: ShardedStore,
+    verbose: bool
+) -> Tuple[List[bytes], int, bool]:
+    """
+    Procesează toate frame-urile complete din buffer.
+    
+    Frame-urile complete sunt decodate dintr-o trecere (decode_bin_batch);
+    pentru fiecare:
+    1. CRC greșit → ERR crc_mismatch
+    2. Altfel procesăm comanda
+    Decodarea se oprește la un frame incomplet (așteptăm următorul recv())
+    sau la un header cu magic/version greșit (închidem conexiunea).
+    
+    Cu persistență și fsync=always, PUT-urile din lot nu așteaptă fiecare
+    fsync-ul lor: așteptăm o singură dată, înainte de a returna răspunsurile.
+    
+    Returns:
+        Tuple de (răspunsuri, bytes consumați din buffer, închidem conexiunea?)
+    """
+    responses: List[bytes] = []
+    frames, offset = decode_bin_batch(buf)
+    
+    for frame in frames:
+        if not frame.crc_ok:
+            if verbose:
+                print(f"[BIN] ! CRC mismatch from {addr}")
+            responses.append(pack_bin_message(TYPE_ERR, b"crc_mismatch", frame.seq))
+            continue
+        
+        if verbose:
+            print(f"[BIN] < {addr[0]}:{addr[1]}: type={TYPE_NAMES.get(frame.mtype, frame.mtype)} "
+                  f"seq={frame.seq} len={len(frame.payload)}")
+        
+        resp = process_request(frame.mtype, frame.seq, frame.payload, state, durable=False)
+        responses.append(resp)
+        
+        if verbose:
+            resp_header = unpack_bin_header(resp[:BIN_HEADER_LEN])
+            print(f"[BIN] > {addr[0]}:{addr[1]}: type={resp_header.type_name} seq={resp_header.seq}")
+    
+    if responses and state.journal is not None:
+        state.journal.wait(state.journal.written)
+    
+    fatal = False
+    if len(buf) - offset >= BIN_HEADER_LEN:
+        header = unpack_bin_header(bytes(buf[offset:offset + BIN_HEADER_LEN]))
+        if not header.is_valid_protocol():
+            if verbose:
+                print(f"[BIN] ! protocol mismatch from {addr}")
+            responses.append(pack_bin_message(TYPE_ERR, b"bad_protocol", header.seq))
+            fatal = True
+    return responses, offset, fatal
+
+
 def process_request(
     mtype: int,
     seq: int,
     payload: bytes,
-    state: Dict[str, str],
-    lock: threading.Lock
+    state: ShardedStore,
+    durable: bool = True
 ) -> bytes:
     """
     Procesează un request și returnează răspunsul împachetat.
+    
+    State-ul este thread-safe (lock per shard), nu e nevoie de lock global.
     """
     # ECHO - returnează payload-ul primit
     if mtype == TYPE_ECHO_REQ:
@@ -168,8 +207,7 @@ def process_request(
         except Exception as e:
             return pack_bin_message(TYPE_ERR, f"bad_put_payload: {e}".encode(), seq)
         
-        with lock:
-            state[key] = value
+        state.put(key, value, durable=durable)
         
         return pack_bin_message(TYPE_PUT_RESP, b"OK", seq)
     
@@ -180,33 +218,47 @@ def process_request(
         except Exception as e:
             return pack_bin_message(TYPE_ERR, f"bad_get_payload: {e}".encode(), seq)
         
-        with lock:
-            value = state.get(key, "")
+        value = state.get(key)
         
-        if not value and key not in state:
+        if value is None:
             return pack_bin_message(TYPE_ERR, b"not_found", seq)
         
         return pack_bin_message(TYPE_GET_RESP, value.encode("utf-8"), seq)
     
     # COUNT - numărul de chei
     if mtype == TYPE_COUNT_REQ:
-        with lock:
-            count = len(state)
+        count = len(state)
         # Returnăm count-ul ca unsigned int (4 bytes, big-endian)
         return pack_bin_message(TYPE_COUNT_RESP, struct.pack("!I", count), seq)
     
     # KEYS - lista cheilor
     if mtype == TYPE_KEYS_REQ:
-        with lock:
-            keys = list(state.keys())
+        keys = state.keys()   # deja sortate
+        if len(keys) > 65535:
+            return pack_bin_message(TYPE_ERR, b"too_many_keys: use SCAN", seq)
         
         # Codificăm lista: num_keys(2B) + [key_len(1B) + key(N)]...
         parts = [struct.pack("!H", len(keys))]
-        for key in sorted(keys):
+        for key in keys:
             kb = key.encode("utf-8")
             parts.append(struct.pack("!B", len(kb)) + kb)
         
-        return pack_bin_message(TYPE_KEYS_RESP, b"".join(parts), seq)
+        resp_payload = b"".join(parts)
+        if len(resp_payload) > 65535:
+            return pack_bin_message(TYPE_ERR, b"too_many_keys: use SCAN", seq)
+        return pack_bin_message(TYPE_KEYS_RESP, resp_payload, seq)
+    
+    # SCAN - o pagină de chei după cursor; serverul nu ține stare între pagini
+    if mtype == TYPE_SCAN_REQ:
+        try:
+            cursor, count, prefix = decode_scan_req(payload)
+        except Exception as e:
+            return pack_bin_message(TYPE_ERR, f"bad_scan_payload: {e}".encode(), seq)
+        
+        count = max(1, min(count, SCAN_MAX_COUNT))
+        keys, next_cursor = state.scan(cursor, count, prefix)
+        resp_payload, _ = encode_scan_resp(keys, next_cursor)
+        return pack_bin_message(TYPE_SCAN_RESP, resp_payload, seq)
     
     # Tip necunoscut
     return pack_bin_message(TYPE_ERR, f"unknown_type: {mtype}".encode(), seq)
@@ -220,11 +272,25 @@ def main() -> int:
     parser.add_argument("--host", default="0.0.0.0", help="Adresa de bind (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=5401, help="Portul de ascultare (default: 5401 - WEEK4 standard)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Afișează mesajele procesate")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS,
+                        help=f"Număr de shard-uri (lock-uri) ale stocării (default: {DEFAULT_SHARDS})")
+    parser.add_argument("--data-dir", default=None,
+                        help="Director pentru jurnal și snapshot-uri (default: fără persistență)")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="interval",
+                        help="Politica fsync a jurnalului (default: interval)")
+    parser.add_argument("--fsync-ms", type=int, default=DEFAULT_FSYNC_MS,
+                        help=f"Intervalul fsync pentru --fsync interval (default: {DEFAULT_FSYNC_MS} ms)")
+    parser.add_argument("--snapshot-every", type=float, default=DEFAULT_SNAPSHOT_INTERVAL,
+                        help=f"Secunde între snapshot-uri (default: {DEFAULT_SNAPSHOT_INTERVAL:.0f}, 0 = niciodată)")
     
     args = parser.parse_args()
     
-    state: Dict[str, str] = {}
-    lock = threading.Lock()
+    try:
+        state, journal = open_store(args.shards, args.data_dir, args.fsync,
+                                    args.fsync_ms, args.snapshot_every)
+    except ValueError as e:
+        print(f"[BIN] Cannot recover data: {e}")
+        return 1
     
     srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -235,13 +301,16 @@ def main() -> int:
         
         print(f"[BIN] Server listening on {args.host}:{args.port}")
         print(f"[BIN] Protocol: binary header (14B) + CRC32")
+        if journal:
+            print(f"[BIN] Persistence: {args.data_dir} (fsync={args.fsync}), recovered "
+                  f"{len(state)} keys from {journal.recovered} records in {journal.recovery_seconds:.2f}s")
         print(f"[BIN] Press Ctrl+C to stop")
         
         while True:
             conn, addr = srv.accept()
             t = threading.Thread(
                 target=handle_client,
-                args=(conn, addr, state, lock, args.verbose),
+                args=(conn, addr, state, args.verbose),
                 daemon=True
             )
             t.start()
@@ -257,6 +326,8 @@ def main() -> int:
             srv.close()
         except Exception:
             pass
+        if journal:
+            journal.close()
 
 
 if __name__ == "__main__":
@@ -18,6 +18,8 @@ COMENZI DISPONIBILE:
 --------------------
   PING              → OK pong
   SET <key> <value> → OK stored <key>
+  SETEX <key> <sec> <value> → OK stored <key> (expiră după <sec> secunde)
+  TTL <key>         → OK <sec> | OK -1 (fără expirare) | ERR not_found
   GET <key>         → OK <key> <value> | ERR not_found
   DEL <key>         → OK deleted | OK no_such_key
   COUNT             → OK <n> keys
@@ -42,11 +44,12 @@ import argparse
 import socket
 import threading
 import sys
-from typing import Dict
 
 # Adăugăm directorul utils la path
 sys.path.insert(0, str(__file__).rsplit('/', 2)[0] + '/utils')
 from io_utils import recv_until, recv_exact
+from kv_store import ShardedStore, DEFAULT_SHARDS
+from kv_persist import open_store, FSYNC_POLICIES, DEFAULT_FSYNC_MS, DEFAULT_SNAPSHOT_INTERVAL
 
 
 def recv_framed(conn: socket.socket) -> str:
@@ -86,11 +89,12 @@ def send_framed(conn: socket.socket, payload: str) -> None:
     conn.sendall(header + payload_bytes)
 
 
-def process_command(state: Dict[str, str], line: str) -> str:
+def process_command(state: ShardedStore, line: str) -> str:
     """
     Procesează o comandă și returnează răspunsul.
     
-    State este dicționarul partajat (thread-safe via lock extern).
+    State este stocarea partajată; ShardedStore își face singur locking-ul
+    per shard, deci nu mai e nevoie de un lock global.
     """
     parts = line.strip().split()
     if not parts:
@@ -108,36 +112,60 @@ def process_command(state: Dict[str, str], line: str) -> str:
             return "ERR usage: SET <key> <value>"
         key = parts[1]
         value = " ".join(parts[2:])  # value poate conține spații
-        state[key] = value
+        state.put(key, value)
         return f"OK stored {key}"
     
+    # SETEX <key> <sec> <value> - stochează o valoare cu expirare
+    if cmd == "SETEX":
+        if len(parts) < 4:
+            return "ERR usage: SETEX <key> <sec> <value>"
+        key = parts[1]
+        try:
+            ttl = float(parts[2])
+        except ValueError:
+            return "ERR invalid_ttl"
+        if ttl <= 0:
+            return "ERR invalid_ttl"
+        state.put(key, " ".join(parts[3:]), ttl=ttl)
+        return f"OK stored {key}"
+    
+    # TTL <key> - secunde rămase până la expirare
+    if cmd == "TTL":
+        if len(parts) != 2:
+            return "ERR usage: TTL <key>"
+        try:
+            remaining = state.ttl(parts[1])
+        except KeyError:
+            return "ERR not_found"
+        return "OK -1" if remaining is None else f"OK {remaining:.1f}"
+    
     # GET <key> - citește o valoare
     if cmd == "GET":
         if len(parts) != 2:
             return "ERR usage: GET <key>"
         key = parts[1]
-        if key not in state:
+        value = state.get(key)
+        if value is None:
             return "ERR not_found"
-        return f"OK {key} {state[key]}"
+        return f"OK {key} {value}"
     
     # DEL <key> - șterge o cheie
     if cmd == "DEL":
         if len(parts) != 2:
             return "ERR usage: DEL <key>"
-        key = parts[1]
-        existed = key in state
-        state.pop(key, None)
+        existed = state.delete(parts[1])
         return "OK deleted" if existed else "OK no_such_key"
     
     # COUNT - numărul de chei
     if cmd == "COUNT":
         return f"OK {len(state)} keys"
     
-    # KEYS - lista cheilor
+    # KEYS - lista cheilor (deja sortată de store)
     if cmd == "KEYS":
-        if not state:
+        keys = state.keys()
+        if not keys:
             return "OK"
-        return "OK " + " ".join(sorted(state.keys()))
+        return "OK " + " ".join(keys)
     
     # QUIT - închide conexiunea
     if cmd == "QUIT":
@@ -149,8 +177,7 @@ def process_command(state: Dict[str, str], line: str) -> str:
 def handle_client(
     conn: socket.socket,
     addr: tuple,
-    state: Dict[str, str],
-    lock: threading.Lock,
+    state: ShardedStore,
     verbose: bool
 ) -> None:
     """
@@ -158,7 +185,7 @@ def handle_client(
     
     Loop de procesare:
     1. Primește mesaj framat
-    2. Procesează comanda (cu lock pe state)
+    2. Procesează comanda (locking per shard, în store)
     3. Trimite răspuns
     4. Repetă până la QUIT sau eroare
     """
@@ -179,9 +206,8 @@ def handle_client(
                 if verbose:
                     print(f"[TEXT] < {addr[0]}:{addr[1]}: {line}")
                 
-                # 2. Procesăm comanda (thread-safe)
-                with lock:
-                    response = process_command(state, line)
+                # 2. Procesăm comanda (thread-safe prin store)
+                response = process_command(state, line)
                 
                 # 3. Trimitem răspuns
                 send_framed(conn, response)
@@ -225,12 +251,36 @@ Testare cu client:
         "--verbose", "-v", action="store_true",
         help="Afișează mesajele procesate"
     )
+    parser.add_argument(
+        "--shards", type=int, default=DEFAULT_SHARDS,
+        help=f"Număr de shard-uri (lock-uri) ale stocării (default: {DEFAULT_SHARDS})"
+    )
+    parser.add_argument(
+        "--data-dir", default=None,
+        help="Director pentru jurnal și snapshot-uri (default: fără persistență)"
+    )
+    parser.add_argument(
+        "--fsync", choices=FSYNC_POLICIES, default="interval",
+        help="Politica fsync a jurnalului (default: interval)"
+    )
+    parser.add_argument(
+        "--fsync-ms", type=int, default=DEFAULT_FSYNC_MS,
+        help=f"Intervalul fsync pentru --fsync interval (default: {DEFAULT_FSYNC_MS} ms)"
+    )
+    parser.add_argument(
+        "--snapshot-every", type=float, default=DEFAULT_SNAPSHOT_INTERVAL,
+        help=f"Secunde între snapshot-uri (default: {DEFAULT_SNAPSHOT_INTERVAL:.0f}, 0 = niciodată)"
+    )
     
     args = parser.parse_args()
     
     # State partajat între thread-uri
-    state: Dict[str, str] = {}
-    lock = threading.Lock()
+    try:
+        state, journal = open_store(args.shards, args.data_dir, args.fsync,
+                                    args.fsync_ms, args.snapshot_every)
+    except ValueError as e:
+        print(f"[TEXT] Cannot recover data: {e}")
+        return 1
     
     # Creare socket server
     srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -242,14 +292,17 @@ Testare cu client:
         
         print(f"[TEXT] Server listening on {args.host}:{args.port}")
         print(f"[TEXT] Protocol: length-prefixed text (<LEN> <PAYLOAD>)")
-        print(f"[TEXT] Commands: PING, SET, GET, DEL, COUNT, KEYS, QUIT")
+        print(f"[TEXT] Commands: PING, SET, SETEX, TTL, GET, DEL, COUNT, KEYS, QUIT")
+        if journal:
+            print(f"[TEXT] Persistence: {args.data_dir} (fsync={args.fsync}), recovered "
+                  f"{len(state)} keys from {journal.recovered} records in {journal.recovery_seconds:.2f}s")
         print(f"[TEXT] Press Ctrl+C to stop")
         
         while True:
             conn, addr = srv.accept()
             t = threading.Thread(
                 target=handle_client,
-                args=(conn, addr, state, lock, args.verbose),
+                args=(conn, addr, state, args.verbose),
                 daemon=True
             )
             t.start()
@@ -265,6 +318,8 @@ Testare cu client:
             srv.close()
         except Exception:
             pass
+        if journal:
+            journal.close()
 
 
 if __name__ == "__main__":
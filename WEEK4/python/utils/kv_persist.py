@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Persistență pentru ShardedStore: jurnal append-only + snapshot-uri.
+
+Fără persistență, serverele din Săptămâna 4 pierd toate datele la repornire.
+Journal scrie fiecare PUT/DEL ca înregistrare binară cu CRC32 la finalul unui
+fișier jurnal (write-ahead log) și, periodic, salvează un snapshot compact al
+întregii stocări, după care jurnalele vechi pot fi șterse.
+
+Fișiere în directorul de date:
+    snapshot.db        - starea completă la începutul generației G
+    wal.<G>.log        - operațiile de după snapshot (G, G+1, ...)
+
+Politici fsync (cât de durabil este un PUT confirmat clientului):
+    always    - clientul primește răspunsul doar după fsync; group commit:
+                un singur fsync acoperă toate înregistrările scrise până atunci,
+                deci thread-urile concurente împart costul
+    interval  - write() imediat (supraviețuiește unui crash al procesului),
+                fsync la fiecare N ms dintr-un thread separat (pierdere maximă
+                la căderea tensiunii: ultimele N ms)
+    os        - doar write(); kernel-ul decide când ajung datele pe disc
+
+Recuperare la pornire: snapshot-ul (dacă există) + reluarea jurnalelor din
+generațiile >= G. O înregistrare incompletă sau cu CRC greșit la finalul
+ultimului jurnal cu înregistrări (scriere întreruptă) este tăiată; generațiile
+goale de după el sunt cele deschise de o recuperare urmată de un nou crash.
+Înainte de a deschide generația nouă, recuperarea face fsync pe jurnalele
+reluate, deci o generație urmată de înregistrări este completă pe disc: o
+înregistrare invalidă acolo (sau în snapshot) înseamnă corupere, iar
+recuperarea se oprește cu ValueError în loc să reia jurnalele următoare
+peste o gaură.
+
+UTILIZARE:
+    store = ShardedStore()
+    journal = Journal("./data", fsync="interval", fsync_ms=1000)
+    journal.recover(store)
+    store.journal = journal
+    journal.start_snapshots(store, interval=60)
+
+    python3 kv_persist.py                   # self-test
+    python3 kv_persist.py --bench           # ops/s pentru fiecare politică fsync
+"""
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+from kv_store import ShardedStore
+
+
+FSYNC_POLICIES = ("always", "interval", "os")
+DEFAULT_FSYNC_MS = 1000
+DEFAULT_SNAPSHOT_INTERVAL = 300.0
+
+SNAPSHOT_FILE = "snapshot.db"
+SNAPSHOT_MAGIC = b"NPSNAP01"
+
+OP_PUT = 1
+OP_DEL = 2
+
+# Înregistrare: crc32(4) + op(1) + key_len(2) + value_len(4) + expires_at(8) + key + value
+# CRC-ul acoperă tot ce urmează după el; expires_at = time.time() la expirare, 0 = fără
+_CRC = struct.Struct("!I")
+_RECORD = struct.Struct("!BHId")
+_RECORD_HEADER_LEN = _CRC.size + _RECORD.size
+_SNAPSHOT_HEADER = struct.Struct("!8sQ")    # magic + generația primului jurnal nereflectat
+
+
+def encode_record(op: int, key: str, value: str = "", expires_at: float = 0.0) -> bytes:
+    """Construiește o înregistrare de jurnal (PUT sau DEL)."""
+    kb = key.encode("utf-8")
+    vb = value.encode("utf-8")
+    body = _RECORD.pack(op, len(kb), len(vb), expires_at) + kb + vb
+    return _CRC.pack(zlib.crc32(body) & 0xFFFFFFFF) + body
+
+
+def replay_records(data: bytes, apply: Callable[[int, str, str, float], None]) -> Tuple[int, int]:
+    """
+    Aplică înregistrările valide din `data`, în ordine.
+
+    Returns:
+        Tuple de (înregistrări aplicate, lungimea porțiunii valide); după
+        prima înregistrare incompletă sau coruptă ne oprim
+    """
+    view = memoryview(data)
+    offset = 0
+    count = 0
+    while len(data) - offset >= _RECORD_HEADER_LEN:
+        op, klen, vlen, expires_at = _RECORD.unpack_from(data, offset + _CRC.size)
+        end = offset + _RECORD_HEADER_LEN + klen + vlen
+        if end > len(data):
+            break
+        (crc,) = _CRC.unpack_from(data, offset)
+        if zlib.crc32(view[offset + _CRC.size:end]) & 0xFFFFFFFF != crc or op not in (OP_PUT, OP_DEL):
+            break
+        key_start = offset + _RECORD_HEADER_LEN
+        key = bytes(view[key_start:key_start + klen]).decode("utf-8", errors="replace")
+        value = bytes(view[key_start + klen:end]).decode("utf-8", errors="replace")
+        apply(op, key, value, expires_at)
+        offset = end
+        count += 1
+    return count, offset
+
+
+class Journal:
+    """
+    Jurnal append-only cu group commit și snapshot-uri.
+
+    Atribute:
+        data_dir: Directorul fișierelor de persistență
+        fsync: Politica fsync (always / interval / os)
+        generation: Generația jurnalului curent (wal.<generation>.log)
+        written: Înregistrări scrise (LSN-ul ultimei înregistrări)
+        synced: LSN-ul până la care datele sunt garantat pe disc
+        fsyncs: Numărul de apeluri fsync (always: mult mai mic decât written
+                când sunt mai mulți clienți, datorită group commit)
+    """
+
+    def __init__(self, data_dir: str, fsync: str = "interval", fsync_ms: int = DEFAULT_FSYNC_MS):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.data_dir = data_dir
+        self.fsync = fsync
+        self.fsync_ms = fsync_ms
+        self.generation = 0
+        self.written = 0
+        self.synced = 0
+        self.fsyncs = 0
+        self.snapshots = 0
+        self.recovered = 0              # înregistrări aplicate la recover()
+        self.recovery_seconds = 0.0
+        self._fd = -1
+        self._syncing = False
+        self._closed = False
+        self._last_snapshot_lsn = 0
+        self._cond = threading.Condition()
+        os.makedirs(data_dir, exist_ok=True)
+
+    # -------------------------------------------------------------------------
+    # Fișiere
+    # -------------------------------------------------------------------------
+
+    def _wal_path(self, generation: int) -> str:
+        return os.path.join(self.data_dir, f"wal.{generation}.log")
+
+    def _wal_generations(self) -> List[int]:
+        gens = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith("wal.") and name.endswith(".log"):
+                try:
+                    gens.append(int(name[4:-4]))
+                except ValueError:
+                    pass
+        return sorted(gens)
+
+    def _open_generation(self, generation: int) -> None:
+        self._fd = os.open(self._wal_path(generation), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.generation = generation
+
+    def _fsync_path(self, path: str) -> None:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self.fsyncs += 1
+
+    def _fsync_dir(self) -> None:
+        # Redenumirile și fișierele noi sunt durabile doar după fsync pe director
+        try:
+            fd = os.open(self.data_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    # -------------------------------------------------------------------------
+    # Recuperare
+    # -------------------------------------------------------------------------
+
+    def recover(self, store: ShardedStore) -> int:
+        """
+        Încarcă snapshot-ul și reia jurnalele în `store`, apoi deschide o
+        generație nouă pentru scriere. Apelat o singură dată, înainte ca
+        `store.journal` să fie setat.
+
+        Returns:
+            Numărul de înregistrări aplicate (snapshot + jurnale)
+
+        Raises:
+            ValueError: Snapshot corupt sau jurnal corupt urmat de alte înregistrări
+        """
+        started = time.perf_counter()
+        now = time.time()
+
+        def apply(op: int, key: str, value: str, expires_at: float) -> None:
+            if op == OP_DEL:
+                store.delete(key)
+            elif not expires_at:
+                store.put(key, value)
+            elif expires_at > now:
+                store.put(key, value, ttl=expires_at - now)
+            else:
+                store.delete(key)   # a expirat cât serverul era oprit
+
+        applied = 0
+        first_gen = 0
+        snap_path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        if os.path.exists(snap_path):
+            with open(snap_path, "rb") as f:
+                data = f.read()
+            magic, first_gen = _SNAPSHOT_HEADER.unpack_from(data, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{snap_path}: not a snapshot file")
+            count, valid = replay_records(data[_SNAPSHOT_HEADER.size:], apply)
+            if _SNAPSHOT_HEADER.size + valid < len(data):
+                raise ValueError(f"{snap_path}: corrupt record at offset {_SNAPSHOT_HEADER.size + valid}")
+            applied += count
+
+        gens = self._wal_generations()
+        for gen in gens:
+            if gen < first_gen:
+                os.unlink(self._wal_path(gen))     # deja inclus în snapshot
+        gens = [gen for gen in gens if gen >= first_gen]
+        # Doar ultima generație cu înregistrări poate avea o scriere întreruptă
+        tail_gen = max((gen for gen in gens if os.path.getsize(self._wal_path(gen))), default=None)
+
+        for gen in gens:
+            path = self._wal_path(gen)
+            with open(path, "rb") as f:
+                data = f.read()
+            count, valid = replay_records(data, apply)
+            applied += count
+            if valid < len(data):
+                if gen != tail_gen:
+                    raise ValueError(f"{path}: corrupt record at offset {valid} "
+                                     f"({len(data) - valid} bytes) before the last generation")
+                # Scriere întreruptă (crash): tăiem coada invalidă
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            # Durabil înainte să existe o generație după el (cu politica interval
+            # sau os, o parte din jurnal poate fi încă doar în page cache)
+            self._fsync_path(path)
+
+        self._fsync_dir()
+        self._open_generation(max(gens + [first_gen - 1]) + 1)
+        self._fsync_dir()
+        if self.fsync == "interval":
+            threading.Thread(target=self._interval_loop, name="journal-fsync", daemon=True).start()
+        self.recovered = applied
+        self.recovery_seconds = time.perf_counter() - started
+        return applied
+
+    # -------------------------------------------------------------------------
+    # Scriere și durabilitate
+    # -------------------------------------------------------------------------
+
+    def _append(self, record: bytes) -> int:
+        with self._cond:
+            view = memoryview(record)
+            while view:
+                view = view[os.write(self._fd, view):]
+            self.written += 1
+            return self.written
+
+    def log_put(self, key: str, value: str, ttl: Optional[float] = None) -> int:
+        """Scrie un PUT în jurnal. Returnează LSN-ul (pentru wait())."""
+        expires_at = time.time() + ttl if ttl is not None else 0.0
+        return self._append(encode_record(OP_PUT, key, value, expires_at))
+
+    def log_delete(self, key: str) -> int:
+        """Scrie un DEL în jurnal. Returnează LSN-ul (pentru wait())."""
+        return self._append(encode_record(OP_DEL, key))
+
+    def wait(self, lsn: int) -> None:
+        """Cu fsync=always: blochează până când înregistrarea `lsn` e pe disc."""
+        if self.fsync == "always":
+            self._sync(lsn)
+
+    def _sync(self, lsn: Optional[int] = None) -> None:
+        """
+        Group commit: un singur thread (liderul) face fsync pentru tot ce s-a
+        scris până în acel moment; ceilalți așteaptă rezultatul lui în loc să
+        facă fiecare propriul fsync.
+        """
+        with self._cond:
+            while self._syncing:
+                if lsn is not None and self.synced >= lsn:
+                    return
+                self._cond.wait()
+            if self.synced >= (self.written if lsn is None else lsn) or self._fd < 0:
+                return
+            self._syncing = True
+            upto, fd = self.written, self._fd
+        try:
+            os.fsync(fd)
+        finally:
+            with self._cond:
+                self._syncing = False
+                self.synced = max(self.synced, upto)
+                self.fsyncs += 1
+                self._cond.notify_all()
+
+    def _interval_loop(self) -> None:
+        while not self._closed:
+            time.sleep(self.fsync_ms / 1000.0)
+            self._sync()
+
+    # -------------------------------------------------------------------------
+    # Snapshot
+    # -------------------------------------------------------------------------
+
+    def snapshot(self, store: ShardedStore) -> int:
+        """
+        Salvează starea completă și șterge jurnalele pe care le înlocuiește.
+
+        1. Trecem la o generație nouă de jurnal (sub lock, fără alte fsync-uri
+           în curs); tot ce e în generațiile vechi este deja aplicat în store
+        2. Scriem store-ul în snapshot.tmp, fsync, rename peste snapshot.db
+        3. Ștergem jurnalele din generațiile vechi
+
+        Scrierile concurente continuă în noua generație; dacă ajung și în
+        snapshot, reluarea lor la recuperare este idempotentă.
+
+        Returns:
+            Numărul de chei salvate
+        """
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._open_generation(self.generation + 1)
+            self.synced = self.written
+            self._last_snapshot_lsn = self.written
+            first_gen = self.generation
+
+        tmp_path = os.path.join(self.data_dir, SNAPSHOT_FILE + ".tmp")
+        count = 0
+        with open(tmp_path, "wb", buffering=1024 * 1024) as f:
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, first_gen))
+            for key, value, expires_at in store.items():
+                f.write(encode_record(OP_PUT, key, value, expires_at))
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.data_dir, SNAPSHOT_FILE))
+        self._fsync_dir()
+
+        for gen in self._wal_generations():
+            if gen < first_gen:
+                os.unlink(self._wal_path(gen))
+        self.snapshots += 1
+        return count
+
+    def start_snapshots(self, store: ShardedStore, interval: float = DEFAULT_SNAPSHOT_INTERVAL) -> None:
+        """Snapshot la fiecare `interval` secunde, dacă au existat scrieri noi."""
+        def loop() -> None:
+            while not self._closed:
+                time.sleep(interval)
+                if not self._closed and self.written > self._last_snapshot_lsn:
+                    try:
+                        self.snapshot(store)
+                    except OSError as e:
+                        print(f"[JOURNAL] snapshot failed: {e}")
+
+        if interval > 0:
+            threading.Thread(target=loop, name="journal-snapshot", daemon=True).start()
+
+    def close(self) -> None:
+        """Oprire curată: fsync final, indiferent de politică."""
+        self._closed = True
+        self._sync()
+        with self._cond:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def open_store(
+    shards: int,
+    data_dir: Optional[str],
+    fsync: str = "interval",
+    fsync_ms: int = DEFAULT_FSYNC_MS,
+    snapshot_interval: float = DEFAULT_SNAPSHOT_INTERVAL
+) -> Tuple[ShardedStore, Optional[Journal]]:
+    """
+    Creează stocarea serverului; cu data_dir, recuperează datele și activează
+    jurnalul și snapshot-urile periodice.
+    """
+    store = ShardedStore(shards=shards)
+    if not data_dir:
+        return store, None
+    journal = Journal(data_dir, fsync=fsync, fsync_ms=fsync_ms)
+    journal.recover(store)
+    store.journal = journal
+    journal.start_snapshots(store, snapshot_interval)
+    return store, journal
+
+
+# =============================================================================
+# SELF-TEST ȘI BENCHMARK
+# =============================================================================
+
+def _selftest() -> None:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store, journal = open_store(4, tmp, fsync="always", snapshot_interval=0)
+        for i in range(100):
+            store.put(f"k{i}", f"v{i}")
+        store.put("temp", "x", ttl=3600)
+        store.delete("k5")
+        assert journal.snapshot(store) == 100
+        store.put("k1", "after-snapshot")
+        store.delete("k2")
+        journal.close()
+
+        # Scriere întreruptă: jumătate de înregistrare la finalul jurnalului
+        with open(journal._wal_path(journal.generation), "ab") as f:
+            f.write(encode_record(OP_PUT, "torn", "value")[:9])
+
+        store2, journal2 = open_store(4, tmp, fsync="os", snapshot_interval=0)
+        assert len(store2) == 99 and store2.get("k1") == "after-snapshot"
+        assert store2.get("k2") is None and store2.get("k5") is None and store2.get("torn") is None
+        assert 3590 < store2.ttl("temp") <= 3600
+        store2.put("k3", "later")
+        journal2.close()
+
+        # Coadă invalidă într-o generație urmată de înregistrări: corupere, nu crash
+        with open(journal._wal_path(journal.generation), "ab") as f:
+            f.write(encode_record(OP_PUT, "torn", "value")[:9])
+        try:
+            Journal(tmp, fsync="os").recover(ShardedStore())
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("corrupt older generation was accepted")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Crash cu fsync interval: jurnalul e scris, dar nu încă pe disc
+        store, journal = open_store(4, tmp, fsync="interval", fsync_ms=60_000, snapshot_interval=0)
+        for i in range(100):
+            store.put(f"k{i}", f"v{i}")
+        path = journal._wal_path(journal.generation)
+        store2, journal2 = open_store(4, tmp, fsync="os", snapshot_interval=0)
+        assert len(store2) == 100 and journal2.fsyncs >= 1    # fsync înainte de rotație
+        journal2.close()
+
+        # Al doilea crash pierde totuși coada primului jurnal (după ce generația
+        # nouă, goală, a fost creată): tot scriere întreruptă, nu corupere
+        os.truncate(path, os.path.getsize(path) - 10)     # jumătate din "k99"
+        store3, journal3 = open_store(4, tmp, fsync="os", snapshot_interval=0)
+        assert len(store3) == 99 and store3.get("k98") == "v98" and store3.get("k99") is None
+        journal3.close()
+        journal.close()
+    print("kv_persist self-test OK")
+
+
+def _bench(seconds: float = 2.0, threads_list: Tuple[int, ...] = (1, 8), fsync_ms: int = DEFAULT_FSYNC_MS) -> None:
+    """PUT-uri de 64 bytes prin store + jurnal, pentru fiecare politică fsync."""
+    import tempfile
+
+    value = "v" * 64
+    for policy in FSYNC_POLICIES:
+        for nthreads in threads_list:
+            with tempfile.TemporaryDirectory() as tmp:
+                store, journal = open_store(16, tmp, fsync=policy, fsync_ms=fsync_ms, snapshot_interval=0)
+                deadline = time.perf_counter() + seconds
+                counts = [0] * nthreads
+
+                def worker(tid: int) -> None:
+                    i = 0
+                    while time.perf_counter() < deadline:
+                        store.put(f"t{tid}:{i}", value)
+                        i += 1
+                    counts[tid] = i
+
+                workers = [threading.Thread(target=worker, args=(t,)) for t in range(nthreads)]
+                start = time.perf_counter()
+                for t in workers:
+                    t.start()
+                for t in workers:
+                    t.join()
+                elapsed = time.perf_counter() - start
+                journal.close()
+                total = sum(counts)
+                label = f"{policy}({fsync_ms}ms)" if policy == "interval" else policy
+                print(f"fsync={label:<15} threads={nthreads:<3} {total / elapsed:>10,.0f} PUT/s  "
+                      f"fsyncs={journal.fsyncs:<6} ({total / max(journal.fsyncs, 1):,.1f} PUT/fsync)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Self-test și benchmark pentru jurnalul de persistență")
+    parser.add_argument("--bench", action="store_true", help="Rulează benchmark-ul de scriere")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Durata fiecărei configurații")
+    parser.add_argument("--fsync-ms", type=int, default=DEFAULT_FSYNC_MS)
+    args = parser.parse_args()
+
+    _selftest()
+    if args.bench:
+        _bench(args.seconds, fsync_ms=args.fsync_ms)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Stocare cheie-valoare partajată între thread-urile serverelor din Săptămâna 4.
+
+Un singur dicționar păzit de un singur lock serializează toți clienții: un
+thread care face KEYS (copiere + sortare a tuturor cheilor) îi blochează pe
+toți ceilalți. ShardedStore împarte cheile în N shard-uri (după hash), fiecare
+cu lock-ul lui (lock striping), deci operațiile pe chei diferite se ating rar.
+
+Concepte cheie:
+- Lock striping: contenția scade ~N ori pentru chei distribuite uniform
+- Index sortat per shard (bisect): KEYS = interclasare, nu sortare completă
+- TTL cu expirare leneșă: o cheie expirată dispare la primul acces, nu printr-un
+  thread de curățenie
+
+UTILIZARE:
+    store = ShardedStore(shards=16)
+    store.put("sesiune:42", "alice", ttl=30)
+    store.get("sesiune:42")     # "alice" (None după 30 s)
+    store.keys(prefix="ses")    # ["sesiune:42"]
+
+    python3 kv_store.py                    # self-test
+    python3 kv_store.py --bench 1,2,4,8    # contenție: 1 shard vs N shard-uri
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice, takewhile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+DEFAULT_SHARDS = 16
+
+# Cel mai mare code point Unicode: prefix + MAX_CHAR delimitează intervalul
+# de chei care încep cu prefix în indexul sortat
+MAX_CHAR = "\U0010ffff"
+
+# Câte chei expirate poate întâlni (și șterge) SCAN într-un shard la un apel,
+# peste cele count+1 chei vii; limitează timpul cât este ținut lock-ul
+SCAN_MAX_EXPIRED = 1024
+
+
+class _Shard:
+    """
+    O partiție a stocării: date, index sortat, termene TTL și lock-ul propriu.
+
+    Folosit ca context manager; numără achizițiile de lock care au trebuit
+    să aștepte (contended), ca măsură a contenției.
+    """
+    __slots__ = ("data", "index", "expires", "lock", "contended")
+
+    def __init__(self):
+        self.data: Dict[str, str] = {}
+        self.index: List[str] = []           # cheile, sortate
+        self.expires: Dict[str, float] = {}  # cheie → termen (doar cheile cu TTL)
+        self.lock = threading.Lock()
+        self.contended = 0
+
+    def __enter__(self) -> "_Shard":
+        if not self.lock.acquire(False):
+            self.lock.acquire()
+            self.contended += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.lock.release()
+
+    # Metodele de mai jos se apelează doar cu lock-ul deținut
+
+    def remove(self, key: str) -> None:
+        del self.data[key]
+        self.expires.pop(key, None)
+        del self.index[bisect_left(self.index, key)]
+
+    def expired(self, key: str, now: float) -> bool:
+        """Expirare leneșă: șterge cheia dacă termenul ei a trecut."""
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= now:
+            self.remove(key)
+            return True
+        return False
+
+    def purge(self, now: float) -> int:
+        """Șterge toate cheile expirate (cost proporțional cu cheile cu TTL)."""
+        dead = [key for key, deadline in self.expires.items() if deadline <= now]
+        for key in dead:
+            self.remove(key)
+        return len(dead)
+
+
+class ShardedStore:
+    """
+    Dicționar thread-safe împărțit în shard-uri cu lock-uri separate.
+
+    Atribute:
+        shards: Numărul de shard-uri
+        journal: Jurnal de persistență opțional (kv_persist.Journal); PUT și DEL
+                 sunt scrise în jurnal sub lock-ul shard-ului, deci ordinea din
+                 jurnal coincide cu ordinea aplicării pentru fiecare cheie
+    """
+
+    def __init__(self, shards: int = DEFAULT_SHARDS, clock: Callable[[], float] = time.monotonic):
+        if shards < 1:
+            raise ValueError(f"shards must be >= 1, got {shards}")
+        self.shards = shards
+        self._shards = [_Shard() for _ in range(shards)]
+        self._clock = clock
+        self.journal = None
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % self.shards]
+
+    def get(self, key: str) -> Optional[str]:
+        """Returnează valoarea sau None dacă cheia nu există (sau a expirat)."""
+        with self._shard(key) as shard:
+            value = shard.data.get(key)
+            if value is not None and shard.expires and shard.expired(key, self._clock()):
+                return None
+            return value
+
+    def put(self, key: str, value: str, ttl: Optional[float] = None, durable: bool = True) -> None:
+        """
+        Stochează valoarea; ttl în secunde (None = fără expirare).
+
+        Cu durable=False nu se așteaptă fsync-ul jurnalului; apelantul face
+        un singur journal.wait() pentru un lot întreg de scrieri.
+        """
+        lsn = 0
+        with self._shard(key) as shard:
+            if key not in shard.data:
+                insort(shard.index, key)
+            shard.data[key] = value
+            if ttl is None:
+                shard.expires.pop(key, None)
+            else:
+                shard.expires[key] = self._clock() + ttl
+            if self.journal is not None:
+                lsn = self.journal.log_put(key, value, ttl)
+        if lsn and durable:
+            self.journal.wait(lsn)      # în afara lock-ului: fsync nu blochează shard-ul
+
+    def delete(self, key: str, durable: bool = True) -> bool:
+        """Șterge cheia. Returnează True dacă a existat."""
+        with self._shard(key) as shard:
+            if key not in shard.data or shard.expired(key, self._clock()):
+                return False
+            shard.remove(key)
+            lsn = self.journal.log_delete(key) if self.journal is not None else 0
+        if lsn and durable:
+            self.journal.wait(lsn)
+        return True
+
+    def ttl(self, key: str) -> Optional[float]:
+        """
+        Secundele rămase până la expirare; None dacă cheia nu are TTL.
+
+        Raises:
+            KeyError: Dacă cheia nu există
+        """
+        with self._shard(key) as shard:
+            now = self._clock()
+            if key not in shard.data or shard.expired(key, now):
+                raise KeyError(key)
+            deadline = shard.expires.get(key)
+            return None if deadline is None else deadline - now
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        now = self._clock()
+        total = 0
+        for shard in self._shards:
+            with shard:
+                if shard.expires:
+                    shard.purge(now)
+                total += len(shard.data)
+        return total
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """
+        Cheile (opțional doar cele cu un prefix), sortate.
+
+        Fiecare shard își ține cheile sortate, deci rezultatul este o
+        interclasare a N liste deja sortate, nu o sortare completă. Costul
+        rămâne O(n): lock-ul unui shard este ținut cât se șterg cheile lui
+        expirate și se copiază porțiunea lui de index - pentru stocări mari,
+        SCAN.
+        """
+        now = self._clock()
+        parts = []
+        for shard in self._shards:
+            with shard:
+                if shard.expires:
+                    shard.purge(now)
+                index = shard.index
+                if prefix:
+                    parts.append(index[bisect_left(index, prefix):bisect_left(index, prefix + MAX_CHAR)])
+                else:
+                    parts.append(index[:])
+        return list(heapq.merge(*parts))
+
+    def scan(self, cursor: Optional[str] = None, count: int = 100,
+             prefix: str = "") -> Tuple[List[str], Optional[str]]:
+        """
+        O pagină de chei sortate, după `cursor` (exclusiv), cu un prefix opțional.
+
+        Cursorul este ultima cheie din pagina anterioară, deci nu există stare
+        pe server și iterarea rămâne corectă dacă se adaugă/șterg chei între
+        pagini. Fiecare shard e blocat cât durează o căutare binară plus
+        parcurgerea a cel mult count+1 chei vii și SCAN_MAX_EXPIRED chei
+        expirate; cheile expirate întâlnite sunt șterse pe loc. Dacă un shard
+        atinge limita, pagina se oprește la ultima cheie examinată acolo și
+        poate avea mai puțin de count chei (chiar zero), dar cursorul nu este
+        None - ca la SCAN din Redis, clientul continuă până la cursor None.
+
+        Returns:
+            Tuple de (chei, cursorul următor sau None dacă nu mai sunt chei)
+        """
+        now = self._clock()
+        parts = []
+        horizon = None          # cea mai mică cheie la care s-a oprit un shard la limită
+        for shard in self._shards:
+            with shard:
+                index = shard.index
+                if cursor is None or cursor < prefix:
+                    start = bisect_left(index, prefix)
+                else:
+                    start = bisect_right(index, cursor)
+                stop = bisect_left(index, prefix + MAX_CHAR) if prefix else len(index)
+                if not shard.expires:
+                    parts.append(index[start:min(stop, start + count + 1)])
+                    continue
+                page, dead = [], []
+                expires = shard.expires
+                for i in range(start, stop):
+                    key = index[i]
+                    deadline = expires.get(key)
+                    if deadline is None or deadline > now:
+                        page.append(key)
+                        if len(page) > count:
+                            break
+                    else:
+                        dead.append(key)
+                        if len(dead) == SCAN_MAX_EXPIRED:
+                            if horizon is None or key < horizon:
+                                horizon = key
+                            break
+                for key in dead:
+                    shard.remove(key)
+                parts.append(page)
+        merged = heapq.merge(*parts)
+        if horizon is not None:
+            merged = takewhile(lambda key: key <= horizon, merged)
+        keys = list(islice(merged, count + 1))
+        if len(keys) > count:
+            return keys[:count], keys[count - 1]
+        return keys, horizon
+
+    def items(self) -> Iterator[Tuple[str, str, float]]:
+        """
+        Toate perechile (cheie, valoare, expires_at), shard cu shard.
+
+        expires_at este timp de perete (time.time()), 0 = fără expirare, ca
+        să rămână valid și după o repornire (pentru snapshot-uri).
+        """
+        for shard in self._shards:
+            with shard:
+                now = self._clock()
+                if shard.expires:
+                    shard.purge(now)
+                wall = time.time()
+                chunk = [(key, value, wall + shard.expires[key] - now if key in shard.expires else 0.0)
+                         for key, value in shard.data.items()]
+            yield from chunk
+
+    def stats(self) -> Dict[str, int]:
+        """Numărul de chei și de achiziții de lock care au așteptat."""
+        return {
+            "shards": self.shards,
+            "keys": sum(len(s.data) for s in self._shards),
+            "contended": sum(s.contended for s in self._shards),
+        }
+
+
+# =============================================================================
+# SELF-TEST ȘI BENCHMARK
+# =============================================================================
+
+def _selftest() -> None:
+    now = [100.0]
+    store = ShardedStore(shards=4, clock=lambda: now[0])
+    for i in range(50):
+        store.put(f"k{i:02d}", str(i))
+    store.put("temp", "x", ttl=5)
+    assert store.get("k07") == "7" and len(store) == 51
+    assert store.keys() == sorted([f"k{i:02d}" for i in range(50)] + ["temp"])
+    assert store.keys(prefix="k4") == [f"k4{i}" for i in range(10)]
+    assert 4.9 < store.ttl("temp") <= 5 and store.ttl("k01") is None
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = store.scan(cursor, count=7)
+        pages.append(page)
+        if cursor is None:
+            break
+    assert sum(pages, []) == store.keys() and len(pages) == 8
+    assert store.scan(None, 100, prefix="k4") == ([f"k4{i}" for i in range(10)], None)
+    assert store.scan("k42", 3, prefix="k4") == (["k43", "k44", "k45"], "k45")
+
+    now[0] += 5
+    assert store.scan("k49", 10) == ([], None)     # "temp" expirat, sărit de scan
+
+    # Multe chei expirate: fiecare apel șterge cel mult SCAN_MAX_EXPIRED per
+    # shard, paginile pot fi scurte, dar iterarea completă rămâne corectă
+    for i in range(4 * SCAN_MAX_EXPIRED):
+        store.put(f"e{i:05d}", "x", ttl=1)
+    now[0] += 1
+    found, cursor = store.scan(None, count=10)
+    assert found == [] and cursor is not None     # un shard a atins limita
+    while cursor is not None:
+        page, cursor = store.scan(cursor, count=10)
+        found += page
+    assert found == store.keys()
+    assert sum(len(s.index) for s in store._shards) == 50
+    assert store.get("temp") is None and "temp" not in store.keys()
+    assert not store.delete("temp") and store.delete("k00") and not store.delete("k00")
+    store.put("k01", "y", ttl=1)
+    store.put("k01", "z")                 # rescrierea fără ttl anulează expirarea
+    now[0] += 2
+    assert store.get("k01") == "z" and len(store) == 49
+    print("kv_store self-test OK")
+
+
+def _bench(threads_list: List[int], ops: int = 200_000, shards: int = DEFAULT_SHARDS) -> None:
+    """N thread-uri, 80% GET / 20% PUT pe 10.000 de chei; 1 shard vs `shards`."""
+    for nshards in (1, shards):
+        for nthreads in threads_list:
+            store = ShardedStore(shards=nshards)
+            for i in range(10_000):
+                store.put(f"key:{i}", "v")
+            per_thread = ops // nthreads
+
+            def worker(tid: int) -> None:
+                for i in range(per_thread):
+                    key = f"key:{(i * 7919 + tid) % 10_000}"
+                    if i % 5 == 0:
+                        store.put(key, "w")
+                    else:
+                        store.get(key)
+
+            workers = [threading.Thread(target=worker, args=(t,)) for t in range(nthreads)]
+            start = time.perf_counter()
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            elapsed = time.perf_counter() - start
+            contended = store.stats()["contended"]
+            total = per_thread * nthreads
+            print(f"shards={nshards:<3} threads={nthreads:<3} {total / elapsed:>10,.0f} ops/s  "
+                  f"contended {contended:>6} ({100.0 * contended / total:.2f}%)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Self-test și benchmark pentru ShardedStore")
+    parser.add_argument("--bench", metavar="THREADS", help="Listă de thread-uri, ex: 1,2,4,8")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS)
+    args = parser.parse_args()
+
+    _selftest()
+    if args.bench:
+        _bench([int(t) for t in args.bench.split(",")], shards=args.shards)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark pentru căile de codare/decodare din proto_common.
+
+Pentru fiecare protocol compară trei variante:
+    legacy   - implementarea inițială (struct.pack cu format string la fiecare
+               apel, header împachetat de două ori pentru CRC, concatenări)
+    per-msg  - funcțiile actuale pack_*/unpack_* (Struct precompilat, CRC incremental)
+    batch    - encode_*_batch / decode_*_batch (un singur buffer pentru tot lotul)
+
+Rezultatul este în mesaje/secundă (mai mare = mai bine).
+
+UTILIZARE:
+    python3 proto_bench.py
+    python3 proto_bench.py --messages 20000 --payload 16,256,4096
+"""
+from __future__ import annotations
+
+import argparse
+import struct
+import time
+from typing import Callable, List, Tuple
+
+from proto_common import (
+    BIN_HEADER_FMT, BIN_HEADER_LEN, BIN_MAGIC, BIN_VERSION, TYPE_PUT_REQ,
+    UDP_FMT, UDP_FMT_WO_CRC, UDP_VER,
+    BinHeader, crc32,
+    pack_bin_message, unpack_bin_header, validate_bin_message,
+    encode_bin_batch, decode_bin_batch,
+    pack_udp_sensor, unpack_udp_sensor,
+    encode_udp_batch, decode_udp_batch,
+)
+
+
+# =============================================================================
+# IMPLEMENTĂRI DE REFERINȚĂ (varianta inițială din proto_common)
+# =============================================================================
+
+def _legacy_pack_bin(mtype: int, payload: bytes, seq: int) -> bytes:
+    header_wo_crc = struct.pack("!2sBBHI", BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq)
+    msg_crc = crc32(header_wo_crc + payload)
+    header = struct.pack(BIN_HEADER_FMT, BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq, msg_crc)
+    return header + payload
+
+
+def _legacy_unpack_bin(header_bytes: bytes, payload: bytes) -> bool:
+    magic, ver, mtype, plen, seq, crc = struct.unpack(BIN_HEADER_FMT, header_bytes)
+    header = BinHeader(magic=magic, version=ver, mtype=mtype, payload_len=plen, seq=seq, crc=crc)
+    header_wo_crc = struct.pack("!2sBBHI", header.magic, header.version, header.mtype, header.payload_len, header.seq)
+    return crc32(header_wo_crc + payload) == header.crc
+
+
+def _legacy_pack_udp(sensor_id: int, temp_c: float, location: str) -> bytes:
+    loc_b = location.encode("utf-8")[:10].ljust(10, b"\x00")
+    base = struct.pack(UDP_FMT_WO_CRC, UDP_VER, sensor_id, temp_c, loc_b)
+    return struct.pack(UDP_FMT, UDP_VER, sensor_id, temp_c, loc_b, crc32(base))
+
+
+def _legacy_unpack_udp(data: bytes) -> Tuple[int, int, float, str]:
+    ver, sensor_id, temp_c, loc_b, received_crc = struct.unpack(UDP_FMT, data)
+    base = struct.pack(UDP_FMT_WO_CRC, ver, sensor_id, temp_c, loc_b)
+    if crc32(base) != received_crc:
+        raise ValueError("CRC mismatch")
+    return ver, sensor_id, temp_c, loc_b.decode("utf-8", errors="replace").rstrip("\x00")
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _rate(fn: Callable[[], None], messages: int, min_time: float) -> float:
+    """Rulează fn() (care procesează `messages` mesaje) până trece min_time; mesaje/s."""
+    fn()    # încălzire
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return runs * messages / elapsed
+
+
+def _report(name: str, rates: List[Tuple[str, float]]) -> None:
+    base = rates[0][1]
+    cols = "  ".join(f"{label:>8} {rate:>11,.0f}/s ({rate / base:4.1f}x)" for label, rate in rates)
+    print(f"{name:<26} {cols}")
+
+
+def run(messages: int, payload_sizes: List[int], min_time: float) -> None:
+    for size in payload_sizes:
+        payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        msgs = [(TYPE_PUT_REQ, payload, seq) for seq in range(messages)]
+        wire = b"".join(pack_bin_message(*m) for m in msgs)
+        frames = [(wire[i:i + BIN_HEADER_LEN], payload)
+                  for i in range(0, len(wire), BIN_HEADER_LEN + size)]
+
+        def legacy_encode():
+            b"".join([_legacy_pack_bin(*m) for m in msgs])
+
+        def permsg_encode():
+            b"".join([pack_bin_message(*m) for m in msgs])
+
+        def batch_encode():
+            encode_bin_batch(msgs)
+
+        def legacy_decode():
+            for header_bytes, body in frames:
+                _legacy_unpack_bin(header_bytes, body)
+
+        def permsg_decode():
+            for header_bytes, body in frames:
+                validate_bin_message(unpack_bin_header(header_bytes), body)
+
+        def batch_decode():
+            decode_bin_batch(wire)
+
+        _report(f"binary encode {size}B", [
+            ("legacy", _rate(legacy_encode, messages, min_time)),
+            ("per-msg", _rate(permsg_encode, messages, min_time)),
+            ("batch", _rate(batch_encode, messages, min_time)),
+        ])
+        _report(f"binary decode {size}B", [
+            ("legacy", _rate(legacy_decode, messages, min_time)),
+            ("per-msg", _rate(permsg_decode, messages, min_time)),
+            ("batch", _rate(batch_decode, messages, min_time)),
+        ])
+
+    readings = [(i, 20.0 + (i % 100) / 10, f"Sala-{i % 50}") for i in range(messages)]
+    datagrams = [pack_udp_sensor(*r) for r in readings]
+    packed = b"".join(datagrams)
+
+    def legacy_udp_encode():
+        for r in readings:
+            _legacy_pack_udp(*r)
+
+    def permsg_udp_encode():
+        for r in readings:
+            pack_udp_sensor(*r)
+
+    def batch_udp_encode():
+        encode_udp_batch(readings)
+
+    def legacy_udp_decode():
+        for d in datagrams:
+            _legacy_unpack_udp(d)
+
+    def permsg_udp_decode():
+        for d in datagrams:
+            unpack_udp_sensor(d)
+
+    def batch_udp_decode():
+        decode_udp_batch(packed)
+
+    _report("udp sensor encode", [
+        ("legacy", _rate(legacy_udp_encode, messages, min_time)),
+        ("per-msg", _rate(permsg_udp_encode, messages, min_time)),
+        ("batch", _rate(batch_udp_encode, messages, min_time)),
+    ])
+    _report("udp sensor decode", [
+        ("legacy", _rate(legacy_udp_decode, messages, min_time)),
+        ("per-msg", _rate(permsg_udp_decode, messages, min_time)),
+        ("batch", _rate(batch_udp_decode, messages, min_time)),
+    ])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark pentru codecurile din proto_common")
+    parser.add_argument("--messages", type=int, default=10000, help="Mesaje per lot (default: 10000)")
+    parser.add_argument("--payload", default="16,1024", help="Dimensiuni payload binar (default: 16,1024)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Secunde per măsurătoare (default: 0.5)")
+    args = parser.parse_args()
+
+    run(args.messages, [int(p) for p in args.payload.split(",")], args.min_time)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,12 +12,17 @@ Concepte cheie ilustrate:
 - Serializare: reprezentarea datelor structurate în bytes
 - Detecție erori: CRC32 pentru verificarea integrității
 - Endianness: ordinea bytes în reprezentări multi-byte (Big-Endian în rețea)
+
+Pentru volume mari există și API-ul batch (encode_bin_batch, decode_bin_batch,
+encode_udp_batch, decode_udp_batch): mai multe mesaje într-un singur buffer,
+cu struct.Struct precompilate și CRC calculat incremental, fără concatenări
+intermediare. Benchmark: python3 proto_bench.py
 """
 from __future__ import annotations
 import struct
 import zlib
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Iterable, List, NamedTuple, Optional, Tuple
 
 
 # ==============================================================================
@@ -48,6 +53,12 @@ BIN_VERSION = 1
 BIN_HEADER_FMT = "!2sBBHII"
 BIN_HEADER_LEN = struct.calcsize(BIN_HEADER_FMT)  # = 14 bytes
 
+# Struct-uri precompilate: formatul e parsat o singură dată, nu la fiecare apel
+_BIN_HEADER = struct.Struct(BIN_HEADER_FMT)
+_BIN_HEADER_WO_CRC = struct.Struct("!2sBBHI")     # primii 10 bytes, acoperiți de CRC
+_BIN_CRC = struct.Struct("!I")
+_BIN_CRC_OFFSET = _BIN_HEADER_WO_CRC.size
+
 # Tipuri de mesaje
 TYPE_ECHO_REQ = 1
 TYPE_ECHO_RESP = 2
@@ -59,6 +70,8 @@ TYPE_KEYS_REQ = 7
 TYPE_KEYS_RESP = 8
 TYPE_COUNT_REQ = 9
 TYPE_COUNT_RESP = 10
+TYPE_SCAN_REQ = 11
+TYPE_SCAN_RESP = 12
 TYPE_ERR = 255
 
 TYPE_NAMES = {
@@ -72,6 +85,8 @@ TYPE_NAMES = {
     TYPE_KEYS_RESP: "KEYS_RESP",
     TYPE_COUNT_REQ: "COUNT_REQ",
     TYPE_COUNT_RESP: "COUNT_RESP",
+    TYPE_SCAN_REQ: "SCAN_REQ",
+    TYPE_SCAN_RESP: "SCAN_RESP",
     TYPE_ERR: "ERROR",
 }
 
@@ -137,16 +152,13 @@ def pack_bin_message(mtype: int, payload: bytes, seq: int) -> bytes:
     if len(payload) > 65535:
         raise ValueError(f"payload too large: {len(payload)} > 65535")
     
-    # Header parțial (fără CRC) pentru calcul CRC
-    header_wo_crc = struct.pack("!2sBBHI", BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq)
+    header_wo_crc = _BIN_HEADER_WO_CRC.pack(BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq)
     
-    # CRC se calculează peste header (fără câmpul CRC) + payload
-    msg_crc = crc32(header_wo_crc + payload)
+    # CRC incremental: zlib.crc32(payload, crc_header) == crc32(header + payload),
+    # fără a construi concatenarea doar pentru checksum
+    msg_crc = zlib.crc32(payload, zlib.crc32(header_wo_crc)) & 0xFFFFFFFF
     
-    # Header complet cu CRC
-    header = struct.pack(BIN_HEADER_FMT, BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq, msg_crc)
-    
-    return header + payload
+    return header_wo_crc + _BIN_CRC.pack(msg_crc) + payload
 
 
 def unpack_bin_header(header_bytes: bytes) -> BinHeader:
@@ -165,7 +177,7 @@ def unpack_bin_header(header_bytes: bytes) -> BinHeader:
     if len(header_bytes) != BIN_HEADER_LEN:
         raise ValueError(f"invalid header length: {len(header_bytes)} != {BIN_HEADER_LEN}")
     
-    magic, ver, mtype, plen, seq, crc = struct.unpack(BIN_HEADER_FMT, header_bytes)
+    magic, ver, mtype, plen, seq, crc = _BIN_HEADER.unpack(header_bytes)
     return BinHeader(magic=magic, version=ver, mtype=mtype, payload_len=plen, seq=seq, crc=crc)
 
 
@@ -175,11 +187,89 @@ def validate_bin_message(header: BinHeader, payload: bytes) -> bool:
     
     Recalculează CRC-ul și compară cu cel din header.
     """
-    header_wo_crc = struct.pack("!2sBBHI", header.magic, header.version, header.mtype, header.payload_len, header.seq)
-    computed_crc = crc32(header_wo_crc + payload)
+    header_wo_crc = _BIN_HEADER_WO_CRC.pack(header.magic, header.version, header.mtype, header.payload_len, header.seq)
+    computed_crc = zlib.crc32(payload, zlib.crc32(header_wo_crc)) & 0xFFFFFFFF
     return computed_crc == header.crc
 
 
+# ==============================================================================
+# API BATCH PENTRU PROTOCOLUL BINAR
+# ==============================================================================
+# Mai multe mesaje într-un singur buffer: la codare, bucățile (header, CRC,
+# payload) sunt unite cu un singur b"".join, care calculează lungimea totală
+# și alocă buffer-ul final o singură dată; la decodare, header-ele sunt citite
+# cu unpack_from direct din buffer-ul de recepție, fără copii per header.
+# CRC-ul este incremental: crc32(payload, crc32(header_fără_crc)).
+# Folosit pentru pipelining: un sendall() / un recv() pentru N mesaje.
+#
+# Notă: în CPython, pack_into + atribuiri pe felii într-un bytearray prealocat
+# s-a dovedit mai lent decât join (cost fix per apel Python), vezi proto_bench.py.
+# ==============================================================================
+
+class BinFrame(NamedTuple):
+    """Un mesaj decodat de decode_bin_batch (mai ieftin decât BinHeader + payload)."""
+    mtype: int
+    seq: int
+    payload: bytes
+    crc_ok: bool
+
+
+def encode_bin_batch(messages: Iterable[Tuple[int, bytes, int]]) -> bytes:
+    """
+    Codifică mai multe mesaje (mtype, payload, seq) unul după altul.
+    
+    Returns:
+        bytes: Identic cu b"".join(pack_bin_message(...) pentru fiecare mesaj)
+    """
+    pack = _BIN_HEADER_WO_CRC.pack
+    pack_crc = _BIN_CRC.pack
+    crc_fn = zlib.crc32
+    parts: List[bytes] = []
+    append = parts.append
+    for mtype, payload, seq in messages:
+        if len(payload) > 65535:
+            raise ValueError(f"payload too large: {len(payload)} > 65535")
+        header_wo_crc = pack(BIN_MAGIC, BIN_VERSION, mtype, len(payload), seq)
+        append(header_wo_crc)
+        append(pack_crc(crc_fn(payload, crc_fn(header_wo_crc)) & 0xFFFFFFFF))
+        append(payload)
+    return b"".join(parts)
+
+
+def decode_bin_batch(data: bytes, offset: int = 0) -> Tuple[List[BinFrame], int]:
+    """
+    Decodează toate mesajele complete din `data`, începând de la `offset`.
+    
+    Se oprește la primul mesaj incomplet sau cu magic/version greșit; apelantul
+    poate verifica cu unpack_bin_header() ce urmează după poziția returnată.
+    Un CRC greșit nu oprește decodarea (framing-ul e intact): mesajul are
+    crc_ok=False.
+    
+    Returns:
+        Tuple de (mesaje, poziția de după ultimul mesaj decodat)
+    """
+    frames: List[BinFrame] = []
+    append = frames.append
+    view = memoryview(data)     # felii fără copiere pentru CRC
+    end = len(data)
+    unpack_from = _BIN_HEADER.unpack_from
+    crc_fn = zlib.crc32
+    
+    while end - offset >= BIN_HEADER_LEN:
+        magic, ver, mtype, plen, seq, crc = unpack_from(data, offset)
+        if magic != BIN_MAGIC or ver != BIN_VERSION:
+            break
+        body = offset + BIN_HEADER_LEN
+        if body + plen > end:
+            break
+        payload = bytes(view[body:body + plen])
+        computed = crc_fn(payload, crc_fn(view[offset:offset + _BIN_CRC_OFFSET])) & 0xFFFFFFFF
+        append(BinFrame(mtype, seq, payload, computed == crc))
+        offset = body + plen
+    
+    return frames, offset
+
+
 # ==============================================================================
 # CODARE PAYLOAD PENTRU PUT/GET
 # ==============================================================================
@@ -226,6 +316,99 @@ def decode_key(payload: bytes) -> str:
     return payload[1:1+klen].decode("utf-8", errors="replace")
 
 
+# ==============================================================================
+# CODARE PAYLOAD PENTRU SCAN (paginare cu cursor)
+# ==============================================================================
+# KEYS întoarce toate cheile într-un singur payload (max 65535 bytes, max
+# 65535 chei); SCAN le întoarce pagină cu pagină. Cursorul este ultima cheie
+# din pagina anterioară (serverul nu ține stare între pagini).
+#
+# SCAN_REQ:  count(2) + flags(1) + prefix_len(1) + prefix + cursor_len(1) + cursor
+#            flags bit 0 = cursorul e prezent (altfel: de la început)
+# SCAN_RESP: flags(1) + cursor_len(1) + cursor + num_keys(2) + [key_len(1) + key]...
+#            flags bit 0 = mai sunt chei; cursor = de unde continuă următorul SCAN
+# ==============================================================================
+
+SCAN_HAS_CURSOR = 0x01
+SCAN_MORE = 0x01
+SCAN_DEFAULT_COUNT = 100
+SCAN_MAX_COUNT = 1000
+
+_SCAN_REQ_HEAD = struct.Struct("!HBB")
+
+
+def encode_scan_req(cursor: Optional[str] = None, count: int = SCAN_DEFAULT_COUNT, prefix: str = "") -> bytes:
+    """Codifică un request SCAN; cursor=None pornește de la prima cheie."""
+    pb = prefix.encode("utf-8")
+    cb = cursor.encode("utf-8") if cursor is not None else b""
+    if len(pb) > 255 or len(cb) > 255:
+        raise ValueError("prefix/cursor too long (max 255 bytes)")
+    flags = SCAN_HAS_CURSOR if cursor is not None else 0
+    return _SCAN_REQ_HEAD.pack(count, flags, len(pb)) + pb + struct.pack("!B", len(cb)) + cb
+
+
+def decode_scan_req(payload: bytes) -> Tuple[Optional[str], int, str]:
+    """Decodifică un request SCAN în (cursor, count, prefix)."""
+    if len(payload) < _SCAN_REQ_HEAD.size + 1:
+        raise ValueError(f"truncated payload: {len(payload)} bytes")
+    count, flags, plen = _SCAN_REQ_HEAD.unpack_from(payload)
+    offset = _SCAN_REQ_HEAD.size
+    prefix = payload[offset:offset + plen].decode("utf-8", errors="replace")
+    offset += plen
+    if len(payload) < offset + 1:
+        raise ValueError("truncated payload: missing cursor")
+    clen = payload[offset]
+    if len(payload) < offset + 1 + clen:
+        raise ValueError("truncated payload: cursor")
+    cursor = payload[offset + 1:offset + 1 + clen].decode("utf-8", errors="replace")
+    return (cursor if flags & SCAN_HAS_CURSOR else None), count, prefix
+
+
+def encode_scan_resp(keys: List[str], next_cursor: Optional[str], limit: int = 65535) -> Tuple[bytes, int]:
+    """
+    Codifică o pagină SCAN, cât încape în `limit` bytes.
+    
+    Dacă nu încap toate cheile, pagina este trunchiată și cursorul devine
+    ultima cheie inclusă.
+    
+    Returns:
+        Tuple de (payload, numărul de chei incluse)
+    """
+    # Rezervăm loc pentru flags + cursor de lungime maximă + num_keys
+    budget = limit - (1 + 1 + 255 + 2)
+    parts = []
+    size = 0
+    for key in keys:
+        kb = key.encode("utf-8")
+        if size + 1 + len(kb) > budget:
+            next_cursor = keys[len(parts) - 1] if parts else next_cursor
+            break
+        parts.append(struct.pack("!B", len(kb)) + kb)
+        size += 1 + len(kb)
+    
+    cb = next_cursor.encode("utf-8") if next_cursor is not None else b""
+    flags = SCAN_MORE if next_cursor is not None else 0
+    head = struct.pack("!BB", flags, len(cb)) + cb + struct.pack("!H", len(parts))
+    return head + b"".join(parts), len(parts)
+
+
+def decode_scan_resp(payload: bytes) -> Tuple[List[str], Optional[str]]:
+    """Decodifică o pagină SCAN în (chei, cursorul următor sau None)."""
+    if len(payload) < 4:
+        raise ValueError(f"truncated payload: {len(payload)} bytes")
+    flags, clen = payload[0], payload[1]
+    cursor = payload[2:2 + clen].decode("utf-8", errors="replace")
+    offset = 2 + clen
+    (num_keys,) = struct.unpack_from("!H", payload, offset)
+    offset += 2
+    keys = []
+    for _ in range(num_keys):
+        klen = payload[offset]
+        keys.append(payload[offset + 1:offset + 1 + klen].decode("utf-8", errors="replace"))
+        offset += 1 + klen
+    return keys, (cursor if flags & SCAN_MORE else None)
+
+
 # ==============================================================================
 # PROTOCOL UDP SENZOR
 # ==============================================================================
@@ -242,6 +425,10 @@ UDP_FMT_WO_CRC = "!BIf10s"  # fără CRC, pentru calcul
 UDP_FMT = "!BIf10sI"        # format complet
 UDP_LEN = struct.calcsize(UDP_FMT)  # = 23 bytes
 
+_UDP = struct.Struct(UDP_FMT)
+_UDP_WO_CRC = struct.Struct(UDP_FMT_WO_CRC)
+_UDP_CRC = struct.Struct("!I")
+
 
 def pack_udp_sensor(sensor_id: int, temp_c: float, location: str) -> bytes:
     """
@@ -260,13 +447,10 @@ def pack_udp_sensor(sensor_id: int, temp_c: float, location: str) -> bytes:
     loc_b = loc_b.ljust(10, b"\x00")
     
     # Construim payload fără CRC
-    base = struct.pack(UDP_FMT_WO_CRC, UDP_VER, sensor_id, temp_c, loc_b)
+    base = _UDP_WO_CRC.pack(UDP_VER, sensor_id, temp_c, loc_b)
     
-    # Calculăm CRC
-    c = crc32(base)
-    
-    # Mesaj complet
-    return struct.pack(UDP_FMT, UDP_VER, sensor_id, temp_c, loc_b, c)
+    # Mesaj complet: CRC-ul e ultimul câmp, deci doar îl adăugăm
+    return base + _UDP_CRC.pack(crc32(base))
 
 
 def unpack_udp_sensor(data: bytes) -> Tuple[int, int, float, str]:
@@ -285,11 +469,10 @@ def unpack_udp_sensor(data: bytes) -> Tuple[int, int, float, str]:
     if len(data) != UDP_LEN:
         raise ValueError(f"invalid datagram length: {len(data)} != {UDP_LEN}")
     
-    ver, sensor_id, temp_c, loc_b, received_crc = struct.unpack(UDP_FMT, data)
+    ver, sensor_id, temp_c, loc_b, received_crc = _UDP.unpack(data)
     
-    # Recalculăm CRC pentru verificare
-    base = struct.pack(UDP_FMT_WO_CRC, ver, sensor_id, temp_c, loc_b)
-    computed_crc = crc32(base)
+    # Recalculăm CRC pentru verificare, direct peste bytes-ii primiți
+    computed_crc = crc32(data[:_UDP_WO_CRC.size])
     
     if computed_crc != received_crc:
         raise ValueError(f"CRC mismatch: computed {computed_crc:08x}, received {received_crc:08x}")
@@ -300,6 +483,61 @@ def unpack_udp_sensor(data: bytes) -> Tuple[int, int, float, str]:
     return ver, sensor_id, temp_c, loc
 
 
+def encode_udp_batch(readings: Iterable[Tuple[int, float, str]]) -> bytes:
+    """
+    Codifică mai multe citiri (sensor_id, temp_c, location) ca datagrame
+    consecutive de UDP_LEN bytes (ex: un buffer de replay sau un lot de trimis).
+    """
+    pack = _UDP_WO_CRC.pack
+    pack_crc = _UDP_CRC.pack
+    crc_fn = zlib.crc32
+    parts: List[bytes] = []
+    append = parts.append
+    for sensor_id, temp_c, location in readings:
+        # "10s" trunchiază și completează cu \0, exact ca în pack_udp_sensor
+        base = pack(UDP_VER, sensor_id, temp_c, location.encode("utf-8"))
+        append(base)
+        append(pack_crc(crc_fn(base) & 0xFFFFFFFF))
+    return b"".join(parts)
+
+
+def decode_udp_batch(data: bytes, count: Optional[int] = None) -> Tuple[List[Tuple[int, int, float, str]], int]:
+    """
+    Decodează datagrame consecutive de UDP_LEN bytes.
+    
+    Args:
+        data: Buffer cu datagramele una după alta
+        count: Câte datagrame (default: len(data) // UDP_LEN)
+        
+    Returns:
+        Tuple de (citiri valide (version, sensor_id, temperature, location),
+                  numărul de datagrame respinse pentru CRC greșit)
+    
+    Raises:
+        ValueError: Dacă count < 0 sau data conține mai puțin de count datagrame
+    """
+    available = len(data) // UDP_LEN
+    if count is None:
+        count = available
+    elif not 0 <= count <= available:
+        raise ValueError(f"count={count} but buffer holds {available} datagrams "
+                         f"({len(data)} bytes, {UDP_LEN} per datagram)")
+    view = memoryview(data)
+    unpack_from = _UDP.unpack_from
+    crc_fn = zlib.crc32
+    crc_len = _UDP_WO_CRC.size
+    readings: List[Tuple[int, int, float, str]] = []
+    append = readings.append
+    bad = 0
+    for offset in range(0, count * UDP_LEN, UDP_LEN):
+        ver, sensor_id, temp_c, loc_b, received_crc = unpack_from(data, offset)
+        if crc_fn(view[offset:offset + crc_len]) & 0xFFFFFFFF != received_crc:
+            bad += 1
+            continue
+        append((ver, sensor_id, temp_c, loc_b.rstrip(b"\x00").decode("utf-8", errors="replace")))
+    return readings, bad
+
+
 def format_sensor_reading(sensor_id: int, temp_c: float, location: str) -> str:
     """Formatează citirea unui senzor pentru afișare."""
     return f"[Sensor {sensor_id:04d}] {location}: {temp_c:+.1f}°C"